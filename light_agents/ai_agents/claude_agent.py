@@ -1,23 +1,68 @@
 from enum import Enum
+from functools import partial
 from typing import (
     Any,
+    AsyncIterator,
     Callable,
+    Collection,
+    Dict,
     List,
     Literal,
     MutableSequence,
     Optional,
     Sequence,
+    Tuple,
 )
 
-from anthropic import AnthropicVertex
+from anthropic import AnthropicVertex, AsyncAnthropicVertex
 from anthropic.types import Message as AnthropicMessage
 from anthropic.types import TextBlock as AnthropicTextBlock
-from pydantic import PrivateAttr
+from pydantic import Field, PrivateAttr
 
 from light_agents.config import appSettings
-from light_agents.core.logger_config import setup_logger
-from light_agents.core.tool_registry import ToolRegistry
-from light_agents.schemas import ToolBaseSchema
+from light_agents.core.budget import (
+    BudgetCall,
+    BudgetExceededError,
+    BudgetGuard,
+    admit_call,
+)
+from light_agents.core.connection_pool import (
+    ConnectionPoolConfig,
+    LazyClient,
+    LoopClients,
+    connection_pools,
+)
+from light_agents.core.deadline import (
+    DeadlineExceededError,
+    bounded_client,
+    check_deadline,
+    get_deadline,
+    raise_if_expired,
+)
+from light_agents.core.logger_config import log_context, setup_logger
+from light_agents.core.message_index import message_index
+from light_agents.core.output_spill import (
+    READ_TOOL_OUTPUT,
+    OutputSpillPolicy,
+    ReadToolOutput,
+    has_spilled_outputs,
+)
+from light_agents.core.payload_optimizer import (
+    PayloadOptimizer,
+    record_request_size,
+)
+from light_agents.core.run_context import RunContext, get_run_context
+from light_agents.core.semantic_cache import (
+    SKIP_CACHE_KWARG,
+    SemanticCache,
+    cacheable_query,
+    request_fingerprint,
+)
+from light_agents.core.speculative_executor import SpeculativeToolExecutor
+from light_agents.core.tool_errors import ToolErrorPolicy
+from light_agents.core.tool_registry import ALLOWED_TOOLS_KWARG, ToolRegistry
+from light_agents.exceptions.thread_agent_exceptions import ToolExecutionError
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
 from light_agents.schemas.messages_schemas import (
     Message,
     MessageBase,
@@ -30,13 +75,50 @@ from light_agents.serializers.messages.claude_messages_serializers import (
     claude_messages_list_serializer,
 )
 from light_agents.serializers.tools import claude_tool_calling_serializer
+from light_agents.utils.messages import recent_messages_text, used_tool_names
+from light_agents.utils.tokens import estimate_request_tokens
 
 logger = setup_logger(__name__)
 
-client = AnthropicVertex(
-    project_id=appSettings.GCP_PROJECT_ID,  # type: ignore
-    region=appSettings.GCP_REGION,  # type: ignore
-)
+ANTHROPIC_POOL = "anthropic"
+"""Name of the connection pool shared by the Claude agents by default."""
+
+
+def claude_client(
+    pool: str = ANTHROPIC_POOL, config: Optional[ConnectionPoolConfig] = None
+) -> AnthropicVertex:
+    """Build an Anthropic Vertex client on a shared connection pool."""
+    config = connection_pools.configure(pool, config)
+    return AnthropicVertex(
+        project_id=appSettings.GCP_PROJECT_ID,  # type: ignore
+        region=appSettings.GCP_REGION,  # type: ignore
+        http_client=connection_pools.client(pool),
+        timeout=config.timeout,
+        max_retries=config.max_retries,
+    )
+
+
+def async_claude_client(
+    pool: str = ANTHROPIC_POOL, config: Optional[ConnectionPoolConfig] = None
+) -> AsyncAnthropicVertex:
+    """Build an async Anthropic Vertex client on a shared connection pool.
+
+    The client can only be used in the running event loop.
+    """
+    config = connection_pools.configure(pool, config)
+    return AsyncAnthropicVertex(
+        project_id=appSettings.GCP_PROJECT_ID,  # type: ignore
+        region=appSettings.GCP_REGION,  # type: ignore
+        http_client=connection_pools.async_client(pool),
+        timeout=config.timeout,
+        max_retries=config.max_retries,
+    )
+
+
+client: LazyClient[AnthropicVertex] = LazyClient(claude_client)
+"""Client on the default pool, built on first use."""
+async_clients: LoopClients[AsyncAnthropicVertex] = LoopClients(async_claude_client)
+"""Async clients on the default pool, one per event loop."""
 
 MODEL_ID = "claude-3-5-sonnet@20240620"
 
@@ -78,6 +160,30 @@ class ClaudeAgent(ThreadAgent):
         tools_serializer: Function used to serialize the tools information.
         system_message_method: ```first``` or ```last``` to choose the system
             message inside messages.
+        stream: Whether to stream the response, executing ```read_only```
+            tools as soon as their input is fully received.
+        tools_top_k: Number of relevant tools to send on each call, besides
+            the ```always_on``` ones. If ```None```, every tool is sent.
+        tools_query_window: Number of recent messages used to select tools.
+        max_continuations: Maximum number of continuations requested when the
+            response reaches ```max_tokens```. Segments are stitched together.
+        tool_error_policy: Retry budgets and rendering of the tool errors. A
+            failing tool is returned to the model as an ```is_error``` result.
+        output_spill: Size policy of the tool outputs. Large outputs are kept
+            in a blob store and paged with the ```read_tool_output``` tool.
+        response_cache: Opt-in cache of the final responses, reused for
+            near-duplicate user queries with the same model, system prompt and
+            tools. Bypassed while tool results are in play.
+        payload_optimizer: Pass minimizing the serialized requests. Disabled
+            if ```None```.
+        provider_client: Client replacing the shared Anthropic client, e.g. a
+            simulated provider.
+        async_provider_client: Client replacing the shared async Anthropic
+            client.
+        connection_pool: Name of the shared HTTP connection pool. Agents using
+            the same name share their keep-alive connections.
+        connection_pool_config: Configuration of the connection pool, only
+            applied if the pool isn't configured yet.
 
     """
 
@@ -85,19 +191,82 @@ class ClaudeAgent(ThreadAgent):
     max_tokens: int = 8192
     messages_serializer: Callable[..., Any] = claude_messages_list_serializer
     verbose: bool = True
-    tools: List[ToolBaseSchema] = []
+    tools: List[ToolBaseSchema] = Field(default_factory=list)
     tools_serializer: Callable[..., Any] = claude_tool_calling_serializer
     tools_registry: Optional[ToolRegistry] = None
     system_message_selector: Literal["first", "last"] = "first"
-    _current_run_messages: List[MessageBase] = PrivateAttr(default=[])
-    """List of messages generated by the agent during the current run."""
+    stream: bool = False
+    tools_top_k: Optional[int] = None
+    tools_query_window: int = 4
+    max_continuations: int = 0
+    tool_error_policy: ToolErrorPolicy = Field(default_factory=ToolErrorPolicy)
+    output_spill: OutputSpillPolicy = Field(default_factory=OutputSpillPolicy)
+    response_cache: Optional[SemanticCache] = Field(default=None, exclude=True)
+    payload_optimizer: Optional[PayloadOptimizer] = Field(
+        default_factory=PayloadOptimizer
+    )
+    provider_client: Optional[Any] = Field(default=None, exclude=True)
+    async_provider_client: Optional[Any] = Field(default=None, exclude=True)
+    connection_pool: str = ANTHROPIC_POOL
+    connection_pool_config: Optional[ConnectionPoolConfig] = None
+    _pool_client: Optional[AnthropicVertex] = PrivateAttr(default=None)
+    """Client on the agent's connection pool, if it isn't the default one."""
+    _async_pool_clients: Optional[LoopClients[AsyncAnthropicVertex]] = PrivateAttr(
+        default=None
+    )
+    """Async clients on the agent's connection pool, one per event loop."""
+    _serialized_tools: Dict[str, Dict[str, Any]] = PrivateAttr(
+        default_factory=dict
+    )
+    """Serialized tool schemas, by tool name."""
+    _paging_tool: ReadToolOutput = PrivateAttr()
+    """Tool reading the outputs spilled to the blob store."""
+    _speculative_executor: SpeculativeToolExecutor = PrivateAttr()
+    """Executor for tools started while the response is streaming. Each run
+    uses its own `for_run` executor, sharing these threads."""
 
     def __init__(self, **data: Any) -> None:
         """Initialize the Claude agent."""
         super().__init__(**data)
-        self.tools_registry = ToolRegistry()
+        if self.tools_registry is None:
+            self.tools_registry = ToolRegistry()
         if len(self.tools) > 0:
             self.tools_registry.register_tools(self.tools)
+        self._speculative_executor = SpeculativeToolExecutor(self.tools_registry)
+        self._paging_tool = self.tools_registry.register_paging_tool(
+            self.output_spill.paging_tool()
+        )
+        if self.connection_pool != ANTHROPIC_POOL or self.connection_pool_config:
+            self._pool_client = claude_client(
+                self.connection_pool, self.connection_pool_config
+            )
+            self._async_pool_clients = LoopClients(
+                partial(
+                    async_claude_client,
+                    self.connection_pool,
+                    self.connection_pool_config,
+                )
+            )
+
+    def warmup(self) -> None:
+        """Prepare the agent before it takes traffic.
+
+        Serializes the tool schemas and, unless a provider client is injected,
+        opens connections of the pool to the Vertex AI API.
+        """
+        self.serialize_tools(self.tools)
+        if self.provider_client is None:
+            connection_pools.warmup(
+                self.connection_pool, str(self._client().base_url)
+            )
+
+    async def awarmup(self) -> None:
+        """Prepare the agent before it takes traffic, on the async pool."""
+        self.serialize_tools(self.tools)
+        if self.async_provider_client is None:
+            await connection_pools.awarmup(
+                self.connection_pool, str(self._async_client().base_url)
+            )
 
     def agent_run(
         self, thread_messages: MutableSequence[MessageBase], **kwargs: Any
@@ -109,17 +278,20 @@ class ClaudeAgent(ThreadAgent):
             run response.
             
         2. Process the model response in `process_model_response`. If the
-            response is a simple text message, `_current_run_messages` will be
-            a list of `Message` objects.
+            response is a simple text message, the run messages will be a list
+            of `Message` objects.
             
         3. Process the tools in `process_tools`. Execute all required tools. 
-            `_current_run_messages` will be a list containing `ToolUseMessage` 
+            The run messages will be a list containing `ToolUseMessage`
             objects with the `tool_outputs` field populated.
     
-        4. If there is any `ToolUseMessage` in the `_current_run_messages`, 
-            call `agent_run` the agent again with the updated messages in order
+        4. If there is any `ToolUseMessage` in the run messages, call
+            `agent_run` the agent again with the updated messages in order
              to get a new response from the model based on the tools outputs.
 
+        The state of the run is kept in a `RunContext`, passed down in the
+        `run_context` keyword argument, so concurrent runs can share the agent.
+
         Args:
         ----
             thread_messages: List of messages forming the conversation thread.
@@ -135,130 +307,625 @@ class ClaudeAgent(ThreadAgent):
             [Message(content="This is a Response", role="ai", type="text")]
 
         """
-        if not kwargs.get("calling_from_inside_agent_run"):
-            self._current_run_messages = []
+        context = self._run_context(kwargs)
+        with log_context(run_id=context.run_id):
+            if self.verbose:
+                logger.debug(f"Running agent with messages: {thread_messages}")
 
-        if self.verbose:
-            logger.debug(f"Running agent with messages: {thread_messages}")
+            try:
+                response = self.send_to_claude(thread_messages, **kwargs)
+            except BudgetExceededError:
+                logger.warning("Run stopped: budget exhausted.")
+                return context.messages
+            except DeadlineExceededError:
+                logger.warning("Run stopped: deadline reached.")
+                return context.messages
 
-        response = self.send_to_claude(thread_messages, **kwargs)
+            if self.max_continuations > 0:
+                response = self.continue_truncated_response(
+                    thread_messages, response, **kwargs
+                )
 
-        logger.debug(f"------------------\n{response}\n------------------")
+            logger.debug(f"------------------\n{response}\n------------------")
 
-        run_messages = self.process_model_response(response, **kwargs)
-        self._current_run_messages.extend(run_messages)
+            run_messages = self.process_model_response(response, **kwargs)
+            context.messages.extend(run_messages)
 
-        thread_messages.extend(run_messages)
+            thread_messages.extend(run_messages)
 
-        if any(
-            isinstance(message, ToolUseMessage) for message in run_messages
-        ):
-            kwargs["calling_from_inside_agent_run"] = True
-            logger.debug(
-                "Tools were used. Feeding agent with results"
-            ) if self.verbose else None
-            self.agent_run(thread_messages, **kwargs)
+            if any(
+                isinstance(message, ToolUseMessage) for message in run_messages
+            ):
+                logger.debug(
+                    "Tools were used. Feeding agent with results"
+                ) if self.verbose else None
+                self.agent_run(thread_messages, **kwargs)
 
-        return self._current_run_messages
+            return context.messages
 
-    def send_to_claude(
+    async def astream_run(
         self, thread_messages: MutableSequence[MessageBase], **kwargs: Any
-    ) -> AnthropicMessage:
-        """Send thread's messages to the model and return the raw response.
+    ) -> AsyncIterator[Sequence[MessageBase]]:
+        """Execute agent's workflow on the async path.
+
+        Follows the same steps as `agent_run`, awaiting the model with
+        `asend_to_claude` and the tools with `aprocess_tools`. The run state
+        is kept locally, so concurrent runs can share the agent.
 
         Args:
         ----
             thread_messages: List of messages forming the conversation thread.
-            **kwargs: Additional arguments for the serialization process.
+            **kwargs: Additional arguments for processing the response.
+
+        Yields:
+        ------
+            Messages: Messages generated in each round, either the model text
+                response or the tool uses with their outputs.
+
+        """
+        context = self._run_context(kwargs)
+        with log_context(run_id=context.run_id):
+            while True:
+                try:
+                    response = await self.asend_to_claude(thread_messages, **kwargs)
+                except BudgetExceededError:
+                    logger.warning("Run stopped: budget exhausted.")
+                    break
+                except DeadlineExceededError:
+                    logger.warning("Run stopped: deadline reached.")
+                    break
+
+                if self.max_continuations > 0:
+                    response = await self.acontinue_truncated_response(
+                        thread_messages, response, **kwargs
+                    )
+
+                run_messages = self.parse_model_response(response, **kwargs)
+                tool_use_messages = [
+                    message
+                    for message in run_messages
+                    if isinstance(message, ToolUseMessage)
+                ]
+                if tool_use_messages:
+                    run_messages = await self.aprocess_tools(
+                        tool_use_messages, **kwargs
+                    )
+
+                thread_messages.extend(run_messages)
+                yield run_messages
+
+                if not tool_use_messages:
+                    break
+
+    def _run_context(self, kwargs: Dict[str, Any]) -> RunContext:
+        return get_run_context(kwargs, self._speculative_executor)
+
+    def _client(self) -> AnthropicVertex:
+        return self.provider_client or self._pool_client or client.get()
+
+    def _async_client(self) -> AsyncAnthropicVertex:
+        return self.async_provider_client or (
+            self._async_pool_clients or async_clients
+        ).get()
+
+    def serialize_tools(self, tools: List[ToolBaseSchema]) -> List[Dict[str, Any]]:
+        """Serialize the tools, reusing the schemas serialized before."""
+        serialized_tools = []
+        for tool in tools:
+            if tool.name not in self._serialized_tools:
+                serialized_tool = self.tools_serializer(tool)
+                if self.payload_optimizer:
+                    serialized_tool = self.payload_optimizer.optimize_tool(
+                        serialized_tool
+                    )
+                self._serialized_tools[tool.name] = serialized_tool
+            serialized_tools.append(self._serialized_tools[tool.name])
+        return serialized_tools
+
+    def build_request(
+        self,
+        thread_messages: MutableSequence[MessageBase],
+        allowed_tools: Optional[Collection[str]] = None,
+    ) -> Dict[str, Any]:
+        """Build the arguments of the Claude messages request.
+
+        Args:
+        ----
+            thread_messages: List of messages forming the conversation thread.
+            allowed_tools: Names of the tools that can be sent. Defaults to
+                every tool.
 
         Returns:
         -------
-            AnthropicMessage: The response message from the Claude model.
+            Dict[str, Any]: Arguments for the Claude messages request.
 
         """
         serialized_messages = self.messages_serializer(
             thread_messages,
             **{"roles_mapping": ModelMessageRoles.get_role_mapping()},
         )
+        if self.payload_optimizer:
+            serialized_messages = self.payload_optimizer.optimize_messages(
+                serialized_messages
+            )
         if self.verbose:
             logger.debug(f"Serialized messages: {serialized_messages}")
 
+        index = message_index(thread_messages)
         if self.system_message_selector == "first":
-            system_message = next(
-                (
-                    message
-                    for message in thread_messages
-                    if message.role == MessageRole.SYSTEM
-                ),
-                None,
-            )
+            system_message = index.first(MessageRole.SYSTEM)
 
         elif self.system_message_selector == "last":
-            system_message = next(
-                (
-                    message
-                    for message in reversed(thread_messages)
-                    if message.role == MessageRole.SYSTEM
-                ),
-                None,
-            )
+            system_message = index.last(MessageRole.SYSTEM)
 
-        serialized_tools = [self.tools_serializer(tool) for tool in self.tools]
+        serialized_tools = self.serialize_tools(
+            self.select_tools(thread_messages, allowed_tools)
+        )
         logger.debug(
             f"Serialized tools: {serialized_tools}"
         ) if self.verbose else None
 
+        request: Dict[str, Any] = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "messages": serialized_messages,
+            "tools": serialized_tools,
+        }
         if system_message and isinstance(system_message, Message):
             logger.debug(
                 f"Calling agent with {self.system_message_selector} "
                 "system prompt."
             ) if self.verbose else None
-
-            response = client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                messages=serialized_messages,
-                tools=serialized_tools,
-                system=system_message.content,
-            )
+            request["system"] = system_message.content
 
         else:
             logger.debug(
                 "Calling agent without system prompt."
             ) if self.verbose else None
 
-            response = client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                messages=serialized_messages,
-                tools=serialized_tools,
-            )
+        return request
+
+    def send_to_claude(
+        self, thread_messages: MutableSequence[MessageBase], **kwargs: Any
+    ) -> AnthropicMessage:
+        """Send thread's messages to the model and return the raw response.
+
+        Args:
+        ----
+            thread_messages: List of messages forming the conversation thread.
+            **kwargs: Additional arguments for the serialization process.
+
+        Returns:
+        -------
+            AnthropicMessage: The response message from the Claude model.
+
+        """
+        check_deadline(kwargs)
+        request = self.build_request(
+            thread_messages, kwargs.get(ALLOWED_TOOLS_KWARG)
+        )
+        self._wrap_up(request, kwargs)
+        cache_key = self._response_cache_key(thread_messages, request, kwargs)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        with self.admit_request(request, **kwargs) as call:
+            self._record_request_size(request, kwargs)
+            try:
+                if self.stream:
+                    response = self.stream_from_claude(request, **kwargs)
+                else:
+                    response = bounded_client(self._client(), kwargs).messages.create(
+                        **request
+                    )
+            except Exception as e:
+                raise_if_expired(kwargs, e)
+                raise
+            call.charge(response.usage.input_tokens, response.usage.output_tokens)
+        self._cache_response(cache_key, response)
+        return response
+
+    async def asend_to_claude(
+        self, thread_messages: MutableSequence[MessageBase], **kwargs: Any
+    ) -> AnthropicMessage:
+        """Send thread's messages to the model with the async client.
+
+        Args:
+        ----
+            thread_messages: List of messages forming the conversation thread.
+            **kwargs: Additional arguments for the serialization process.
+
+        Returns:
+        -------
+            AnthropicMessage: The response message from the Claude model.
+
+        """
+        check_deadline(kwargs)
+        request = self.build_request(
+            thread_messages, kwargs.get(ALLOWED_TOOLS_KWARG)
+        )
+        self._wrap_up(request, kwargs)
+        cache_key = self._response_cache_key(thread_messages, request, kwargs)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        with self.admit_request(request, **kwargs) as call:
+            self._record_request_size(request, kwargs)
+            try:
+                if self.stream:
+                    response = await self.astream_from_claude(request, **kwargs)
+                else:
+                    response = await bounded_client(
+                        self._async_client(), kwargs
+                    ).messages.create(**request)
+            except Exception as e:
+                raise_if_expired(kwargs, e)
+                raise
+            call.charge(response.usage.input_tokens, response.usage.output_tokens)
+        self._cache_response(cache_key, response)
+        return response
+
+    def _wrap_up(self, request: Dict[str, Any], kwargs: Dict[str, Any]) -> None:
+        # out of time for more tool rounds, the model has to answer now
+        deadline = get_deadline(kwargs)
+        if deadline is not None and deadline.wrapping_up and request.get("tools"):
+            logger.debug("Wrapping up: no more tool calls.") if self.verbose else None
+            request["tool_choice"] = {"type": "none"}
+
+    def _record_request_size(
+        self, request: Dict[str, Any], kwargs: Dict[str, Any]
+    ) -> None:
+        size = record_request_size(request, kwargs)
+        logger.debug(
+            f"Request size: {size} bytes."
+        ) if self.verbose and size is not None else None
+
+    def _response_cache_key(
+        self,
+        thread_messages: MutableSequence[MessageBase],
+        request: Dict[str, Any],
+        kwargs: Dict[str, Any],
+    ) -> Optional[Tuple[str, str]]:
+        """Get the query and the context fingerprint caching a request.
+
+        Internal requests (e.g. continuations) and the answers forced by the
+        deadline wrap-up are never cached.
+        """
+        if self.response_cache is None or kwargs.get(SKIP_CACHE_KWARG):
+            return None
+        deadline = get_deadline(kwargs)
+        if deadline is not None and deadline.wrapping_up:
+            return None
+        query = cacheable_query(thread_messages)
+        if query is None:
+            return None
+        return query, request_fingerprint(request)
+
+    def _cached_response(
+        self, cache_key: Optional[Tuple[str, str]]
+    ) -> Optional[AnthropicMessage]:
+        if cache_key is None or self.response_cache is None:
+            return None
+        cached: Optional[AnthropicMessage] = self.response_cache.get(*cache_key)
+        if cached is not None:
+            logger.debug("Using cached response.") if self.verbose else None
+        return cached
+
+    def _cache_response(
+        self, cache_key: Optional[Tuple[str, str]], response: AnthropicMessage
+    ) -> None:
+        # only final answers are cached, never tool uses or cut off answers
+        if cache_key is None or self.response_cache is None:
+            return
+        if response.stop_reason == "end_turn" and all(
+            block.type != "tool_use" for block in response.content
+        ):
+            query, context = cache_key
+            self.response_cache.put(query, response, context)
+
+    def admit_request(self, request: Dict[str, Any], **kwargs: Any) -> BudgetCall:
+        """Admit the request with the run's budget, if any.
+
+        The ```max_tokens``` of the request is lowered to what's left in the
+        budget. The input tokens are estimated from the messages and
+        tools actually sent.
+
+        Raises:
+            BudgetExceededError: If the budget is exhausted.
+
+        """
+        budget: Optional[BudgetGuard] = kwargs.get("budget")
+        call = admit_call(
+            budget,
+            self.model,
+            estimate_request_tokens(request),
+            request["max_tokens"],
+        )
+        request["max_tokens"] = call.max_tokens
+        return call
+
+    def continue_truncated_response(
+        self,
+        thread_messages: MutableSequence[MessageBase],
+        response: AnthropicMessage,
+        **kwargs: Any,
+    ) -> AnthropicMessage:
+        """Continue a response that reached the ```max_tokens``` limit.
+
+        The partial text is sent back as the last assistant message, so the
+        model resumes it from where it stopped. It's repeated up to
+        ```max_continuations``` times.
+
+        Args:
+        ----
+            thread_messages: List of messages forming the conversation thread.
+            response: The response from the Claude model, possibly truncated.
+            **kwargs: Additional arguments for the serialization process.
+
+        Returns:
+        -------
+            AnthropicMessage: The response with every text segment stitched
+                into a single text block.
+
+        """
+        continuations = 0
+        while self._should_continue(response, continuations):
+            continuations += 1
+            logger.debug(
+                f"Response truncated. Requesting continuation {continuations}."
+            ) if self.verbose else None
+
+            partial_text = self._partial_text(response)
+            try:
+                continuation = self.send_to_claude(
+                    self._continuation_messages(thread_messages, partial_text),
+                    **{**kwargs, SKIP_CACHE_KWARG: True},
+                )
+            except (BudgetExceededError, DeadlineExceededError):
+                break
+            response = self._stitch_continuation(partial_text, continuation)
+
+        return response
+
+    async def acontinue_truncated_response(
+        self,
+        thread_messages: MutableSequence[MessageBase],
+        response: AnthropicMessage,
+        **kwargs: Any,
+    ) -> AnthropicMessage:
+        """Continue a response that reached the limit, on the async path.
+
+        See `continue_truncated_response`.
+        """
+        continuations = 0
+        while self._should_continue(response, continuations):
+            continuations += 1
+            partial_text = self._partial_text(response)
+            try:
+                continuation = await self.asend_to_claude(
+                    self._continuation_messages(thread_messages, partial_text),
+                    **{**kwargs, SKIP_CACHE_KWARG: True},
+                )
+            except (BudgetExceededError, DeadlineExceededError):
+                break
+            response = self._stitch_continuation(partial_text, continuation)
 
         return response
 
+    def _should_continue(
+        self, response: AnthropicMessage, continuations: int
+    ) -> bool:
+        return bool(
+            response.stop_reason == "max_tokens"
+            and response.content
+            and all(
+                isinstance(block, AnthropicTextBlock) for block in response.content
+            )
+            and continuations < self.max_continuations
+        )
+
+    @staticmethod
+    def _partial_text(response: AnthropicMessage) -> str:
+        # the API rejects assistant prefills ending with whitespace
+        return "".join(
+            block.text
+            for block in response.content
+            if isinstance(block, AnthropicTextBlock)
+        ).rstrip()
+
+    @staticmethod
+    def _continuation_messages(
+        thread_messages: MutableSequence[MessageBase], partial_text: str
+    ) -> List[MessageBase]:
+        return [
+            *thread_messages,
+            Message(
+                role=MessageRole.AI,
+                type=MessageType.TEXT,
+                content=partial_text,
+            ),
+        ]
+
+    @staticmethod
+    def _stitch_continuation(
+        partial_text: str, continuation: AnthropicMessage
+    ) -> AnthropicMessage:
+        continuation_text = "".join(
+            block.text
+            for block in continuation.content
+            if isinstance(block, AnthropicTextBlock)
+        )
+        return continuation.model_copy(
+            update={
+                "content": [
+                    AnthropicTextBlock(
+                        type="text", text=partial_text + continuation_text
+                    ),
+                    *(
+                        block
+                        for block in continuation.content
+                        if not isinstance(block, AnthropicTextBlock)
+                    ),
+                ]
+            }
+        )
+
+    def select_tools(
+        self,
+        thread_messages: MutableSequence[MessageBase],
+        allowed_tools: Optional[Collection[str]] = None,
+    ) -> List[ToolBaseSchema]:
+        """Select the tools to be sent to the model.
+
+        Args:
+        ----
+            thread_messages: List of messages forming the conversation thread.
+            allowed_tools: Names of the tools that can be selected. Defaults
+                to every tool.
+
+        Returns:
+        -------
+            List[ToolBaseSchema]: Every tool, or only the ```always_on``` tools
+                and the tools already called in the thread, plus the
+                ```tools_top_k``` most relevant to the last
+                ```tools_query_window``` messages.
+
+        """
+        if self.tools_top_k is None or not self.tools_registry:
+            tools = self.tools
+        else:
+            query = recent_messages_text(thread_messages, self.tools_query_window)
+            tools = self.tools_registry.select_tools(
+                query, self.tools_top_k, self.tools
+            )
+            # the tools called earlier in the thread stay available
+            used_tools = used_tool_names(thread_messages)
+            selected = {tool.name for tool in tools}
+            tools += [
+                tool
+                for tool in self.tools
+                if tool.name in used_tools and tool.name not in selected
+            ]
+            logger.debug(
+                f"Selected tools: {[tool.name for tool in tools]}"
+            ) if self.verbose else None
+        if allowed_tools is not None:
+            tools = [tool for tool in tools if tool.name in allowed_tools]
+
+        # the paging tool is only needed once an output was spilled
+        if has_spilled_outputs(thread_messages) and all(
+            tool.name != READ_TOOL_OUTPUT for tool in tools
+        ):
+            tools = [*tools, self._paging_tool]
+        return tools
+
+    def stream_from_claude(
+        self, request: Dict[str, Any], **kwargs: Any
+    ) -> AnthropicMessage:
+        """Stream the response from the model.
+
+        Every `tool_use` block is handed to the speculative executor as soon as
+        the block stops, so `read_only` tools run while the rest of the
+        response is still arriving.
+
+        Args:
+        ----
+            request: Arguments for the Claude messages request.
+            **kwargs: Additional arguments, passed to speculative tools.
+
+        Returns:
+        -------
+            AnthropicMessage: The accumulated response message.
+
+        """
+        speculative_executor = self._run_context(kwargs).speculative_executor
+        try:
+            with bounded_client(self._client(), kwargs).messages.stream(
+                **request
+            ) as stream:
+                for event in stream:
+                    if (
+                        event.type == "content_block_stop"
+                        and event.content_block.type == "tool_use"
+                    ):
+                        block = event.content_block
+                        speculative_executor.submit(
+                            block.id, block.name, block.input, **kwargs
+                        )
+                return stream.get_final_message()
+
+        except BaseException:
+            speculative_executor.discard()
+            raise
+
+    async def astream_from_claude(
+        self, request: Dict[str, Any], **kwargs: Any
+    ) -> AnthropicMessage:
+        """Stream the response from the model with the async client.
+
+        See `stream_from_claude`.
+        """
+        speculative_executor = self._run_context(kwargs).speculative_executor
+        try:
+            async with bounded_client(
+                self._async_client(), kwargs
+            ).messages.stream(**request) as stream:
+                async for event in stream:
+                    if (
+                        event.type == "content_block_stop"
+                        and event.content_block.type == "tool_use"
+                    ):
+                        block = event.content_block
+                        speculative_executor.submit(
+                            block.id, block.name, block.input, **kwargs
+                        )
+                return await stream.get_final_message()
+
+        except BaseException:
+            speculative_executor.discard()
+            raise
+
     def process_model_response(
         self, response: AnthropicMessage, **kwargs: Any
     ) -> Sequence[MessageBase]:
-        """Process the model response."""
+        """Process the model response, executing the requested tools."""
+        messages = self.parse_model_response(response, **kwargs)
+        tool_use_messages = [
+            message for message in messages if isinstance(message, ToolUseMessage)
+        ]
+        if tool_use_messages:
+            return self.process_tools(tool_use_messages, **kwargs)
+        return messages
+
+    def parse_model_response(
+        self, response: AnthropicMessage, **kwargs: Any
+    ) -> Sequence[MessageBase]:
+        """Convert the model response into messages, without executing tools."""
         stop_reason = response.stop_reason
         if stop_reason in ["end_turn", "max_tokens", "stop_sequence"]:
             logger.debug("stop reason doesn't require tools processing.")
             if stop_reason == "max_tokens":
                 logger.warning("The response reached the max tokens limit.")
 
-            first_message = response.content[0]
-            if isinstance(first_message, AnthropicTextBlock):
+            text_blocks = [
+                block
+                for block in response.content
+                if isinstance(block, AnthropicTextBlock)
+            ]
+            if text_blocks:
                 messages: List[MessageBase] = [
                     Message(
                         role=MessageRole.AI,
                         type=MessageType.TEXT,
-                        content=first_message.text,
+                        content="".join(block.text for block in text_blocks),
                     )
                 ]
                 return messages
             else:
                 raise ValueError(
-                    f"Unexpected response content: {first_message}"
+                    f"Unexpected response content: {response.content}"
                 )
 
         elif stop_reason == "tool_use":
@@ -280,6 +947,7 @@ class ClaudeAgent(ThreadAgent):
                         type=MessageType.TEXT,
                         role=MessageRole.TOOL_USE,
                         input_params_dict=block_input,
+                        completion_id=response.id,
                     )
                     tool_use_messages.append(tool_use_message)
                     
@@ -289,9 +957,6 @@ class ClaudeAgent(ThreadAgent):
                         "will be used."
                     ) if self.verbose else None
                     # raise ValueError(f"Unexpected tool use block: {block}")
-            logger.debug(f"Passing to process_tools: {tool_use_messages}")
-            tool_use_messages = self.process_tools(tool_use_messages, **kwargs)
-
             return tool_use_messages
 
         else:
@@ -301,41 +966,141 @@ class ClaudeAgent(ThreadAgent):
         self, tool_use_messages: List[ToolUseMessage], **kwargs: Any
     ) -> List[ToolUseMessage]:
         """Process the tools."""
+        context = self._run_context(kwargs)
+        speculative_executor = context.speculative_executor
         updated_tool_use_messages = []
+        # Duplicated read only calls within the same response run only once
+        batch_responses: Dict[str, ToolResponseSchema] = {}
         if self.tools_registry:
             for tool_message in tool_use_messages:
-                if isinstance(tool_message.input_params_dict, str):
-                    args_dict = {"response": tool_message}
-                else:
-                    args_dict = tool_message.input_params_dict
-
+                args_dict = self._tool_args(tool_message)
                 try:
                     logger.debug(
                         f"Executing tool: '{tool_message.name}' "
                         f"with args: {args_dict}"
                     )
-                    tool_response = self.tools_registry.execute_tool(
+                    tool_response = speculative_executor.pop_result(
+                        tool_message.run_id
+                    )
+                    call_key = self.tools_registry.call_key(
                         tool_message.name,
-                        args_dict,
-                        **kwargs,
+                        {**args_dict, **self.tools_registry.tool_kwargs(kwargs)},
                     )
-                    logger.info(
-                        f"Tool returned:\n{tool_response}"
-                    ) if self.verbose else None
-
-                    tool_message.tool_outputs = tool_response.content
-                    if tool_response.external_fields:
-                        tool_message.external_fields.update(
-                            tool_response.external_fields
+                    if tool_response is None:
+                        tool_response = batch_responses.get(call_key)
+                    if tool_response is None:
+                        tool_response = self.tools_registry.execute_tool(
+                            tool_message.name,
+                            args_dict,
+                            **kwargs,
                         )
-                    updated_tool_use_messages.append(tool_message)
+                    if self.tools_registry.is_read_only(tool_message.name):
+                        batch_responses[call_key] = tool_response
 
-                except Exception:
-                    tool_message.is_error = True
-                    logger.error(
-                        f"Error executing tool: {tool_message.name}"
-                        f"with args: {args_dict}"
+                    self._apply_tool_response(tool_message, tool_response, context)
+
+                except ToolExecutionError:
+                    raise
+                except Exception as e:
+                    self._recover_tool_error(tool_message, args_dict, e, context)
+                updated_tool_use_messages.append(tool_message)
+
+        speculative_executor.discard()
+        return updated_tool_use_messages
+
+    async def aprocess_tools(
+        self, tool_use_messages: List[ToolUseMessage], **kwargs: Any
+    ) -> List[ToolUseMessage]:
+        """Process the tools without blocking the event loop.
+
+        Async tools are awaited on the event loop, and sync ones run on the
+        registry thread pool.
+        """
+        context = self._run_context(kwargs)
+        speculative_executor = context.speculative_executor
+        updated_tool_use_messages = []
+        batch_responses: Dict[str, ToolResponseSchema] = {}
+        if self.tools_registry:
+            for tool_message in tool_use_messages:
+                args_dict = self._tool_args(tool_message)
+                try:
+                    tool_response = await speculative_executor.apop_result(
+                        tool_message.run_id
+                    )
+                    call_key = self.tools_registry.call_key(
+                        tool_message.name,
+                        {**args_dict, **self.tools_registry.tool_kwargs(kwargs)},
                     )
-                    raise ValueError(f"Error executing tool: {tool_message}")
+                    if tool_response is None:
+                        tool_response = batch_responses.get(call_key)
+                    if tool_response is None:
+                        tool_response = await self.tools_registry.aexecute_tool(
+                            tool_message.name, args_dict, **kwargs
+                        )
+                    if self.tools_registry.is_read_only(tool_message.name):
+                        batch_responses[call_key] = tool_response
+
+                    self._apply_tool_response(tool_message, tool_response, context)
 
+                except ToolExecutionError:
+                    raise
+                except Exception as e:
+                    self._recover_tool_error(tool_message, args_dict, e, context)
+                updated_tool_use_messages.append(tool_message)
+
+        speculative_executor.discard()
         return updated_tool_use_messages
+
+    @staticmethod
+    def _tool_args(tool_message: ToolUseMessage) -> Dict[str, Any]:
+        if isinstance(tool_message.input_params_dict, str):
+            return {"response": tool_message}
+        return tool_message.input_params_dict
+
+    def _apply_tool_response(
+        self,
+        tool_message: ToolUseMessage,
+        tool_response: ToolResponseSchema,
+        context: RunContext,
+    ) -> None:
+        logger.info(
+            f"Tool returned:\n{tool_response}"
+        ) if self.verbose else None
+
+        self.output_spill.spill(tool_message, tool_response)
+        if tool_response.unavailable:
+            # the tool wasn't executed, so it isn't a tool failure
+            tool_message.is_error = True
+        elif tool_response.is_error:
+            self._count_tool_error(
+                tool_message, ValueError(tool_response.content), context
+            )
+        if tool_response.external_fields:
+            tool_message.external_fields.update(tool_response.external_fields)
+
+    def _recover_tool_error(
+        self,
+        tool_message: ToolUseMessage,
+        args_dict: Dict[str, Any],
+        error: Exception,
+        context: RunContext,
+    ) -> None:
+        logger.error(
+            f"Error executing tool: '{tool_message.name}' with args: {args_dict}"
+        )
+        self._count_tool_error(tool_message, error, context)
+        tool_message.tool_outputs = self.tool_error_policy.render(
+            tool_message.name, error
+        )
+
+    def _count_tool_error(
+        self, tool_message: ToolUseMessage, error: Exception, context: RunContext
+    ) -> None:
+        """Flag a failed tool call, aborting the run past the retry budgets."""
+        tool_message.is_error = True
+        if not self.tool_error_policy.admit(tool_message.name, context.tool_errors):
+            context.speculative_executor.discard()
+            raise ToolExecutionError(tool_message.name, error)
+        logger.warning(
+            f"Tool '{tool_message.name}' failed. Returning the error to the model."
+        )
@@ -1,26 +1,83 @@
+import json
 from ast import literal_eval
 from enum import Enum
+from functools import partial
 from typing import (
     Any,
+    AsyncIterator,
     Callable,
+    Collection,
+    Dict,
     List,
     Literal,
     MutableSequence,
     Optional,
     Sequence,
+    Tuple,
 )
 
-from openai import OpenAI
-from openai.types.chat import ChatCompletion, ChatCompletionMessageToolCall
-from pydantic import PrivateAttr
+from openai import AsyncOpenAI, OpenAI
+from openai.types.chat import (
+    ChatCompletion,
+    ChatCompletionChunk,
+    ChatCompletionMessage,
+    ChatCompletionMessageToolCall,
+)
+from openai.types.chat.chat_completion import Choice
+from openai.types.chat.chat_completion_message_tool_call import Function
+from openai.types.completion_usage import CompletionUsage
+from pydantic import Field, PrivateAttr
 
 from light_agents.config import appSettings
-from light_agents.core.logger_config import setup_logger
-from light_agents.core.tool_registry import ToolRegistry
+from light_agents.core.budget import (
+    BudgetCall,
+    BudgetExceededError,
+    BudgetGuard,
+    admit_call,
+)
+from light_agents.core.choice_selectors import (
+    ChoiceSelector,
+    first_valid_tool_call,
+)
+from light_agents.core.connection_pool import (
+    ConnectionPoolConfig,
+    LazyClient,
+    LoopClients,
+    connection_pools,
+)
+from light_agents.core.deadline import (
+    DeadlineExceededError,
+    bounded_client,
+    check_deadline,
+    get_deadline,
+    raise_if_expired,
+)
+from light_agents.core.logger_config import log_context, setup_logger
+from light_agents.core.output_spill import (
+    READ_TOOL_OUTPUT,
+    OutputSpillPolicy,
+    ReadToolOutput,
+    has_spilled_outputs,
+)
+from light_agents.core.payload_optimizer import (
+    PayloadOptimizer,
+    record_request_size,
+)
+from light_agents.core.run_context import RunContext, get_run_context
+from light_agents.core.semantic_cache import (
+    SKIP_CACHE_KWARG,
+    SemanticCache,
+    cacheable_query,
+    request_fingerprint,
+)
+from light_agents.core.speculative_executor import SpeculativeToolExecutor
+from light_agents.core.tool_errors import ToolErrorPolicy
+from light_agents.core.tool_registry import ALLOWED_TOOLS_KWARG, ToolRegistry
 from light_agents.exceptions.thread_agent_exceptions import (
     AIAgentCompletionError,
+    ToolExecutionError,
 )
-from light_agents.schemas import ToolBaseSchema
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
 from light_agents.schemas.messages_schemas import (
     Message,
     MessageBase,
@@ -35,10 +92,57 @@ from light_agents.serializers.messages.openai_messages_serializer import (
 from light_agents.serializers.tools.openai_tools_serializer import (
     openai_tool_calling_serializer,
 )
+from light_agents.utils.messages import (
+    recent_messages_text,
+    stitch_text,
+    used_tool_names,
+)
+from light_agents.utils.tokens import CHARS_PER_TOKEN, estimate_request_tokens
 
 logger = setup_logger(__name__)
 
-client = OpenAI(api_key=appSettings.OPENAI_API_KEY)
+CONTINUATION_PROMPT = (
+    "Your last answer was cut off. Continue it exactly where it stopped, "
+    "without repeating what was already written."
+)
+
+OPENAI_POOL = "openai"
+"""Name of the connection pool shared by the OpenAI agents by default."""
+
+
+def openai_client(
+    pool: str = OPENAI_POOL, config: Optional[ConnectionPoolConfig] = None
+) -> OpenAI:
+    """Build an OpenAI client on a shared connection pool."""
+    config = connection_pools.configure(pool, config)
+    return OpenAI(
+        api_key=appSettings.OPENAI_API_KEY,
+        http_client=connection_pools.client(pool),
+        timeout=config.timeout,
+        max_retries=config.max_retries,
+    )
+
+
+def async_openai_client(
+    pool: str = OPENAI_POOL, config: Optional[ConnectionPoolConfig] = None
+) -> AsyncOpenAI:
+    """Build an async OpenAI client on a shared connection pool.
+
+    The client can only be used in the running event loop.
+    """
+    config = connection_pools.configure(pool, config)
+    return AsyncOpenAI(
+        api_key=appSettings.OPENAI_API_KEY,
+        http_client=connection_pools.async_client(pool),
+        timeout=config.timeout,
+        max_retries=config.max_retries,
+    )
+
+
+client: LazyClient[OpenAI] = LazyClient(openai_client)
+"""Client on the default pool, built on first use."""
+async_clients: LoopClients[AsyncOpenAI] = LoopClients(async_openai_client)
+"""Async clients on the default pool, one per event loop."""
 
 
 class OpenAIMessageRoles(str, Enum):
@@ -58,6 +162,120 @@ class OpenAIMessageRoles(str, Enum):
         return role_mapping
 
 
+class OpenAIStreamAccumulator:
+    """Rebuilds a `ChatCompletion` from the chunks of a streamed completion.
+
+    Tool calls of a choice arrive in order, so a tool call is complete as soon
+    as the next one starts, or when the stream ends.
+    """
+
+    def __init__(self, model: str) -> None:
+        """Initialize the OpenAIStreamAccumulator class."""
+        self.completion_id = ""
+        self.created = 0
+        self.model = model
+        self.contents: Dict[int, List[str]] = {}
+        self.tool_calls: Dict[int, Dict[int, Dict[str, str]]] = {}
+        self.finish_reasons: Dict[int, str] = {}
+        self.usage: Optional[CompletionUsage] = None
+
+    def add_chunk(self, chunk: ChatCompletionChunk) -> List[Dict[str, str]]:
+        """Add a chunk to the completion.
+
+        Returns:
+            tool_calls: Tool calls completed by this chunk, as dicts with
+                `id`, `name` and `arguments`.
+
+        """
+        self.completion_id = chunk.id
+        self.created = chunk.created
+        self.model = chunk.model
+        if chunk.usage:
+            self.usage = chunk.usage
+        completed_tool_calls = []
+        for choice in chunk.choices:
+            choice_tool_calls = self.tool_calls.setdefault(choice.index, {})
+            if choice.delta.content:
+                self.contents.setdefault(choice.index, []).append(
+                    choice.delta.content
+                )
+
+            for tool_call_delta in choice.delta.tool_calls or []:
+                index = tool_call_delta.index
+                if index not in choice_tool_calls:
+                    if choice_tool_calls:
+                        completed_tool_calls.append(
+                            choice_tool_calls[max(choice_tool_calls)]
+                        )
+                    choice_tool_calls[index] = {
+                        "id": "",
+                        "name": "",
+                        "arguments": "",
+                    }
+
+                tool_call = choice_tool_calls[index]
+                if tool_call_delta.id:
+                    tool_call["id"] = tool_call_delta.id
+                if tool_call_delta.function:
+                    function_delta = tool_call_delta.function
+                    tool_call["name"] += function_delta.name or ""
+                    tool_call["arguments"] += function_delta.arguments or ""
+
+            if choice.finish_reason:
+                self.finish_reasons[choice.index] = choice.finish_reason
+
+        return completed_tool_calls
+
+    def last_tool_calls(self) -> List[Dict[str, str]]:
+        """Get the last tool call of each choice, completed by the stream end."""
+        return [
+            choice_tool_calls[max(choice_tool_calls)]
+            for choice_tool_calls in self.tool_calls.values()
+            if choice_tool_calls
+        ]
+
+    def completion(self) -> ChatCompletion:
+        """Build the completion object from the chunks received."""
+        choices = []
+        for choice_index in sorted(self.tool_calls):
+            message = ChatCompletionMessage(
+                role="assistant",
+                content="".join(self.contents.get(choice_index, [])) or None,
+                tool_calls=[
+                    ChatCompletionMessageToolCall(
+                        id=tool_call["id"],
+                        type="function",
+                        function=Function(
+                            name=tool_call["name"],
+                            arguments=tool_call["arguments"],
+                        ),
+                    )
+                    for _, tool_call in sorted(
+                        self.tool_calls[choice_index].items()
+                    )
+                ]
+                or None,
+            )
+            choices.append(
+                Choice(
+                    finish_reason=self.finish_reasons.get(  # type: ignore[arg-type]
+                        choice_index, "stop"
+                    ),
+                    index=choice_index,
+                    message=message,
+                )
+            )
+
+        return ChatCompletion(
+            id=self.completion_id,
+            choices=choices,
+            created=self.created,
+            model=self.model,
+            object="chat.completion",
+            usage=self.usage,
+        )
+
+
 class OpenAIAgent(ThreadAgent):
     """OpenAI Agent.
 
@@ -72,6 +290,21 @@ class OpenAIAgent(ThreadAgent):
         tools_serializer: Tools serializer function for the model.
         tools_registry: Registry of tools available for the agent.
         system_message_selector: Selector for system messages.
+        stream: Flag to stream the completions from the model.
+        tools_top_k: Number of relevant tools to send on each call.
+        tools_query_window: Number of recent messages used to select tools.
+        n_choices: Number of choices generated on each call.
+        choice_selector: Selector picking one choice when `n_choices > 1`.
+        max_continuations: Maximum number of continuations of a truncated
+            response.
+        tool_error_policy: Retry budgets and rendering of the tool errors.
+        output_spill: Size policy of the tool outputs kept in the thread.
+        response_cache: Near-duplicate cache of the final responses.
+        payload_optimizer: Minimizes the serialized requests.
+        provider_client: Client replacing the shared OpenAI client.
+        async_provider_client: Client replacing the shared async OpenAI client.
+        connection_pool: Name of the shared HTTP connection pool.
+        connection_pool_config: Configuration of the connection pool.
 
     """
 
@@ -87,7 +320,7 @@ class OpenAIAgent(ThreadAgent):
     verbose: bool = True
     """Flag to indicate if the agent should print messages."""
 
-    tools: List[ToolBaseSchema] = []
+    tools: List[ToolBaseSchema] = Field(default_factory=list)
     """List of tools available for the agent."""
 
     tools_serializer: Callable[..., Any] = openai_tool_calling_serializer
@@ -95,20 +328,138 @@ class OpenAIAgent(ThreadAgent):
 
     tools_registry: Optional[ToolRegistry] = None
     """Registry of tools available for the agent. at
-    [light_agents.core.tool_registry.ToolRegistry]"""
+    [light_agents.core.tool_registry.ToolRegistry]
+
+    A registry can be shared between agents, so identical concurrent calls to
+    `read_only` tools are executed only once."""
 
     system_message_selector: Literal["first", "last", "all"] = "all"
     """Selector for system messages."""
 
-    _current_run_messages: List[MessageBase] = PrivateAttr(default=[])
-    """List of messages generated in the current run."""
+    stream: bool = False
+    """Flag to stream the completions from the model.
+
+    When streaming, `read_only` tools start executing as soon as their
+    arguments are fully received, while the rest of the completion is still
+    arriving."""
+
+    tools_top_k: Optional[int] = None
+    """Number of relevant tools to send on each call, besides the `always_on`
+    ones. If `None`, every tool is sent."""
+
+    tools_query_window: int = 4
+    """Number of recent messages used to select the relevant tools."""
+
+    n_choices: int = 1
+    """Number of choices generated on each call, in a single request."""
+
+    choice_selector: ChoiceSelector = first_valid_tool_call
+    """Selector picking the choice to be used when `n_choices > 1`. See
+    [light_agents.core.choice_selectors]"""
+
+    max_continuations: int = 0
+    """Maximum number of continuations requested when a response is cut off
+    by the `max_tokens` limit. The segments are stitched into one message."""
+
+    tool_error_policy: ToolErrorPolicy = Field(default_factory=ToolErrorPolicy)
+    """How the run recovers from failing tools. Errors are returned to the
+    model as `is_error` tool results, within the retry budgets. See
+    [light_agents.core.tool_errors.ToolErrorPolicy]"""
+
+    output_spill: OutputSpillPolicy = Field(default_factory=OutputSpillPolicy)
+    """Size policy of the tool outputs. Outputs above the threshold are kept
+    in a blob store, and the thread only keeps a preview the model can page
+    through with the `read_tool_output` tool. See
+    [light_agents.core.output_spill.OutputSpillPolicy]"""
+
+    response_cache: Optional[SemanticCache] = Field(default=None, exclude=True)
+    """Opt-in cache of the final responses, reused for near-duplicate user
+    queries with the same model, system prompt and tools. Bypassed while tool
+    results are in play. See
+    [light_agents.core.semantic_cache.SemanticCache]"""
+
+    payload_optimizer: Optional[PayloadOptimizer] = Field(
+        default_factory=PayloadOptimizer
+    )
+    """Pass minimizing the serialized requests, e.g. sending single text
+    blocks as plain strings. Disabled if `None`. See
+    [light_agents.core.payload_optimizer.PayloadOptimizer]"""
+
+    provider_client: Optional[Any] = Field(default=None, exclude=True)
+    """Client replacing the shared OpenAI client, e.g. a simulated provider."""
+
+    async_provider_client: Optional[Any] = Field(default=None, exclude=True)
+    """Client replacing the shared async OpenAI client."""
+
+    connection_pool: str = OPENAI_POOL
+    """Name of the HTTP connection pool. Agents using the same name share
+    their keep-alive connections."""
+
+    connection_pool_config: Optional[ConnectionPoolConfig] = None
+    """Configuration of the connection pool (limits, keep-alive, HTTP/2 and
+    timeouts). Only applied if the pool isn't configured yet, as the first
+    configuration of a name wins."""
+
+    _pool_client: Optional[OpenAI] = PrivateAttr(default=None)
+    """Client on the agent's connection pool, if it isn't the default one."""
+
+    _async_pool_clients: Optional[LoopClients[AsyncOpenAI]] = PrivateAttr(default=None)
+    """Async clients on the agent's connection pool, one per event loop."""
+
+    _serialized_tools: Dict[str, Dict[str, Any]] = PrivateAttr(
+        default_factory=dict
+    )
+    """Serialized tool schemas, by tool name."""
+
+    _paging_tool: ReadToolOutput = PrivateAttr()
+    """Tool reading the outputs spilled to the blob store."""
+
+    _speculative_executor: SpeculativeToolExecutor = PrivateAttr()
+    """Executor for tools started while the completion is streaming. Each run
+    uses its own `for_run` executor, sharing these threads."""
 
     def __init__(self, **data: Any) -> None:
         """Initialize OpenAI Agent."""
         super().__init__(**data)
-        self.tools_registry = ToolRegistry()
+        if self.tools_registry is None:
+            self.tools_registry = ToolRegistry()
         if len(self.tools) > 0:
             self.tools_registry.register_tools(self.tools)
+        self._speculative_executor = SpeculativeToolExecutor(self.tools_registry)
+        self._paging_tool = self.tools_registry.register_paging_tool(
+            self.output_spill.paging_tool()
+        )
+        if self.connection_pool != OPENAI_POOL or self.connection_pool_config:
+            self._pool_client = openai_client(
+                self.connection_pool, self.connection_pool_config
+            )
+            self._async_pool_clients = LoopClients(
+                partial(
+                    async_openai_client,
+                    self.connection_pool,
+                    self.connection_pool_config,
+                )
+            )
+
+    def warmup(self) -> None:
+        """Prepare the agent before it takes traffic.
+
+        Serializes the tool schemas and, unless a provider client is injected,
+        opens connections of the pool to the OpenAI API.
+        """
+        self.serialize_tools(self.tools)
+        if self.provider_client is None:
+            connection_pools.warmup(
+                self.connection_pool, str(self._client().base_url)
+            )
+
+    async def awarmup(self) -> None:
+        """Prepare the agent before it takes traffic, on the async pool."""
+        self.serialize_tools(self.tools)
+        if self.async_provider_client is None:
+            await connection_pools.awarmup(
+                self.connection_pool, str(self._async_client().base_url)
+            )
 
     def agent_run(
         self, thread_messages: MutableSequence[MessageBase], **kwargs: Any
@@ -120,16 +471,20 @@ class OpenAIAgent(ThreadAgent):
             run response.
 
         2. Process the model response in `process_model_response`. If the
-            response is a simple text message, `_current_run_messages` will be
-            a list of `Message` objects.
+            response is a simple text message, the run messages will be a list
+            of `Message` objects.
 
         3. Process the tools in `process_tools`. Execute all required tools.
-            `_current_run_messages` will be a list containing `ToolUseMessage`
+            The run messages will be a list containing `ToolUseMessage`
             objects with the `tool_outputs` field populated.
 
-        4. If there is any `ToolUseMessage` in the `_current_run_messages`,
-            call `agent_run` again with the updated messages in order to get a
-            new response from the model based on the tools outputs.
+        4. If there is any `ToolUseMessage` in the run messages, call
+            `agent_run` again with the updated messages in order to get a new
+            response from the model based on the tools outputs.
+
+        The state of the run is kept in a `RunContext`, passed down in the
+        `run_context` keyword argument, so concurrent runs can share the
+        agent.
 
         Args:
             thread_messages: List of messages in the thread.
@@ -144,70 +499,591 @@ class OpenAIAgent(ThreadAgent):
         [Message(content="This is a Response", role="ai", type="text")]
 
         """
-        if not kwargs.get("calling_from_inside_agent_run"):
-            self._current_run_messages = []
+        context = self._run_context(kwargs)
+        with log_context(run_id=context.run_id):
+            logger.debug("Running OpenAI Agent.") if self.verbose else None
+
+            try:
+                model_response = self.send_to_openai(thread_messages, **kwargs)
+            except BudgetExceededError:
+                logger.warning("Run stopped: budget exhausted.")
+                return context.messages
+            except DeadlineExceededError:
+                logger.warning("Run stopped: deadline reached.")
+                return context.messages
+
+            if self.max_continuations > 0:
+                model_response = self.continue_truncated_response(
+                    thread_messages, model_response, **kwargs
+                )
+            logger.debug(
+                f"Model response: {model_response}\nProcessing it"
+            ) if self.verbose else None
 
-        logger.debug("Running OpenAI Agent.") if self.verbose else None
+            run_messages = self.process_model_response(model_response, **kwargs)
+            context.messages.extend(run_messages)
+            thread_messages.extend(run_messages)
+            logger.debug(
+                f"Model response processed: {run_messages}"
+            ) if self.verbose else None
 
-        model_response = self.send_to_openai(thread_messages, **kwargs)
-        logger.debug(
-            f"Model response: {model_response}\nProcessing it"
-        ) if self.verbose else None
+            if any(
+                isinstance(message, ToolUseMessage) for message in run_messages
+            ):
+                logger.debug(
+                    "Tools were used in the response. Processing tools."
+                ) if self.verbose else None
+                self.agent_run(thread_messages, **kwargs)
 
-        run_messages = self.process_model_response(model_response, **kwargs)
-        self._current_run_messages.extend(run_messages)
-        thread_messages.extend(run_messages)
-        logger.debug(
-            f"Model response processed: {run_messages}"
-        ) if self.verbose else None
+            return context.messages
 
-        if any(
-            isinstance(message, ToolUseMessage) for message in run_messages
-        ):
-            kwargs["calling_from_inside_agent_run"] = True
+    async def astream_run(
+        self, thread_messages: MutableSequence[MessageBase], **kwargs: Any
+    ) -> AsyncIterator[Sequence[MessageBase]]:
+        """Run the agent on the thread messages, on the async path.
+
+        Follows the same steps as `agent_run`, awaiting the model with
+        `asend_to_openai` and the tools with `aprocess_tools`. The messages of
+        each round (model response or tools results) are yielded as soon as
+        they are generated.
+
+        Args:
+            thread_messages: List of messages in the thread.
+            **kwargs: Additional arguments.
+
+        Yields:
+            messages: List of messages generated in each round.
+
+        """
+        context = self._run_context(kwargs)
+        with log_context(run_id=context.run_id):
+            logger.debug("Running OpenAI Agent (async).") if self.verbose else None
+            while True:
+                try:
+                    model_response = await self.asend_to_openai(
+                        thread_messages, **kwargs
+                    )
+                except BudgetExceededError:
+                    logger.warning("Run stopped: budget exhausted.")
+                    break
+                except DeadlineExceededError:
+                    logger.warning("Run stopped: deadline reached.")
+                    break
+
+                if self.max_continuations > 0:
+                    model_response = await self.acontinue_truncated_response(
+                        thread_messages, model_response, **kwargs
+                    )
+
+                run_messages = self.parse_model_response(model_response, **kwargs)
+                tool_use_messages = [
+                    message
+                    for message in run_messages
+                    if isinstance(message, ToolUseMessage)
+                ]
+                if tool_use_messages:
+                    run_messages = await self.aprocess_tools(
+                        tool_use_messages, **kwargs
+                    )
+
+                thread_messages.extend(run_messages)
+                yield run_messages
+
+                if not tool_use_messages:
+                    break
+
+    def _run_context(self, kwargs: Dict[str, Any]) -> RunContext:
+        return get_run_context(kwargs, self._speculative_executor)
+
+    def _client(self) -> OpenAI:
+        return self.provider_client or self._pool_client or client.get()
+
+    def _async_client(self) -> AsyncOpenAI:
+        return self.async_provider_client or (
+            self._async_pool_clients or async_clients
+        ).get()
+
+    def serialize_tools(self, tools: List[ToolBaseSchema]) -> List[Dict[str, Any]]:
+        """Serialize the tools, reusing the schemas serialized before."""
+        serialized_tools = []
+        for tool in tools:
+            if tool.name not in self._serialized_tools:
+                serialized_tool = self.tools_serializer(tool)
+                if self.payload_optimizer:
+                    serialized_tool = self.payload_optimizer.optimize_tool(
+                        serialized_tool
+                    )
+                self._serialized_tools[tool.name] = serialized_tool
+            serialized_tools.append(self._serialized_tools[tool.name])
+        return serialized_tools
+
+    def build_request(
+        self,
+        thread_messages: MutableSequence[MessageBase],
+        n_choices: Optional[int] = None,
+        allowed_tools: Optional[Collection[str]] = None,
+    ) -> Dict[str, Any]:
+        """Build the arguments of the OpenAI completion request.
+
+        Args:
+            thread_messages: List of messages in the thread.
+            n_choices: Number of choices to generate. Defaults to the agent's
+                `n_choices`.
+            allowed_tools: Names of the tools that can be sent. Defaults to
+                every tool.
+
+        Returns:
+            request: Arguments for the OpenAI completion request.
+
+        """
+        messages = self.messages_serializer(thread_messages)
+        if self.payload_optimizer:
+            messages = self.payload_optimizer.optimize_messages(messages)
+        request: Dict[str, Any] = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": self.max_tokens,
+        }
+        tools = self.select_tools(thread_messages, allowed_tools)
+        if len(tools) > 0:
+            logger.debug("Calling agent with tools.") if self.verbose else None
+            serialized_tools = self.serialize_tools(tools)
             logger.debug(
-                "Tools were used in the response. Processing tools."
+                f"Serialized tools: {serialized_tools}"
             ) if self.verbose else None
-            self.agent_run(thread_messages, **kwargs)
+            request["tools"] = serialized_tools
 
-        return self._current_run_messages
+        n_choices = n_choices or self.n_choices
+        if n_choices > 1:
+            request["n"] = n_choices
+
+        return request
 
     def send_to_openai(
-        self, thread_messages: MutableSequence[MessageBase], **kwargs: Any
+        self,
+        thread_messages: MutableSequence[MessageBase],
+        n_choices: Optional[int] = None,
+        **kwargs: Any,
     ) -> ChatCompletion:
         """Send messages to OpenAI model.
 
         Args:
             thread_messages: List of messages in the thread.
+            n_choices: Number of choices to generate. Defaults to the agent's
+                `n_choices`.
             **kwargs: Additional arguments.
 
         Returns:
             completion: OpenAI completion object.
 
         """
-        messages = self.messages_serializer(thread_messages)
-        completion: ChatCompletion
-        if len(self.tools) > 0:
-            logger.debug("Calling agent with tools.") if self.verbose else None
-            serialized_tools = [
-                self.tools_serializer(tool) for tool in self.tools
+        check_deadline(kwargs)
+        request = self.build_request(
+            thread_messages, n_choices, kwargs.get(ALLOWED_TOOLS_KWARG)
+        )
+        self._wrap_up(request, kwargs)
+        cache_key = self._response_cache_key(thread_messages, request, kwargs)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        with self.admit_request(request, **kwargs) as call:
+            self._record_request_size(request, kwargs)
+            try:
+                if self.stream:
+                    completion = self.stream_from_openai(request, **kwargs)
+                else:
+                    completion = bounded_client(
+                        self._client(), kwargs
+                    ).chat.completions.create(**request)
+            except Exception as e:
+                raise_if_expired(kwargs, e)
+                raise
+            self.charge_usage(call, completion)
+        self._cache_response(cache_key, completion)
+        return completion
+
+    async def asend_to_openai(
+        self,
+        thread_messages: MutableSequence[MessageBase],
+        n_choices: Optional[int] = None,
+        **kwargs: Any,
+    ) -> ChatCompletion:
+        """Send messages to OpenAI model, with the async client.
+
+        Args:
+            thread_messages: List of messages in the thread.
+            n_choices: Number of choices to generate. Defaults to the agent's
+                `n_choices`.
+            **kwargs: Additional arguments.
+
+        Returns:
+            completion: OpenAI completion object.
+
+        """
+        check_deadline(kwargs)
+        request = self.build_request(
+            thread_messages, n_choices, kwargs.get(ALLOWED_TOOLS_KWARG)
+        )
+        self._wrap_up(request, kwargs)
+        cache_key = self._response_cache_key(thread_messages, request, kwargs)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        with self.admit_request(request, **kwargs) as call:
+            self._record_request_size(request, kwargs)
+            try:
+                if self.stream:
+                    completion = await self.astream_from_openai(request, **kwargs)
+                else:
+                    completion = await bounded_client(
+                        self._async_client(), kwargs
+                    ).chat.completions.create(**request)
+            except Exception as e:
+                raise_if_expired(kwargs, e)
+                raise
+            self.charge_usage(call, completion)
+        self._cache_response(cache_key, completion)
+        return completion
+
+    def _wrap_up(self, request: Dict[str, Any], kwargs: Dict[str, Any]) -> None:
+        # out of time for more tool rounds, the model has to answer now
+        deadline = get_deadline(kwargs)
+        if deadline is not None and deadline.wrapping_up and request.get("tools"):
+            logger.debug("Wrapping up: no more tool calls.") if self.verbose else None
+            request["tool_choice"] = "none"
+
+    def _record_request_size(
+        self, request: Dict[str, Any], kwargs: Dict[str, Any]
+    ) -> None:
+        size = record_request_size(request, kwargs)
+        logger.debug(
+            f"Request size: {size} bytes."
+        ) if self.verbose and size is not None else None
+
+    def _response_cache_key(
+        self,
+        thread_messages: MutableSequence[MessageBase],
+        request: Dict[str, Any],
+        kwargs: Dict[str, Any],
+    ) -> Optional[Tuple[str, str]]:
+        """Get the query and the context fingerprint caching a request.
+
+        Internal requests (e.g. continuations) and the answers forced by the
+        deadline wrap-up are never cached.
+        """
+        if self.response_cache is None or kwargs.get(SKIP_CACHE_KWARG):
+            return None
+        deadline = get_deadline(kwargs)
+        if deadline is not None and deadline.wrapping_up:
+            return None
+        query = cacheable_query(thread_messages)
+        if query is None:
+            return None
+        return query, request_fingerprint(request)
+
+    def _cached_response(
+        self, cache_key: Optional[Tuple[str, str]]
+    ) -> Optional[ChatCompletion]:
+        if cache_key is None or self.response_cache is None:
+            return None
+        cached: Optional[ChatCompletion] = self.response_cache.get(*cache_key)
+        if cached is not None:
+            logger.debug("Using cached response.") if self.verbose else None
+        return cached
+
+    def _cache_response(
+        self, cache_key: Optional[Tuple[str, str]], completion: ChatCompletion
+    ) -> None:
+        # only final answers are cached, never tool calls or cut off answers
+        if cache_key is None or self.response_cache is None:
+            return
+        if all(
+            choice.finish_reason == "stop" and not choice.message.tool_calls
+            for choice in completion.choices
+        ):
+            query, context = cache_key
+            self.response_cache.put(query, completion, context)
+
+    def admit_request(self, request: Dict[str, Any], **kwargs: Any) -> BudgetCall:
+        """Admit the request with the run's budget, if any.
+
+        The `max_tokens` of the request is lowered to what's left in the
+        budget. The input tokens are estimated from the messages and
+        tools actually sent.
+
+        Raises:
+            BudgetExceededError: If the budget is exhausted.
+
+        """
+        budget: Optional[BudgetGuard] = kwargs.get("budget")
+        n_choices = request.get("n", 1)
+        call = admit_call(
+            budget,
+            self.model,
+            estimate_request_tokens(request),
+            request["max_tokens"] * n_choices,
+        )
+        request["max_tokens"] = call.max_tokens // n_choices
+        return call
+
+    @staticmethod
+    def charge_usage(call: BudgetCall, completion: ChatCompletion) -> None:
+        """Charge the usage reported by the completion, or an estimate."""
+        if completion.usage:
+            call.charge(
+                completion.usage.prompt_tokens, completion.usage.completion_tokens
+            )
+        else:
+            output_chars = sum(
+                len(choice.message.content or "") for choice in completion.choices
+            )
+            call.charge(call.input_tokens, output_chars // CHARS_PER_TOKEN + 1)
+
+    def continue_truncated_response(
+        self,
+        thread_messages: MutableSequence[MessageBase],
+        completion: ChatCompletion,
+        **kwargs: Any,
+    ) -> ChatCompletion:
+        """Ask the model to continue a response cut off by `max_tokens`.
+
+        The partial text is sent back as an assistant message followed by a
+        continuation request, up to `max_continuations` times. The segments
+        are stitched into a single choice.
+
+        Args:
+            thread_messages: List of messages in the thread.
+            completion: OpenAI completion object, possibly truncated.
+            **kwargs: Additional arguments.
+
+        Returns:
+            completion: OpenAI completion object with a single choice.
+
+        """
+        choices = completion.choices
+        if len(choices) > 1:
+            choices = [self.choice_selector(choices, self.tools_registry)]
+        choice = choices[0]
+
+        continuations = 0
+        while self._should_continue(choice, continuations):
+            continuations += 1
+            logger.debug(
+                f"Response truncated. Requesting continuation {continuations}."
+            ) if self.verbose else None
+
+            try:
+                continuation = self.send_to_openai(
+                    self._continuation_messages(thread_messages, choice),
+                    n_choices=1,
+                    **{**kwargs, SKIP_CACHE_KWARG: True},
+                )
+            except (BudgetExceededError, DeadlineExceededError):
+                break
+            choice = self._stitch_continuation(choice, continuation)
+
+        return completion.model_copy(update={"choices": [choice]})
+
+    async def acontinue_truncated_response(
+        self,
+        thread_messages: MutableSequence[MessageBase],
+        completion: ChatCompletion,
+        **kwargs: Any,
+    ) -> ChatCompletion:
+        """Ask the model to continue a truncated response, on the async path.
+
+        See `continue_truncated_response`.
+        """
+        choices = completion.choices
+        if len(choices) > 1:
+            choices = [self.choice_selector(choices, self.tools_registry)]
+        choice = choices[0]
+
+        continuations = 0
+        while self._should_continue(choice, continuations):
+            continuations += 1
+            try:
+                continuation = await self.asend_to_openai(
+                    self._continuation_messages(thread_messages, choice),
+                    n_choices=1,
+                    **{**kwargs, SKIP_CACHE_KWARG: True},
+                )
+            except (BudgetExceededError, DeadlineExceededError):
+                break
+            choice = self._stitch_continuation(choice, continuation)
+
+        return completion.model_copy(update={"choices": [choice]})
+
+    def _should_continue(self, choice: Choice, continuations: int) -> bool:
+        return bool(
+            choice.finish_reason == "length"
+            and choice.message.content
+            and not choice.message.tool_calls
+            and continuations < self.max_continuations
+        )
+
+    @staticmethod
+    def _continuation_messages(
+        thread_messages: MutableSequence[MessageBase], choice: Choice
+    ) -> List[MessageBase]:
+        return [
+            *thread_messages,
+            Message(
+                role=MessageRole.AI,
+                type=MessageType.TEXT,
+                content=choice.message.content or "",
+            ),
+            Message(
+                role=MessageRole.USER,
+                type=MessageType.TEXT,
+                content=CONTINUATION_PROMPT,
+            ),
+        ]
+
+    @staticmethod
+    def _stitch_continuation(
+        choice: Choice, continuation: ChatCompletion
+    ) -> Choice:
+        continuation_choice = continuation.choices[0]
+        return continuation_choice.model_copy(
+            update={
+                "message": continuation_choice.message.model_copy(
+                    update={
+                        "content": stitch_text(
+                            choice.message.content or "",
+                            continuation_choice.message.content or "",
+                        )
+                    }
+                )
+            }
+        )
+
+    def select_tools(
+        self,
+        thread_messages: MutableSequence[MessageBase],
+        allowed_tools: Optional[Collection[str]] = None,
+    ) -> List[ToolBaseSchema]:
+        """Select the tools to be sent to the model.
+
+        If `tools_top_k` is set, only the agent's tools relevant to the last
+        `tools_query_window` messages are sent, plus the `always_on` ones and
+        the ones already called in the thread.
+        The `read_tool_output` paging tool is added once the thread has a
+        spilled tool output.
+
+        Args:
+            thread_messages: List of messages in the thread.
+            allowed_tools: Names of the tools that can be selected. Defaults
+                to every tool.
+
+        Returns:
+            tools: List of tools to be sent to the model.
+
+        """
+        if self.tools_top_k is None or not self.tools_registry:
+            tools = self.tools
+        else:
+            query = recent_messages_text(thread_messages, self.tools_query_window)
+            tools = self.tools_registry.select_tools(
+                query, self.tools_top_k, self.tools
+            )
+            # the tools called earlier in the thread stay available
+            used_tools = used_tool_names(thread_messages)
+            selected = {tool.name for tool in tools}
+            tools += [
+                tool
+                for tool in self.tools
+                if tool.name in used_tools and tool.name not in selected
             ]
             logger.debug(
-                f"Serialized tools: {serialized_tools}"
+                f"Selected tools: {[tool.name for tool in tools]}"
             ) if self.verbose else None
-            completion = client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=self.max_tokens,
-                tools=serialized_tools,
+        if allowed_tools is not None:
+            tools = [tool for tool in tools if tool.name in allowed_tools]
+
+        # the paging tool is only needed once an output was spilled
+        if has_spilled_outputs(thread_messages) and all(
+            tool.name != READ_TOOL_OUTPUT for tool in tools
+        ):
+            tools = [*tools, self._paging_tool]
+        return tools
+
+    def stream_from_openai(
+        self, request: Dict[str, Any], **kwargs: Any
+    ) -> ChatCompletion:
+        """Stream a completion from OpenAI model.
+
+        Tool calls arrive in order, so a tool call is complete as soon as the
+        next one starts (or the stream ends). Complete tool calls are handed to
+        the speculative executor, which runs the `read_only` ones right away.
+        When `n_choices > 1`, tool calls of every choice are handed over, since
+        the selected choice is only known at the end.
+
+        Args:
+            request: Arguments for the OpenAI completion request.
+            **kwargs: Additional arguments, passed to speculative tools.
+
+        Returns:
+            completion: OpenAI completion object rebuilt from the chunks.
+
+        """
+        speculative_executor = self._run_context(kwargs).speculative_executor
+        accumulator = OpenAIStreamAccumulator(self.model)
+        try:
+            chunks = bounded_client(self._client(), kwargs).chat.completions.create(
+                **request, stream=True, stream_options={"include_usage": True}
             )
-        else:
-            completion = client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=self.max_tokens,
+            for chunk in chunks:
+                for tool_call in accumulator.add_chunk(chunk):
+                    self._speculate(tool_call, **kwargs)
+
+            for tool_call in accumulator.last_tool_calls():
+                self._speculate(tool_call, **kwargs)
+
+        except BaseException:
+            speculative_executor.discard()
+            raise
+
+        return accumulator.completion()
+
+    async def astream_from_openai(
+        self, request: Dict[str, Any], **kwargs: Any
+    ) -> ChatCompletion:
+        """Stream a completion from OpenAI model, with the async client.
+
+        See `stream_from_openai`.
+        """
+        speculative_executor = self._run_context(kwargs).speculative_executor
+        accumulator = OpenAIStreamAccumulator(self.model)
+        try:
+            chunks = await bounded_client(
+                self._async_client(), kwargs
+            ).chat.completions.create(
+                **request, stream=True, stream_options={"include_usage": True}
             )
-        return completion
+            async for chunk in chunks:
+                for tool_call in accumulator.add_chunk(chunk):
+                    self._speculate(tool_call, **kwargs)
+
+            for tool_call in accumulator.last_tool_calls():
+                self._speculate(tool_call, **kwargs)
+
+        except BaseException:
+            speculative_executor.discard()
+            raise
+
+        return accumulator.completion()
+
+    def _speculate(self, tool_call: Dict[str, str], **kwargs: Any) -> None:
+        try:
+            args = json.loads(tool_call["arguments"])
+        except json.JSONDecodeError:
+            return
+        self._run_context(kwargs).speculative_executor.submit(
+            tool_call["id"], tool_call["name"], args, **kwargs
+        )
 
     def process_model_response(
         self, completion: ChatCompletion, **kwargs: Any
@@ -224,10 +1100,43 @@ class OpenAIAgent(ThreadAgent):
         Returns:
             messages: List of messages generated by the agent.
 
+        """
+        messages = self.parse_model_response(completion, **kwargs)
+        tool_use_messages = [
+            message for message in messages if isinstance(message, ToolUseMessage)
+        ]
+        if tool_use_messages:
+            return self.process_tools(tool_use_messages, **kwargs)
+        return messages
+
+    def parse_model_response(
+        self, completion: ChatCompletion, **kwargs: Any
+    ) -> Sequence[MessageBase]:
+        """Convert the model response into messages, without executing tools.
+
+        If the completion has more than one choice, only the one picked by
+        `choice_selector` is processed.
+
+        Args:
+            completion: OpenAI completion object.
+            **kwargs: Additional arguments.
+
+        Returns:
+            messages: The generated `Message`, or the `ToolUseMessage`s to be
+                executed.
+
         """
         response_messages = []
         # tool_responses = []
-        for choice in completion.choices:
+        choices = completion.choices
+        if len(choices) > 1:
+            choices = [self.choice_selector(choices, self.tools_registry)]
+            logger.debug(
+                f"Selected choice {choices[0].index} out of "
+                f"{len(completion.choices)}."
+            ) if self.verbose else None
+
+        for choice in choices:
             if choice.finish_reason == "stop":
                 logger.debug(
                     "Model stopped by it's own."
@@ -274,16 +1183,13 @@ class OpenAIAgent(ThreadAgent):
                             run_id=tool_call.id,
                             role=MessageRole.TOOL_USE,
                             type=MessageType.TEXT,
-                            external_fields=kwargs,
+                            external_fields=ToolRegistry.tool_kwargs(kwargs),
                             name=tool_call.function.name,
                             input_params_dict=tool_call.function.arguments,
+                            completion_id=completion.id,
                         )
                         lightagents_tool_use_messages.append(tool_use_message)
 
-                    lightagents_tool_use_messages = self.process_tools(
-                        lightagents_tool_use_messages, **kwargs
-                    )
-
                     return lightagents_tool_use_messages
 
                 else:
@@ -292,18 +1198,24 @@ class OpenAIAgent(ThreadAgent):
                         "calls were found."
                     )
 
-            elif choice.finish_reason == "length":
-                logger.warning("Model reached maximum token limits.")
-                # TODO: handle this cas
-                ...
-                
-                return []
+            elif choice.finish_reason in ["length", "content_filter"]:
+                if choice.finish_reason == "length":
+                    logger.warning("Model reached maximum token limits.")
+                else:
+                    logger.warning(
+                        "Model content omitted due to content filter."
+                    )
 
-            elif choice.finish_reason == "content_filter":
-                # TODO: handle this case
-                logger.warning("Model content omitted due to content filter.")
-                ...
-                return []
+                # keeps the partial content generated until the stop
+                if choice.message.content:
+                    response_messages.append(
+                        Message(
+                            content=choice.message.content,
+                            role=MessageRole.AI,
+                            type=MessageType.TEXT,
+                        )
+                    )
+                return response_messages
 
             else:
                 logger.error(
@@ -327,50 +1239,159 @@ class OpenAIAgent(ThreadAgent):
             tool_use_messages: List of tool use messages.
 
         """
+        context = self._run_context(kwargs)
+        speculative_executor = context.speculative_executor
         updated_tool_use_messages = []
+        # Duplicated read only calls within the same response run only once
+        batch_responses: Dict[str, ToolResponseSchema] = {}
         if self.tools_registry:
             for tool_message in tool_use_messages:
-                if isinstance(tool_message.input_params_dict, str):
-                    try:
-                        args_dict = literal_eval(
-                            tool_message.input_params_dict
-                        )
-                    except ValueError:
-                        logger.warning(
-                            "Could not parse input args. Using as str."
-                        )
-                        args_dict = {
-                            "response": tool_message.input_params_dict
-                        }
-                else:
-                    args_dict = tool_message.input_params_dict
-
+                args_dict = self._tool_args(tool_message)
                 try:
                     logger.debug(
                         f"Executing tool: '{tool_message.name}' "
                         f"with args: {args_dict}"
                     ) if self.verbose else None
 
-                    tool_response = self.tools_registry.execute_tool(
-                        tool_message.name, args_dict, **kwargs
+                    tool_response = speculative_executor.pop_result(
+                        tool_message.run_id
+                    )
+                    call_key = self.tools_registry.call_key(
+                        tool_message.name,
+                        {**args_dict, **self.tools_registry.tool_kwargs(kwargs)},
                     )
+                    if tool_response is None:
+                        tool_response = batch_responses.get(call_key)
+                    if tool_response is None:
+                        tool_response = self.tools_registry.execute_tool(
+                            tool_message.name, args_dict, **kwargs
+                        )
+                    if self.tools_registry.is_read_only(tool_message.name):
+                        batch_responses[call_key] = tool_response
 
-                    logger.info(
-                        f"Tool returned: \n{tool_response}"
-                    ) if self.verbose else None
+                    self._apply_tool_response(tool_message, tool_response, context)
 
-                    tool_message.tool_outputs = tool_response.content
-                    if tool_response.external_fields:
-                        tool_message.external_fields.update(
-                            tool_response.external_fields
-                        )
-                    updated_tool_use_messages.append(tool_message)
-                    
+                except ToolExecutionError:
+                    raise
                 except Exception as e:
-                    tool_message.is_error = True
-                    logger.error(
-                        f"Error executing tool: '{tool_message.name}'"
+                    self._recover_tool_error(tool_message, args_dict, e, context)
+                updated_tool_use_messages.append(tool_message)
+
+        speculative_executor.discard()
+        return updated_tool_use_messages
+
+    async def aprocess_tools(
+        self, tool_use_messages: List[ToolUseMessage], **kwargs: Any
+    ) -> List[ToolUseMessage]:
+        """Process tool use messages without blocking the event loop.
+
+        Follows `process_tools`, awaiting the tools with `aexecute_tool`:
+        async tools run on the event loop, and sync ones on the registry
+        thread pool.
+
+        Args:
+            tool_use_messages: List of tool use messages.
+            **kwargs: Additional arguments.
+
+        Returns:
+            tool_use_messages: List of tool use messages.
+
+        """
+        context = self._run_context(kwargs)
+        speculative_executor = context.speculative_executor
+        updated_tool_use_messages = []
+        batch_responses: Dict[str, ToolResponseSchema] = {}
+        if self.tools_registry:
+            for tool_message in tool_use_messages:
+                args_dict = self._tool_args(tool_message)
+                try:
+                    tool_response = await speculative_executor.apop_result(
+                        tool_message.run_id
                     )
-                    raise ValueError(f"Error executing tool: {e}")
-                
+                    call_key = self.tools_registry.call_key(
+                        tool_message.name,
+                        {**args_dict, **self.tools_registry.tool_kwargs(kwargs)},
+                    )
+                    if tool_response is None:
+                        tool_response = batch_responses.get(call_key)
+                    if tool_response is None:
+                        tool_response = await self.tools_registry.aexecute_tool(
+                            tool_message.name, args_dict, **kwargs
+                        )
+                    if self.tools_registry.is_read_only(tool_message.name):
+                        batch_responses[call_key] = tool_response
+
+                    self._apply_tool_response(tool_message, tool_response, context)
+
+                except ToolExecutionError:
+                    raise
+                except Exception as e:
+                    self._recover_tool_error(tool_message, args_dict, e, context)
+                updated_tool_use_messages.append(tool_message)
+
+        speculative_executor.discard()
         return updated_tool_use_messages
+
+    def _tool_args(self, tool_message: ToolUseMessage) -> Dict[str, Any]:
+        if not isinstance(tool_message.input_params_dict, str):
+            return tool_message.input_params_dict
+        # OpenAI sends JSON, with `null` for the optional args of strict tools
+        try:
+            args: Dict[str, Any] = json.loads(tool_message.input_params_dict)
+            return args
+        except json.JSONDecodeError:
+            pass
+        try:
+            args = literal_eval(tool_message.input_params_dict)
+            return args
+        except ValueError:
+            logger.warning("Could not parse input args. Using as str.")
+            return {"response": tool_message.input_params_dict}
+
+    def _apply_tool_response(
+        self,
+        tool_message: ToolUseMessage,
+        tool_response: ToolResponseSchema,
+        context: RunContext,
+    ) -> None:
+        logger.info(
+            f"Tool returned: \n{tool_response}"
+        ) if self.verbose else None
+
+        self.output_spill.spill(tool_message, tool_response)
+        if tool_response.unavailable:
+            # the tool wasn't executed, so it isn't a tool failure
+            tool_message.is_error = True
+        elif tool_response.is_error:
+            self._count_tool_error(
+                tool_message, ValueError(tool_response.content), context
+            )
+        if tool_response.external_fields:
+            tool_message.external_fields.update(tool_response.external_fields)
+
+    def _recover_tool_error(
+        self,
+        tool_message: ToolUseMessage,
+        args_dict: Dict[str, Any],
+        error: Exception,
+        context: RunContext,
+    ) -> None:
+        logger.error(
+            f"Error executing tool: '{tool_message.name}' with args: {args_dict}"
+        )
+        self._count_tool_error(tool_message, error, context)
+        tool_message.tool_outputs = self.tool_error_policy.render(
+            tool_message.name, error
+        )
+
+    def _count_tool_error(
+        self, tool_message: ToolUseMessage, error: Exception, context: RunContext
+    ) -> None:
+        """Flag a failed tool call, aborting the run past the retry budgets."""
+        tool_message.is_error = True
+        if not self.tool_error_policy.admit(tool_message.name, context.tool_errors):
+            context.speculative_executor.discard()
+            raise ToolExecutionError(tool_message.name, error)
+        logger.warning(
+            f"Tool '{tool_message.name}' failed. Returning the error to the model."
+        )
@@ -15,6 +15,9 @@ class AppSettings(BaseSettings):
     AWS_ACCESS_KEY: Optional[str] = None
     AWS_SECRET_KEY: Optional[str] = None
     OPENAI_API_KEY: Optional[str] = None
+    MEDIA_ROOT: Optional[str] = None
+    """Directory media messages may load local files from. Local files are
+    refused when unset."""
 
 
 appSettings = AppSettings()
@@ -0,0 +1,153 @@
+import hashlib
+import os
+import re
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from light_agents.core.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+"""Blob keys are SHA-256 hex digests."""
+
+
+def content_key(content: str) -> str:
+    """Get the content address of a text, its SHA-256 hex digest."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def is_valid_key(key: str) -> bool:
+    """Check if a key is a content address, e.g. before using it in a path."""
+    return KEY_PATTERN.fullmatch(key) is not None
+
+
+class BlobStore(ABC):
+    """Content-addressed store of large texts kept outside the threads.
+
+    A blob is stored once under the hash of its content, so identical
+    outputs of different calls or threads share a single copy.
+    """
+
+    def put(self, content: str) -> str:
+        """Store a text.
+
+        Returns:
+            key: The content address of the text.
+
+        """
+        key = content_key(content)
+        self._put(key, content)
+        return key
+
+    @abstractmethod
+    def _put(self, key: str, content: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Get a text by its key, or `None` if it isn't stored."""
+        raise NotImplementedError
+
+    def read(self, key: str, offset: int, length: int) -> Optional[str]:
+        """Read a slice of a stored text, or `None` if it isn't stored."""
+        content = self.get(key)
+        if content is None:
+            return None
+        return content[offset : offset + length]
+
+
+class InMemoryBlobStore(BlobStore):
+    """Blob store in the process memory.
+
+    The least recently used blobs are evicted once the stored texts exceed
+    `max_chars`. Blobs are lost when the process exits, so use a
+    `FileBlobStore` when threads are processed by several processes.
+    """
+
+    def __init__(self, max_chars: int = 256 * 1024 * 1024) -> None:
+        """Initialize the InMemoryBlobStore class."""
+        self.max_chars = max_chars
+        self._blobs: "OrderedDict[str, str]" = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+    def _put(self, key: str, content: str) -> None:
+        with self._lock:
+            if key in self._blobs:
+                self._blobs.move_to_end(key)
+                return
+            self._blobs[key] = content
+            self._size += len(content)
+            while self._size > self.max_chars and len(self._blobs) > 1:
+                _, evicted = self._blobs.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a text by its key, or `None` if it isn't stored."""
+        with self._lock:
+            content = self._blobs.get(key)
+            if content is not None:
+                self._blobs.move_to_end(key)
+            return content
+
+
+class FileBlobStore(BlobStore):
+    """Blob store in a local directory, shared by the processes of a host.
+
+    Each blob is a UTF-8 file named by its key, under a subdirectory with the
+    first two characters of the key.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Initialize the FileBlobStore class."""
+        self.directory = directory
+
+    def path(self, key: str) -> str:
+        """Get the file path of a blob."""
+        if not is_valid_key(key):
+            raise ValueError(f"Invalid blob key '{key}'.")
+        return os.path.join(self.directory, key[:2], key)
+
+    def _put(self, key: str, content: str) -> None:
+        path = self.path(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # written aside and renamed, so readers never see a partial blob
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            file.write(content)
+        os.replace(temporary_path, path)
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a text by its key, or `None` if it isn't stored."""
+        if not is_valid_key(key):
+            return None
+        try:
+            with open(self.path(key), encoding="utf-8") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def read(self, key: str, offset: int, length: int) -> Optional[str]:
+        """Read a slice of a stored text, without loading the whole blob."""
+        if not is_valid_key(key):
+            return None
+        try:
+            with open(self.path(key), encoding="utf-8") as file:
+                # text files only seek to opaque positions, so skip by reading
+                while offset > 0:
+                    skipped = file.read(min(offset, 1024 * 1024))
+                    if not skipped:
+                        break
+                    offset -= len(skipped)
+                return file.read(length)
+        except FileNotFoundError:
+            return None
+
+
+default_blob_store = InMemoryBlobStore()
+"""Blob store used by default, shared by the agents of the process."""
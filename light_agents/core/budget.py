@@ -0,0 +1,325 @@
+from enum import Enum
+from threading import Lock
+from types import TracebackType
+from typing import Dict, List, Optional, Sequence, Type
+
+from pydantic import BaseModel, PrivateAttr
+
+from light_agents.core.logger_config import setup_logger
+from light_agents.schemas.model_config import model_config
+
+logger = setup_logger(__name__)
+
+MIN_OUTPUT_TOKENS = 64
+"""Calls that can't generate at least this many tokens are not admitted."""
+
+
+class StopReason(str, Enum):
+    """Possible reasons for a thread run to stop."""
+
+    COMPLETED = "completed"
+    TOKEN_BUDGET = "token_budget"
+    COST_BUDGET = "cost_budget"
+    DEADLINE = "deadline"
+
+
+class ModelPrice(BaseModel):
+    """Price of a model, in USD per million tokens."""
+
+    input: float
+    output: float
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        """Get the cost of a call."""
+        return (input_tokens * self.input + output_tokens * self.output) / 1e6
+
+
+PRICE_TABLE: Dict[str, ModelPrice] = {
+    "gpt-4o-mini": ModelPrice(input=0.15, output=0.6),
+    "gpt-4o": ModelPrice(input=2.5, output=10.0),
+    "gpt-4-turbo": ModelPrice(input=10.0, output=30.0),
+    "gpt-3.5-turbo": ModelPrice(input=0.5, output=1.5),
+    "claude-3-5-sonnet": ModelPrice(input=3.0, output=15.0),
+    "claude-3-opus": ModelPrice(input=15.0, output=75.0),
+    "claude-3-haiku": ModelPrice(input=0.25, output=1.25),
+    "anthropic.claude-3-5-sonnet": ModelPrice(input=3.0, output=15.0),
+}
+"""Prices by model name prefix. The longest matching prefix is used."""
+
+
+def model_price(
+    model: str, prices: Optional[Dict[str, ModelPrice]] = None
+) -> Optional[ModelPrice]:
+    """Find the price of a model by the longest matching prefix."""
+    prices = PRICE_TABLE if prices is None else prices
+    matches = [prefix for prefix in prices if model.startswith(prefix)]
+    if not matches:
+        return None
+    return prices[max(matches, key=len)]
+
+
+class BudgetExceededError(Exception):
+    """Exception raised when a provider call doesn't fit in a budget."""
+
+    def __init__(self, stop_reason: StopReason, budget_name: str) -> None:
+        """Initialize the exception."""
+        super().__init__(
+            f"The {budget_name} budget is exhausted ({stop_reason.value})."
+        )
+        self.stop_reason = stop_reason
+        self.budget_name = budget_name
+
+
+class Budget(BaseModel):
+    """Token and cost ceilings, with the usage charged so far.
+
+    A budget can be shared by concurrent runs (e.g. every thread of a
+    tenant). Calls reserve their worst case usage when admitted, and settle
+    the actual usage when they complete, so concurrent calls can't overrun
+    the ceilings together.
+
+    Attributes:
+        name: Name of the budget, for logs and errors.
+        max_tokens: Maximum number of tokens (input and output).
+        max_cost: Maximum cost in USD.
+        used_tokens: Tokens charged so far.
+        used_cost: Cost charged so far.
+
+    """
+
+    model_config = model_config
+    name: str = "thread"
+    max_tokens: Optional[int] = None
+    max_cost: Optional[float] = None
+    used_tokens: int = 0
+    used_cost: float = 0.0
+
+    _reserved_tokens: int = PrivateAttr(default=0)
+    _reserved_cost: float = PrivateAttr(default=0.0)
+    _lock: Lock = PrivateAttr(default_factory=Lock)
+
+    def reserve(
+        self,
+        input_tokens: int,
+        max_output_tokens: int,
+        price: Optional[ModelPrice] = None,
+    ) -> int:
+        """Reserve the worst case usage of a call.
+
+        Args:
+            input_tokens: Estimated input tokens of the call.
+            max_output_tokens: Requested maximum output tokens.
+            price: Price of the model. Cost ceilings are not enforced for
+                models without a price.
+
+        Returns:
+            output_tokens: Output tokens reserved, possibly fewer than
+                requested so the call fits in the budget.
+
+        Raises:
+            BudgetExceededError: If the call can't generate at least
+                `MIN_OUTPUT_TOKENS`, or all of `max_output_tokens` if fewer.
+
+        """
+        min_output_tokens = min(MIN_OUTPUT_TOKENS, max_output_tokens)
+        with self._lock:
+            output_tokens = max_output_tokens
+            if self.max_tokens is not None:
+                remaining = (
+                    self.max_tokens
+                    - self.used_tokens
+                    - self._reserved_tokens
+                    - input_tokens
+                )
+                output_tokens = min(output_tokens, remaining)
+                if output_tokens < min_output_tokens:
+                    raise BudgetExceededError(StopReason.TOKEN_BUDGET, self.name)
+
+            if self.max_cost is not None and price is not None:
+                remaining_cost = (
+                    self.max_cost
+                    - self.used_cost
+                    - self._reserved_cost
+                    - price.cost(input_tokens, 0)
+                )
+                affordable = int(remaining_cost * 1e6 / price.output)
+                output_tokens = min(output_tokens, affordable)
+                if output_tokens < min_output_tokens:
+                    raise BudgetExceededError(StopReason.COST_BUDGET, self.name)
+
+            self._reserved_tokens += input_tokens + output_tokens
+            if price is not None:
+                self._reserved_cost += price.cost(input_tokens, output_tokens)
+            return output_tokens
+
+    def settle(
+        self,
+        reserved_tokens: int,
+        reserved_cost: float,
+        used_tokens: int = 0,
+        used_cost: float = 0.0,
+    ) -> None:
+        """Release a reservation, charging the actual usage of the call."""
+        with self._lock:
+            self._reserved_tokens -= reserved_tokens
+            self._reserved_cost -= reserved_cost
+            self.used_tokens += used_tokens
+            self.used_cost += used_cost
+
+
+class BudgetCall:
+    """A provider call admitted by a `BudgetGuard`.
+
+    Used as a context manager around the call. The reservations are released
+    on exit, charging the usage given to `charge`, if any.
+    """
+
+    def __init__(
+        self,
+        budgets: Sequence[Budget],
+        price: Optional[ModelPrice],
+        input_tokens: int,
+        max_tokens: int,
+    ) -> None:
+        """Initialize the BudgetCall class."""
+        self.budgets = list(budgets)
+        self.price = price
+        self.input_tokens = input_tokens
+        self.max_tokens = max_tokens
+        self._used_tokens = 0
+        self._used_cost = 0.0
+
+    @property
+    def reserved_tokens(self) -> int:
+        """Tokens reserved in each budget."""
+        return self.input_tokens + self.max_tokens
+
+    @property
+    def reserved_cost(self) -> float:
+        """Cost reserved in each budget."""
+        if self.price is None:
+            return 0.0
+        return self.price.cost(self.input_tokens, self.max_tokens)
+
+    def charge(self, input_tokens: int, output_tokens: int) -> None:
+        """Record the actual usage of the call."""
+        self._used_tokens = input_tokens + output_tokens
+        self._used_cost = (
+            self.price.cost(input_tokens, output_tokens) if self.price else 0.0
+        )
+
+    def __enter__(self) -> "BudgetCall":
+        """Enter the call."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Settle the reservation of every budget."""
+        for budget in self.budgets:
+            budget.settle(
+                self.reserved_tokens,
+                self.reserved_cost,
+                self._used_tokens,
+                self._used_cost,
+            )
+
+
+class BudgetGuard:
+    """Admission control of the provider calls of a run.
+
+    Checks every budget of the run (e.g. the thread and the tenant budgets)
+    before each provider call. Agents receive it in the `budget` keyword
+    argument, and stop the run cleanly when a call is not admitted. The
+    reason is kept in `stop_reason`.
+
+    Examples:
+        >>> guard = BudgetGuard([Budget(max_tokens=10_000)])
+        >>> with guard.admit("gpt-4o", input_tokens=1200, max_tokens=4096) as call:
+        ...     call.charge(input_tokens=1180, output_tokens=300)
+        >>> guard.budgets[0].used_tokens
+        1480
+
+    """
+
+    def __init__(
+        self,
+        budgets: Sequence[Budget],
+        prices: Optional[Dict[str, ModelPrice]] = None,
+    ) -> None:
+        """Initialize the BudgetGuard class.
+
+        Args:
+            budgets: Budgets charged by every call of the run.
+            prices: Prices by model name prefix. Defaults to `PRICE_TABLE`.
+
+        """
+        self.budgets = list(budgets)
+        self.prices = prices
+        self.stop_reason: Optional[StopReason] = None
+
+    def admit(self, model: str, input_tokens: int, max_tokens: int) -> BudgetCall:
+        """Admit a provider call, reserving its worst case usage.
+
+        Args:
+            model: Model of the call.
+            input_tokens: Estimated input tokens of the call.
+            max_tokens: Requested maximum output tokens.
+
+        Returns:
+            call: The admitted call. Its `max_tokens` may be lower than
+                requested, so the call fits in every budget.
+
+        Raises:
+            BudgetExceededError: If any budget is exhausted.
+
+        """
+        price = model_price(model, self.prices)
+        if price is None and any(budget.max_cost for budget in self.budgets):
+            logger.warning(f"No price for model '{model}'. Cost is not enforced.")
+
+        reservations: List[BudgetCall] = []
+        try:
+            for budget in self.budgets:
+                output_tokens = budget.reserve(input_tokens, max_tokens, price)
+                reservations.append(
+                    BudgetCall([budget], price, input_tokens, output_tokens)
+                )
+        except BudgetExceededError as e:
+            self.stop_reason = e.stop_reason
+            logger.warning(str(e))
+            for reservation in reservations:
+                reservation.__exit__(None, None, None)
+            raise
+
+        call = BudgetCall(
+            self.budgets,
+            price,
+            input_tokens,
+            min(
+                [reservation.max_tokens for reservation in reservations],
+                default=max_tokens,
+            ),
+        )
+        # releases what was reserved above the lowest limit
+        for reservation in reservations:
+            reservation.budgets[0].settle(
+                reservation.reserved_tokens - call.reserved_tokens,
+                reservation.reserved_cost - call.reserved_cost,
+            )
+        return call
+
+
+def admit_call(
+    guard: Optional[BudgetGuard], model: str, input_tokens: int, max_tokens: int
+) -> BudgetCall:
+    """Admit a provider call with the run's guard, if the run has one.
+
+    Without a guard, the call is always admitted and nothing is charged.
+    """
+    if guard is None:
+        return BudgetCall([], None, input_tokens, max_tokens)
+    return guard.admit(model, input_tokens, max_tokens)
@@ -0,0 +1,93 @@
+import json
+from typing import Callable, Optional, Sequence
+
+from openai.types.chat import ChatCompletionMessageToolCall
+from openai.types.chat.chat_completion import Choice
+
+from light_agents.core.tool_registry import ToolRegistry
+
+ChoiceSelector = Callable[[Sequence[Choice], Optional[ToolRegistry]], Choice]
+"""Picks one of the choices of an OpenAI completion with `n > 1`."""
+
+
+def first_choice(
+    choices: Sequence[Choice], tools_registry: Optional[ToolRegistry] = None
+) -> Choice:
+    """Select the first choice."""
+    return choices[0]
+
+
+def choice_length(choice: Choice) -> int:
+    """Count the characters generated in a choice, including tool calls."""
+    length = len(choice.message.content or "")
+    for tool_call in choice.message.tool_calls or []:
+        if isinstance(tool_call, ChatCompletionMessageToolCall):
+            length += len(tool_call.function.arguments)
+    return length
+
+
+def longest_choice(
+    choices: Sequence[Choice], tools_registry: Optional[ToolRegistry] = None
+) -> Choice:
+    """Select the choice with the longest generated content."""
+    return max(choices, key=choice_length)
+
+
+def is_valid_tool_call_choice(
+    choice: Choice, tools_registry: Optional[ToolRegistry]
+) -> bool:
+    """Check if every tool call of a choice is for a known tool with valid args."""
+    if choice.finish_reason not in ["tool_calls", "function_call"]:
+        return False
+
+    tool_calls = choice.message.tool_calls or []
+    if not tool_calls:
+        return False
+
+    for tool_call in tool_calls:
+        if not isinstance(tool_call, ChatCompletionMessageToolCall):
+            return False
+        try:
+            args = json.loads(tool_call.function.arguments)
+        except json.JSONDecodeError:
+            return False
+        if tools_registry and not tools_registry.validate_args(
+            tool_call.function.name, args
+        ):
+            return False
+    return True
+
+
+def first_valid_tool_call(
+    choices: Sequence[Choice], tools_registry: Optional[ToolRegistry] = None
+) -> Choice:
+    """Select the first choice with only valid tool calls.
+
+    Falls back to the first choice that stopped naturally with content, and
+    then to the first choice.
+    """
+    for choice in choices:
+        if is_valid_tool_call_choice(choice, tools_registry):
+            return choice
+
+    for choice in choices:
+        if choice.finish_reason == "stop" and choice.message.content:
+            return choice
+
+    return choices[0]
+
+
+def best_scored(score: Callable[[Choice], float]) -> ChoiceSelector:
+    """Build a selector that picks the choice with the highest score.
+
+    Examples:
+        >>> selector = best_scored(lambda choice: -choice_length(choice))
+
+    """
+
+    def selector(
+        choices: Sequence[Choice], tools_registry: Optional[ToolRegistry] = None
+    ) -> Choice:
+        return max(choices, key=score)
+
+    return selector
@@ -0,0 +1,189 @@
+import time
+from collections import deque
+from enum import Enum
+from threading import Lock
+from typing import Callable, Deque, Optional, Tuple
+
+from pydantic import BaseModel
+
+from light_agents.core.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Possible states of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreakerConfig(BaseModel):
+    """Thresholds of a tool circuit breaker.
+
+    The breaker looks at the last `window` calls of the tool. Once it has at
+    least `min_calls` of them, it opens when the rate of failed calls reaches
+    `failure_rate`, or when the rate of calls slower than `slow_call_seconds`
+    reaches `slow_call_rate`. After `open_seconds`, it lets `probes` calls
+    through: it closes once they all succeed, and opens again on the first
+    failing or slow one.
+
+    Attributes:
+        window: Number of recent calls considered.
+        min_calls: Calls needed in the window before the breaker can open.
+        failure_rate: Rate of failed calls opening the breaker, in `[0, 1]`.
+        slow_call_seconds: Duration of a slow call. Latency is not checked if
+            `None`.
+        slow_call_rate: Rate of slow calls opening the breaker, in `[0, 1]`.
+        open_seconds: Seconds the breaker stays open before probing the tool.
+        probes: Calls let through while half-open.
+
+    """
+
+    window: int = 20
+    min_calls: int = 5
+    failure_rate: float = 0.5
+    slow_call_seconds: Optional[float] = None
+    slow_call_rate: float = 0.5
+    open_seconds: float = 30.0
+    probes: int = 1
+
+
+class ToolMetrics(BaseModel):
+    """Execution metrics of a tool in a registry.
+
+    Attributes:
+        tool: Name of the tool.
+        calls: Executions of the tool. Coalesced and rejected calls are not
+            counted.
+        failures: Executions raising an error.
+        rejected: Calls failed fast while the circuit breaker was open.
+        total_seconds: Time spent in the executions.
+        max_seconds: Longest execution.
+        circuit_state: State of the circuit breaker, `None` without one.
+        circuit_opened: Times the circuit breaker opened.
+
+    """
+
+    tool: str
+    calls: int = 0
+    failures: int = 0
+    rejected: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    circuit_state: Optional[CircuitState] = None
+    circuit_opened: int = 0
+
+    @property
+    def mean_seconds(self) -> float:
+        """Mean duration of the executions."""
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+class CircuitBreaker:
+    """Circuit breaker of a tool, failing its calls fast while it is down.
+
+    Calls first ask `allow`, then report their outcome with `record`, or with
+    `release` when they end without an outcome (e.g. cancelled). The breaker
+    is thread-safe, and can be shared by sync and async calls.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: CircuitBreakerConfig,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the CircuitBreaker class.
+
+        Args:
+            name: Name of the guarded tool, used in the logs.
+            config: Thresholds of the breaker.
+            clock: Monotonic clock, in seconds.
+
+        """
+        self.name = name
+        self.config = config
+        self.clock = clock
+        self.state = CircuitState.CLOSED
+        self.opened = 0
+        self._calls: Deque[Tuple[bool, bool]] = deque(maxlen=config.window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = Lock()
+
+    def allow(self) -> bool:
+        """Whether a call can go through, claiming a probe when half-open."""
+        with self._lock:
+            if (
+                self.state == CircuitState.OPEN
+                and self.clock() - self._opened_at >= self.config.open_seconds
+            ):
+                logger.info(f"Circuit of tool '{self.name}' half-open, probing.")
+                self.state = CircuitState.HALF_OPEN
+                self._probes = 0
+                self._probe_successes = 0
+
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.HALF_OPEN and (
+                self._probes < self.config.probes
+            ):
+                self._probes += 1
+                return True
+            return False
+
+    def record(self, seconds: float, failed: bool) -> None:
+        """Report the outcome of an allowed call."""
+        slow = (
+            self.config.slow_call_seconds is not None
+            and seconds >= self.config.slow_call_seconds
+        )
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self._probes = max(self._probes - 1, 0)
+                if failed or slow:
+                    self._open()
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.config.probes:
+                    logger.info(f"Circuit of tool '{self.name}' closed.")
+                    self.state = CircuitState.CLOSED
+                    self._calls.clear()
+                return
+            if self.state == CircuitState.OPEN:
+                # a call allowed before the breaker opened
+                return
+
+            self._calls.append((failed, slow))
+            if self._tripped():
+                self._open()
+
+    def release(self) -> None:
+        """Report an allowed call ending without an outcome."""
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self._probes = max(self._probes - 1, 0)
+
+    def _tripped(self) -> bool:
+        calls = len(self._calls)
+        if calls < max(self.config.min_calls, 1):
+            return False
+        failures = sum(failed for failed, _ in self._calls)
+        slow_calls = sum(slow for _, slow in self._calls)
+        return failures / calls >= self.config.failure_rate or (
+            self.config.slow_call_seconds is not None
+            and slow_calls / calls >= self.config.slow_call_rate
+        )
+
+    def _open(self) -> None:
+        logger.warning(
+            f"Circuit of tool '{self.name}' opened for "
+            f"{self.config.open_seconds:g}s."
+        )
+        self.state = CircuitState.OPEN
+        self.opened += 1
+        self._opened_at = self.clock()
+        self._calls.clear()
@@ -0,0 +1,291 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Dict, Generic, Optional, Protocol, TypeVar
+from weakref import WeakKeyDictionary
+
+import httpx
+from pydantic import BaseModel
+
+from light_agents.core.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class _ClosableClient(Protocol):
+    def is_closed(self) -> bool: ...
+
+
+ClientT = TypeVar("ClientT", bound=_ClosableClient)
+
+
+class ConnectionPoolConfig(BaseModel):
+    """Configuration of a shared HTTP connection pool.
+
+    Attributes:
+        max_connections: Maximum number of open connections.
+        max_keepalive_connections: Maximum number of idle connections kept.
+        keepalive_expiry: Seconds an idle connection is kept open.
+        http2: Whether to use HTTP/2. Requires the `h2` package.
+        connect_timeout: Seconds to establish a connection.
+        read_timeout: Seconds to wait for response data.
+        write_timeout: Seconds to send request data.
+        pool_timeout: Seconds to wait for a free connection of the pool.
+        max_retries: Retries of the provider SDK on transient errors.
+        warmup_connections: Connections opened by `warmup`.
+
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    connect_timeout: float = 5.0
+    read_timeout: float = 600.0
+    write_timeout: float = 600.0
+    pool_timeout: float = 600.0
+    max_retries: int = 2
+    warmup_connections: int = 4
+
+    @property
+    def limits(self) -> httpx.Limits:
+        """The httpx limits of the pool."""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        """The httpx timeouts of the pool."""
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+
+class ConnectionPools:
+    """Named HTTP connection pools, shared by every agent using the same name.
+
+    Each name holds a sync `httpx` client, and an async one per event loop,
+    created on first use with the configuration given for the name. Provider
+    SDK clients built on them share the keep-alive connections, so bursts
+    don't pay a new TLS handshake per agent instance.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the ConnectionPools class."""
+        self._configs: Dict[str, ConnectionPoolConfig] = {}
+        self._clients: Dict[str, httpx.Client] = {}
+        self._async_clients: Dict[
+            str, WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]
+        ] = {}
+        self._lock = Lock()
+
+    def configure(
+        self, name: str, config: Optional[ConnectionPoolConfig] = None
+    ) -> ConnectionPoolConfig:
+        """Set the configuration of a pool, if it isn't configured yet.
+
+        Returns:
+            config: The configuration in use by the pool. The first
+                configuration given for a name wins.
+
+        """
+        with self._lock:
+            current = self._configs.get(name)
+            if current is None:
+                current = config or ConnectionPoolConfig()
+                self._configs[name] = current
+            elif config is not None and config != current:
+                logger.warning(
+                    f"Connection pool '{name}' is already configured. "
+                    "Ignoring the new configuration."
+                )
+            return current
+
+    def client(self, name: str) -> httpx.Client:
+        """Get the sync client of a pool."""
+        config = self.configure(name)
+        with self._lock:
+            if name not in self._clients:
+                self._clients[name] = httpx.Client(
+                    limits=config.limits,
+                    timeout=config.timeout,
+                    http2=self._http2(config),
+                    follow_redirects=True,
+                )
+            return self._clients[name]
+
+    def async_client(self, name: str) -> httpx.AsyncClient:
+        """Get the async client of a pool for the running event loop.
+
+        Async connections can't be used outside the loop that opened them,
+        so each loop gets its own client (e.g. each `asyncio.run`), dropped
+        with the loop. Clients closed by `aclose` are rebuilt on next use.
+
+        Raises:
+            RuntimeError: If there is no running event loop.
+
+        """
+        config = self.configure(name)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(name, WeakKeyDictionary())
+            client = clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    limits=config.limits,
+                    timeout=config.timeout,
+                    http2=self._http2(config),
+                    follow_redirects=True,
+                )
+                clients[loop] = client
+            return client
+
+    def warmup(self, name: str, url: str, connections: Optional[int] = None) -> int:
+        """Open connections of the sync pool to `url` ahead of traffic.
+
+        Any HTTP answer counts, since only the connection is needed.
+
+        Returns:
+            opened: Number of requests that got an answer.
+
+        """
+        connections = connections or self.configure(name).warmup_connections
+        client = self.client(name)
+
+        def touch() -> bool:
+            try:
+                client.head(url)
+                return True
+            except httpx.HTTPError as e:
+                logger.warning(f"Failed to warm up '{url}': {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            opened = sum(executor.map(lambda _: touch(), range(connections)))
+        logger.debug(f"Warmed up {opened} connections of pool '{name}'.")
+        return opened
+
+    async def awarmup(
+        self, name: str, url: str, connections: Optional[int] = None
+    ) -> int:
+        """Open connections of the async pool to `url` ahead of traffic."""
+        connections = connections or self.configure(name).warmup_connections
+        client = self.async_client(name)
+
+        async def touch() -> bool:
+            try:
+                await client.head(url)
+                return True
+            except httpx.HTTPError as e:
+                logger.warning(f"Failed to warm up '{url}': {e}")
+                return False
+
+        results = await asyncio.gather(*(touch() for _ in range(connections)))
+        opened = sum(results)
+        logger.debug(f"Warmed up {opened} async connections of pool '{name}'.")
+        return opened
+
+    def close(self) -> None:
+        """Close the sync clients of every pool."""
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+    async def aclose(self) -> None:
+        """Close the async clients of every pool for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = [
+                client
+                for loop_clients in self._async_clients.values()
+                if (client := loop_clients.pop(loop, None)) is not None
+            ]
+        for client in clients:
+            await client.aclose()
+
+    @staticmethod
+    def _http2(config: ConnectionPoolConfig) -> bool:
+        if not config.http2:
+            return False
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                "HTTP/2 connection pools require the 'h2' package. "
+                "Install it with `pip install httpx[http2]`."
+            )
+        return True
+
+
+connection_pools = ConnectionPools()
+"""Pools shared by every agent of the process."""
+
+
+class LazyClient(Generic[ClientT]):
+    """A provider SDK client, built on first use.
+
+    Building the client configures its connection pool, so a module-level
+    default client must not be built on import: the pool configuration of
+    the first agent would then be ignored.
+    """
+
+    def __init__(self, factory: Callable[[], ClientT]) -> None:
+        """Initialize the LazyClient class.
+
+        Args:
+            factory: Callable building the client.
+
+        """
+        self.factory = factory
+        self._client: Optional[ClientT] = None
+        self._lock = Lock()
+
+    def get(self) -> ClientT:
+        """Get the client, building it on the first call."""
+        with self._lock:
+            if self._client is None:
+                self._client = self.factory()
+            return self._client
+
+
+class LoopClients(Generic[ClientT]):
+    """Async provider SDK clients, built once per event loop.
+
+    SDK clients hold the async `httpx` client of the loop they were built
+    in, so they follow the same rules: one per loop, rebuilt once closed.
+    """
+
+    def __init__(self, factory: Callable[[], ClientT]) -> None:
+        """Initialize the LoopClients class.
+
+        Args:
+            factory: Callable building the client, called in the event loop.
+
+        """
+        self.factory = factory
+        self._clients: WeakKeyDictionary[asyncio.AbstractEventLoop, ClientT] = (
+            WeakKeyDictionary()
+        )
+        self._lock = Lock()
+
+    def get(self) -> ClientT:
+        """Get the client of the running event loop.
+
+        Raises:
+            RuntimeError: If there is no running event loop.
+
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed():
+                client = self.factory()
+                self._clients[loop] = client
+            return client
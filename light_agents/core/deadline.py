@@ -0,0 +1,129 @@
+import time
+from typing import Any, Dict, Optional, TypeVar, Union
+
+from light_agents.core.budget import StopReason
+
+ClientT = TypeVar("ClientT", bound=Any)
+
+DEADLINE_KWARG = "deadline"
+"""Run keyword argument carrying the `Deadline` of the run."""
+
+
+class DeadlineExceededError(Exception):
+    """Exception raised when a run is out of time."""
+
+    def __init__(self) -> None:
+        """Initialize the exception."""
+        super().__init__("The run deadline was reached.")
+
+
+class Deadline:
+    """Point in time a run has to finish by.
+
+    Agents receive it in the `deadline` keyword argument. Provider calls use
+    the remaining time as their timeout, tools are abandoned when it runs
+    out, and no new provider call is made after it. The run then stops with
+    the messages generated so far, and the reason is kept in `stop_reason`.
+
+    Once less than `answer_reserve` seconds are left, the run wraps up: the
+    model is asked to answer without calling more tools.
+
+    Examples:
+        >>> deadline = Deadline(30, answer_reserve=8)
+        >>> deadline.expired, deadline.wrapping_up
+        (False, False)
+        >>> thread.process_thread(agent, deadline=deadline)  # doctest: +SKIP
+        >>> thread.stop_reason  # doctest: +SKIP
+        'deadline'
+
+    """
+
+    def __init__(self, seconds: float, answer_reserve: float = 0.0) -> None:
+        """Initialize the Deadline class.
+
+        Args:
+            seconds: Time given to the run, from now.
+            answer_reserve: Seconds kept for the final answer.
+
+        """
+        self.seconds = seconds
+        self.answer_reserve = answer_reserve
+        self.expires_at = time.monotonic() + seconds
+        self.stop_reason: Optional[StopReason] = None
+
+    def remaining(self) -> float:
+        """Get the seconds left, or `0.0` once expired."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline was reached."""
+        return self.remaining() <= 0
+
+    @property
+    def wrapping_up(self) -> bool:
+        """Whether the run should answer now, without calling more tools."""
+        return self.answer_reserve > 0 and self.remaining() <= self.answer_reserve
+
+    def check(self) -> None:
+        """Stop the run if the deadline was reached.
+
+        Raises:
+            DeadlineExceededError: If the deadline was reached.
+
+        """
+        if self.expired:
+            self.stop_reason = StopReason.DEADLINE
+            raise DeadlineExceededError()
+
+
+def as_deadline(deadline: Union[None, float, Deadline]) -> Optional[Deadline]:
+    """Build a deadline from seconds, or keep the given one."""
+    if deadline is None or isinstance(deadline, Deadline):
+        return deadline
+    return Deadline(deadline)
+
+
+def get_deadline(kwargs: Dict[str, Any]) -> Optional[Deadline]:
+    """Get the deadline of the run, if it has one."""
+    return kwargs.get(DEADLINE_KWARG)
+
+
+def check_deadline(kwargs: Dict[str, Any]) -> None:
+    """Stop the run if its deadline was reached.
+
+    Raises:
+        DeadlineExceededError: If the deadline was reached.
+
+    """
+    deadline = get_deadline(kwargs)
+    if deadline is not None:
+        deadline.check()
+
+
+def bounded_client(client: ClientT, kwargs: Dict[str, Any]) -> ClientT:
+    """Get a provider client whose calls end by the run's deadline.
+
+    The SDK timeout applies to each attempt, so the client also makes a
+    single attempt: retries would overrun the deadline.
+    """
+    deadline = get_deadline(kwargs)
+    if deadline is None:
+        return client
+    bounded: ClientT = client.with_options(
+        timeout=deadline.remaining(), max_retries=0
+    )
+    return bounded
+
+
+def raise_if_expired(kwargs: Dict[str, Any], error: Exception) -> None:
+    """Turn the failure of a call cut by the deadline into a run stop.
+
+    Raises:
+        DeadlineExceededError: If the deadline was reached.
+
+    """
+    deadline = get_deadline(kwargs)
+    if deadline is not None and deadline.expired:
+        deadline.stop_reason = StopReason.DEADLINE
+        raise DeadlineExceededError() from error
@@ -0,0 +1,274 @@
+import asyncio
+from enum import Enum
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field, SerializeAsAny
+
+from light_agents.core.budget import StopReason
+from light_agents.core.connection_pool import connection_pools
+from light_agents.core.deadline import Deadline
+from light_agents.core.logger_config import setup_logger
+from light_agents.schemas.messages_schemas import (
+    Message,
+    MessageBase,
+    MessageRole,
+    MessageType,
+)
+from light_agents.schemas.model_config import model_config
+from light_agents.schemas.thread_agent_schema import ThreadAgent
+from light_agents.schemas.thread_schema import ThreadBase
+
+logger = setup_logger(__name__)
+
+
+class SubThreadStatus(str, Enum):
+    """Possible outcomes of a sub-thread."""
+
+    COMPLETED = "completed"
+    FAILED = "failed"
+    TIMED_OUT = "timed_out"
+
+
+class SubThread(BaseModel):
+    """A branch of a fan-out, with its own agent and tools.
+
+    Attributes:
+        name: Name of the branch, used in the merged message.
+        agent: Agent processing the branch.
+        tools: Names of the agent tools offered in the branch. Defaults to
+            every tool of the agent.
+        instructions: User message added after the forked messages, e.g. the
+            part of the request handled by the branch.
+
+    """
+
+    model_config = model_config
+    name: str
+    agent: ThreadAgent
+    tools: Optional[List[str]] = None
+    instructions: Optional[str] = None
+
+
+class SubThreadResult(BaseModel):
+    """Outcome of a sub-thread.
+
+    Attributes:
+        name: Name of the sub-thread.
+        status: How the sub-thread ended.
+        messages: Messages generated by the sub-thread. Sub-threads that
+            failed or timed out keep the messages generated until then.
+        error: The error of a failed sub-thread.
+
+    """
+
+    model_config = model_config
+    name: str
+    status: SubThreadStatus
+    messages: List[SerializeAsAny[MessageBase]] = Field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def output(self) -> Optional[str]:
+        """The content of the last AI message, if any."""
+        for message in reversed(self.messages):
+            if isinstance(message, Message) and message.role == MessageRole.AI:
+                return message.content
+        return None
+
+
+class FanOut(BaseModel):
+    """Forks a thread into sub-threads, runs them concurrently and merges them.
+
+    Every sub-thread starts from a copy of the parent messages and runs on
+    the async path of its own agent. The sub-threads share the budgets of the
+    parent thread and a single `Deadline`, `timeout` seconds after the start,
+    so they stop by themselves: with an `answer_reserve`, they wrap up and
+    answer before it. Sub-threads still running `grace_period` seconds past
+    it are cancelled, and a failing sub-thread doesn't stop the others. In
+    both cases, the messages generated so far are kept as a partial result.
+
+    The outputs are merged back into the parent thread as a single AI
+    message. If the fan-out itself is cancelled, every sub-thread is
+    cancelled and nothing is merged.
+
+    Examples:
+        >>> fan_out = FanOut(  # doctest: +SKIP
+        ...     sub_threads=[
+        ...         SubThread(name="flights", agent=agent, tools=["search_flights"]),
+        ...         SubThread(name="hotels", agent=agent, tools=["search_hotels"]),
+        ...     ],
+        ...     timeout=60,
+        ...     answer_reserve=10,
+        ... )
+        >>> results = fan_out.run(thread)  # doctest: +SKIP
+
+    Attributes:
+        sub_threads: Branches of the fan-out.
+        timeout: Seconds given to the whole fan-out. Unlimited if `None`.
+        answer_reserve: Seconds of the timeout kept for the final answers of
+            the sub-threads.
+        grace_period: Seconds given to the sub-threads past the timeout to
+            return what they generated, before they are cancelled.
+        merge_results: Whether to add the merged message to the parent
+            thread.
+
+    """
+
+    model_config = model_config
+    sub_threads: List[SubThread]
+    timeout: Optional[float] = None
+    answer_reserve: float = 0.0
+    grace_period: float = 1.0
+    merge_results: bool = True
+
+    def fork(self, thread: ThreadBase, sub_thread: SubThread) -> ThreadBase:
+        """Copy the thread for a sub-thread.
+
+        The copy shares the messages and the budgets of the thread, but not
+        the list holding the messages, so the sub-thread only extends its own
+        copy.
+        """
+        forked = thread.model_copy(
+            update={
+                "id": f"{thread.id}-{sub_thread.name}",
+                "messages": list(thread.messages),
+                "external_thread_fields": dict(thread.external_thread_fields),
+                "compactor": None,
+                "stop_reason": None,
+                "allowed_tools": sub_thread.tools,
+            }
+        )
+        if sub_thread.instructions:
+            forked.add_message(
+                Message(
+                    role=MessageRole.USER,
+                    type=MessageType.TEXT,
+                    content=sub_thread.instructions,
+                )
+            )
+        return forked
+
+    async def arun(self, thread: ThreadBase) -> List[SubThreadResult]:
+        """Run the sub-threads, and merge their outputs into the thread.
+
+        Returns:
+            results: The result of every sub-thread, in order.
+
+        """
+        forks = [
+            (self.fork(thread, sub_thread), sub_thread)
+            for sub_thread in self.sub_threads
+        ]
+        starts = [len(forked.messages) for forked, _ in forks]
+        # the sub-threads wrap up by themselves, before being cancelled
+        deadline, cancel_after = None, None
+        if self.timeout is not None:
+            deadline = Deadline(self.timeout, answer_reserve=self.answer_reserve)
+            cancel_after = self.timeout + self.grace_period
+        tasks = [
+            asyncio.create_task(
+                self._run_sub_thread(forked, sub_thread.agent, deadline)
+            )
+            for forked, sub_thread in forks
+        ]
+        if not tasks:
+            return []
+
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=cancel_after)
+        except asyncio.CancelledError:
+            await self._cancel(tasks)
+            raise
+        await self._cancel(pending)
+
+        results = [
+            self._result(sub_thread.name, task, forked, start)
+            for (forked, sub_thread), task, start in zip(forks, tasks, starts)
+        ]
+        if self.merge_results:
+            thread.add_message(self.merge(results))
+        return results
+
+    def run(self, thread: ThreadBase) -> List[SubThreadResult]:
+        """Run the fan-out from sync code, in a new event loop.
+
+        The async clients opened in the loop are closed when the run ends.
+        Use `arun` from async code, to share the clients of the running loop.
+        """
+        return asyncio.run(self._run_and_close(thread))
+
+    async def _run_and_close(self, thread: ThreadBase) -> List[SubThreadResult]:
+        try:
+            return await self.arun(thread)
+        finally:
+            await connection_pools.aclose()
+
+    @staticmethod
+    def merge(results: Sequence[SubThreadResult]) -> Message:
+        """Merge the outputs of the sub-threads into a single AI message.
+
+        Each output is wrapped in a `<SUB_THREAD>` tag with the name and the
+        status of its sub-thread. The statuses and errors are also kept in
+        the `fan_out` external field.
+        """
+        sections = []
+        for result in results:
+            output = result.output or result.error or "No output."
+            sections.append(
+                f'<SUB_THREAD name="{result.name}" status="{result.status}">\n'
+                f"{output}\n</SUB_THREAD>"
+            )
+        return Message(
+            role=MessageRole.AI,
+            type=MessageType.TEXT,
+            content="\n\n".join(sections),
+            external_fields={
+                "fan_out": [
+                    {
+                        "name": result.name,
+                        "status": result.status,
+                        "error": result.error,
+                    }
+                    for result in results
+                ]
+            },
+        )
+
+    @staticmethod
+    async def _run_sub_thread(
+        thread: ThreadBase, agent: ThreadAgent, deadline: Optional[Deadline]
+    ) -> None:
+        async for _ in thread.astream_thread(agent, deadline):
+            pass
+
+    @staticmethod
+    async def _cancel(tasks: Iterable["asyncio.Task[None]"]) -> None:
+        tasks = list(tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _result(
+        name: str, task: "asyncio.Task[None]", forked: ThreadBase, start: int
+    ) -> SubThreadResult:
+        status, error = _task_outcome(task)
+        if forked.stop_reason == StopReason.DEADLINE:
+            status, error = SubThreadStatus.TIMED_OUT, "The deadline was reached."
+        messages = forked.messages[start:]
+        if status != SubThreadStatus.COMPLETED:
+            logger.warning(f"Sub-thread '{name}' {status.value}: {error}")
+        return SubThreadResult(
+            name=name, status=status, messages=list(messages), error=error
+        )
+
+
+def _task_outcome(
+    task: "asyncio.Task[None]",
+) -> Tuple[SubThreadStatus, Optional[str]]:
+    if task.cancelled():
+        return SubThreadStatus.TIMED_OUT, "The deadline was reached."
+    error = task.exception()
+    if error is not None:
+        return SubThreadStatus.FAILED, f"{type(error).__name__}: {error}"
+    return SubThreadStatus.COMPLETED, None
@@ -1,5 +1,13 @@
+import atexit
+import json
 import logging
-from typing import Any, Dict, Literal, Optional
+import queue
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Iterator, List, Literal, Optional, TextIO, Tuple
 
 from termcolor import colored
 
@@ -23,6 +31,14 @@ Color = Literal[
     "white",
 ]
 
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s:\n%(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+run_id_var: ContextVar[Optional[str]] = ContextVar("run_id", default=None)
+"""Id of the agent run being executed, added to the JSON log lines."""
+thread_id_var: ContextVar[Optional[str]] = ContextVar("thread_id", default=None)
+"""Id of the thread being processed, added to the JSON log lines."""
+
 
 class ColoredFormatter(logging.Formatter):
     """Custom log formatter that colorizes the entire log message."""
@@ -47,29 +63,214 @@ class ColoredFormatter(logging.Formatter):
         return super(ColoredFormatter, self).format(record)
 
 
+class JsonFormatter(logging.Formatter):
+    """Log formatter emitting each record as a single JSON line.
+
+    Lines hold the UTC `time`, the `level`, the `logger` name, the `message`,
+    the `run_id` and `thread_id` correlation ids, and the `exception`
+    traceback, if any.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format the log record."""
+        payload: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "run_id": getattr(record, "run_id", None),
+            "thread_id": getattr(record, "thread_id", None),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class CorrelationFilter(logging.Filter):
+    """Adds the run and thread ids of the current context to the records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Add the correlation ids to the record."""
+        if not hasattr(record, "run_id"):
+            record.run_id = run_id_var.get()
+        if not hasattr(record, "thread_id"):
+            record.thread_id = thread_id_var.get()
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that drops the records instead of blocking on a full queue.
+
+    Records are rendered in the calling thread, so the listener never reads
+    the objects passed as log arguments. The dropped records are counted in
+    `dropped`.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        """Initialize the NonBlockingQueueHandler class."""
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put the record in the queue, or drop it if the queue is full."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Render the message and the traceback of the record."""
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+
+class _JsonListener(QueueListener):
+    def __init__(
+        self, log_queue: "queue.Queue[logging.LogRecord]", handler: logging.Handler
+    ) -> None:
+        super().__init__(log_queue, handler)
+        self.log_queue = log_queue
+
+    def enqueue_sentinel(self) -> None:
+        # waits for room in a full queue, the queued records are written first
+        self.log_queue.put(None)  # type: ignore[arg-type]
+
+
+class _JsonSink:
+    def __init__(self, stream: TextIO, queue_size: int) -> None:
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(queue_size)
+        stream_handler = logging.StreamHandler(stream)
+        stream_handler.setFormatter(JsonFormatter())
+        self.handler = NonBlockingQueueHandler(log_queue)
+        self.handler.addFilter(CorrelationFilter())
+        self.listener = _JsonListener(log_queue, stream_handler)
+        self.listener.start()
+
+    def stop(self) -> None:
+        self.listener.stop()
+
+
+_json_sink: Optional[_JsonSink] = None
+_managed_handlers: Dict[str, Tuple[logging.Logger, logging.Handler]] = {}
+
+
+def console_formatter(stream: Any) -> logging.Formatter:
+    """Get the console formatter, colored only when writing to a terminal."""
+    isatty = getattr(stream, "isatty", None)
+    if callable(isatty) and isatty():
+        return ColoredFormatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+    return logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+
+
 def setup_logger(name: Optional[str] = None, **kwargs: Any) -> logging.Logger:
-    """Set up the logger."""
+    """Set up the logger.
+
+    Logs go to stderr, colored when it is a terminal, or to the JSON sink
+    once `enable_json_logging` was called.
+    """
     log_level = kwargs.get("log_level", logging.DEBUG)
 
     logger = logging.getLogger(name)
     logger.setLevel(log_level)
 
     if not logger.handlers:
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.DEBUG)
-
-        formatter = ColoredFormatter(
-            "%(asctime)s [%(levelname)s] %(name)s:\n%(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-
-        # Adicionar o formatter ao handler
-        console_handler.setFormatter(formatter)
-
-        # Adicionar o handler ao logger
-        logger.addHandler(console_handler)
+        handler = _handler()
+        logger.addHandler(handler)
+        _managed_handlers[logger.name] = (logger, handler)
 
         # Opcional: Propagar o log para loggers de nível superior
         logger.propagate = False
 
     return logger
+
+
+def enable_json_logging(
+    stream: Optional[TextIO] = None, queue_size: int = 10000
+) -> NonBlockingQueueHandler:
+    """Send the logs of every package logger to a non-blocking JSON sink.
+
+    Records are put in a bounded queue and written as JSON lines by a
+    background thread, so logging never blocks the request threads. Records
+    are dropped while the queue is full. The sink is flushed at exit, or by
+    `disable_json_logging`.
+
+    Args:
+        stream: Stream the lines are written to. Defaults to stderr.
+        queue_size: Maximum records waiting to be written.
+
+    Returns:
+        handler: The handler of the sink, counting the dropped records.
+
+    """
+    global _json_sink
+    disable_json_logging()
+    _json_sink = _JsonSink(stream or sys.stderr, queue_size)
+    _replace_handlers()
+    return _json_sink.handler
+
+
+def disable_json_logging() -> None:
+    """Flush the JSON sink and go back to the console logs."""
+    global _json_sink
+    if _json_sink is None:
+        return
+    sink, _json_sink = _json_sink, None
+    _replace_handlers()
+    sink.stop()
+
+
+@contextmanager
+def log_context(
+    run_id: Optional[str] = None, thread_id: Optional[str] = None
+) -> Iterator[None]:
+    """Set the correlation ids of the logs emitted in the block.
+
+    The ids follow the tasks and the tool threads started in the block. Ids
+    left to `None` keep their current value.
+    """
+    tokens: List[Tuple[ContextVar[Optional[str]], Token[Optional[str]]]] = []
+    if run_id is not None:
+        tokens.append((run_id_var, run_id_var.set(run_id)))
+    if thread_id is not None:
+        tokens.append((thread_id_var, thread_id_var.set(thread_id)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            try:
+                var.reset(token)
+            except ValueError:
+                # closed from another context, e.g. a dropped async generator
+                pass
+
+
+def _handler() -> logging.Handler:
+    if _json_sink is not None:
+        return _json_sink.handler
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.DEBUG)
+    console_handler.setFormatter(console_formatter(console_handler.stream))
+    return console_handler
+
+
+def _replace_handlers() -> None:
+    # only the handlers added by setup_logger, the user ones are kept
+    for name, (logger, handler) in list(_managed_handlers.items()):
+        logger.removeHandler(handler)
+        handler = _handler()
+        logger.addHandler(handler)
+        _managed_handlers[name] = (logger, handler)
+
+
+atexit.register(disable_json_logging)
@@ -0,0 +1,262 @@
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union, overload
+
+from light_agents.schemas.messages_schemas import (
+    Message,
+    MessageBase,
+    MessageRole,
+    ToolUseMessage,
+)
+
+
+class MessageView(Sequence[MessageBase]):
+    """Read-only view of some messages of a list, without copying them.
+
+    The view holds the positions of its messages in the list. It reflects the
+    list as it was when the view was taken, and stays valid as long as the
+    list is only appended to.
+    """
+
+    def __init__(
+        self,
+        messages: Sequence[MessageBase],
+        positions: Sequence[int],
+        length: Optional[int] = None,
+    ) -> None:
+        """Initialize the MessageView class.
+
+        Args:
+            messages: The viewed list.
+            positions: Positions of the messages of the view in the list.
+            length: Number of leading positions in the view. Defaults to all
+                of them.
+
+        """
+        self._messages = messages
+        self._positions = positions
+        self._length = len(positions) if length is None else length
+
+    @property
+    def positions(self) -> Sequence[int]:
+        """Positions of the messages of the view in the list."""
+        if self._length == len(self._positions):
+            return self._positions
+        return self._positions[: self._length]
+
+    def __len__(self) -> int:
+        """Get the number of messages of the view."""
+        return self._length
+
+    @overload
+    def __getitem__(self, item: int) -> MessageBase: ...
+
+    @overload
+    def __getitem__(self, item: slice) -> "MessageView": ...
+
+    def __getitem__(
+        self, item: Union[int, slice]
+    ) -> Union[MessageBase, "MessageView"]:
+        """Get a message, or a narrower view."""
+        if isinstance(item, slice):
+            return MessageView(self._messages, self.positions[item])
+        if item < 0:
+            item += self._length
+        if not 0 <= item < self._length:
+            raise IndexError("Message view index out of range.")
+        return self._messages[self._positions[item]]
+
+    def __iter__(self) -> Iterator[MessageBase]:
+        """Iterate the messages of the view."""
+        for item in range(self._length):
+            yield self._messages[self._positions[item]]
+
+    def __repr__(self) -> str:
+        """Represent the view."""
+        return f"MessageView({self._length} messages)"
+
+
+class MessageIndex:
+    """Secondary indexes of a message list, maintained incrementally.
+
+    Indexes the positions of the messages by role, tool use `run_id`, tool
+    name and timestamp, so lookups and windows don't scan the whole list.
+
+    The list is indexed lazily: every query first indexes the messages
+    appended since the last one. Any other change (e.g. an insert or a
+    removal) is detected by the position of the last indexed message, and
+    rebuilds the indexes. Replacing a message in place is not detected, so
+    call `rebuild` after doing it.
+
+    Examples:
+        >>> messages = [
+        ...     Message(role="system", type="text", content="Be brief."),
+        ...     Message(role="user", type="text", content="Hi!"),
+        ...     Message(role="ai", type="text", content="Hello!"),
+        ... ]
+        >>> index = MessageIndex(messages)
+        >>> index.last(MessageRole.SYSTEM).content
+        'Be brief.'
+        >>> index.last_turns(2)
+        MessageView(2 messages)
+
+    """
+
+    def __init__(self, messages: Sequence[MessageBase]) -> None:
+        """Initialize the MessageIndex class.
+
+        Args:
+            messages: The indexed list. It is not copied.
+
+        """
+        self.messages = messages
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Drop the indexes, so the whole list is indexed on the next query."""
+        self._count = 0
+        self._last: Optional[MessageBase] = None
+        self._by_role: Dict[str, List[int]] = {}
+        self._by_tool: Dict[str, List[int]] = {}
+        self._by_run_id: Dict[str, int] = {}
+        self._turns: List[int] = []
+        self._times: List[datetime] = []
+        self._timed: List[int] = []
+        self._time_ordered = True
+
+    def sync(self) -> None:
+        """Index the messages appended since the last query."""
+        messages = self.messages
+        if self._count and (
+            len(messages) < self._count or messages[self._count - 1] is not self._last
+        ):
+            self.rebuild()
+
+        for position in range(self._count, len(messages)):
+            self._add(position, messages[position])
+        if len(messages) > self._count:
+            self._count = len(messages)
+            self._last = messages[-1]
+
+    def _add(self, position: int, message: MessageBase) -> None:
+        role = _role(message)
+        self._by_role.setdefault(role, []).append(position)
+        if isinstance(message, ToolUseMessage):
+            self._by_tool.setdefault(message.name, []).append(position)
+            self._by_run_id[message.run_id] = position
+        elif role == MessageRole.USER.value and isinstance(message, Message):
+            self._turns.append(position)
+
+        timestamp = getattr(message, "timestamp", None)
+        if isinstance(timestamp, datetime):
+            if self._times and timestamp < self._times[-1]:
+                self._time_ordered = False
+            self._times.append(timestamp)
+            self._timed.append(position)
+
+    def by_role(self, role: Union[MessageRole, str]) -> MessageView:
+        """Get the messages of a role."""
+        self.sync()
+        positions = self._by_role.get(_role_value(role), [])
+        return MessageView(self.messages, positions, len(positions))
+
+    def first(self, role: Union[MessageRole, str]) -> Optional[MessageBase]:
+        """Get the first message of a role, if any."""
+        self.sync()
+        positions = self._by_role.get(_role_value(role))
+        return self.messages[positions[0]] if positions else None
+
+    def last(self, role: Union[MessageRole, str]) -> Optional[MessageBase]:
+        """Get the last message of a role, if any."""
+        self.sync()
+        positions = self._by_role.get(_role_value(role))
+        return self.messages[positions[-1]] if positions else None
+
+    def tool_use(self, run_id: str) -> Optional[ToolUseMessage]:
+        """Get the tool use of a `run_id`, if any."""
+        self.sync()
+        position = self._by_run_id.get(run_id)
+        if position is None:
+            return None
+        message = self.messages[position]
+        return message if isinstance(message, ToolUseMessage) else None
+
+    def tool_uses(self, name: str) -> MessageView:
+        """Get the uses of a tool."""
+        self.sync()
+        positions = self._by_tool.get(name, [])
+        return MessageView(self.messages, positions, len(positions))
+
+    def last_turns(self, turns: int) -> MessageView:
+        """Get the messages of the last `turns` user turns.
+
+        A turn starts at a user text message and holds every message until
+        the next one. Messages before the first user turn are never included.
+        """
+        self.sync()
+        if turns <= 0 or not self._turns:
+            return MessageView(self.messages, range(0))
+        start = self._turns[-min(turns, len(self._turns))]
+        return MessageView(self.messages, range(start, self._count))
+
+    def since(self, timestamp: datetime) -> MessageView:
+        """Get the messages from the first one created at or after `timestamp`.
+
+        Messages without a timestamp (e.g. tool uses) are included when they
+        follow it. The timestamps are binary searched while they are in
+        order.
+        """
+        self.sync()
+        if self._time_ordered:
+            found = bisect_left(self._times, timestamp)
+        else:
+            found = next(
+                (
+                    item
+                    for item, created in enumerate(self._times)
+                    if created >= timestamp
+                ),
+                len(self._times),
+            )
+        start = self._timed[found] if found < len(self._timed) else self._count
+        return MessageView(self.messages, range(start, self._count))
+
+
+class MessageList(List[MessageBase]):
+    """A message list carrying its own `MessageIndex`.
+
+    Threads hand it to the agents, so lookups during a run (e.g. the system
+    message of every request) use the index instead of scanning the list.
+    The index is built on first use.
+    """
+
+    def __init__(self, *args: Any) -> None:
+        """Initialize the MessageList class."""
+        super().__init__(*args)
+        self._message_index: Optional[MessageIndex] = None
+
+    @property
+    def message_index(self) -> MessageIndex:
+        """The index of the list."""
+        if self._message_index is None:
+            self._message_index = MessageIndex(self)
+        return self._message_index
+
+
+def message_index(messages: Sequence[MessageBase]) -> MessageIndex:
+    """Get the index of a message list.
+
+    Uses the index carried by a `MessageList`, or indexes any other sequence
+    on the spot.
+    """
+    if isinstance(messages, MessageList):
+        return messages.message_index
+    return MessageIndex(messages)
+
+
+def _role(message: MessageBase) -> str:
+    return _role_value(message.role)
+
+
+def _role_value(role: Union[MessageRole, str]) -> str:
+    return role.value if isinstance(role, MessageRole) else role
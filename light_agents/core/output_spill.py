@@ -0,0 +1,169 @@
+from typing import Any, List, Optional, Sequence
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+from light_agents.core.blob_store import BlobStore, default_blob_store
+from light_agents.core.logger_config import setup_logger
+from light_agents.core.message_index import MessageList
+from light_agents.schemas.messages_schemas import (
+    MessageBase,
+    MessageRole,
+    ToolUseMessage,
+)
+from light_agents.schemas.model_config import model_config
+from light_agents.schemas.tool_schema import ToolBaseSchema, ToolResponseSchema
+
+logger = setup_logger(__name__)
+
+READ_TOOL_OUTPUT = "read_tool_output"
+"""Name of the paging tool reading spilled tool outputs."""
+
+TRUNCATED_NOTICE = (
+    "\n<TRUNCATED> The output has {size} characters, only the first {shown} "
+    f"are shown. Call `{READ_TOOL_OUTPUT}` with blob_id=\"{{blob_id}}\" and "
+    "offset={shown} to read more. </TRUNCATED>"
+)
+
+
+class ReadToolOutput(ToolBaseSchema):
+    """Paging tool returning slices of a tool output kept in a blob store.
+
+    Agents sharing a tool registry share a single paging tool, reading from
+    the stores of every agent (see `ToolRegistry.register_paging_tool`).
+    """
+
+    name: str = READ_TOOL_OUTPUT
+    description: str = (
+        "Read a slice of a tool output that was too large to be shown. Use "
+        "the blob_id and offset given in the truncated output."
+    )
+    required: Optional[List[str]] = ["blob_id", "offset"]
+    read_only: Optional[bool] = True
+    blob_id: str = Field(default="", description="Id of the truncated output.")
+    offset: int = Field(default=0, description="First character to read.")
+    length: int = Field(
+        default=0, description="Characters to read. 0 reads a full page."
+    )
+
+    _stores: List[BlobStore] = PrivateAttr()
+    _page_chars: int = PrivateAttr()
+
+    def __init__(self, store: BlobStore, page_chars: int, **data: Any) -> None:
+        """Initialize the ReadToolOutput tool."""
+        super().__init__(**data)
+        self._stores = [store]
+        self._page_chars = page_chars
+
+    @property
+    def stores(self) -> List[BlobStore]:
+        """The stores the outputs are read from."""
+        return list(self._stores)
+
+    def add_store(self, store: BlobStore) -> None:
+        """Also read the outputs spilled to another store.
+
+        Blob ids are content addresses, so a blob found in any of the stores
+        is the output the id names.
+        """
+        if all(existing is not store for existing in self._stores):
+            self._stores.append(store)
+
+    def run(self, **kwargs: Any) -> ToolResponseSchema:
+        """Read a page of a spilled tool output."""
+        blob_id = str(kwargs.get("blob_id", ""))
+        offset = max(int(kwargs.get("offset") or 0), 0)
+        length = int(kwargs.get("length") or self._page_chars)
+        length = min(max(length, 1), self._page_chars)
+
+        # one more character tells if the page ends the output
+        page = next(
+            (
+                page
+                for store in self._stores
+                if (page := store.read(blob_id, offset, length + 1)) is not None
+            ),
+            None,
+        )
+        if page is None:
+            return ToolResponseSchema(
+                content=f"<INTERNAL> The output '{blob_id}' is not available. "
+                "</INTERNAL>",
+                is_error=True,
+            )
+        if len(page) > length:
+            page = page[:length]
+            page += (
+                f"\n<MORE> Call `{READ_TOOL_OUTPUT}` with blob_id=\"{blob_id}\" "
+                f"and offset={offset + len(page)} to read more. </MORE>"
+            )
+        return ToolResponseSchema(content=page)
+
+
+class OutputSpillPolicy(BaseModel):
+    """Size policy of the tool outputs kept in the threads.
+
+    Outputs longer than `max_inline_chars` are stored in `store`, outside the
+    thread. The thread keeps a preview with the first `preview_chars`, so the
+    large output is not resent to the provider on every later turn. The model
+    reads the rest on demand with the `read_tool_output` paging tool, sent
+    only once the thread has a spilled output.
+
+    The default store lives in the process memory. When the turns of a thread
+    can be processed by different processes (e.g. a `WorkerPool`), use a store
+    they all reach, like a `FileBlobStore` on a shared directory.
+
+    Attributes:
+        max_inline_chars: Output characters above which the output spills.
+            `ToolResponseSchema.max_inline_chars` overrides it per response.
+        preview_chars: Characters of the preview kept in the thread.
+        page_chars: Maximum characters returned by each paging call.
+        store: Blob store of the full outputs.
+
+    """
+
+    model_config = model_config
+    max_inline_chars: Optional[int] = 50_000
+    preview_chars: int = 4_000
+    page_chars: int = 16_000
+    store: BlobStore = Field(
+        default_factory=lambda: default_blob_store, exclude=True
+    )
+
+    def paging_tool(self) -> ReadToolOutput:
+        """Build the paging tool reading from the policy store."""
+        return ReadToolOutput(self.store, self.page_chars)
+
+    def spill(
+        self, tool_message: ToolUseMessage, tool_response: ToolResponseSchema
+    ) -> None:
+        """Set the tool output, spilling it to the store if it's too long."""
+        content = tool_response.content
+        max_inline_chars = (
+            tool_response.max_inline_chars
+            if tool_response.max_inline_chars is not None
+            else self.max_inline_chars
+        )
+        if max_inline_chars is None or len(content) <= max_inline_chars:
+            tool_message.tool_outputs = content
+            return
+
+        blob_id = self.store.put(content)
+        preview = content[: min(self.preview_chars, max_inline_chars)]
+        tool_message.tool_outputs = preview + TRUNCATED_NOTICE.format(
+            size=len(content), shown=len(preview), blob_id=blob_id
+        )
+        tool_message.output_blob_id = blob_id
+        logger.debug(
+            f"Output of tool '{tool_message.name}' ({len(content)} chars) "
+            f"spilled to blob '{blob_id}'."
+        )
+
+
+def has_spilled_outputs(thread_messages: Sequence[MessageBase]) -> bool:
+    """Check if any tool output of the thread was spilled to a blob store."""
+    if isinstance(thread_messages, MessageList):
+        thread_messages = thread_messages.message_index.by_role(MessageRole.TOOL_USE)
+    return any(
+        isinstance(message, ToolUseMessage) and message.output_blob_id
+        for message in thread_messages
+    )
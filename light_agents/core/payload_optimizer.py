@@ -0,0 +1,148 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+REQUEST_BYTES_KWARG = "request_bytes"
+"""Run keyword argument holding the list the request sizes are appended to."""
+
+
+def wire_size(payload: Any) -> int:
+    """Get the size of a payload encoded as compact JSON, in bytes."""
+    return len(
+        json.dumps(
+            payload, separators=(",", ":"), ensure_ascii=False, default=str
+        ).encode("utf-8")
+    )
+
+
+def trim_text(text: str) -> str:
+    """Trim the whitespace of a text, keeping its line breaks.
+
+    Collapses the spaces of each line (e.g. the indentation of a docstring)
+    and the runs of blank lines.
+    """
+    lines: List[str] = []
+    for line in text.strip().splitlines():
+        line = " ".join(line.split())
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+class PayloadOptimizer(BaseModel):
+    """Minimizes the serialized payload of the provider requests.
+
+    Runs after the serialization, so every serializer benefits from it. The
+    content of the messages is never changed, only its encoding.
+
+    Attributes:
+        compact_content: Send a message content made of a single text block
+            as a plain string.
+        trim_descriptions: Trim the whitespace of the tool and parameter
+            descriptions.
+        dedupe_descriptions: Drop empty descriptions, and the parameter
+            descriptions repeating the tool description.
+
+    """
+
+    compact_content: bool = True
+    trim_descriptions: bool = True
+    dedupe_descriptions: bool = True
+
+    def optimize_messages(
+        self, messages: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Optimize the serialized messages of a request."""
+        if not self.compact_content:
+            return messages
+        return [self._compact_message(message) for message in messages]
+
+    def optimize_tool(self, tool: Dict[str, Any]) -> Dict[str, Any]:
+        """Optimize a serialized tool, in the OpenAI or the Claude format."""
+        if tool.get("type") == "function" and "function" in tool:
+            return {**tool, "function": self._optimize_definition(tool["function"])}
+        return self._optimize_definition(tool)
+
+    def _compact_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        content = message.get("content")
+        if (
+            isinstance(content, list)
+            and len(content) == 1
+            and isinstance(content[0], dict)
+            and content[0].keys() == {"type", "text"}
+            and content[0]["type"] == "text"
+        ):
+            return {**message, "content": content[0]["text"]}
+        return message
+
+    def _optimize_definition(self, definition: Dict[str, Any]) -> Dict[str, Any]:
+        definition = dict(definition)
+        description = self._description(definition.get("description"))
+        if description is None and self.dedupe_descriptions:
+            definition.pop("description", None)
+        elif description is not None:
+            definition["description"] = description
+
+        for key in ("parameters", "input_schema"):
+            if isinstance(definition.get(key), dict):
+                definition[key] = self._optimize_schema(definition[key], description)
+        return definition
+
+    def _optimize_schema(
+        self, schema: Dict[str, Any], tool_description: Optional[str]
+    ) -> Dict[str, Any]:
+        schema = dict(schema)
+        if "description" in schema:
+            description = self._description(schema["description"])
+            if self.dedupe_descriptions and (
+                description is None or description == tool_description
+            ):
+                del schema["description"]
+            else:
+                schema["description"] = description
+
+        if isinstance(schema.get("properties"), dict):
+            schema["properties"] = {
+                name: self._optimize_schema(value, tool_description)
+                if isinstance(value, dict)
+                else value
+                for name, value in schema["properties"].items()
+            }
+        for key in ("items", "additionalProperties"):
+            if isinstance(schema.get(key), dict):
+                schema[key] = self._optimize_schema(schema[key], tool_description)
+        for key in ("anyOf", "oneOf", "allOf"):
+            if isinstance(schema.get(key), list):
+                schema[key] = [
+                    self._optimize_schema(option, tool_description)
+                    if isinstance(option, dict)
+                    else option
+                    for option in schema[key]
+                ]
+        return schema
+
+    def _description(self, description: Any) -> Optional[str]:
+        if not isinstance(description, str):
+            return None
+        if self.trim_descriptions:
+            description = trim_text(description)
+        return description or None
+
+
+def record_request_size(
+    request: Dict[str, Any], kwargs: Dict[str, Any]
+) -> Optional[int]:
+    """Record the wire size of a request in the run's `request_bytes` list.
+
+    Returns:
+        size: The size of the request in bytes, or `None` if the run doesn't
+            record the sizes.
+
+    """
+    request_bytes: Optional[List[int]] = kwargs.get(REQUEST_BYTES_KWARG)
+    if request_bytes is None:
+        return None
+    size = wire_size(request)
+    request_bytes.append(size)
+    return size
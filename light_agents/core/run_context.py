@@ -0,0 +1,57 @@
+from typing import Any, Dict, List
+from uuid import uuid4
+
+from light_agents.core.speculative_executor import SpeculativeToolExecutor
+from light_agents.schemas.messages_schemas import MessageBase
+
+RUN_CONTEXT_KWARG = "run_context"
+"""Keyword argument carrying the `RunContext` down the agent calls."""
+
+
+class RunContext:
+    """State of a single agent run.
+
+    Agents keep no per-run state on the instance, so a single configured agent
+    can serve concurrent runs from threads or asyncio tasks. Each run gets its
+    own context, passed down the agent calls in the `run_context` keyword
+    argument. It is never passed to tools.
+
+    Attributes:
+        run_id: Id of the run, added to its logs.
+        messages: Messages generated in the run so far.
+        speculative_executor: Executor of the tools started while the run's
+            completions are streaming. Discarding it only cancels the tool
+            calls of this run.
+        tool_errors: Tool errors of the run, by tool name.
+
+    """
+
+    def __init__(self, speculative_executor: SpeculativeToolExecutor) -> None:
+        """Initialize the RunContext class."""
+        self.run_id = uuid4().hex
+        self.messages: List[MessageBase] = []
+        self.speculative_executor = speculative_executor
+        self.tool_errors: Dict[str, int] = {}
+
+
+def get_run_context(
+    kwargs: Dict[str, Any], speculative_executor: SpeculativeToolExecutor
+) -> RunContext:
+    """Get the context of the current run, starting a new run if there is none.
+
+    The new context is stored in `kwargs`, so it follows the calls made with
+    them.
+
+    Args:
+        kwargs: Keyword arguments of the agent call.
+        speculative_executor: Agent executor, shared by the runs.
+
+    Returns:
+        context: The context of the run.
+
+    """
+    context = kwargs.get(RUN_CONTEXT_KWARG)
+    if context is None:
+        context = RunContext(speculative_executor.for_run())
+        kwargs[RUN_CONTEXT_KWARG] = context
+    return context
@@ -0,0 +1,308 @@
+import hashlib
+import json
+import random
+import re
+import unicodedata
+from collections import OrderedDict
+from threading import Lock
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from light_agents.core.logger_config import setup_logger
+from light_agents.core.message_index import message_index
+from light_agents.schemas.messages_schemas import (
+    Message,
+    MessageBase,
+    MessageRole,
+    MessageType,
+)
+
+logger = setup_logger(__name__)
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+CONTRACTIONS = (
+    (re.compile(r"\bcan't\b"), "can not"),
+    (re.compile(r"\bwon't\b"), "will not"),
+    (re.compile(r"n't\b"), " not"),
+    (re.compile(r"'re\b"), " are"),
+    (re.compile(r"'m\b"), " am"),
+    (re.compile(r"'ll\b"), " will"),
+    (re.compile(r"'ve\b"), " have"),
+    (re.compile(r"'d\b"), " would"),
+    (re.compile(r"'s\b"), " is"),
+)
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+NUMBER_PATTERN = re.compile(r"\d+")
+
+SKIP_CACHE_KWARG = "skip_response_cache"
+"""Run keyword argument bypassing the response cache, for internal requests
+(e.g. continuations and summaries) whose answer isn't the thread's."""
+
+
+def normalize_query(text: str) -> str:
+    """Normalize a query for near-duplicate matching.
+
+    Lowercases the text, expands the common English contractions, drops the
+    punctuation and collapses the whitespace, so `"Where's my order?"`
+    becomes `"where is my order"`.
+    """
+    text = unicodedata.normalize("NFKC", text).lower().replace("’", "'")
+    for pattern, expansion in CONTRACTIONS:
+        text = pattern.sub(expansion, text)
+    return " ".join(PUNCTUATION_PATTERN.sub(" ", text).split())
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Get the character shingles (n-grams) of a text."""
+    if len(text) <= size:
+        return {text}
+    return {text[start : start + size] for start in range(len(text) - size + 1)}
+
+
+def stable_hash(text: str) -> int:
+    """Hash a text to 64 bits, consistently across processes."""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class MinHasher:
+    """MinHash signatures of shingle sets.
+
+    The fraction of equal positions in the signatures of two sets estimates
+    their Jaccard similarity.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1) -> None:
+        """Initialize the MinHasher class.
+
+        Args:
+            num_perm: Number of hash permutations, i.e. the signature length.
+            seed: Seed of the permutations. Signatures are only comparable
+                between hashers with the same seed and length.
+
+        """
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, items: Set[str]) -> Tuple[int, ...]:
+        """Get the signature of a set."""
+        hashes = [stable_hash(item) for item in items]
+        return tuple(
+            min(((a * value + b) % MERSENNE_PRIME) & MAX_HASH for value in hashes)
+            for a, b in self.permutations
+        )
+
+    @staticmethod
+    def similarity(first: Sequence[int], second: Sequence[int]) -> float:
+        """Estimate the Jaccard similarity of two signatures."""
+        if not first:
+            return 0.0
+        return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+class _Entry:
+    def __init__(
+        self,
+        context: str,
+        numbers: FrozenSet[str],
+        signature: Tuple[int, ...],
+        value: Any,
+    ) -> None:
+        self.context = context
+        self.numbers = numbers
+        self.signature = signature
+        self.value = value
+
+
+class SemanticCache:
+    """Approximate cache of model responses, keyed by near-duplicate queries.
+
+    Queries are normalized, split in character shingles and hashed to MinHash
+    signatures. Candidates are found by locality sensitive hashing over bands
+    of the signatures, and a lookup hits the most similar candidate with an
+    estimated similarity of at least `threshold`. Entries are only matched
+    within the same context (e.g. the model, the system prompt and the
+    tools), and queries must hold exactly the same numbers, so
+    `"where is order 123"` never hits the answer about order 124. The least
+    recently used entries are evicted beyond `max_entries`.
+
+    Everything runs locally, and the cache can be shared by agents and
+    threads.
+
+    Examples:
+        >>> cache = SemanticCache(threshold=0.8)
+        >>> cache.put("where is my order", "It was shipped.", context="gpt-4o")
+        >>> cache.get("Where's my order?", context="gpt-4o")
+        'It was shipped.'
+
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        max_entries: int = 1024,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ) -> None:
+        """Initialize the SemanticCache class.
+
+        Args:
+            threshold: Minimum estimated similarity of a hit, in `[0, 1]`.
+            max_entries: Maximum number of entries kept.
+            num_perm: Length of the MinHash signatures.
+            bands: Number of LSH bands. Must divide `num_perm`. More bands
+                find candidates of lower similarity.
+            shingle_size: Characters per shingle.
+            seed: Seed of the MinHash permutations.
+
+        """
+        if num_perm % bands:
+            raise ValueError("The number of bands must divide num_perm.")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.hits = 0
+        self.misses = 0
+        self._hasher = MinHasher(num_perm, seed)
+        self._rows = num_perm // bands
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[int]] = {}
+        self._next_id = 0
+        self._lock = Lock()
+
+    def get(self, query: str, context: str = "") -> Optional[Any]:
+        """Get the value cached for a near-duplicate query, if any."""
+        normalized = normalize_query(query)
+        numbers = frozenset(NUMBER_PATTERN.findall(normalized))
+        signature = self._signature(normalized)
+        with self._lock:
+            best_id, best_similarity = None, 0.0
+            for entry_id in self._candidates(context, signature):
+                entry = self._entries[entry_id]
+                if entry.numbers != numbers:
+                    continue
+                similarity = self._hasher.similarity(signature, entry.signature)
+                if similarity > best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            if best_id is None or best_similarity < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best_id)
+            logger.debug(f"Semantic cache hit ({best_similarity:.2f}).")
+            return self._entries[best_id].value
+
+    def put(self, query: str, value: Any, context: str = "") -> None:
+        """Cache a value for a query."""
+        normalized = normalize_query(query)
+        numbers = frozenset(NUMBER_PATTERN.findall(normalized))
+        signature = self._signature(normalized)
+        with self._lock:
+            # an identical query replaces the older entry
+            for entry_id in self._candidates(context, signature):
+                entry = self._entries[entry_id]
+                if entry.numbers == numbers and entry.signature == signature:
+                    entry.value = value
+                    self._entries.move_to_end(entry_id)
+                    return
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(context, numbers, signature, value)
+            for key in self._band_keys(context, signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._evict()
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        """Get the number of entries."""
+        return len(self._entries)
+
+    def _signature(self, normalized: str) -> Tuple[int, ...]:
+        return self._hasher.signature(shingles(normalized, self.shingle_size))
+
+    def _band_keys(
+        self, context: str, signature: Tuple[int, ...]
+    ) -> List[Tuple[str, int, Tuple[int, ...]]]:
+        return [
+            (context, band, signature[band * self._rows : (band + 1) * self._rows])
+            for band in range(self.bands)
+        ]
+
+    def _candidates(self, context: str, signature: Tuple[int, ...]) -> Set[int]:
+        candidates: Set[int] = set()
+        for key in self._band_keys(context, signature):
+            candidates.update(self._buckets.get(key, ()))
+        return candidates
+
+    def _evict(self) -> None:
+        entry_id, entry = self._entries.popitem(last=False)
+        for key in self._band_keys(entry.context, entry.signature):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            bucket.discard(entry_id)
+            if not bucket:
+                del self._buckets[key]
+
+
+def cacheable_query(thread_messages: Sequence[MessageBase]) -> Optional[str]:
+    """Get the query of a thread whose response can be cached, if any.
+
+    The query is the content of the last message, when it is a user text
+    message. Threads with tool uses that aren't compacted are never cached,
+    since the response depends on the tool results.
+    """
+    if not thread_messages:
+        return None
+    last_message = thread_messages[-1]
+    if (
+        not isinstance(last_message, Message)
+        or last_message.role != MessageRole.USER
+        or last_message.type != MessageType.TEXT
+    ):
+        return None
+
+    index = message_index(thread_messages)
+    if any(
+        not message.compacted for message in index.by_role(MessageRole.TOOL_USE)
+    ):
+        return None
+    return last_message.content
+
+
+def request_fingerprint(request: Dict[str, Any]) -> str:
+    """Hash the context of a request: everything but its last message.
+
+    Holds the model, the generation parameters, the tools, the system prompt
+    and the conversation before the query, so a query is only matched within
+    the same conversation.
+    """
+    context = dict(request)
+    context["messages"] = request.get("messages", [])[:-1]
+    return hashlib.sha256(
+        json.dumps(context, sort_keys=True, default=repr).encode("utf-8")
+    ).hexdigest()
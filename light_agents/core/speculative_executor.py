@@ -0,0 +1,128 @@
+import asyncio
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from light_agents.core.logger_config import setup_logger
+from light_agents.core.tool_registry import ToolRegistry
+from light_agents.schemas.tool_schema import ToolResponseSchema
+
+logger = setup_logger(__name__)
+
+
+class SpeculativeToolExecutor:
+    """Executes read only tools while the model completion is still streaming.
+
+    As soon as a tool call is fully received, the agent submits it here. If the
+    tool is flagged as `read_only` and its arguments are valid, the tool starts
+    running in background. When the agent later processes the tool calls, it
+    collects the result with `pop_result` instead of executing the tool again.
+
+    Concurrent runs of an agent each use their own executor from `for_run`,
+    sharing the agent executor's threads.
+    """
+
+    def __init__(
+        self,
+        tools_registry: ToolRegistry,
+        max_workers: int = 4,
+        parent: Optional["SpeculativeToolExecutor"] = None,
+    ) -> None:
+        """Initialize the SpeculativeToolExecutor class."""
+        self.tools_registry = tools_registry
+        self.max_workers = max_workers
+        self.parent = parent
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[str, Future[ToolResponseSchema]] = {}
+        self._lock = Lock()
+
+    def for_run(self) -> "SpeculativeToolExecutor":
+        """Get an executor for a single run, sharing this executor's threads.
+
+        Its `discard` only cancels the tool calls submitted to it.
+        """
+        return SpeculativeToolExecutor(self.tools_registry, self.max_workers, self)
+
+    def thread_pool(self) -> ThreadPoolExecutor:
+        """Get the threads executing the tools, started on first use."""
+        if self.parent is not None:
+            return self.parent.thread_pool()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="speculative-tool",
+                )
+            return self._executor
+
+    def submit(
+        self, run_id: str, tool_name: str, args: Any, **kwargs: Any
+    ) -> bool:
+        """Start executing the tool call in background, if allowed.
+
+        Returns:
+            started: `True` if the tool call is being executed speculatively.
+
+        """
+        if not self.tools_registry.is_read_only(tool_name):
+            return False
+
+        if not self.tools_registry.validate_args(tool_name, args):
+            logger.debug(
+                f"Skipping speculative execution of '{tool_name}'. "
+                f"Invalid args: {args}"
+            )
+            return False
+
+        thread_pool = self.thread_pool()
+        with self._lock:
+            if run_id in self._futures:
+                return True
+            # in the caller context, so the tool logs keep the correlation ids
+            self._futures[run_id] = thread_pool.submit(
+                contextvars.copy_context().run,
+                partial(
+                    self.tools_registry.execute_tool, tool_name, dict(args), **kwargs
+                ),
+            )
+
+        logger.debug(f"Speculatively executing tool '{tool_name}' ({run_id}).")
+        return True
+
+    def pop_result(self, run_id: str) -> Optional[ToolResponseSchema]:
+        """Wait for and return the speculative result of a tool call.
+
+        Returns `None` if the tool call wasn't executed speculatively. Errors
+        raised by the tool are re-raised here.
+        """
+        with self._lock:
+            future = self._futures.pop(run_id, None)
+
+        if future is None:
+            return None
+
+        return future.result()
+
+    async def apop_result(self, run_id: str) -> Optional[ToolResponseSchema]:
+        """Await and return the speculative result of a tool call.
+
+        See `pop_result`.
+        """
+        with self._lock:
+            future = self._futures.pop(run_id, None)
+
+        if future is None:
+            return None
+
+        return await asyncio.wrap_future(future)
+
+    def discard(self) -> None:
+        """Discard every pending speculative execution."""
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,166 @@
+import hashlib
+from collections import OrderedDict
+from typing import List, MutableSequence, Optional
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+from light_agents.core.logger_config import setup_logger
+from light_agents.core.semantic_cache import SKIP_CACHE_KWARG
+from light_agents.schemas.messages_schemas import (
+    Message,
+    MessageBase,
+    MessageRole,
+    MessageType,
+    SummaryMessage,
+    ToolUseMessage,
+)
+from light_agents.schemas.model_config import model_config
+from light_agents.schemas.thread_agent_schema import ThreadAgent
+from light_agents.utils.tokens import estimate_tokens
+
+logger = setup_logger(__name__)
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation below. Keep every fact, decision, user "
+    "preference, identifier and tool result that may be needed to continue "
+    "the conversation. Answer only with the summary.\n\n"
+    "<conversation>\n{transcript}\n</conversation>"
+)
+
+
+def render_transcript(messages: List[MessageBase]) -> str:
+    """Render messages as a plain text transcript for the summarizer."""
+    lines = []
+    for message in messages:
+        if isinstance(message, ToolUseMessage):
+            lines.append(
+                f"tool {message.name}({message.input_params_dict}) -> "
+                f"{message.tool_outputs}"
+            )
+        elif isinstance(message, Message):
+            lines.append(f"{message.role}: {message.content}")
+    return "\n".join(lines)
+
+
+class ThreadCompactor(BaseModel):
+    """Replaces the older messages of a long thread with a summary.
+
+    Once the messages still sent to the LLM exceed `token_threshold`, every
+    message but the last `keep_last_messages` is summarized by the
+    `summarizer` agent. The summarized messages are flagged as `compacted`, so
+    they stay in the thread but are no longer serialized, and a
+    `SummaryMessage` is inserted in their place.
+
+    The kept messages always start at a user message, so tool uses are never
+    separated from the turn that requested them. System messages are never
+    compacted.
+
+    Attributes:
+        summarizer: Agent used to generate the summaries.
+        token_threshold: Estimated tokens above which the thread is compacted.
+        keep_last_messages: Minimum number of recent messages kept as is, at
+            least 1.
+        summary_prompt: Prompt template with a `{transcript}` placeholder.
+        cache_size: Maximum number of summaries kept in cache.
+
+    """
+
+    model_config = model_config
+    summarizer: ThreadAgent
+    token_threshold: int = 8000
+    keep_last_messages: int = Field(default=6, ge=1)
+    summary_prompt: str = SUMMARY_PROMPT
+    cache_size: int = 128
+
+    _summaries_cache: "OrderedDict[str, str]" = PrivateAttr(
+        default_factory=OrderedDict
+    )
+    """Summaries already generated, by the hash of the summarized messages."""
+
+    def compact(
+        self, messages: MutableSequence[MessageBase]
+    ) -> Optional[SummaryMessage]:
+        """Compact the messages in place, if they exceed the threshold.
+
+        Args:
+            messages: List of messages of the thread.
+
+        Returns:
+            summary_message: The inserted summary, or `None` if the messages
+                were not compacted.
+
+        """
+        active_indexes = [
+            index
+            for index, message in enumerate(messages)
+            if not message.compacted and message.role != MessageRole.SYSTEM
+        ]
+        active_messages = [messages[index] for index in active_indexes]
+        if estimate_tokens(active_messages) <= self.token_threshold:
+            return None
+
+        cut = max(len(active_indexes) - self.keep_last_messages, 0)
+        while cut > 0 and not (
+            isinstance(active_messages[cut], Message)
+            and active_messages[cut].role == MessageRole.USER
+        ):
+            cut -= 1
+
+        compacted_messages = active_messages[:cut]
+        if all(
+            isinstance(message, SummaryMessage) for message in compacted_messages
+        ):
+            logger.debug("No turn boundary found to compact the thread.")
+            return None
+
+        summary_key = hashlib.sha256(
+            "".join(
+                message.model_dump_json() for message in compacted_messages
+            ).encode()
+        ).hexdigest()
+
+        summary = self._summaries_cache.get(summary_key)
+        if summary is None:
+            summary = self.summarize(compacted_messages)
+            self._summaries_cache[summary_key] = summary
+            if len(self._summaries_cache) > self.cache_size:
+                self._summaries_cache.popitem(last=False)
+        else:
+            self._summaries_cache.move_to_end(summary_key)
+            logger.debug("Using cached summary.")
+
+        for message in compacted_messages:
+            message.compacted = True
+
+        summary_message = SummaryMessage(
+            role=MessageRole.USER,
+            type=MessageType.TEXT,
+            content=f"<conversation_summary>\n{summary}\n</conversation_summary>",
+            summarized_messages=len(compacted_messages),
+            summary_key=summary_key,
+        )
+        messages.insert(active_indexes[cut], summary_message)
+        logger.info(f"Compacted {len(compacted_messages)} messages.")
+        return summary_message
+
+    def summarize(self, messages: List[MessageBase]) -> str:
+        """Generate the summary of the messages with the summarizer agent."""
+        prompt = Message(
+            role=MessageRole.USER,
+            type=MessageType.TEXT,
+            content=self.summary_prompt.format(
+                transcript=render_transcript(messages)
+            ),
+        )
+        responses = self.summarizer.agent_run([prompt], **{SKIP_CACHE_KWARG: True})
+        summary = next(
+            (
+                response.content
+                for response in reversed(responses)
+                if isinstance(response, Message)
+            ),
+            None,
+        )
+        if summary is None:
+            raise ValueError("The summarizer didn't generate any summary.")
+        return summary
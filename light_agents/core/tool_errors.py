@@ -0,0 +1,56 @@
+from typing import Callable, Dict
+
+from pydantic import BaseModel
+
+from light_agents.schemas.model_config import model_config
+
+
+def render_tool_error(tool_name: str, error: Exception) -> str:
+    """Render a tool error as the tool result sent back to the model.
+
+    The registry errors already name the tool, so only the error is rendered.
+    """
+    return (
+        f"<TOOL_ERROR> {error}. Check the arguments and try again, or continue "
+        "without this tool. </TOOL_ERROR>"
+    )
+
+
+class ToolErrorPolicy(BaseModel):
+    """How a run recovers from failing tools.
+
+    A failing tool doesn't abort the run. Its error is returned to the model
+    as an `is_error` tool result, so the model can fix the call or go on
+    without it, within the retry budgets. Once a budget is exhausted, the run
+    is aborted with a `ToolExecutionError`.
+
+    Attributes:
+        max_errors_per_tool: Maximum errors of a single tool in a run.
+        max_errors_per_run: Maximum errors of every tool in a run. `0` aborts
+            the run on the first error.
+        render: Renders the error sent to the model, from the tool name and
+            the exception.
+
+    """
+
+    model_config = model_config
+    max_errors_per_tool: int = 2
+    max_errors_per_run: int = 5
+    render: Callable[[str, Exception], str] = render_tool_error
+
+    def admit(self, tool_name: str, errors: Dict[str, int]) -> bool:
+        """Count a tool error of the run, checking the retry budgets.
+
+        Args:
+            tool_name: Name of the failing tool.
+            errors: Errors of the run so far, by tool name. Updated in place.
+
+        Returns:
+            admitted: `True` if the run can recover from the error.
+
+        """
+        errors[tool_name] = errors.get(tool_name, 0) + 1
+        return (
+            errors[tool_name] <= self.max_errors_per_tool
+            and sum(errors.values()) <= self.max_errors_per_run
+        )
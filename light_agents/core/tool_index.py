@@ -0,0 +1,103 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+from light_agents.schemas.tool_schema import ToolBaseSchema
+from light_agents.serializers.tools.base_serializers import TOOL_METADATA_FIELDS
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split a text into lowercase alphanumeric terms.
+
+    Snake case names are split as well, so `get_weather` becomes
+    `["get", "weather"]`.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def tool_document(tool: ToolBaseSchema) -> List[str]:
+    """Build the terms describing a tool.
+
+    Uses the tool's name (weighted twice), description, parameters names and
+    parameters descriptions.
+    """
+    terms = tokenize(tool.name) * 2 + tokenize(tool.description)
+    for field_name, field in type(tool).model_fields.items():
+        if field_name in TOOL_METADATA_FIELDS:
+            continue
+        terms.extend(tokenize(field_name))
+        if field.description:
+            terms.extend(tokenize(field.description))
+    return terms
+
+
+class ToolIndex:
+    """BM25 retrieval index over a list of tools.
+
+    The index is built once and is used to select only the tools relevant to
+    the recent messages of a thread, reducing the input tokens of each call.
+    """
+
+    def __init__(
+        self, tools: Sequence[ToolBaseSchema], k1: float = 1.5, b: float = 0.75
+    ) -> None:
+        """Initialize the ToolIndex class."""
+        self.tools = list(tools)
+        self.k1 = k1
+        self.b = b
+        self._term_frequencies: List[Counter[str]] = []
+        self._lengths: List[int] = []
+        document_frequencies: Counter[str] = Counter()
+        for tool in self.tools:
+            terms = tool_document(tool)
+            frequencies = Counter(terms)
+            self._term_frequencies.append(frequencies)
+            self._lengths.append(len(terms))
+            document_frequencies.update(frequencies.keys())
+
+        self._average_length = (
+            sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        )
+        documents_count = len(self.tools)
+        self._idf: Dict[str, float] = {
+            term: math.log(
+                1 + (documents_count - frequency + 0.5) / (frequency + 0.5)
+            )
+            for term, frequency in document_frequencies.items()
+        }
+
+    def score(self, query: str) -> List[Tuple[ToolBaseSchema, float]]:
+        """Score every tool against the query, keeping registration order."""
+        query_terms = set(tokenize(query))
+        scores = []
+        for tool, frequencies, length in zip(
+            self.tools, self._term_frequencies, self._lengths
+        ):
+            score = 0.0
+            for term in query_terms:
+                frequency = frequencies.get(term, 0)
+                if not frequency:
+                    continue
+                normalization = self.k1 * (
+                    1 - self.b + self.b * length / (self._average_length or 1)
+                )
+                score += (
+                    self._idf[term]
+                    * frequency
+                    * (self.k1 + 1)
+                    / (frequency + normalization)
+                )
+            scores.append((tool, score))
+        return scores
+
+    def search(self, query: str, top_k: int) -> List[ToolBaseSchema]:
+        """Return up to `top_k` tools relevant to the query, best first.
+
+        Tools without any term in common with the query are never returned.
+        """
+        scores = [item for item in self.score(query) if item[1] > 0]
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return [tool for tool, _ in scores[:top_k]]
@@ -1,31 +1,257 @@
-from typing import Any, Callable, Dict, List
+import asyncio
+import contextvars
+import json
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
+from light_agents.core.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    ToolMetrics,
+)
+from light_agents.core.deadline import DEADLINE_KWARG, Deadline, get_deadline
 from light_agents.core.logger_config import setup_logger
+from light_agents.core.output_spill import READ_TOOL_OUTPUT, ReadToolOutput
+from light_agents.core.payload_optimizer import REQUEST_BYTES_KWARG
+from light_agents.core.semantic_cache import SKIP_CACHE_KWARG
+from light_agents.core.tool_index import ToolIndex
 from light_agents.schemas.tool_schema import ToolBaseSchema, ToolResponseSchema
 
 logger = setup_logger(__name__)
 
+ALLOWED_TOOLS_KWARG = "allowed_tools"
+"""Run keyword argument limiting the tools offered to the model, by name."""
+
+RESERVED_KWARGS = frozenset(
+    {
+        "budget",
+        "run_context",
+        ALLOWED_TOOLS_KWARG,
+        REQUEST_BYTES_KWARG,
+        DEADLINE_KWARG,
+        SKIP_CACHE_KWARG,
+    }
+)
+"""Run keyword arguments used by the agents, never passed to tools."""
+
 
 class ToolRegistry:
     """Registry for tools that can be used by AI agents.
 
     This registry converts tools defined in the Pydantic model into
     callables that can be used by AI agents.
+
+    Identical calls to `read_only` tools that are in flight at the same time,
+    from the same agent or from concurrent runs sharing the registry, are
+    coalesced into a single execution. Results are never kept after the
+    execution completes.
+
+    On the async path, tools implementing `arun` are awaited directly, while
+    sync tools run on a bounded thread pool, so a single event loop can run
+    many tool calls at once.
+
+    When the run has a deadline, tools are given the time left. A tool still
+    running at the deadline is abandoned with a `TimeoutError`: async tools
+    are cancelled, while sync tools finish in the background.
+
+    Tools with a circuit breaker (from their `circuit_breaker` field, or the
+    registry default) fail fast while their breaker is open: the model gets
+    an error response telling it the tool is unavailable, without calling the
+    tool. The executions of every tool and the breaker states are reported
+    by `metrics`.
     """
 
-    def __init__(self) -> None:
-        """Initialize the ToolRegistry class."""
+    def __init__(
+        self,
+        max_sync_workers: int = 32,
+        circuit_breaker: Optional[CircuitBreakerConfig] = None,
+    ) -> None:
+        """Initialize the ToolRegistry class.
+
+        Args:
+            max_sync_workers: Threads running sync tools on the async path.
+            circuit_breaker: Circuit breaker thresholds of the tools without
+                their own. Tools have no breaker if `None`.
+
+        """
         self.tools: Dict[str, Callable[..., ToolResponseSchema]] = {}
+        self.async_tools: Dict[
+            str, Callable[..., Awaitable[ToolResponseSchema]]
+        ] = {}
+        self.tool_schemas: Dict[str, ToolBaseSchema] = {}
+        self.max_sync_workers = max_sync_workers
+        self._sync_executor: Optional[ThreadPoolExecutor] = None
+        self._tool_indexes: Dict[Tuple[int, ...], ToolIndex] = {}
+        self._inflight_calls: Dict[str, Future[ToolResponseSchema]] = {}
+        self._inflight_lock = Lock()
+        self.circuit_breaker = circuit_breaker
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self._metrics: Dict[str, ToolMetrics] = {}
+        self._metrics_lock = Lock()
 
     def register(self, tool: ToolBaseSchema) -> None:
         """Register a tool using its name and run method."""
+        if not tool.is_sync and not tool.is_async:
+            raise ValueError(f"Tool '{tool.name}' must implement `run` or `arun`.")
         self.tools[tool.name] = tool.run
+        if tool.is_async:
+            self.async_tools[tool.name] = tool.arun
+        else:
+            self.async_tools.pop(tool.name, None)
+        self.tool_schemas[tool.name] = tool
+        self._tool_indexes.clear()
+
+        config = tool.circuit_breaker or self.circuit_breaker
+        breaker = self.circuit_breakers.get(tool.name)
+        if config is None:
+            self.circuit_breakers.pop(tool.name, None)
+        elif breaker is None or breaker.config != config:
+            # agents sharing the registry register the same tools again
+            self.circuit_breakers[tool.name] = CircuitBreaker(tool.name, config)
 
     def register_tools(self, tools: List[ToolBaseSchema]) -> None:
         """Register a list of tools."""
         for tool in tools:
             self.register(tool)
 
+    def register_paging_tool(self, tool: ReadToolOutput) -> ReadToolOutput:
+        """Register the paging tool of an agent.
+
+        Agents sharing the registry share a single paging tool. The stores of
+        a new one are added to the registered tool instead of replacing it,
+        so the outputs spilled by every agent stay readable.
+
+        Returns:
+            tool: The paging tool of the registry.
+
+        """
+        registered = self.get_tool(READ_TOOL_OUTPUT)
+        if not isinstance(registered, ReadToolOutput):
+            self.register(tool)
+            return tool
+        for store in tool.stores:
+            registered.add_store(store)
+        return registered
+
+    def get_tool(self, tool_name: str) -> Optional[ToolBaseSchema]:
+        """Get the registered tool schema by its name."""
+        return self.tool_schemas.get(tool_name)
+
+    def is_read_only(self, tool_name: str) -> bool:
+        """Check if a registered tool is flagged as side-effect free."""
+        tool = self.get_tool(tool_name)
+        return bool(tool and tool.read_only)
+
+    def is_strict(self, tool_name: str) -> bool:
+        """Check if a registered tool uses strict function calling."""
+        tool = self.get_tool(tool_name)
+        return bool(tool and tool.strict)
+
+    def drop_null_args(self, tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop the optional args sent as `null`, so the tool defaults apply.
+
+        Strict tools receive every parameter, with `null` for the optional
+        ones the model didn't use.
+        """
+        tool = self.get_tool(tool_name)
+        required = (tool.required if tool else None) or []
+        return {
+            key: value
+            for key, value in args.items()
+            if value is not None or key in required
+        }
+
+    def validate_args(self, tool_name: str, args: Any) -> bool:
+        """Check if the args are complete and known for the given tool.
+
+        It doesn't validate the values themselves, only that every required
+        field is present and that no unknown field was given.
+        """
+        tool = self.get_tool(tool_name)
+        if tool is None or not isinstance(args, dict):
+            return False
+
+        if any(field not in args for field in tool.required or []):
+            return False
+
+        return all(field in type(tool).model_fields for field in args)
+
+    def select_tools(
+        self,
+        query: str,
+        top_k: int,
+        tools: Optional[Sequence[ToolBaseSchema]] = None,
+    ) -> List[ToolBaseSchema]:
+        """Select the tools relevant to the query.
+
+        Returns the `always_on` tools plus the `top_k` most relevant of the
+        remaining ones, ranked by a BM25 index over the tools names,
+        descriptions and parameters descriptions. An index is built on the
+        first selection among a set of tools, and dropped when new tools are
+        registered.
+
+        Args:
+            query: Text the tools are ranked against.
+            top_k: Number of ranked tools to return.
+            tools: Tools to select from, e.g. the tools of an agent sharing
+                the registry. Defaults to every registered tool.
+
+        Returns:
+            tools: The selected tools.
+
+        """
+        candidates = list(self.tool_schemas.values()) if tools is None else tools
+        # the index holds the tools, so their ids can't be reused while cached
+        key = tuple(id(tool) for tool in candidates)
+        index = self._tool_indexes.get(key)
+        if index is None:
+            index = ToolIndex([tool for tool in candidates if not tool.always_on])
+            self._tool_indexes[key] = index
+
+        pinned_tools = [tool for tool in candidates if tool.always_on]
+        return pinned_tools + index.search(query, top_k)
+
+    @staticmethod
+    def call_key(tool_name: str, args: Dict[str, Any]) -> str:
+        """Build a canonical key identifying a tool call.
+
+        Two calls with the same tool name and the same args, regardless of
+        the args order, have the same key.
+        """
+        return json.dumps(
+            [tool_name, args], sort_keys=True, separators=(",", ":"), default=repr
+        )
+
+    def is_allowed(self, tool_name: str, kwargs: Dict[str, Any]) -> bool:
+        """Check if the tool is registered and allowed in the run.
+
+        The paging tool of spilled outputs is always allowed.
+        """
+        allowed_tools = kwargs.get(ALLOWED_TOOLS_KWARG)
+        return tool_name in self.tools and (
+            allowed_tools is None
+            or tool_name in allowed_tools
+            or tool_name == READ_TOOL_OUTPUT
+        )
+
+    @staticmethod
+    def tool_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop the run keyword arguments reserved to the agents."""
+        return {
+            key: value for key, value in kwargs.items() if key not in RESERVED_KWARGS
+        }
+
     def execute_tool(
         self, tool_name: str, args: Dict[str, Any], **kwargs: Any
     ) -> ToolResponseSchema:
@@ -33,29 +259,315 @@ class ToolRegistry:
 
         If any kwargs are given and they overlap with args, the args will be
         updated with the kwargs.
+
+        If the tool is `read_only` and an identical call is already being
+        executed, waits for it and returns its result instead.
         """
-        if tool_name not in self.tools:
-            # To prevent error, tells the LLM that the tool wasn't available
-            return ToolResponseSchema(
-                content="<INTERNAL> This tool was not available </INTERNAL>",
-                is_error=True,
-            )
+        if not self.is_allowed(tool_name, kwargs):
+            return self._unavailable_tool()
 
         tool = self.tools[tool_name]
-        args.update(kwargs)
+        deadline = get_deadline(kwargs)
+        args = self._prepare_args(tool_name, args, kwargs)
+        if not self.is_read_only(tool_name):
+            return self._run_guarded(
+                tool_name, lambda: self._run_tool_until(tool_name, tool, args, deadline)
+            )
+
+        key = self.call_key(tool_name, args)
+        call, inflight = self._claim_call(key)
+        if inflight:
+            logger.debug(f"Coalescing call to tool '{tool_name}'.")
+            try:
+                return call.result(
+                    timeout=None if deadline is None else deadline.remaining()
+                )
+            except TimeoutError:
+                raise self._timeout_error(tool_name)
+
+        try:
+            result = self._run_guarded(
+                tool_name, lambda: self._run_tool_until(tool_name, tool, args, deadline)
+            )
+            call.set_result(result)
+            return result
+        except BaseException as e:
+            # e.g. KeyboardInterrupt, so the waiters are never left hanging
+            call.set_exception(e)
+            raise
+        finally:
+            self._release_call(key)
+
+    async def aexecute_tool(
+        self, tool_name: str, args: Dict[str, Any], **kwargs: Any
+    ) -> ToolResponseSchema:
+        """Execute a tool on the async path.
+
+        Tools implementing `arun` are awaited directly. Sync tools run on the
+        registry thread pool, bounded by `max_sync_workers`, so they never
+        block the event loop. Identical in-flight calls to `read_only` tools
+        are coalesced with the calls of the sync path as well.
+        """
+        if not self.is_allowed(tool_name, kwargs):
+            return self._unavailable_tool()
+
+        deadline = get_deadline(kwargs)
+        args = self._prepare_args(tool_name, args, kwargs)
+        if not self.is_read_only(tool_name):
+            return await self._arun_guarded(
+                tool_name,
+                lambda: self._await_until(
+                    tool_name, self._arun_tool(tool_name, args), deadline
+                ),
+            )
+
+        key = self.call_key(tool_name, args)
+        call, inflight = self._claim_call(key)
+        if inflight:
+            logger.debug(f"Coalescing call to tool '{tool_name}'.")
+            # shielded, so a waiter timing out doesn't cancel the shared call
+            return await self._await_until(
+                tool_name, asyncio.shield(asyncio.wrap_future(call)), deadline
+            )
+
+        try:
+            result = await self._arun_guarded(
+                tool_name,
+                lambda: self._await_until(
+                    tool_name, self._arun_tool(tool_name, args), deadline
+                ),
+            )
+            call.set_result(result)
+            return result
+        except BaseException as e:
+            # also on cancellation, so the waiters are never left hanging
+            call.set_exception(e)
+            raise
+        finally:
+            self._release_call(key)
+
+    def metrics(self) -> Dict[str, ToolMetrics]:
+        """Get a snapshot of the execution metrics of every tool, by name."""
+        with self._metrics_lock:
+            metrics = {
+                name: self._metrics.get(name, ToolMetrics(tool=name)).model_copy()
+                for name in self.tools
+            }
+        for name, tool_metrics in metrics.items():
+            breaker = self.circuit_breakers.get(name)
+            if breaker is not None:
+                tool_metrics.circuit_state = breaker.state
+                tool_metrics.circuit_opened = breaker.opened
+        return metrics
+
+    def sync_executor(self) -> ThreadPoolExecutor:
+        """Get the thread pool running sync tools on the async path."""
+        with self._inflight_lock:
+            if self._sync_executor is None:
+                self._sync_executor = ThreadPoolExecutor(
+                    max_workers=self.max_sync_workers,
+                    thread_name_prefix="sync-tool",
+                )
+            return self._sync_executor
+
+    @staticmethod
+    def _unavailable_tool() -> ToolResponseSchema:
+        # To prevent error, tells the LLM that the tool wasn't available
+        return ToolResponseSchema(
+            content="<INTERNAL> This tool was not available </INTERNAL>",
+            is_error=True,
+            unavailable=True,
+        )
+
+    def _prepare_args(
+        self, tool_name: str, args: Dict[str, Any], kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if self.is_strict(tool_name):
+            args = self.drop_null_args(tool_name, args)
+        args.update(self.tool_kwargs(kwargs))
 
         if kwargs.get("verbose"):
             logger.debug(f"Executing tool '{tool_name}' with args: {args}")
+        return args
+
+    def _claim_call(self, key: str) -> Tuple[Future[ToolResponseSchema], bool]:
+        """Get the in-flight call with this key, or register a new one.
+
+        Returns:
+            call: The call future.
+            inflight: `True` if the call was already being executed.
+
+        """
+        with self._inflight_lock:
+            inflight_call = self._inflight_calls.get(key)
+            if inflight_call is not None:
+                return inflight_call, True
+            call: Future[ToolResponseSchema] = Future()
+            self._inflight_calls[key] = call
+            return call, False
+
+    def _release_call(self, key: str) -> None:
+        with self._inflight_lock:
+            del self._inflight_calls[key]
+
+    async def _arun_tool(
+        self, tool_name: str, args: Dict[str, Any]
+    ) -> ToolResponseSchema:
+        """Await the async tool, or run the sync one on the thread pool."""
+        async_tool = self.async_tools.get(tool_name)
+        if async_tool is None:
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(
+                self.sync_executor(),
+                context.run,
+                self._run_tool,
+                tool_name,
+                self.tools[tool_name],
+                args,
+            )
 
         try:
-            result = tool(**args)
+            return self._check_result(tool_name, await async_tool(**args))
+        except Exception as e:
+            logger.error(f"Error executing tool '{tool_name}': {e}")
+            raise ValueError(f"Error executing tool '{tool_name}': {e}")
 
-            if not isinstance(result, ToolResponseSchema):
-                raise ValueError(
-                    f"Tool '{tool_name}' should return a ToolResponseSchema"
-                )
+    def _run_guarded(
+        self, tool_name: str, run: Callable[[], ToolResponseSchema]
+    ) -> ToolResponseSchema:
+        """Run the tool through its circuit breaker, recording the metrics."""
+        breaker = self.circuit_breakers.get(tool_name)
+        if breaker is not None and not breaker.allow():
+            return self._circuit_open(tool_name)
 
-            return result
+        started = time.monotonic()
+        try:
+            result = run()
+        except Exception:
+            self._record(tool_name, breaker, time.monotonic() - started, True)
+            raise
+        except BaseException:
+            if breaker is not None:
+                breaker.release()
+            raise
+        self._record(tool_name, breaker, time.monotonic() - started, False)
+        return result
+
+    async def _arun_guarded(
+        self,
+        tool_name: str,
+        run: Callable[[], Awaitable[ToolResponseSchema]],
+    ) -> ToolResponseSchema:
+        """Await the tool through its circuit breaker, recording the metrics."""
+        breaker = self.circuit_breakers.get(tool_name)
+        if breaker is not None and not breaker.allow():
+            return self._circuit_open(tool_name)
+
+        started = time.monotonic()
+        try:
+            result = await run()
+        except Exception:
+            self._record(tool_name, breaker, time.monotonic() - started, True)
+            raise
+        except BaseException:
+            # cancelled, which says nothing about the tool
+            if breaker is not None:
+                breaker.release()
+            raise
+        self._record(tool_name, breaker, time.monotonic() - started, False)
+        return result
+
+    def _record(
+        self,
+        tool_name: str,
+        breaker: Optional[CircuitBreaker],
+        seconds: float,
+        failed: bool,
+    ) -> None:
+        if breaker is not None:
+            breaker.record(seconds, failed)
+        with self._metrics_lock:
+            metrics = self._metrics.setdefault(tool_name, ToolMetrics(tool=tool_name))
+            metrics.calls += 1
+            metrics.failures += failed
+            metrics.total_seconds += seconds
+            metrics.max_seconds = max(metrics.max_seconds, seconds)
+
+    def _circuit_open(self, tool_name: str) -> ToolResponseSchema:
+        logger.debug(f"Circuit of tool '{tool_name}' is open, failing fast.")
+        with self._metrics_lock:
+            metrics = self._metrics.setdefault(tool_name, ToolMetrics(tool=tool_name))
+            metrics.rejected += 1
+        return ToolResponseSchema(
+            content=(
+                f"<INTERNAL> The tool '{tool_name}' is temporarily unavailable. "
+                "Continue without it. </INTERNAL>"
+            ),
+            is_error=True,
+            unavailable=True,
+        )
+
+    def _run_tool_until(
+        self,
+        tool_name: str,
+        tool: Callable[..., ToolResponseSchema],
+        args: Dict[str, Any],
+        deadline: Optional[Deadline],
+    ) -> ToolResponseSchema:
+        """Run the tool, giving up on it at the deadline."""
+        if deadline is None:
+            return self._run_tool(tool_name, tool, args)
+        if deadline.expired:
+            raise self._timeout_error(tool_name)
+
+        context = contextvars.copy_context()
+        future = self.sync_executor().submit(
+            context.run, self._run_tool, tool_name, tool, args
+        )
+        try:
+            return future.result(timeout=deadline.remaining())
+        except TimeoutError:
+            future.cancel()
+            raise self._timeout_error(tool_name)
+
+    async def _await_until(
+        self,
+        tool_name: str,
+        awaitable: Awaitable[ToolResponseSchema],
+        deadline: Optional[Deadline],
+    ) -> ToolResponseSchema:
+        """Await the tool, cancelling it at the deadline."""
+        if deadline is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, deadline.remaining())
+        except TimeoutError:
+            raise self._timeout_error(tool_name)
+
+    @staticmethod
+    def _timeout_error(tool_name: str) -> TimeoutError:
+        logger.warning(f"Tool '{tool_name}' abandoned, the deadline was reached.")
+        return TimeoutError(
+            f"Tool '{tool_name}' timed out, the run deadline was reached."
+        )
+
+    def _run_tool(
+        self,
+        tool_name: str,
+        tool: Callable[..., ToolResponseSchema],
+        args: Dict[str, Any],
+    ) -> ToolResponseSchema:
+        """Run the tool, checking its response type."""
+        try:
+            return self._check_result(tool_name, tool(**args))
         except Exception as e:
             logger.error(f"Error executing tool '{tool_name}': {e}")
             raise ValueError(f"Error executing tool '{tool_name}': {e}")
+
+    @staticmethod
+    def _check_result(tool_name: str, result: Any) -> ToolResponseSchema:
+        if not isinstance(result, ToolResponseSchema):
+            raise ValueError(
+                f"Tool '{tool_name}' should return a ToolResponseSchema"
+            )
+        return result
@@ -36,3 +36,12 @@ class MessageRoleNotSupportedException(MessageSupportException):
             f"Message role '{message_role}' is not supported. "
             f"Supported roles are: {supported_roles}"
         )
+
+
+class MediaSourceNotAllowedException(MessageSupportException):
+    """Exception raised for media loaded from a source that isn't allowed."""
+
+    def __init__(self, media_url: str, reason: str) -> None:
+        """Initialize the exception."""
+        self.media_url = media_url
+        super().__init__(f"Media '{media_url}' can't be loaded: {reason}")
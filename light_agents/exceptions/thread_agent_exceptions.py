@@ -5,3 +5,16 @@ class AIAgentCompletionError(Exception):
         """Initialize the exception."""
         super().__init__(message)
         self.message = message
+
+
+class ToolExecutionError(ValueError):
+    """Exception raised when a tool fails and the run can't recover from it.
+
+    Raised once the tool error retry budgets of the run are exhausted.
+    """
+
+    def __init__(self, tool_name: str, error: Exception) -> None:
+        """Initialize the exception."""
+        super().__init__(f"Error executing tool: {error}")
+        self.tool_name = tool_name
+        self.error = error
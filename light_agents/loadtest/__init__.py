@@ -0,0 +1,14 @@
+from light_agents.loadtest.runner import LevelReport, run_load_test
+from light_agents.loadtest.simulated_provider import (
+    LatencyDistribution,
+    SimulatedProvider,
+    SimulatedProviderError,
+)
+
+__all__ = [
+    "LatencyDistribution",
+    "LevelReport",
+    "SimulatedProvider",
+    "SimulatedProviderError",
+    "run_load_test",
+]
@@ -0,0 +1,3 @@
+from light_agents.loadtest.runner import main
+
+main()
@@ -0,0 +1,286 @@
+import argparse
+import asyncio
+import json
+import math
+import time
+import tracemalloc
+from typing import List, Optional, Sequence
+
+from pydantic import BaseModel
+
+from light_agents.core.logger_config import setup_logger
+from light_agents.loadtest.simulated_provider import (
+    LatencyDistribution,
+    SimulatedProvider,
+)
+from light_agents.schemas.messages_schemas import MessageRole
+from light_agents.schemas.thread_agent_schema import ThreadAgent
+from light_agents.schemas.thread_schema import ThreadBase
+from light_agents.workers.pool import load_agent_factory
+
+logger = setup_logger(__name__)
+
+
+class LevelReport(BaseModel):
+    """Results of the load test at a single concurrency level.
+
+    Latencies are in milliseconds, throughput in turns per second and memory
+    in bytes.
+    """
+
+    concurrency: int
+    threads: int
+    turns: int
+    errors: int
+    duration_seconds: float
+    throughput: float
+    p50_latency: float
+    p95_latency: float
+    p99_latency: float
+    peak_memory: Optional[int] = None
+    memory_per_thread: Optional[int] = None
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Get the `q` percentile of the values, by the nearest rank method."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def load_corpus(path: str) -> List[ThreadBase]:
+    """Load recorded threads from a JSON lines file, one thread per line."""
+    with open(path) as file:
+        return [
+            ThreadBase.model_validate_json(line) for line in file if line.strip()
+        ]
+
+
+def user_turns(thread: ThreadBase) -> List[ThreadBase]:
+    """Split a recorded thread into the threads replaying each user turn.
+
+    Each turn keeps the recorded messages before a user message, and the user
+    message itself. The generated answers are left to the agent.
+    """
+    return [
+        thread.model_copy(
+            update={"messages": list(thread.messages[: position + 1])},
+            deep=True,
+        )
+        for position in thread.index.by_role(MessageRole.USER).positions
+    ]
+
+
+def attach_provider(agent: ThreadAgent, provider: SimulatedProvider) -> None:
+    """Point the agent's provider clients to the simulated provider."""
+    if not hasattr(agent, "provider_client"):
+        raise ValueError(
+            f"'{type(agent).__name__}' doesn't accept a provider client."
+        )
+
+    # checked by name, so the other provider's SDK client is never built
+    if type(agent).__name__ == "ClaudeAgent":
+        setattr(agent, "provider_client", provider.anthropic_client())
+        setattr(agent, "async_provider_client", provider.async_anthropic_client())
+    else:
+        setattr(agent, "provider_client", provider.openai_client())
+        setattr(agent, "async_provider_client", provider.async_openai_client())
+
+
+async def run_level(
+    agent: ThreadAgent,
+    corpus: Sequence[ThreadBase],
+    concurrency: int,
+    threads: int,
+    trace_memory: bool = True,
+) -> LevelReport:
+    """Replay threads with a fixed number of threads in flight.
+
+    Each replayed thread runs its user turns in order, on the agent's async
+    path. A turn is one `aprocess_thread` call.
+
+    Args:
+        agent: Agent processing the threads.
+        corpus: Recorded threads, replayed in a loop.
+        concurrency: Number of threads processed at once.
+        threads: Number of threads replayed at this level.
+        trace_memory: Whether to measure the peak memory with `tracemalloc`.
+            Tracing slows down the run.
+
+    Returns:
+        report: The results of the level.
+
+    """
+    pending = [corpus[index % len(corpus)] for index in range(threads)]
+    latencies: List[float] = []
+    errors = 0
+
+    async def replay_threads() -> None:
+        nonlocal errors
+        while pending:
+            recorded = pending.pop()
+            for turn in user_turns(recorded):
+                started = time.perf_counter()
+                try:
+                    await turn.aprocess_thread(agent)
+                except Exception as e:
+                    errors += 1
+                    logger.debug(f"Turn failed: {e}")
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    if trace_memory:
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(replay_threads() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    peak_memory = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_memory = max(peak - baseline, 0)
+
+    turns = len(latencies) + errors
+    return LevelReport(
+        concurrency=concurrency,
+        threads=threads,
+        turns=turns,
+        errors=errors,
+        duration_seconds=duration,
+        throughput=turns / duration if duration > 0 else 0.0,
+        p50_latency=percentile(latencies, 50),
+        p95_latency=percentile(latencies, 95),
+        p99_latency=percentile(latencies, 99),
+        peak_memory=peak_memory,
+        memory_per_thread=(
+            peak_memory // concurrency if peak_memory is not None else None
+        ),
+    )
+
+
+async def run_load_test(
+    agent: ThreadAgent,
+    corpus: Sequence[ThreadBase],
+    concurrency_levels: Sequence[int],
+    threads_per_worker: int = 4,
+    trace_memory: bool = True,
+) -> List[LevelReport]:
+    """Replay the corpus while ramping up the concurrency.
+
+    Args:
+        agent: Agent processing the threads, usually attached to a
+            `SimulatedProvider`.
+        corpus: Recorded threads.
+        concurrency_levels: Concurrency of each level, in order.
+        threads_per_worker: Threads replayed per concurrent worker on each
+            level.
+        trace_memory: Whether to measure the peak memory.
+
+    Returns:
+        reports: The results of each level.
+
+    """
+    if not corpus:
+        raise ValueError("The corpus has no threads.")
+
+    reports = []
+    for concurrency in concurrency_levels:
+        report = await run_level(
+            agent,
+            corpus,
+            concurrency,
+            concurrency * threads_per_worker,
+            trace_memory,
+        )
+        logger.info(format_report(report))
+        reports.append(report)
+    return reports
+
+
+def format_report(report: LevelReport) -> str:
+    """Format a level report as a single line."""
+    line = (
+        f"concurrency={report.concurrency} turns={report.turns} "
+        f"errors={report.errors} throughput={report.throughput:.2f} turns/s "
+        f"p50={report.p50_latency:.0f}ms p95={report.p95_latency:.0f}ms "
+        f"p99={report.p99_latency:.0f}ms"
+    )
+    if report.memory_per_thread is not None:
+        line += f" memory/thread={report.memory_per_thread / 1024:.1f}KiB"
+    return line
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run a load test from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Replay recorded threads against a simulated provider."
+    )
+    parser.add_argument(
+        "--corpus", required=True, help="JSON lines file of recorded threads."
+    )
+    parser.add_argument(
+        "--agent-factory",
+        required=True,
+        help="Callable building the agent, as 'module:attribute'.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        default="1,2,4,8,16,32",
+        help="Comma separated concurrency levels.",
+    )
+    parser.add_argument("--threads-per-worker", type=int, default=4)
+    parser.add_argument(
+        "--latency",
+        default="lognormal",
+        choices=["constant", "uniform", "lognormal", "exponential"],
+    )
+    parser.add_argument("--latency-median-ms", type=float, default=800.0)
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--tool-call-probability", type=float, default=0.3)
+    parser.add_argument("--max-parallel-tool-calls", type=int, default=2)
+    parser.add_argument("--max-tool-rounds", type=int, default=3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Skip memory tracing, which slows down the run.",
+    )
+    parser.add_argument("--output", help="Write the reports as JSON to a file.")
+    args = parser.parse_args(argv)
+
+    provider = SimulatedProvider(
+        latency=LatencyDistribution(
+            kind=args.latency,
+            median_ms=args.latency_median_ms,
+            spread=args.latency_spread,
+        ),
+        tool_call_probability=args.tool_call_probability,
+        max_parallel_tool_calls=args.max_parallel_tool_calls,
+        max_tool_rounds=args.max_tool_rounds,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    agent = load_agent_factory(args.agent_factory)()
+    attach_provider(agent, provider)
+
+    reports = asyncio.run(
+        run_load_test(
+            agent,
+            load_corpus(args.corpus),
+            [int(level) for level in args.concurrency.split(",")],
+            args.threads_per_worker,
+            not args.no_memory,
+        )
+    )
+    for report in reports:
+        print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump([report.model_dump() for report in reports], file, indent=2)
@@ -0,0 +1,405 @@
+import asyncio
+import json
+import math
+import random
+import time
+from threading import Lock
+from typing import Any, Dict, List, Literal, Optional
+from uuid import uuid4
+
+from anthropic.types import Message as AnthropicMessage
+from openai.types.chat import ChatCompletion
+from pydantic import BaseModel, PrivateAttr
+
+from light_agents.schemas.model_config import model_config
+
+WORDS = (
+    "the order was shipped yesterday and should arrive within three business "
+    "days please let me know if there is anything else i can help with"
+).split()
+
+
+class SimulatedProviderError(Exception):
+    """Error injected by the simulated provider."""
+
+
+class LatencyDistribution(BaseModel):
+    """Distribution of the simulated provider latency.
+
+    Attributes:
+        kind: Shape of the distribution.
+        median_ms: Median latency, in milliseconds.
+        spread: Lognormal sigma, or the relative half width of the uniform
+            distribution. Ignored by `constant` and `exponential`.
+
+    """
+
+    kind: Literal["constant", "uniform", "lognormal", "exponential"] = "lognormal"
+    median_ms: float = 800.0
+    spread: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        """Sample a latency, in seconds."""
+        if self.kind == "constant":
+            latency = self.median_ms
+        elif self.kind == "uniform":
+            latency = rng.uniform(
+                self.median_ms * (1 - self.spread), self.median_ms * (1 + self.spread)
+            )
+        elif self.kind == "lognormal":
+            latency = self.median_ms * rng.lognormvariate(0, self.spread)
+        else:
+            # the median of an exponential distribution is ln(2) / lambda
+            latency = rng.expovariate(math.log(2) / self.median_ms)
+        return max(latency, 0.0) / 1000
+
+
+class SimulatedProvider(BaseModel):
+    """Local stand-in for the OpenAI and Anthropic APIs, for load tests.
+
+    Answers every call after a latency sampled from `latency`. When tools
+    are sent, it calls `1..max_parallel_tool_calls` of them with probability
+    `tool_call_probability`, up to `max_tool_rounds` rounds after the last
+    user message. A fraction `error_rate` of the calls raise
+    `SimulatedProviderError`. Tool arguments are built from the tool schemas.
+    Calls slower than their `timeout` fail after it, and failed calls are
+    retried `max_retries` times, like the SDK clients do.
+
+    Use `openai_client()` / `anthropic_client()` (and their async versions)
+    as the agents' `provider_client` / `async_provider_client`. Streaming is
+    not simulated.
+
+    Attributes:
+        latency: Distribution of the latency of each call.
+        tool_call_probability: Probability of calling tools when possible.
+        max_parallel_tool_calls: Maximum tool calls in a single response.
+        max_tool_rounds: Maximum consecutive rounds of tool calls.
+        error_rate: Probability of a call failing.
+        max_retries: Retries of a failed call, overridden by `with_options`.
+        response_words: Number of words of the text responses.
+        seed: Seed of the random generator, for reproducible runs.
+
+    """
+
+    model_config = model_config
+    latency: LatencyDistribution = LatencyDistribution()
+    tool_call_probability: float = 0.3
+    max_parallel_tool_calls: int = 2
+    max_tool_rounds: int = 3
+    error_rate: float = 0.0
+    max_retries: int = 0
+    response_words: int = 60
+    seed: Optional[int] = None
+
+    _rng: random.Random = PrivateAttr()
+    _lock: Lock = PrivateAttr(default_factory=Lock)
+
+    def __init__(self, **data: Any) -> None:
+        """Initialize the SimulatedProvider class."""
+        super().__init__(**data)
+        self._rng = random.Random(self.seed)
+
+    def plan_response(
+        self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Draw the latency, the failure and the content of a response.
+
+        Args:
+            messages: Serialized messages of the request.
+            tools: Tools of the request, as `{"name", "schema"}` dicts.
+
+        Returns:
+            plan: The `latency`, `error`, `text` and `tool_calls` (as
+                `{"id", "name", "arguments"}` dicts) of the response.
+
+        """
+        with self._lock:
+            latency = self.latency.sample(self._rng)
+            error = self._rng.random() < self.error_rate
+            tool_calls = []
+            if (
+                tools
+                and tool_rounds(messages) < self.max_tool_rounds
+                and self._rng.random() < self.tool_call_probability
+            ):
+                for _ in range(self._rng.randint(1, self.max_parallel_tool_calls)):
+                    tool = self._rng.choice(tools)
+                    tool_calls.append(
+                        {
+                            "id": f"call_{uuid4().hex[:24]}",
+                            "name": tool["name"],
+                            "arguments": sample_arguments(tool["schema"], self._rng),
+                        }
+                    )
+            text = " ".join(
+                self._rng.choice(WORDS) for _ in range(self.response_words)
+            )
+
+        return {
+            "latency": latency,
+            "error": error,
+            "text": text,
+            "tool_calls": tool_calls,
+        }
+
+    def openai_completion(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Plan a response for an OpenAI request."""
+        if request.get("stream"):
+            raise ValueError("The simulated provider doesn't stream.")
+        tools = [
+            {
+                "name": tool["function"]["name"],
+                "schema": tool["function"].get("parameters", {}),
+            }
+            for tool in offered_tools(request)
+        ]
+        plan = self.plan_response(request["messages"], tools)
+        plan["response"] = build_openai_completion(request, plan)
+        return plan
+
+    def anthropic_message(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Plan a response for an Anthropic request."""
+        tools = [
+            {"name": tool["name"], "schema": tool.get("input_schema", {})}
+            for tool in offered_tools(request)
+        ]
+        plan = self.plan_response(request["messages"], tools)
+        plan["response"] = build_anthropic_message(request, plan)
+        return plan
+
+    def openai_client(self) -> "_Client":
+        """Build a client with the surface of `openai.OpenAI` used by agents."""
+        completions = _SyncCall(self.openai_completion, max_retries=self.max_retries)
+        return _Client(chat=_Client(completions=completions))
+
+    def async_openai_client(self) -> "_Client":
+        """Build a client with the surface of `openai.AsyncOpenAI`."""
+        completions = _AsyncCall(self.openai_completion, max_retries=self.max_retries)
+        return _Client(chat=_Client(completions=completions))
+
+    def anthropic_client(self) -> "_Client":
+        """Build a client with the surface of `anthropic.Anthropic`."""
+        messages = _SyncCall(self.anthropic_message, max_retries=self.max_retries)
+        return _Client(messages=messages)
+
+    def async_anthropic_client(self) -> "_Client":
+        """Build a client with the surface of `anthropic.AsyncAnthropic`."""
+        messages = _AsyncCall(self.anthropic_message, max_retries=self.max_retries)
+        return _Client(messages=messages)
+
+
+def offered_tools(request: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Get the tools the model may call, none if `tool_choice` forbids it."""
+    tool_choice = request.get("tool_choice")
+    if tool_choice == "none" or (
+        isinstance(tool_choice, dict) and tool_choice.get("type") == "none"
+    ):
+        return []
+    return list(request.get("tools", []))
+
+
+def tool_rounds(messages: List[Dict[str, Any]]) -> int:
+    """Count the tool call rounds since the last user message."""
+    rounds = 0
+    for message in reversed(messages):
+        content = message.get("content")
+        if message.get("tool_calls") or (
+            isinstance(content, list)
+            and any(block.get("type") == "tool_use" for block in content)
+        ):
+            rounds += 1
+        elif message.get("role") == "user" and not (
+            isinstance(content, list)
+            and any(block.get("type") == "tool_result" for block in content)
+        ):
+            break
+    return rounds
+
+
+def sample_arguments(schema: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    """Build arguments matching the properties of a tool JSON schema."""
+    arguments: Dict[str, Any] = {}
+    for name, spec in schema.get("properties", {}).items():
+        if spec.get("enum"):
+            arguments[name] = rng.choice(spec["enum"])
+        elif spec.get("type") == "integer":
+            arguments[name] = rng.randint(1, 1000)
+        elif spec.get("type") == "number":
+            arguments[name] = round(rng.uniform(0, 1000), 2)
+        elif spec.get("type") == "boolean":
+            arguments[name] = rng.random() < 0.5
+        elif spec.get("type") == "array":
+            arguments[name] = []
+        elif spec.get("type") == "object":
+            arguments[name] = {}
+        else:
+            arguments[name] = f"{name}-{rng.randint(1, 1000)}"
+    return arguments
+
+
+def _usage(request: Dict[str, Any], plan: Dict[str, Any]) -> tuple[int, int]:
+    input_tokens = len(str(request["messages"])) // 4 + 1
+    output_tokens = len(plan["text"]) // 4 + 1 + 20 * len(plan["tool_calls"])
+    return input_tokens, output_tokens
+
+
+def build_openai_completion(
+    request: Dict[str, Any], plan: Dict[str, Any]
+) -> ChatCompletion:
+    """Build the OpenAI completion of a response plan."""
+    input_tokens, output_tokens = _usage(request, plan)
+    if plan["tool_calls"]:
+        finish_reason = "tool_calls"
+        message: Dict[str, Any] = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": tool_call["id"],
+                    "type": "function",
+                    "function": {
+                        "name": tool_call["name"],
+                        "arguments": json.dumps(tool_call["arguments"]),
+                    },
+                }
+                for tool_call in plan["tool_calls"]
+            ],
+        }
+    else:
+        finish_reason = "stop"
+        message = {"role": "assistant", "content": plan["text"]}
+
+    return ChatCompletion.model_validate(
+        {
+            "id": f"chatcmpl-{uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request["model"],
+            "choices": [
+                {
+                    "index": index,
+                    "finish_reason": finish_reason,
+                    "message": message,
+                }
+                for index in range(request.get("n", 1))
+            ],
+            "usage": {
+                "prompt_tokens": input_tokens,
+                "completion_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        }
+    )
+
+
+def build_anthropic_message(
+    request: Dict[str, Any], plan: Dict[str, Any]
+) -> AnthropicMessage:
+    """Build the Anthropic message of a response plan."""
+    input_tokens, output_tokens = _usage(request, plan)
+    if plan["tool_calls"]:
+        stop_reason = "tool_use"
+        content: List[Dict[str, Any]] = [
+            {
+                "type": "tool_use",
+                "id": tool_call["id"],
+                "name": tool_call["name"],
+                "input": tool_call["arguments"],
+            }
+            for tool_call in plan["tool_calls"]
+        ]
+    else:
+        stop_reason = "end_turn"
+        content = [{"type": "text", "text": plan["text"]}]
+
+    return AnthropicMessage.model_validate(
+        {
+            "id": f"msg_{uuid4().hex}",
+            "type": "message",
+            "role": "assistant",
+            "model": request["model"],
+            "content": content,
+            "stop_reason": stop_reason,
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+        }
+    )
+
+
+class _Client:
+    """Namespace mimicking the attributes of the SDK clients."""
+
+    def __init__(self, **attributes: Any) -> None:
+        self.__dict__.update(attributes)
+
+    def with_options(self, **options: Any) -> "_Client":
+        """Copy the client with other `timeout` and `max_retries`."""
+        return _Client(
+            **{
+                name: value.with_options(**options)
+                if hasattr(value, "with_options")
+                else value
+                for name, value in self.__dict__.items()
+            }
+        )
+
+
+class _Call:
+    def __init__(
+        self, plan: Any, timeout: Optional[float] = None, max_retries: int = 0
+    ) -> None:
+        self.plan = plan
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+    def with_options(
+        self, timeout: Optional[float] = None, max_retries: Optional[int] = None
+    ) -> Any:
+        return type(self)(
+            self.plan,
+            self.timeout if timeout is None else timeout,
+            self.max_retries if max_retries is None else max_retries,
+        )
+
+
+class _SyncCall(_Call):
+    def create(self, timeout: Optional[float] = None, **request: Any) -> Any:
+        timeout = self.timeout if timeout is None else timeout
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._attempt(request, timeout)
+            except SimulatedProviderError:
+                if attempt == self.max_retries:
+                    raise
+
+    def _attempt(self, request: Dict[str, Any], timeout: Optional[float]) -> Any:
+        plan = self.plan(request)
+        if timeout is not None and plan["latency"] > timeout:
+            time.sleep(timeout)
+            raise SimulatedProviderError("Simulated provider timeout.")
+        time.sleep(plan["latency"])
+        if plan["error"]:
+            raise SimulatedProviderError("Simulated provider error.")
+        return plan["response"]
+
+
+class _AsyncCall(_Call):
+    async def create(self, timeout: Optional[float] = None, **request: Any) -> Any:
+        timeout = self.timeout if timeout is None else timeout
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._attempt(request, timeout)
+            except SimulatedProviderError:
+                if attempt == self.max_retries:
+                    raise
+
+    async def _attempt(
+        self, request: Dict[str, Any], timeout: Optional[float]
+    ) -> Any:
+        plan = self.plan(request)
+        if timeout is not None and plan["latency"] > timeout:
+            await asyncio.sleep(timeout)
+            raise SimulatedProviderError("Simulated provider timeout.")
+        await asyncio.sleep(plan["latency"])
+        if plan["error"]:
+            raise SimulatedProviderError("Simulated provider error.")
+        return plan["response"]
@@ -2,9 +2,11 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Optional, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PrivateAttr
 
+from light_agents.config import appSettings
 from light_agents.schemas.model_config import model_config
+from light_agents.utils.media import MediaPayload, is_remote, load_media
 
 
 class MessageRole(str, Enum):
@@ -43,6 +45,11 @@ class MessageBase(BaseModel):
     type: MessageType
     external_fields: dict[str, Any] = {}
     """Fields to be returned for the thread outside LLM."""
+    compacted: bool = False
+    """Flag to indicate the message was replaced by a summary.
+
+    Compacted messages are kept in the thread for audit, but they are not
+    serialized to the LLM anymore."""
 
 
 class Message(MessageBase):
@@ -57,7 +64,9 @@ class Message(MessageBase):
 
     model_config = model_config
     content: str
-    timestamp: Optional[datetime] = datetime.now(timezone.utc)
+    timestamp: Optional[datetime] = Field(
+        default_factory=lambda: datetime.now(timezone.utc)
+    )
 
 
 class ToolUseMessage(MessageBase):
@@ -70,6 +79,10 @@ class ToolUseMessage(MessageBase):
         input_params_dict: the input parameters of the tool
         tool_outputs: the output of the tool
         is_error: flag to indicate if the tool execution was an error
+        completion_id: the id of the model response that requested the tool.
+            Tool uses sharing it are parallel calls of a single turn.
+        output_blob_id: the blob store key of the full output, when it was
+            too large and `tool_outputs` only holds a preview
 
     """
 
@@ -78,9 +91,80 @@ class ToolUseMessage(MessageBase):
     input_params_dict: Union[str, dict[str, Any]]
     tool_outputs: Optional[Any] = None
     is_error: Optional[bool] = False
+    completion_id: Optional[str] = None
+    output_blob_id: Optional[str] = None
+
+
+class SummaryMessage(Message):
+    """A model generated summary replacing older messages of a thread.
+
+    Attributes
+    ----------
+        summarized_messages: the number of messages replaced by the summary
+        summary_key: the hash of the replaced messages
+
+    """
+
+    summarized_messages: int = 0
+    summary_key: Optional[str] = None
 
 
 class MediaMessage(Message):
-    """A single media message."""
+    """A single media message.
+
+    The media is loaded lazily, on the first serialization, and the encoded
+    payload is cached in the message. Later turns of the same run reuse it
+    instead of reading and encoding the file again.
+
+    Attributes
+    ----------
+        media_url: a `data:` URL, an http(s) URL, a `file://` URL or a local
+            path to the media. Local files are only read from the
+            `MEDIA_ROOT` directory of the settings
+        media_type: the MIME type of the media, guessed from the URL if empty
+        file_id: the reference of the file already uploaded to the provider
+
+    """
 
     media_url: str
+    media_type: Optional[str] = None
+    file_id: Optional[str] = None
+    _payloads: dict[bool, MediaPayload] = PrivateAttr(default_factory=dict)
+    """Loaded payloads, by whether remote media were inlined."""
+
+    def load_payload(self, inline_remote: bool = False) -> MediaPayload:
+        """Load the media, or get it from the message cache.
+
+        Args:
+            inline_remote: Whether to download and inline http(s) media.
+
+        """
+        payload = self._payloads.get(inline_remote)
+        if payload is None:
+            payload = load_media(
+                self.media_url,
+                self.type,
+                self.media_type,
+                inline_remote,
+                media_root=appSettings.MEDIA_ROOT,
+            )
+            self._payloads[inline_remote] = payload
+            # local and data URL payloads are always inlined
+            if payload.data is not None and not is_remote(self.media_url):
+                self._payloads[not inline_remote] = payload
+        return payload
+
+
+def message_from_dict(data: dict[str, Any]) -> MessageBase:
+    """Build a message of the right class from its serialized fields.
+
+    Useful for loading threads stored as JSON, where the message class is
+    lost.
+    """
+    if "run_id" in data:
+        return ToolUseMessage.model_validate(data)
+    if "summary_key" in data:
+        return SummaryMessage.model_validate(data)
+    if "media_url" in data:
+        return MediaMessage.model_validate(data)
+    return Message.model_validate(data)
@@ -1,5 +1,14 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, List, MutableSequence, Sequence
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    MutableSequence,
+    Sequence,
+)
 
 from pydantic import BaseModel
 
@@ -15,6 +24,16 @@ class ThreadAgent(ABC, BaseModel):
     messages_serializer: Callable[..., List[Dict[str, str]]] = base_serializer
     verbose: bool = False
 
+    def warmup(self) -> None:
+        """Prepare the agent before it takes traffic, e.g. open connections.
+
+        Does nothing by default.
+        """
+
+    async def awarmup(self) -> None:
+        """Prepare the agent before it takes traffic, on the async path."""
+        await asyncio.to_thread(self.warmup)
+
     @abstractmethod
     def agent_run(
         self, thread_messages: MutableSequence[MessageBase], **kwargs: Any
@@ -22,6 +41,25 @@ class ThreadAgent(ABC, BaseModel):
         """Run the agent."""
         raise NotImplementedError
 
+    async def astream_run(
+        self, thread_messages: MutableSequence[MessageBase], **kwargs: Any
+    ) -> AsyncIterator[Sequence[MessageBase]]:
+        """Run the agent on the async path, yielding the generated messages.
+
+        Agents with native async clients override it. By default `agent_run`
+        runs in a worker thread and its messages are yielded at once.
+        """
+        yield await asyncio.to_thread(self.agent_run, thread_messages, **kwargs)
+
+    async def aagent_run(
+        self, thread_messages: MutableSequence[MessageBase], **kwargs: Any
+    ) -> Sequence[MessageBase]:
+        """Run the agent on the async path."""
+        run_messages: List[MessageBase] = []
+        async for messages in self.astream_run(thread_messages, **kwargs):
+            run_messages.extend(messages)
+        return run_messages
+
     @abstractmethod
     def process_tools(
         self, tool_use_messages: List[ToolUseMessage], **kwargs: Any
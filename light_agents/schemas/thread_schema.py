@@ -1,9 +1,29 @@
+import asyncio
+from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, MutableSequence, Sequence
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from uuid import uuid4
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PrivateAttr, SerializeAsAny, field_validator
 
-from light_agents.schemas.messages_schemas import MessageBase
+from light_agents.core.budget import Budget, BudgetGuard, StopReason
+from light_agents.core.deadline import DEADLINE_KWARG, Deadline, as_deadline
+from light_agents.core.logger_config import log_context
+from light_agents.core.message_index import MessageIndex, MessageList, MessageView
+from light_agents.core.payload_optimizer import REQUEST_BYTES_KWARG
+from light_agents.core.thread_compactor import ThreadCompactor
+from light_agents.core.tool_registry import ALLOWED_TOOLS_KWARG, RESERVED_KWARGS
+from light_agents.schemas.messages_schemas import MessageBase, message_from_dict
 from light_agents.schemas.model_config import model_config
 from light_agents.schemas.thread_agent_schema import ThreadAgent
 
@@ -18,9 +38,48 @@ class ThreadBase(BaseModel):
     """Base schema for a Thread."""
 
     model_config = model_config
+    id: str = Field(default_factory=lambda: uuid4().hex)
     type: ThreadType
-    messages: MutableSequence[MessageBase] = []
-    external_thread_fields: Dict[str, Any] = {}
+    messages: MutableSequence[SerializeAsAny[MessageBase]] = Field(
+        default_factory=list
+    )
+    external_thread_fields: Dict[str, Any] = Field(default_factory=dict)
+    compactor: Optional[ThreadCompactor] = Field(default=None, exclude=True)
+    """Compacts the older messages once the thread gets too long."""
+    budget: Optional[Budget] = None
+    """Token and cost ceilings of the thread, charged across every run."""
+    tenant_id: Optional[str] = None
+    tenant_budget: Optional[Budget] = Field(default=None, exclude=True)
+    """Ceilings shared by every thread of the tenant."""
+    stop_reason: Optional[StopReason] = None
+    """Why the last run stopped."""
+    allowed_tools: Optional[List[str]] = None
+    """Names of the agent tools offered in the thread. Defaults to every tool."""
+    request_bytes: List[int] = Field(default_factory=list)
+    """Wire size of each provider request of the thread, in bytes."""
+
+    _index: Optional[MessageIndex] = PrivateAttr(default=None)
+
+    @field_validator("messages", mode="before")
+    @classmethod
+    def load_messages(cls, messages: Any) -> Any:
+        """Load serialized messages with their original classes."""
+        if not isinstance(messages, (list, tuple)):
+            return messages
+
+        return [
+            message_from_dict(message) if isinstance(message, dict) else message
+            for message in messages
+        ]
+
+    @field_validator("external_thread_fields")
+    @classmethod
+    def check_external_fields(cls, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Refuse the fields that would override the agents' run kwargs."""
+        reserved = sorted(RESERVED_KWARGS.intersection(fields))
+        if reserved:
+            raise ValueError(f"Reserved external thread fields: {reserved}")
+        return fields
 
     def add_message(self, message: MessageBase) -> None:
         """Add a message to the thread."""
@@ -28,6 +87,26 @@ class ThreadBase(BaseModel):
             raise ValueError("The message must be an instance of MessageBase.")
 
         self.messages.append(message)
+        if self._index is not None:
+            self._index.sync()
+
+    @property
+    def index(self) -> MessageIndex:
+        """Secondary indexes of the messages, by role, run_id, tool and time.
+
+        Kept up to date as messages are added. See `MessageIndex`.
+        """
+        if self._index is None or self._index.messages is not self.messages:
+            self._index = MessageIndex(self.messages)
+        return self._index
+
+    def last_turns(self, turns: int) -> MessageView:
+        """Get the messages of the last `turns` user turns, without copying."""
+        return self.index.last_turns(turns)
+
+    def messages_since(self, timestamp: datetime) -> MessageView:
+        """Get the messages created since `timestamp`, without copying."""
+        return self.index.since(timestamp)
 
     def add_messages_list(
         self, messages: Sequence[MessageBase]
@@ -39,17 +118,109 @@ class ThreadBase(BaseModel):
         for message in messages:
             self.add_message(message)
 
-    def process_thread(self, thread_agent: ThreadAgent) -> None:
-        """Process the thread."""
+    def process_thread(
+        self,
+        thread_agent: ThreadAgent,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> None:
+        """Process the thread.
+
+        Args:
+            thread_agent: Agent processing the thread.
+            deadline: Seconds given to the run, or its `Deadline`. Once it is
+                reached, the run stops with the messages generated so far and
+                `stop_reason` is `"deadline"`.
+
+        """
         if not isinstance(thread_agent, ThreadAgent):
             raise ValueError(
                 "The thread agent must be an instance of ThreadAgent."
             )
 
+        if self.compactor:
+            self.compactor.compact(self.messages)
+
         ## TODO:
         ## 1. Deal gracefully with exceptions
         ## 2. Update external thread fields based on the agent's output
-        messages = thread_agent.agent_run(
-            self.messages, **self.external_thread_fields
-        )
+        # agents extend the given list during the run, so it gets a copy to
+        # avoid adding the generated messages twice
+        run_deadline = as_deadline(deadline)
+        run_kwargs, budget_guard = self._run_kwargs(run_deadline)
+        with log_context(thread_id=self.id):
+            messages = thread_agent.agent_run(
+                MessageList(self.messages), **run_kwargs
+            )
         self.add_messages_list(messages)
+        self._set_stop_reason(budget_guard, run_deadline)
+
+    async def astream_thread(
+        self,
+        thread_agent: ThreadAgent,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> AsyncIterator[MessageBase]:
+        """Process the thread on the async path, yielding each new message.
+
+        Messages are added to the thread as soon as the agent generates them.
+        The `deadline` works as in `process_thread`.
+        """
+        if not isinstance(thread_agent, ThreadAgent):
+            raise ValueError(
+                "The thread agent must be an instance of ThreadAgent."
+            )
+
+        if self.compactor:
+            await asyncio.to_thread(self.compactor.compact, self.messages)
+
+        run_deadline = as_deadline(deadline)
+        run_kwargs, budget_guard = self._run_kwargs(run_deadline)
+        with log_context(thread_id=self.id):
+            async for messages in thread_agent.astream_run(
+                MessageList(self.messages), **run_kwargs
+            ):
+                self.add_messages_list(messages)
+                for message in messages:
+                    yield message
+        self._set_stop_reason(budget_guard, run_deadline)
+
+    async def aprocess_thread(
+        self,
+        thread_agent: ThreadAgent,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> None:
+        """Process the thread on the async path."""
+        async for _ in self.astream_thread(thread_agent, deadline):
+            pass
+
+    def _run_kwargs(
+        self, deadline: Optional[Deadline] = None
+    ) -> Tuple[Dict[str, Any], Optional[BudgetGuard]]:
+        """Build the agent run kwargs, with the budget guard if needed."""
+        run_kwargs: Dict[str, Any] = {
+            key: value
+            for key, value in self.external_thread_fields.items()
+            if key not in RESERVED_KWARGS
+        }
+        run_kwargs[REQUEST_BYTES_KWARG] = self.request_bytes
+        if deadline is not None:
+            run_kwargs[DEADLINE_KWARG] = deadline
+        if self.allowed_tools is not None:
+            run_kwargs[ALLOWED_TOOLS_KWARG] = frozenset(self.allowed_tools)
+
+        budgets = [
+            budget for budget in (self.budget, self.tenant_budget) if budget
+        ]
+        if not budgets:
+            return run_kwargs, None
+
+        budget_guard = BudgetGuard(budgets)
+        return {**run_kwargs, "budget": budget_guard}, budget_guard
+
+    def _set_stop_reason(
+        self, budget_guard: Optional[BudgetGuard], deadline: Optional[Deadline]
+    ) -> None:
+        self.stop_reason = (
+            (budget_guard.stop_reason if budget_guard else None)
+            or (deadline.stop_reason if deadline else None)
+            or StopReason.COMPLETED
+        )
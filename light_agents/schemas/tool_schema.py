@@ -1,11 +1,18 @@
-from abc import ABC, abstractmethod
+import asyncio
+from abc import ABC
 from typing import Any, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from light_agents.core.circuit_breaker import CircuitBreakerConfig
+
 
 class ToolBaseSchema(ABC, BaseModel):
-    """Base schema for a Tool used in LLM."""
+    """Base schema for a Tool used in LLM.
+
+    Tools implement `run`, `arun` or both. On the async agent path, `arun` is
+    awaited, and sync `run` implementations are offloaded to a thread pool.
+    """
 
     model_config = ConfigDict(extra="allow")
     name: str = Field(..., description="The name of the function")
@@ -16,11 +23,63 @@ class ToolBaseSchema(ABC, BaseModel):
         default=False, description="Flag to indicate if the response is a JSON"
     )
     required: Optional[List[str]] = Field(default=[], description="The required fields")
+    read_only: Optional[bool] = Field(
+        default=False,
+        description=(
+            "Flag to indicate the tool has no side effects. Read only tools "
+            "can be executed speculatively while the completion is streaming"
+        ),
+    )
+    always_on: Optional[bool] = Field(
+        default=False,
+        description=(
+            "Flag to always send the tool to the model, even when the agent "
+            "selects only the tools relevant to the conversation"
+        ),
+    )
+    strict: Optional[bool] = Field(
+        default=False,
+        description=(
+            "Flag to send the exact JSON schema of the parameters, built from "
+            "their annotations, and to enable strict function calling. "
+            "Optional parameters are sent as null when not used"
+        ),
+    )
+    circuit_breaker: Optional[CircuitBreakerConfig] = Field(
+        default=None,
+        description=(
+            "Circuit breaker thresholds of the tool, overriding the ones of "
+            "the registry"
+        ),
+    )
 
-    @abstractmethod
     def run(self, *args: Any, **kwargs: Any) -> "ToolResponseSchema":
-        """Python  function to be executed when the tool is called."""
-        pass
+        """Python  function to be executed when the tool is called.
+
+        Async only tools run `arun` in a new event loop.
+        """
+        if not self.is_async:
+            raise NotImplementedError(
+                f"Tool '{self.name}' must implement `run` or `arun`."
+            )
+        return asyncio.run(self.arun(*args, **kwargs))
+
+    async def arun(self, *args: Any, **kwargs: Any) -> "ToolResponseSchema":
+        """Async function to be executed when the tool is called.
+
+        Implement it for I/O bound tools using async clients.
+        """
+        raise NotImplementedError(f"Tool '{self.name}' doesn't implement `arun`.")
+
+    @property
+    def is_sync(self) -> bool:
+        """Whether the tool implements `run`."""
+        return type(self).run is not ToolBaseSchema.run
+
+    @property
+    def is_async(self) -> bool:
+        """Whether the tool implements `arun`."""
+        return type(self).arun is not ToolBaseSchema.arun
 
 
 class ToolResponseSchema(BaseModel):
@@ -43,3 +102,17 @@ class ToolResponseSchema(BaseModel):
 
     is_error: Optional[bool] = False
     """Flag to indicate if the tool response is an error."""
+
+    unavailable: Optional[bool] = False
+    """Flag to indicate the tool wasn't executed, e.g. its circuit is open.
+
+    The response is an error sent to the model, but it doesn't count against
+    the agent's `tool_error_policy`.
+    """
+
+    max_inline_chars: Optional[int] = None
+    """Maximum characters of content kept in the thread.
+
+    Longer content is stored in the agent's blob store, and the thread keeps
+    a preview. `None` uses the agent's `output_spill` policy.
+    """
@@ -2,15 +2,16 @@ from typing import Any, Dict, List, MutableSequence
 
 from light_agents.core.logger_config import setup_logger
 from light_agents.schemas.messages_schemas import (
+    MediaMessage,
     Message,
     MessageBase,
     MessageRole,
     MessageType,
-    ToolUseMessage,
 )
 from light_agents.serializers.tools.claude_tools_serializer import (
-    claude_tool_response_serializer,
+    claude_tool_responses_serializer,
 )
+from light_agents.utils.messages import group_tool_uses
 
 logger = setup_logger(__name__)
 
@@ -63,17 +64,95 @@ def claude_text_message_serializer(
     return serialized_message
 
 
+def claude_media_message_serializer(
+    message: MediaMessage, **kwargs: Any
+) -> Dict[str, Any] | None:
+    """Serialize a single media message for Claude API.
+
+    Images are sent as `image` blocks and PDFs as `document` blocks, both
+    inlined as base64 (remote media are downloaded once and cached in the
+    message). The message content, if any, follows the media as a text block.
+
+    Expected return:
+    ```json
+    {
+        "role": "user",
+        "content": [
+            {
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": "image/png",
+                    "data": "iVBORw0KGgo..."
+                }
+            },
+            {
+                "type": "text",
+                "text": "message content"
+            }
+        ]
+    }
+    ```
+
+    """
+    role_mapping = {MessageRole.USER.value: "user"}
+    if "roles_mapping" in kwargs:
+        role_mapping = kwargs["roles_mapping"]
+
+    if role_mapping.get(message.role) != "user":
+        logger.warning(
+            f"'{message.role}' role is not supported for media. Ignoring message."
+        )
+        return None
+
+    if message.type == MessageType.IMAGE:
+        block_type = "image"
+    elif message.type == MessageType.FILE:
+        block_type = "document"
+    else:
+        logger.warning(
+            f"'{message.type}' message type is not supported. Message ignored."
+        )
+        return None
+
+    payload = message.load_payload(inline_remote=True)
+    content: List[Dict[str, Any]] = [
+        {
+            "type": block_type,
+            "source": {
+                "type": "base64",
+                "media_type": payload.media_type,
+                "data": payload.data,
+            },
+        }
+    ]
+    if message.content:
+        content.append({"type": "text", "text": message.content})
+
+    return {"role": "user", "content": content}
+
+
 def claude_messages_list_serializer(
     messages: MutableSequence[MessageBase], **kwargs: Any
 ) -> List[Dict[str, Any]]:
     """Serialize a series of messages for Claude API.
 
-    Handles text messages and tool use messages.
+    Handles text, image, file and tool use messages. Parallel tool uses of a
+    single turn are grouped into one assistant message and one user message.
     *Not tested with Bedrock Claude.*
     """
     serialized_messages = []
-    for message in messages:
-        if isinstance(message, Message):
+    active_messages = [message for message in messages if not message.compacted]
+    for message in group_tool_uses(active_messages):
+        if isinstance(message, list):
+            serialized_messages.extend(claude_tool_responses_serializer(message))
+
+        elif isinstance(message, MediaMessage):
+            serialized_message = claude_media_message_serializer(message, **kwargs)
+            if serialized_message:
+                serialized_messages.append(serialized_message)
+
+        elif isinstance(message, Message):
             if message.type == MessageType.TEXT:
                 ##TODO: handle text messages
                 serialized_message = claude_text_message_serializer(message, **kwargs)
@@ -85,11 +164,6 @@ def claude_messages_list_serializer(
                     "Message will be ignored."
                 )
 
-        elif isinstance(message, ToolUseMessage):
-            tool_serialized_messages = claude_tool_response_serializer(message)
-            if any(tool for tool in tool_serialized_messages):
-                serialized_messages.extend(tool_serialized_messages)
-
         else:
             logger.warning(
                 f"'{type(message)}' message type is not supported."
@@ -136,7 +210,7 @@ def bedrock_claude_messages_serializer(
     current_message: Dict[str, Any] = {"role": None, "content": []}
     for message in messages:
         # TODO: Handle when last message is tool use or media message
-        if isinstance(message, Message):
+        if isinstance(message, Message) and not message.compacted:
             current_role = roles_mapping.get(message.role, None)
             if current_role:
                 if current_role == current_message["role"]:
@@ -7,15 +7,16 @@ from light_agents.exceptions.messages_exceptions import (
     MessageTypeNotSupportedException,
 )
 from light_agents.schemas.messages_schemas import (
+    MediaMessage,
     Message,
     MessageBase,
     MessageRole,
     MessageType,
-    ToolUseMessage,
 )
 from light_agents.serializers.tools.openai_tools_serializer import (
-    openai_tooL_response_serializer,
+    openai_tool_responses_serializer,
 )
+from light_agents.utils.messages import group_tool_uses
 
 logger = setup_logger(__name__)
 
@@ -102,16 +103,87 @@ def openai_text_message_serializer(
     return serialized_message
 
 
+def openai_media_message_serializer(
+    media_message: MediaMessage, **kwargs: Any
+) -> Dict[str, Any]:
+    """Serialize a single media message to OpenAI's API format.
+
+    Images are sent as `image_url` blocks, by reference for http(s) URLs and
+    inlined otherwise. Files are sent as `file` blocks, with their uploaded
+    `file_id` or inlined. The message content, if any, is sent as a text block
+    before the media.
+
+    Arguments:
+        media_message: The message to be serialized.
+        **kwargs: Additional arguments.
+
+    Returns:
+        serialized_message: The serialized message
+
+    """
+    if not isinstance(media_message, MediaMessage):
+        raise MessageSupportException("Only MediaMessage type is supported.")
+
+    role_mapping = {MessageRole.USER.value: "user"}
+    if "roles_mapping" in kwargs:
+        role_mapping = kwargs["roles_mapping"]
+
+    message_converted_role = role_mapping.get(media_message.role)
+    if message_converted_role != "user":
+        raise MessageRoleNotSupportedException(media_message.role, ["user"])
+
+    content: List[Dict[str, Any]] = []
+    if media_message.content:
+        content.append({"type": "text", "text": media_message.content})
+
+    if media_message.type == MessageType.IMAGE:
+        payload = media_message.load_payload()
+        content.append(
+            {"type": "image_url", "image_url": {"url": payload.data_url}}
+        )
+
+    elif media_message.type == MessageType.FILE:
+        if media_message.file_id:
+            file: Dict[str, Any] = {"file_id": media_message.file_id}
+        else:
+            payload = media_message.load_payload(inline_remote=True)
+            file = {
+                "filename": payload.filename or "file",
+                "file_data": payload.data_url,
+            }
+        content.append({"type": "file", "file": file})
+
+    else:
+        raise MessageTypeNotSupportedException(
+            media_message.type, [MessageType.IMAGE, MessageType.FILE]
+        )
+
+    return {"role": message_converted_role, "content": content}
+
+
 def openai_messages_list_serializer(
     messages: MutableSequence[MessageBase], **kwargs: Any
 ) -> List[Dict[str, Any]]:
     """Serialize a series of messages for OpenAI API.
 
-    Handles text messages only.
+    Handles text, image, file and tool use messages. Parallel tool uses of a
+    single turn are grouped into one assistant message.
     """
     serialized_messages = []
-    for message in messages:
-        if isinstance(message, Message):
+    active_messages = [message for message in messages if not message.compacted]
+    for message in group_tool_uses(active_messages):
+        if isinstance(message, list):
+            serialized_messages.extend(openai_tool_responses_serializer(message))
+
+        elif isinstance(message, MediaMessage) and message.type in [
+            MessageType.IMAGE,
+            MessageType.FILE,
+        ]:
+            serialized_messages.append(
+                openai_media_message_serializer(message, **kwargs)
+            )
+
+        elif isinstance(message, Message):
             if message.type == MessageType.TEXT:
                 serialized_message = openai_text_message_serializer(message)
                 serialized_messages.append(serialized_message)
@@ -121,11 +193,6 @@ def openai_messages_list_serializer(
                     "Message will be ignored."
                 )
                 
-        elif isinstance(message, ToolUseMessage):
-            tool_serialized_messages = openai_tooL_response_serializer(message)
-            if any(tool for tool in tool_serialized_messages):
-                serialized_messages.extend(tool_serialized_messages)
-            
         else:
             logger.warning(
                 f"'{message}' message type is not yet supported."
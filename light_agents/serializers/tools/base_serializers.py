@@ -1,5 +1,24 @@
 from enum import Enum
-from typing import Any
+from typing import Any, Dict, Optional, Sequence
+
+from pydantic import BaseModel, create_model
+
+from light_agents.schemas import ToolBaseSchema
+
+TOOL_METADATA_FIELDS = {
+    "name",
+    "description",
+    "required",
+    "json_response",
+    "read_only",
+    "always_on",
+    "strict",
+    "circuit_breaker",
+}
+"""`ToolBaseSchema` fields that configure the tool and are not parameters."""
+
+STRICT_DROPPED_KEYWORDS = {"title", "default"}
+"""JSON schema keywords generated by pydantic but rejected by strict mode."""
 
 
 def python_type_to_json_type(value: Any) -> str:
@@ -20,3 +39,111 @@ def python_type_to_json_type(value: Any) -> str:
         return "null"
     else:
         return "string"
+
+
+def strict_parameters_schema(llm_function: ToolBaseSchema) -> Dict[str, Any]:
+    """Build the exact JSON schema of a tool parameters, for strict mode.
+
+    The schema is generated from the pydantic annotations of the parameter
+    fields, so nested models, lists, enums and optionals are described
+    exactly. Following the OpenAI structured outputs rules:
+    - every object sets `additionalProperties: false`,
+    - every property is listed in `required`. Optional parameters (not in
+      the tool `required`) accept `null`, while nested fields keep their
+      annotated type,
+    - `$ref`s are inlined, and `title` / `default` keywords are dropped.
+
+    Raises:
+        ValueError: If a parameter model is recursive, or a parameter is a
+            free-form object (e.g. a `Dict` field), which strict mode can't
+            describe.
+
+    """
+    tool_class = type(llm_function)
+    fields: Dict[str, Any] = {
+        name: (field.annotation, field)
+        for name, field in tool_class.model_fields.items()
+        if name not in TOOL_METADATA_FIELDS
+    }
+    parameters_model: type[BaseModel] = create_model(
+        f"{tool_class.__name__}Parameters", **fields
+    )
+    schema = parameters_model.model_json_schema()
+    definitions = schema.pop("$defs", {})
+    strict = _strict_schema(schema, definitions, (), tool_class.__name__)
+    required = llm_function.required or []
+    strict["properties"] = {
+        name: property_schema if name in required else _nullable(property_schema)
+        for name, property_schema in strict["properties"].items()
+    }
+    return strict
+
+
+def _strict_schema(
+    schema: Dict[str, Any],
+    definitions: Dict[str, Any],
+    resolving: Sequence[str],
+    path: str,
+) -> Dict[str, Any]:
+    """Convert a pydantic JSON schema to strict mode, recursively.
+
+    The `path` of the schema (e.g. `Tool.tags[]`) names it in the errors.
+    """
+    if "$ref" in schema:
+        name = schema["$ref"].split("/")[-1]
+        if name in resolving:
+            raise ValueError(
+                f"Recursive model '{name}' is not supported in strict mode."
+            )
+        siblings = {key: value for key, value in schema.items() if key != "$ref"}
+        return _strict_schema(
+            {**definitions[name], **siblings}, definitions, (*resolving, name), path
+        )
+
+    strict = {
+        key: value
+        for key, value in schema.items()
+        if key not in STRICT_DROPPED_KEYWORDS
+    }
+    if "items" in strict:
+        strict["items"] = _strict_schema(
+            strict["items"], definitions, resolving, f"{path}[]"
+        )
+    for keyword in ("anyOf", "allOf", "oneOf"):
+        if keyword in strict:
+            strict[keyword] = [
+                _strict_schema(option, definitions, resolving, path)
+                for option in strict[keyword]
+            ]
+
+    if strict.get("type") == "object":
+        if "properties" not in strict or strict.get("additionalProperties"):
+            raise ValueError(
+                f"Free-form object '{path}' (e.g. a Dict field) is not "
+                "supported in strict mode. Use a model with fixed fields, or "
+                "disable strict mode for the tool."
+            )
+        strict["properties"] = {
+            name: _strict_schema(
+                property_schema, definitions, resolving, f"{path}.{name}"
+            )
+            for name, property_schema in strict.get("properties", {}).items()
+        }
+        strict["required"] = list(strict["properties"])
+        strict["additionalProperties"] = False
+
+    return strict
+
+
+def _nullable(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Make a property schema accept `null`, keeping its description."""
+    options = schema.get("anyOf", [])
+    if {"type": "null"} in options or schema.get("type") == "null":
+        return schema
+
+    description: Optional[str] = schema.get("description")
+    option = {key: value for key, value in schema.items() if key != "description"}
+    nullable: Dict[str, Any] = {"anyOf": [option, {"type": "null"}]}
+    if description:
+        nullable["description"] = description
+    return nullable
@@ -1,10 +1,12 @@
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, Sequence
 
 from light_agents.core.logger_config import setup_logger
 from light_agents.schemas import ToolBaseSchema, ToolUseMessage
 from light_agents.serializers.tools.base_serializers import (
+    TOOL_METADATA_FIELDS,
     python_type_to_json_type,
+    strict_parameters_schema,
 )
 
 logger = setup_logger(__name__)
@@ -13,10 +15,19 @@ logger = setup_logger(__name__)
 def claude_tool_calling_serializer(
     llm_function: ToolBaseSchema,
 ) -> Dict[str, Any]:
-    """Serialize a ToolBaseSchema into Claude API format."""
-    function_dict = llm_function.model_dump(
-        exclude={"name", "description", "required", "json_response"}
-    )
+    """Serialize a ToolBaseSchema into Claude API format.
+
+    If the tool is `strict`, the input schema is built exactly from the fields
+    annotations, with `additionalProperties: false` on every object.
+    """
+    if llm_function.strict:
+        return {
+            "name": llm_function.name,
+            "description": llm_function.description,
+            "input_schema": strict_parameters_schema(llm_function),
+        }
+
+    function_dict = llm_function.model_dump(exclude=TOOL_METADATA_FIELDS)
 
     claude_format: Dict[str, Any] = {
         "name": llm_function.name,
@@ -83,44 +94,57 @@ def claude_tool_response_serializer(
     ]
     ```
     """
-    if not isinstance(tool, ToolUseMessage):
+    return claude_tool_responses_serializer([tool], **kwargs)
+
+
+def claude_tool_responses_serializer(
+    tools: Sequence[ToolUseMessage], **kwargs: Any
+) -> list[Dict[str, Any]]:
+    """Serialize the parallel tool calls of a single turn for the Claude API.
+
+    The function creates a single ```assistant``` message with every
+    `tool_use` block, and a single ```user``` message with every
+    `tool_result` block, in the same order. Failed tool calls are flagged
+    with `is_error`.
+    """
+    if not all(isinstance(tool, ToolUseMessage) for tool in tools):
         raise ValueError("The tool must be a ToolUseMessage instance.")
 
-    tool_output = tool.tool_outputs
-    if not isinstance(tool_output, str):
-        logger.warning(
-            "The tool output is not a string. Converting to string."
-        )
-        tool_output = str(tool.tool_outputs)
+    tool_use_blocks = []
+    tool_result_blocks = []
+    for tool in tools:
+        tool_output = tool.tool_outputs
+        if not isinstance(tool_output, str):
+            logger.warning(
+                "The tool output is not a string. Converting to string."
+            )
+            tool_output = str(tool.tool_outputs)
 
-    tool_input = tool.input_params_dict
-    if not isinstance(tool_input, dict):
-        logger.warning(
-            "The tool input is not a dictionary. Converting to dictionary."
-        )
-        tool_input = {"input": str(tool.input_params_dict)}
+        tool_input = tool.input_params_dict
+        if not isinstance(tool_input, dict):
+            logger.warning(
+                "The tool input is not a dictionary. Converting to dictionary."
+            )
+            tool_input = {"input": str(tool.input_params_dict)}
 
-    serialized_tool_calling_message = {
-        "role": "assistant",
-        "content": [
+        tool_use_blocks.append(
             {
                 "type": "tool_use",
                 "id": tool.run_id,
                 "name": tool.name,
-                "input": tool.input_params_dict,
-            }
-        ],
-    }
-
-    serialized_tool_response_message = {
-        "role": "user",
-        "content": [
-            {
-                "type": "tool_result",
-                "tool_use_id": tool.run_id,
-                "content": tool_output,
+                "input": tool_input,
             }
-        ],
-    }
+        )
+        tool_result_block: Dict[str, Any] = {
+            "type": "tool_result",
+            "tool_use_id": tool.run_id,
+            "content": tool_output,
+        }
+        if tool.is_error:
+            tool_result_block["is_error"] = True
+        tool_result_blocks.append(tool_result_block)
 
-    return [serialized_tool_calling_message, serialized_tool_response_message]
+    return [
+        {"role": "assistant", "content": tool_use_blocks},
+        {"role": "user", "content": tool_result_blocks},
+    ]
@@ -1,10 +1,12 @@
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, Sequence
 
 from light_agents.core.logger_config import setup_logger
 from light_agents.schemas import ToolBaseSchema, ToolUseMessage
 from light_agents.serializers.tools.base_serializers import (
+    TOOL_METADATA_FIELDS,
     python_type_to_json_type,
+    strict_parameters_schema,
 )
 
 logger = setup_logger(__name__)
@@ -36,11 +38,23 @@ def openai_tool_calling_serializer(
             }
     }
     ```
+
+    If the tool is `strict`, the parameters schema is built exactly from the
+    fields annotations and OpenAI strict function calling is enabled, so the
+    arguments always match the schema.
     """
-    # TODO: Implemment JSON structured mode.
-    function_dict = llm_function.model_dump(
-        exclude={"name", "description", "required", "json_response"}
-    )
+    if llm_function.strict:
+        return {
+            "type": "function",
+            "function": {
+                "name": llm_function.name,
+                "description": llm_function.description,
+                "parameters": strict_parameters_schema(llm_function),
+                "strict": True,
+            },
+        }
+
+    function_dict = llm_function.model_dump(exclude=TOOL_METADATA_FIELDS)
 
     serialized_tool: Dict[str, Any] = {
         "type": "function",
@@ -108,18 +122,46 @@ def openai_tooL_response_serializer(
     ]
     ```
     """
-    if not isinstance(tool, ToolUseMessage):
-        raise ValueError("tool must be an instance of ToolUseMessage.")
+    return openai_tool_responses_serializer([tool], **kwargs)
 
-    tool_output = tool.tool_outputs
-    # TODO: gracefully handle non-string tool_output
-    if not isinstance(tool_output, str):
-        logger.warning("Tool output is not a string. Converting it to string.")
-        tool_output = str(tool_output)
 
-    serialized_tool_calling_message = {
+def openai_tool_responses_serializer(
+    tools: Sequence[ToolUseMessage], **kwargs: Any
+) -> list[Dict[str, Any]]:
+    """Serialize the parallel tool calls of a single turn for the OpenAI API.
+
+    The function creates a single ```assistant``` message with every tool call,
+    followed by one ```tool``` message per tool response.
+    ```json
+    [
+        {
+            "role": "assistant",
+            "tool_calls": [
+                {"id": "call_xxxx", "type": "function", "function": {...}},
+                {"id": "call_yyyy", "type": "function", "function": {...}}
+            ]
+        },
+        {"role": "tool", "content": "response_xxxx", "tool_call_id": "call_xxxx"},
+        {"role": "tool", "content": "response_yyyy", "tool_call_id": "call_yyyy"}
+    ]
+    ```
+    """
+    if not all(isinstance(tool, ToolUseMessage) for tool in tools):
+        raise ValueError("tool must be an instance of ToolUseMessage.")
+
+    serialized_tool_calling_message: Dict[str, Any] = {
         "role": "assistant",
-        "tool_calls": [
+        "tool_calls": [],
+    }
+    serialized_tool_response_messages = []
+    for tool in tools:
+        tool_output = tool.tool_outputs
+        # TODO: gracefully handle non-string tool_output
+        if not isinstance(tool_output, str):
+            logger.warning("Tool output is not a string. Converting it to string.")
+            tool_output = str(tool_output)
+
+        serialized_tool_calling_message["tool_calls"].append(
             {
                 "id": tool.run_id,
                 "type": "function",
@@ -128,13 +170,13 @@ def openai_tooL_response_serializer(
                     "name": tool.name,
                 },
             }
-        ],
-    }
-
-    serialized_tool_response_message = {
-        "role": "tool",
-        "content": tool_output,
-        "tool_call_id": tool.run_id,
-    }
+        )
+        serialized_tool_response_messages.append(
+            {
+                "role": "tool",
+                "content": tool_output,
+                "tool_call_id": tool.run_id,
+            }
+        )
 
-    return [serialized_tool_calling_message, serialized_tool_response_message]
+    return [serialized_tool_calling_message, *serialized_tool_response_messages]
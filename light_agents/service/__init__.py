@@ -0,0 +1,7 @@
+from light_agents.service.asgi import ServiceError, ThreadService, create_app
+
+__all__ = [
+    "ServiceError",
+    "ThreadService",
+    "create_app",
+]
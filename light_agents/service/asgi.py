@@ -0,0 +1,365 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, MutableMapping, Optional
+
+from pydantic import ValidationError
+
+from light_agents.core.budget import Budget
+from light_agents.core.connection_pool import connection_pools
+from light_agents.core.logger_config import setup_logger
+from light_agents.schemas.messages_schemas import MediaMessage
+from light_agents.schemas.thread_agent_schema import ThreadAgent
+from light_agents.schemas.thread_schema import ThreadBase
+from light_agents.utils.media import is_remote
+from light_agents.workers.pool import AgentFactory, load_agent_factory
+
+logger = setup_logger(__name__)
+
+Scope = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[MutableMapping[str, Any]]]
+Send = Callable[[MutableMapping[str, Any]], Awaitable[None]]
+TenantResolver = Callable[[Scope], Optional[str]]
+
+
+class ServiceError(Exception):
+    """Error answered to the client with an HTTP status."""
+
+    def __init__(
+        self,
+        status: int,
+        detail: Any,
+        headers: Optional[List[tuple[bytes, bytes]]] = None,
+    ) -> None:
+        """Initialize the ServiceError class."""
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.headers = headers or []
+
+
+class ThreadService:
+    """ASGI application processing threads with an agent.
+
+    Routes:
+        - `POST /threads/process`: processes the thread in the body and answers
+            the processed thread.
+        - `POST /threads/stream`: processes the thread in the body, streaming
+            each generated message as a `message` Server-Sent Event, and then
+            the processed thread as a `done` event (or an `error` event).
+        - `GET /health`: answers the number of running and waiting threads.
+
+    Threads run on the agent's async path (`ThreadBase.astream_thread`), so
+    a single process serves many threads concurrently and every request
+    shares the agent's provider clients and their connection pool. At most
+    `max_concurrency` threads run at once. Up to `max_queue` requests wait
+    for a slot, for at most `queue_timeout` seconds; the rest are answered
+    with `503 Service Unavailable`.
+
+    The budget and tenant sent by the client are ignored. Each thread gets a
+    fresh copy of `thread_budget`, and the tenant is derived from the request
+    by `tenant_resolver` (e.g. from the user authenticated by a middleware),
+    charging the thread to the matching budget of `tenant_budgets`.
+
+    Media messages can't reference local files (the service would read and
+    send any file the process can open), and http(s) media are refused
+    unless `allow_remote_media` is set. Clients inline their media as
+    `data:` URLs or reference files already uploaded to the provider.
+
+    Examples:
+        >>> app = ThreadService(OpenAIAgent(), max_concurrency=16)  # doctest: +SKIP
+        >>> # uvicorn my_app.service:app
+
+    """
+
+    def __init__(
+        self,
+        agent: ThreadAgent,
+        max_concurrency: int = 8,
+        max_queue: int = 64,
+        queue_timeout: float = 30.0,
+        max_body_size: int = 10 * 1024 * 1024,
+        tenant_budgets: Optional[Dict[str, Budget]] = None,
+        tenant_resolver: Optional[TenantResolver] = None,
+        thread_budget: Optional[Budget] = None,
+        allow_remote_media: bool = False,
+    ) -> None:
+        """Initialize the ThreadService class.
+
+        Args:
+            agent: Agent processing the threads.
+            max_concurrency: Maximum number of threads processed at once.
+            max_queue: Maximum number of requests waiting for a slot.
+            queue_timeout: Seconds a request waits for a slot.
+            max_body_size: Maximum size of the request body, in bytes.
+            tenant_budgets: Budgets shared by the threads of each tenant, by
+                tenant id.
+            tenant_resolver: Callable getting the tenant id of a request from
+                its ASGI scope. Threads have no tenant if `None`.
+            thread_budget: Ceilings of each thread. Threads have no budget of
+                their own if `None`.
+            allow_remote_media: Whether media messages may reference http(s)
+                URLs, fetched by the agent or the provider.
+
+        """
+        self.agent = agent
+        self.tenant_budgets = tenant_budgets or {}
+        self.tenant_resolver = tenant_resolver
+        self.thread_budget = thread_budget
+        self.allow_remote_media = allow_remote_media
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_body_size = max_body_size
+        self.running = 0
+        self.waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI connection."""
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        routes = {
+            "/health": ("GET", self._health),
+            "/threads/process": ("POST", self._process),
+            "/threads/stream": ("POST", self._stream),
+        }
+        try:
+            route = routes.get(scope["path"].rstrip("/"))
+            if route is None:
+                raise ServiceError(404, "Not found.")
+            method, handler = route
+            if scope["method"] != method:
+                raise ServiceError(405, "Method not allowed.")
+            await handler(scope, receive, send)
+        except ServiceError as e:
+            await self._send_json(send, e.status, {"detail": e.detail}, e.headers)
+
+    def health(self) -> Dict[str, Any]:
+        """Get the load of the service."""
+        return {
+            "status": "ok",
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+        }
+
+    async def _health(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self._send_json(send, 200, self.health())
+
+    async def _process(self, scope: Scope, receive: Receive, send: Send) -> None:
+        thread = await self._read_thread(scope, receive)
+        async with self._slot():
+            try:
+                await thread.aprocess_thread(self.agent)
+            except Exception as e:
+                logger.error(f"Error processing thread '{thread.id}': {e}")
+                raise ServiceError(500, f"Error processing thread: {e}")
+
+        await self._send_json(send, 200, thread.model_dump(mode="json"))
+
+    async def _stream(self, scope: Scope, receive: Receive, send: Send) -> None:
+        thread = await self._read_thread(scope, receive)
+        async with self._slot():
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/event-stream"),
+                        (b"cache-control", b"no-cache"),
+                        (b"x-accel-buffering", b"no"),
+                    ],
+                }
+            )
+            try:
+                async for message in thread.astream_thread(self.agent):
+                    await self._send_event(
+                        send, "message", message.model_dump(mode="json")
+                    )
+                await self._send_event(send, "done", thread.model_dump(mode="json"))
+            except Exception as e:
+                logger.error(f"Error processing thread '{thread.id}': {e}")
+                await self._send_event(
+                    send, "error", {"detail": f"Error processing thread: {e}"}
+                )
+            await send({"type": "http.response.body", "body": b""})
+
+    def _slot(self) -> "_Slot":
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return _Slot(self, self._semaphore)
+
+    async def _read_thread(self, scope: Scope, receive: Receive) -> ThreadBase:
+        body = bytearray()
+        while True:
+            event = await receive()
+            if event["type"] == "http.disconnect":
+                raise ServiceError(400, "Client disconnected.")
+            body.extend(event.get("body", b""))
+            if len(body) > self.max_body_size:
+                raise ServiceError(413, "Request body too large.")
+            if not event.get("more_body", False):
+                break
+
+        try:
+            thread = ThreadBase.model_validate_json(bytes(body))
+        except ValidationError as e:
+            raise ServiceError(
+                422, json.loads(e.json(include_url=False, include_input=False))
+            )
+        self._check_media(thread)
+
+        # clients can't raise their own ceilings or spend another tenant's
+        thread.budget = (
+            Budget(
+                name=self.thread_budget.name,
+                max_tokens=self.thread_budget.max_tokens,
+                max_cost=self.thread_budget.max_cost,
+            )
+            if self.thread_budget
+            else None
+        )
+        thread.tenant_id = self.tenant_resolver(scope) if self.tenant_resolver else None
+        thread.tenant_budget = (
+            self.tenant_budgets.get(thread.tenant_id) if thread.tenant_id else None
+        )
+        return thread
+
+    def _check_media(self, thread: ThreadBase) -> None:
+        for message in thread.messages:
+            if not isinstance(message, MediaMessage):
+                continue
+            if message.media_url.startswith("data:"):
+                continue
+            if not is_remote(message.media_url):
+                raise ServiceError(422, "Media messages can't reference local files.")
+            if not self.allow_remote_media:
+                raise ServiceError(422, "Media messages can't reference remote URLs.")
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            event = await receive()
+            if event["type"] == "lifespan.startup":
+                try:
+                    await self.agent.awarmup()
+                except Exception as e:
+                    logger.error(f"Agent warmup failed: {e}")
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                logger.info("Thread service started.")
+                await send({"type": "lifespan.startup.complete"})
+            elif event["type"] == "lifespan.shutdown":
+                await connection_pools.aclose()
+                logger.info("Thread service stopped.")
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    async def _send_json(
+        send: Send,
+        status: int,
+        content: Any,
+        headers: Optional[List[tuple[bytes, bytes]]] = None,
+    ) -> None:
+        body = json.dumps(content).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    *(headers or []),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _send_event(send: Send, event: str, data: Any) -> None:
+        await send(
+            {
+                "type": "http.response.body",
+                "body": f"event: {event}\ndata: {json.dumps(data)}\n\n".encode(),
+                "more_body": True,
+            }
+        )
+
+
+class _Slot:
+    """Concurrency slot of the service, waiting in the queue if needed."""
+
+    def __init__(self, service: ThreadService, semaphore: asyncio.Semaphore) -> None:
+        self.service = service
+        self.semaphore = semaphore
+
+    async def __aenter__(self) -> None:
+        service = self.service
+        retry_after = [(b"retry-after", str(int(service.queue_timeout)).encode())]
+        if self.semaphore.locked():
+            if service.waiting >= service.max_queue:
+                raise ServiceError(503, "Too many queued threads.", retry_after)
+            service.waiting += 1
+            try:
+                await asyncio.wait_for(
+                    self.semaphore.acquire(), timeout=service.queue_timeout
+                )
+            except asyncio.TimeoutError:
+                raise ServiceError(503, "Timed out waiting for a slot.", retry_after)
+            finally:
+                service.waiting -= 1
+        else:
+            await self.semaphore.acquire()
+        service.running += 1
+
+    async def __aexit__(self, *args: object) -> None:
+        self.service.running -= 1
+        self.semaphore.release()
+
+
+def create_app(
+    agent_factory: AgentFactory,
+    max_concurrency: int = 8,
+    max_queue: int = 64,
+    queue_timeout: float = 30.0,
+    max_body_size: int = 10 * 1024 * 1024,
+    tenant_budgets: Optional[Dict[str, Budget]] = None,
+    tenant_resolver: Optional[TenantResolver] = None,
+    thread_budget: Optional[Budget] = None,
+    allow_remote_media: bool = False,
+) -> ThreadService:
+    """Build the thread service with the agent built by `agent_factory`.
+
+    Args:
+        agent_factory: Callable building the agent, or its `module:attribute`
+            path.
+        max_concurrency: Maximum number of threads processed at once.
+        max_queue: Maximum number of requests waiting for a slot.
+        queue_timeout: Seconds a request waits for a slot.
+        max_body_size: Maximum size of the request body, in bytes.
+        tenant_budgets: Budgets shared by the threads of each tenant, by
+            tenant id.
+        tenant_resolver: Callable getting the tenant id of a request from its
+            ASGI scope.
+        thread_budget: Ceilings of each thread.
+        allow_remote_media: Whether media messages may reference http(s) URLs.
+
+    Returns:
+        app: The ASGI application.
+
+    """
+    return ThreadService(
+        load_agent_factory(agent_factory)(),
+        max_concurrency=max_concurrency,
+        max_queue=max_queue,
+        queue_timeout=queue_timeout,
+        max_body_size=max_body_size,
+        tenant_budgets=tenant_budgets,
+        tenant_resolver=tenant_resolver,
+        thread_budget=thread_budget,
+        allow_remote_media=allow_remote_media,
+    )
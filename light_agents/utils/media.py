@@ -0,0 +1,191 @@
+import base64
+import mimetypes
+import mmap
+import os
+from typing import Iterable, Optional
+from urllib.parse import unquote, urlparse
+
+from pydantic import BaseModel
+
+from light_agents.core.connection_pool import connection_pools
+from light_agents.exceptions.messages_exceptions import (
+    MediaSourceNotAllowedException,
+)
+
+CHUNK_SIZE = 3 * 256 * 1024
+"""Bytes read per chunk on streamed reads, a multiple of 3 for base64."""
+
+MEDIA_POOL = "media"
+"""Name of the connection pool downloading remote media."""
+
+DEFAULT_MEDIA_TYPES = {
+    "image": "image/png",
+    "file": "application/pdf",
+    "audio": "audio/wav",
+    "video": "video/mp4",
+}
+
+
+class MediaPayload(BaseModel):
+    """Media content ready to be serialized for an LLM.
+
+    Attributes:
+        media_type: The MIME type of the media.
+        data: The base64 encoded content, if inlined.
+        url: The remote URL, if the media is passed by reference.
+        filename: The file name, for document inputs.
+
+    """
+
+    media_type: str
+    data: Optional[str] = None
+    url: Optional[str] = None
+    filename: Optional[str] = None
+
+    @property
+    def data_url(self) -> str:
+        """The content as a `data:` URL, or the remote URL."""
+        if self.data is None:
+            return self.url or ""
+        return f"data:{self.media_type};base64,{self.data}"
+
+
+def is_remote(media_url: str) -> bool:
+    """Check if the media is an http(s) URL."""
+    return urlparse(media_url).scheme in ["http", "https"]
+
+
+def local_path(media_url: str) -> str:
+    """Convert a `file://` URL or a plain path into a local path."""
+    parsed = urlparse(media_url)
+    if parsed.scheme == "file":
+        return unquote(parsed.path)
+    return media_url
+
+
+def allowed_local_path(media_url: str, media_root: Optional[str]) -> str:
+    """Get the local path of the media, if it's inside the media root.
+
+    Symbolic links and `..` components are resolved before the check, so
+    they can't escape the root.
+
+    Raises:
+        MediaSourceNotAllowedException: If no media root is configured, or
+            the file is outside of it.
+
+    """
+    if media_root is None:
+        raise MediaSourceNotAllowedException(
+            media_url, "loading local files is disabled (no media root)."
+        )
+    root = os.path.realpath(media_root)
+    path = os.path.realpath(os.path.join(root, local_path(media_url)))
+    if os.path.commonpath([root, path]) != root:
+        raise MediaSourceNotAllowedException(
+            media_url, f"the file is outside of the media root '{media_root}'."
+        )
+    return path
+
+
+def guess_media_type(media_url: str, message_type: str) -> str:
+    """Guess the MIME type from the URL extension, or the message type."""
+    media_type, _ = mimetypes.guess_type(urlparse(media_url).path)
+    return media_type or DEFAULT_MEDIA_TYPES.get(message_type, "")
+
+
+def encode_chunks(chunks: Iterable[bytes]) -> str:
+    """Base64 encode a stream of bytes, without joining the raw bytes first."""
+    encoded = []
+    remainder = b""
+    for chunk in chunks:
+        chunk = remainder + chunk
+        cut = len(chunk) - len(chunk) % 3
+        encoded.append(base64.b64encode(chunk[:cut]))
+        remainder = chunk[cut:]
+    encoded.append(base64.b64encode(remainder))
+    return b"".join(encoded).decode("ascii")
+
+
+def read_file_base64(path: str) -> str:
+    """Base64 encode a local file.
+
+    The file is memory-mapped, so its content is never copied in Python
+    memory. Files that can't be mapped (e.g. empty files or pipes) are read
+    in chunks.
+    """
+    with open(path, "rb") as file:
+        try:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return base64.b64encode(mapped).decode("ascii")
+        except (ValueError, OSError):
+            file.seek(0)
+            return encode_chunks(iter(lambda: file.read(CHUNK_SIZE), b""))
+
+
+def download_base64(url: str, timeout: float = 30.0) -> str:
+    """Base64 encode a remote file, streaming the download.
+
+    The download goes through the shared `media` connection pool.
+    """
+    with connection_pools.client(MEDIA_POOL).stream(
+        "GET", url, timeout=timeout
+    ) as response:
+        response.raise_for_status()
+        return encode_chunks(response.iter_bytes(CHUNK_SIZE))
+
+
+def load_media(
+    media_url: str,
+    message_type: str,
+    media_type: Optional[str] = None,
+    inline_remote: bool = False,
+    media_root: Optional[str] = None,
+) -> MediaPayload:
+    """Load the media of a message.
+
+    Args:
+        media_url: A `data:` URL, an http(s) URL, a `file://` URL or a local
+            path.
+        message_type: The message type, used when the MIME type can't be
+            guessed.
+        media_type: The MIME type, if known.
+        inline_remote: Whether to download http(s) URLs and inline them,
+            for APIs that don't accept media by reference.
+        media_root: The directory local files may be read from. Relative
+            paths are resolved from it. Local files are refused when empty.
+
+    Returns:
+        payload: The loaded media.
+
+    Raises:
+        MediaSourceNotAllowedException: If the media is a local file outside
+            of `media_root`.
+
+    """
+    if media_url.startswith("data:"):
+        header, _, data = media_url.partition(",")
+        if not header.endswith(";base64"):
+            raise ValueError("Only base64 encoded data URLs are supported.")
+        return MediaPayload(
+            media_type=media_type or header[5:].removesuffix(";base64"),
+            data=data,
+        )
+
+    media_type = media_type or guess_media_type(media_url, message_type)
+    filename = os.path.basename(urlparse(media_url).path) or None
+    if is_remote(media_url):
+        if not inline_remote:
+            return MediaPayload(
+                media_type=media_type, url=media_url, filename=filename
+            )
+        return MediaPayload(
+            media_type=media_type,
+            data=download_base64(media_url),
+            filename=filename,
+        )
+
+    return MediaPayload(
+        media_type=media_type,
+        data=read_file_base64(allowed_local_path(media_url, media_root)),
+        filename=filename,
+    )
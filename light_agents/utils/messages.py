@@ -0,0 +1,79 @@
+from typing import Iterator, List, Sequence, Set, Union
+
+from light_agents.schemas.messages_schemas import (
+    Message,
+    MessageBase,
+    ToolUseMessage,
+)
+
+
+def recent_messages_text(messages: Sequence[MessageBase], window: int) -> str:
+    """Join the text of the last `window` messages.
+
+    Text messages contribute their content and tool use messages contribute
+    the tool name. Useful for building retrieval queries from the recent turns
+    of a thread.
+    """
+    texts: List[str] = []
+    for message in messages[-window:] if window > 0 else []:
+        if isinstance(message, Message):
+            texts.append(message.content)
+        elif isinstance(message, ToolUseMessage):
+            texts.append(message.name)
+    return "\n".join(texts)
+
+
+def used_tool_names(messages: Sequence[MessageBase]) -> Set[str]:
+    """Get the names of the tools called in the messages."""
+    return {
+        message.name for message in messages if isinstance(message, ToolUseMessage)
+    }
+
+
+def group_tool_uses(
+    messages: Sequence[MessageBase],
+) -> Iterator[Union[MessageBase, List[ToolUseMessage]]]:
+    """Group the consecutive tool uses requested by the same model response.
+
+    Tool uses are yielded as lists, holding every parallel call of a single
+    turn (or only one call, if the `completion_id` is unknown). Other messages
+    are yielded as they are.
+    """
+    group: List[ToolUseMessage] = []
+    for message in messages:
+        if (
+            group
+            and isinstance(message, ToolUseMessage)
+            and message.completion_id is not None
+            and message.completion_id == group[0].completion_id
+        ):
+            group.append(message)
+            continue
+
+        if group:
+            yield group
+            group = []
+        if isinstance(message, ToolUseMessage):
+            group = [message]
+        else:
+            yield message
+
+    if group:
+        yield group
+
+
+def stitch_text(
+    text: str, continuation: str, min_overlap: int = 16, max_overlap: int = 500
+) -> str:
+    """Append a continuation to a truncated text.
+
+    Models often repeat the last words of the truncated text when asked to
+    continue it. If the continuation starts with at least `min_overlap` (and
+    at most `max_overlap`) characters of the end of the text, the repeated
+    part is dropped.
+    """
+    max_overlap = min(len(text), len(continuation), max_overlap)
+    for overlap in range(max_overlap, min_overlap - 1, -1):
+        if text.endswith(continuation[:overlap]):
+            return text + continuation[overlap:]
+    return text + continuation
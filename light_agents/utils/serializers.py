@@ -14,6 +14,8 @@ def base_serializer(
 
     serialized_messages = []
     for message in messages:
+        if message.compacted:
+            continue
         serialized_messages.append(
             {"content": message.content, "role": message.role.value}
         )
@@ -36,7 +38,7 @@ def role_mapping_serializer(
     serialized_messages = []
     for message in messages:
         converted_role = kwargs["roles_mapping"].get(message.role, None)
-        if converted_role:
+        if converted_role and not message.compacted:
             serialized_messages.append(
                 {"content": message.content, "role": converted_role}
             )
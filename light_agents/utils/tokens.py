@@ -0,0 +1,44 @@
+import json
+from typing import Any, Mapping, Sequence
+
+from light_agents.schemas.messages_schemas import (
+    Message,
+    MessageBase,
+    ToolUseMessage,
+)
+
+CHARS_PER_TOKEN = 4
+"""Rough number of characters per token for english text."""
+
+
+def estimate_message_tokens(message: MessageBase) -> int:
+    """Estimate the number of tokens of a single message.
+
+    It's a cheap approximation based on the characters count, good enough for
+    thresholds. It's not meant for billing.
+    """
+    if isinstance(message, Message):
+        text = message.content
+    elif isinstance(message, ToolUseMessage):
+        text = f"{message.name}{message.input_params_dict}{message.tool_outputs}"
+    else:
+        text = ""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_tokens(messages: Sequence[MessageBase]) -> int:
+    """Estimate the number of tokens of a list of messages."""
+    return sum(estimate_message_tokens(message) for message in messages)
+
+
+def estimate_request_tokens(request: Mapping[str, Any]) -> int:
+    """Estimate the number of input tokens of a provider request.
+
+    Counts what is actually sent: the serialized messages (without the
+    compacted ones), the system prompt and the tool schemas.
+    """
+    sent = {
+        key: request[key] for key in ("system", "messages", "tools") if key in request
+    }
+    text = json.dumps(sent, ensure_ascii=False, default=str)
+    return len(text) // CHARS_PER_TOKEN + 1
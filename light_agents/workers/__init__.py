@@ -0,0 +1,9 @@
+from light_agents.workers.pool import WorkerPool, WorkerStats
+from light_agents.workers.thread_queue import SQLiteThreadQueue, ThreadStatus
+
+__all__ = [
+    "SQLiteThreadQueue",
+    "ThreadStatus",
+    "WorkerPool",
+    "WorkerStats",
+]
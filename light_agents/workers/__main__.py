@@ -0,0 +1,3 @@
+from light_agents.workers.pool import main
+
+main()
@@ -0,0 +1,323 @@
+import argparse
+import importlib
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from multiprocessing.synchronize import Event
+from types import FrameType
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from pydantic import BaseModel
+
+from light_agents.core.blob_store import InMemoryBlobStore
+from light_agents.core.logger_config import setup_logger
+from light_agents.schemas.thread_agent_schema import ThreadAgent
+from light_agents.workers.thread_queue import (
+    DEFAULT_LEASE,
+    DEFAULT_MAX_ATTEMPTS,
+    SQLiteThreadQueue,
+)
+
+logger = setup_logger(__name__)
+
+AgentFactory = Union[str, Callable[[], ThreadAgent]]
+"""Callable building the agent of a worker, or its `module:attribute` path.
+
+Worker processes are spawned, so callables must be importable (module level).
+"""
+
+
+class WorkerStats(BaseModel):
+    """Throughput statistics of a single worker process."""
+
+    worker: str
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    started_at: float
+    reported_at: float
+
+    @property
+    def throughput(self) -> float:
+        """Threads processed per second since the worker started."""
+        elapsed = self.reported_at - self.started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+
+def load_agent_factory(agent_factory: AgentFactory) -> Callable[[], ThreadAgent]:
+    """Resolve a `module:attribute` path into the agent factory."""
+    if callable(agent_factory):
+        return agent_factory
+
+    module_name, _, attribute = agent_factory.partition(":")
+    if not attribute:
+        raise ValueError(
+            f"Invalid agent factory '{agent_factory}'. Expected "
+            "'module:attribute'."
+        )
+    factory: Callable[[], ThreadAgent] = getattr(
+        importlib.import_module(module_name), attribute
+    )
+    return factory
+
+
+def run_worker(
+    worker: str,
+    queue_path: str,
+    agent_factory: AgentFactory,
+    stop_event: Event,
+    stats_queue: "multiprocessing.Queue[WorkerStats]",
+    poll_interval: float,
+    stats_interval: float,
+    lease_timeout: float = DEFAULT_LEASE,
+) -> None:
+    """Process queued threads until `stop_event` is set.
+
+    Runs inside each worker process. The agent is built and warmed up once per
+    process, and each claimed thread goes through `ThreadBase.process_thread`,
+    renewing its lease meanwhile. A thread being processed is always finished
+    before stopping.
+    """
+    # shutdown is coordinated by the pool through `stop_event`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    agent = load_agent_factory(agent_factory)()
+    output_spill = getattr(agent, "output_spill", None)
+    if isinstance(getattr(output_spill, "store", None), InMemoryBlobStore):
+        logger.warning(
+            f"Worker '{worker}' spills the large tool outputs to its memory. "
+            "They can't be read once the thread is claimed by another worker, "
+            "use a FileBlobStore."
+        )
+    agent.warmup()
+    thread_queue = SQLiteThreadQueue(queue_path)
+    now = time.time()
+    stats = WorkerStats(worker=worker, started_at=now, reported_at=now)
+    logger.info(f"Worker '{worker}' started.")
+
+    while not stop_event.is_set():
+        thread = thread_queue.claim(worker, lease_timeout)
+        if thread is None:
+            stop_event.wait(poll_interval)
+        else:
+            started = time.monotonic()
+            try:
+                with thread_queue.hold(thread.id, worker, lease_timeout):
+                    thread.process_thread(agent)
+                stored = thread_queue.complete(thread, worker)
+                stats.processed += 1
+            except Exception as e:
+                logger.error(f"Error processing thread '{thread.id}': {e}")
+                stored = thread_queue.fail(thread.id, repr(e), worker)
+                stats.failed += 1
+            if not stored:
+                logger.warning(
+                    f"Lease of thread '{thread.id}' expired, dropped the result."
+                )
+            stats.busy_seconds += time.monotonic() - started
+
+        if time.time() - stats.reported_at >= stats_interval:
+            stats.reported_at = time.time()
+            stats_queue.put(stats.model_copy())
+
+    stats.reported_at = time.time()
+    stats_queue.put(stats.model_copy())
+    thread_queue.close()
+    logger.info(f"Worker '{worker}' stopped.")
+
+
+class WorkerPool:
+    """Pool of processes consuming threads from a local queue.
+
+    Each process hosts its own agent, built by `agent_factory`, and pulls
+    threads from the `SQLiteThreadQueue` at `queue_path`, so serialization and
+    validation run on every CPU core. SIGINT and SIGTERM stop the pool
+    gracefully: workers finish the thread in progress and exit.
+
+    Workers renew the lease of the thread they process, and the pool puts
+    back in the queue the threads whose lease expired, recovering them from
+    dead or hung workers. A thread is retried at most `max_attempts` times.
+
+    Examples:
+        >>> pool = WorkerPool("threads.db", "my_app.agents:build_agent")
+        >>> stats = pool.run()  # doctest: +SKIP
+
+    """
+
+    def __init__(
+        self,
+        queue_path: str,
+        agent_factory: AgentFactory,
+        processes: Optional[int] = None,
+        poll_interval: float = 0.5,
+        stats_interval: float = 30.0,
+        lease_timeout: float = DEFAULT_LEASE,
+        shutdown_timeout: float = 60.0,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> None:
+        """Initialize the WorkerPool class.
+
+        Args:
+            queue_path: Path of the SQLite queue database.
+            agent_factory: Callable building each worker's agent, or its
+                `module:attribute` path.
+            processes: Number of worker processes. Defaults to the CPU count.
+            poll_interval: Seconds to wait when the queue is empty.
+            stats_interval: Seconds between throughput reports.
+            lease_timeout: Seconds a claimed thread stays leased to its
+                worker without a heartbeat.
+            shutdown_timeout: Seconds to wait for workers when stopping.
+            max_attempts: Claims of a thread before an expired lease marks it
+                as failed.
+
+        """
+        self.queue_path = queue_path
+        self.agent_factory = agent_factory
+        self.processes = processes or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self.stats_interval = stats_interval
+        self.lease_timeout = lease_timeout
+        self.shutdown_timeout = shutdown_timeout
+        self.max_attempts = max_attempts
+        self.stats: Dict[str, WorkerStats] = {}
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._stopped_at: Optional[float] = None
+
+    def stop(self, *args: object) -> None:
+        """Ask every worker to stop after the thread in progress."""
+        if not self._stop_event.is_set():
+            logger.info("Stopping workers.")
+            self._stopped_at = time.monotonic()
+        self._stop_event.set()
+
+    def run(self) -> Dict[str, WorkerStats]:
+        """Start the workers and block until they stop.
+
+        Returns:
+            stats: Last statistics reported by each worker.
+
+        """
+        # creates the database before the workers race for it
+        thread_queue = SQLiteThreadQueue(self.queue_path)
+        stats_queue: "multiprocessing.Queue[WorkerStats]" = self._context.Queue()
+        workers: List[multiprocessing.process.BaseProcess] = [
+            self._context.Process(
+                target=run_worker,
+                name=f"light-agents-worker-{index}",
+                args=(
+                    f"{os.getpid()}-{index}",
+                    self.queue_path,
+                    self.agent_factory,
+                    self._stop_event,
+                    stats_queue,
+                    self.poll_interval,
+                    self.stats_interval,
+                    self.lease_timeout,
+                ),
+            )
+            for index in range(self.processes)
+        ]
+
+        previous_handlers = {
+            signum: signal.signal(signum, self._handle_signal)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            for worker in workers:
+                worker.start()
+            logger.info(f"Started {len(workers)} workers on '{self.queue_path}'.")
+
+            # keeps draining the stats while the workers finish, since a
+            # process can't exit before its queued stats are consumed
+            while any(worker.is_alive() for worker in workers):
+                self._collect_stats(stats_queue, timeout=1.0)
+                if not self._stop_event.is_set():
+                    requeued = thread_queue.requeue_expired(self.max_attempts)
+                    if requeued:
+                        logger.warning(f"Requeued {requeued} expired threads.")
+                if (
+                    self._stopped_at is not None
+                    and time.monotonic() - self._stopped_at > self.shutdown_timeout
+                ):
+                    break
+        finally:
+            self.stop()
+            self._join(workers)
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            self._collect_stats(stats_queue, timeout=0)
+            thread_queue.close()
+
+        self.log_stats()
+        return self.stats
+
+    def log_stats(self) -> None:
+        """Log the throughput of each worker and of the whole pool."""
+        for stats in self.stats.values():
+            logger.info(
+                f"Worker '{stats.worker}': {stats.processed} processed, "
+                f"{stats.failed} failed, {stats.throughput:.2f} threads/s."
+            )
+        total = sum(stats.throughput for stats in self.stats.values())
+        logger.info(f"Pool throughput: {total:.2f} threads/s.")
+
+    def _handle_signal(self, signum: int, frame: Optional[FrameType]) -> None:
+        self.stop()
+
+    def _join(self, workers: Sequence[multiprocessing.process.BaseProcess]) -> None:
+        deadline = (self._stopped_at or time.monotonic()) + self.shutdown_timeout
+        for worker in workers:
+            worker.join(max(deadline - time.monotonic(), 0))
+            if worker.is_alive():
+                logger.warning(f"Terminating worker '{worker.name}'.")
+                worker.terminate()
+                worker.join()
+
+    def _collect_stats(
+        self, stats_queue: "multiprocessing.Queue[WorkerStats]", timeout: float
+    ) -> None:
+        while True:
+            try:
+                stats = stats_queue.get(timeout=timeout)
+            except queue.Empty:
+                return
+            self.stats[stats.worker] = stats
+            logger.debug(
+                f"Worker '{stats.worker}': {stats.throughput:.2f} threads/s."
+            )
+            timeout = 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run a worker pool from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Process queued threads with a pool of worker processes."
+    )
+    parser.add_argument("--queue", required=True, help="SQLite queue path.")
+    parser.add_argument(
+        "--agent-factory",
+        required=True,
+        help="Callable building the agent, as 'module:attribute'.",
+    )
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--stats-interval", type=float, default=30.0)
+    parser.add_argument("--lease-timeout", type=float, default=DEFAULT_LEASE)
+    parser.add_argument("--shutdown-timeout", type=float, default=60.0)
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+    args = parser.parse_args(argv)
+
+    WorkerPool(
+        queue_path=args.queue,
+        agent_factory=args.agent_factory,
+        processes=args.processes,
+        poll_interval=args.poll_interval,
+        stats_interval=args.stats_interval,
+        lease_timeout=args.lease_timeout,
+        shutdown_timeout=args.shutdown_timeout,
+        max_attempts=args.max_attempts,
+    ).run()
@@ -0,0 +1,318 @@
+import sqlite3
+import time
+from contextlib import contextmanager
+from enum import Enum
+from threading import Event, Lock, Thread
+from typing import Dict, Iterator, Optional
+
+from light_agents.core.logger_config import setup_logger
+from light_agents.schemas.thread_schema import ThreadBase
+
+logger = setup_logger(__name__)
+
+DEFAULT_LEASE = 60.0
+"""Seconds a claimed thread stays leased to its worker without a heartbeat."""
+
+DEFAULT_MAX_ATTEMPTS = 3
+"""Claims of a thread before an expired lease marks it as failed."""
+
+
+class ThreadStatus(str, Enum):
+    """Possible status for a queued thread."""
+
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class SQLiteThreadQueue:
+    """Durable local queue of threads, backed by a SQLite database.
+
+    Threads are stored as JSON with their id and status. Workers `claim` the
+    oldest pending thread, process it, and store the result with `complete`
+    or `fail`. Several processes can share the same database file, and a
+    single instance can be shared between threads.
+
+    A claimed thread is leased to its worker for `lease` seconds. Workers
+    renew the lease with `heartbeat` while processing (see `hold`), so a
+    lease only expires when its worker died or hung, and `requeue_expired`
+    puts the thread back in the queue. A thread whose lease expired on each
+    of its `max_attempts` claims likely crashes its worker, so it's marked as
+    failed instead. A worker whose lease expired can't store its result
+    anymore.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0) -> None:
+        """Initialize the SQLiteThreadQueue class."""
+        self.path = path
+        self._lock = Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS threads (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                error TEXT,
+                enqueued_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                lease_expires_at REAL
+            )
+            """
+        )
+        columns = {
+            row[1] for row in self._connection.execute("PRAGMA table_info(threads)")
+        }
+        if "lease_expires_at" not in columns:
+            # databases created before the leases
+            self._connection.execute(
+                "ALTER TABLE threads ADD COLUMN lease_expires_at REAL"
+            )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS threads_status "
+            "ON threads (status, enqueued_at)"
+        )
+
+    def enqueue(self, thread: ThreadBase) -> str:
+        """Add a thread to the queue, or put it back as pending.
+
+        Returns:
+            thread_id: The id of the queued thread.
+
+        """
+        now = time.time()
+        payload = thread.model_dump_json()
+        with self._lock:
+            self._connection.execute(
+                """
+                INSERT INTO threads (id, payload, status, enqueued_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    payload = excluded.payload,
+                    status = excluded.status,
+                    attempts = 0,
+                    error = NULL,
+                    enqueued_at = excluded.enqueued_at,
+                    updated_at = excluded.updated_at
+                """,
+                (thread.id, payload, ThreadStatus.PENDING.value, now, now),
+            )
+        return thread.id
+
+    def claim(self, worker: str, lease: float = DEFAULT_LEASE) -> Optional[ThreadBase]:
+        """Take the oldest pending thread, leasing it to the worker.
+
+        Args:
+            worker: Id of the worker claiming the thread.
+            lease: Seconds the thread stays leased without a heartbeat.
+
+        Returns:
+            thread: The claimed thread, or `None` if the queue is empty.
+
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    "SELECT id, payload FROM threads WHERE status = ? "
+                    "ORDER BY enqueued_at LIMIT 1",
+                    (ThreadStatus.PENDING.value,),
+                ).fetchone()
+                if row is not None:
+                    self._connection.execute(
+                        "UPDATE threads SET status = ?, worker = ?, "
+                        "attempts = attempts + 1, updated_at = ?, "
+                        "lease_expires_at = ? WHERE id = ?",
+                        (
+                            ThreadStatus.PROCESSING.value,
+                            worker,
+                            now,
+                            now + lease,
+                            row[0],
+                        ),
+                    )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+        return ThreadBase.model_validate_json(row[1]) if row else None
+
+    def complete(self, thread: ThreadBase, worker: Optional[str] = None) -> bool:
+        """Store the processed thread, marking it as done.
+
+        Args:
+            thread: The processed thread.
+            worker: If given, the thread is only stored if it is still leased
+                to this worker.
+
+        Returns:
+            stored: Whether the thread was stored.
+
+        """
+        return self._update(
+            thread.id, ThreadStatus.DONE, worker, payload=thread.model_dump_json()
+        )
+
+    def fail(self, thread_id: str, error: str, worker: Optional[str] = None) -> bool:
+        """Mark a thread as failed, keeping the error message.
+
+        Args:
+            thread_id: Id of the failed thread.
+            error: Error message.
+            worker: If given, the thread is only marked if it is still leased
+                to this worker.
+
+        Returns:
+            marked: Whether the thread was marked as failed.
+
+        """
+        return self._update(thread_id, ThreadStatus.FAILED, worker, error=error)
+
+    def heartbeat(self, thread_id: str, worker: str, lease: float) -> bool:
+        """Renew the lease of a thread being processed by the worker.
+
+        Returns:
+            renewed: `False` if the thread isn't leased to the worker anymore,
+                e.g. its lease expired and it was put back in the queue.
+
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.execute(
+                "UPDATE threads SET lease_expires_at = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (now + lease, now, thread_id, worker, ThreadStatus.PROCESSING.value),
+            )
+        return cursor.rowcount == 1
+
+    @contextmanager
+    def hold(
+        self, thread_id: str, worker: str, lease: float = DEFAULT_LEASE
+    ) -> Iterator[None]:
+        """Keep a thread leased to the worker while the block runs.
+
+        The lease is renewed by a background thread, every third of `lease`.
+        """
+        stopped = Event()
+
+        def renew() -> None:
+            while not stopped.wait(lease / 3):
+                if not self.heartbeat(thread_id, worker, lease):
+                    logger.warning(f"Worker '{worker}' lost thread '{thread_id}'.")
+                    return
+
+        renewer = Thread(target=renew, name=f"lease-{thread_id}", daemon=True)
+        renewer.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            renewer.join()
+
+    def get(self, thread_id: str) -> Optional[ThreadBase]:
+        """Load a thread by its id."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT payload FROM threads WHERE id = ?", (thread_id,)
+            ).fetchone()
+        return ThreadBase.model_validate_json(row[0]) if row else None
+
+    def status(self, thread_id: str) -> Optional[ThreadStatus]:
+        """Get the status of a thread by its id."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status FROM threads WHERE id = ?", (thread_id,)
+            ).fetchone()
+        return ThreadStatus(row[0]) if row else None
+
+    def requeue_expired(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """Put back as pending the threads whose lease expired.
+
+        Recovers the threads claimed by workers that died or hung while
+        processing them. Threads already claimed `max_attempts` times are
+        marked as failed instead, so a thread crashing its workers isn't
+        retried forever.
+
+        Returns:
+            count: Number of threads put back in the queue.
+
+        """
+        now = time.time()
+        expired = "WHERE status = ? AND COALESCE(lease_expires_at, 0) < ?"
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                failed = self._connection.execute(
+                    "UPDATE threads SET status = ?, error = ?, updated_at = ?, "
+                    f"lease_expires_at = NULL {expired} AND attempts >= ?",
+                    (
+                        ThreadStatus.FAILED.value,
+                        f"Lease expired on each of {max_attempts} attempts.",
+                        now,
+                        ThreadStatus.PROCESSING.value,
+                        now,
+                        max_attempts,
+                    ),
+                )
+                cursor = self._connection.execute(
+                    "UPDATE threads SET status = ?, worker = NULL, updated_at = ?, "
+                    f"lease_expires_at = NULL {expired}",
+                    (
+                        ThreadStatus.PENDING.value,
+                        now,
+                        ThreadStatus.PROCESSING.value,
+                        now,
+                    ),
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+        if failed.rowcount:
+            logger.error(
+                f"Failed {failed.rowcount} threads whose lease expired on each "
+                f"of {max_attempts} attempts."
+            )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Count the threads by status."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, COUNT(*) FROM threads GROUP BY status"
+            ).fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _update(
+        self,
+        thread_id: str,
+        status: ThreadStatus,
+        worker: Optional[str] = None,
+        payload: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        query = (
+            "UPDATE threads SET status = ?, payload = COALESCE(?, payload), "
+            "error = ?, updated_at = ?, lease_expires_at = NULL WHERE id = ?"
+        )
+        params = [status.value, payload, error, time.time(), thread_id]
+        if worker is not None:
+            query += " AND worker = ? AND status = ?"
+            params += [worker, ThreadStatus.PROCESSING.value]
+        with self._lock:
+            cursor = self._connection.execute(query, params)
+        return cursor.rowcount == 1
@@ -0,0 +1,54 @@
+import os
+from typing import Any, Callable, List, Optional
+
+import pytest
+
+# the OpenAI SDK clients need an API key to be built
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from light_agents.ai_agents.claude_agent import ClaudeAgent  # noqa: E402
+from light_agents.ai_agents.openai_agent import OpenAIAgent  # noqa: E402
+from light_agents.loadtest.runner import attach_provider  # noqa: E402
+from light_agents.loadtest.simulated_provider import SimulatedProvider  # noqa: E402
+from light_agents.schemas import ToolBaseSchema  # noqa: E402
+from light_agents.schemas.messages_schemas import Message  # noqa: E402
+from light_agents.schemas.thread_schema import ThreadBase  # noqa: E402
+from tests.helpers import simulated_provider  # noqa: E402
+
+AGENT_CLASSES = [OpenAIAgent, ClaudeAgent]
+
+
+@pytest.fixture(params=AGENT_CLASSES, ids=lambda cls: cls.__name__)
+def agent_class(request: pytest.FixtureRequest) -> Any:
+    """Run the test with each agent."""
+    return request.param
+
+
+@pytest.fixture
+def make_agent(agent_class: Any) -> Callable[..., Any]:
+    """Build an agent of the parametrized class on a simulated provider."""
+
+    def make(
+        tools: Optional[List[ToolBaseSchema]] = None,
+        provider: Optional[SimulatedProvider] = None,
+        **kwargs: Any,
+    ) -> Any:
+        agent = agent_class(tools=tools or [], **kwargs)
+        attach_provider(agent, provider or simulated_provider())
+        return agent
+
+    return make
+
+
+@pytest.fixture
+def make_thread() -> Callable[..., ThreadBase]:
+    """Build a thread holding a single user message."""
+
+    def make(content: str = "hello", **kwargs: Any) -> ThreadBase:
+        return ThreadBase(
+            type="basic",
+            messages=[Message(content=content, role="user", type="text")],
+            **kwargs,
+        )
+
+    return make
@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from anthropic.types import Message as AnthropicMessage
+from openai.types.chat import ChatCompletion
+
+from light_agents.loadtest.simulated_provider import (
+    LatencyDistribution,
+    SimulatedProvider,
+)
+
+
+def simulated_provider(latency_ms: float = 1.0, **kwargs: Any) -> SimulatedProvider:
+    """Build a fast, reproducible simulated provider."""
+    kwargs.setdefault("seed", 1)
+    kwargs.setdefault("response_words", 5)
+    return SimulatedProvider(
+        latency=LatencyDistribution(kind="constant", median_ms=latency_ms),
+        **kwargs,
+    )
+
+
+class ScriptedCall:
+    """Answers the calls with the scripted responses, recording the requests.
+
+    Exceptions in the script are raised instead of returned.
+    """
+
+    def __init__(self, *responses: Any) -> None:
+        self.responses = list(responses)
+        self.requests: List[Dict[str, Any]] = []
+
+    def create(self, **request: Any) -> Any:
+        self.requests.append(request)
+        response = self.responses.pop(0)
+        if isinstance(response, BaseException):
+            raise response
+        return response
+
+
+def scripted_openai_client(call: ScriptedCall) -> Any:
+    """Build a client with the surface of `openai.OpenAI` on a script."""
+    client = SimpleNamespace(chat=SimpleNamespace(completions=call))
+    client.with_options = lambda **options: client
+    return client
+
+
+def scripted_anthropic_client(call: ScriptedCall) -> Any:
+    """Build a client with the surface of `anthropic.Anthropic` on a script."""
+    client = SimpleNamespace(messages=call)
+    client.with_options = lambda **options: client
+    return client
+
+
+def openai_completion(*choices: Dict[str, Any]) -> ChatCompletion:
+    """Build an OpenAI completion with the given choices.
+
+    Choices are `{"content", "tool_calls", "finish_reason"}` dicts, tool calls
+    being `(id, name, arguments)` tuples.
+    """
+    return ChatCompletion.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [
+                {
+                    "index": index,
+                    "finish_reason": choice.get("finish_reason", "stop"),
+                    "message": {
+                        "role": "assistant",
+                        "content": choice.get("content"),
+                        "tool_calls": [
+                            {
+                                "id": call_id,
+                                "type": "function",
+                                "function": {"name": name, "arguments": arguments},
+                            }
+                            for call_id, name, arguments in choice["tool_calls"]
+                        ]
+                        if choice.get("tool_calls")
+                        else None,
+                    },
+                }
+                for index, choice in enumerate(choices)
+            ],
+        }
+    )
+
+
+def anthropic_message(
+    *content: Dict[str, Any], stop_reason: str = "end_turn"
+) -> AnthropicMessage:
+    """Build an Anthropic message with the given content blocks."""
+    return AnthropicMessage.model_validate(
+        {
+            "id": "msg_1",
+            "type": "message",
+            "role": "assistant",
+            "model": "claude-3-5-sonnet-latest",
+            "content": list(content),
+            "stop_reason": stop_reason,
+            "usage": {"input_tokens": 10, "output_tokens": 10},
+        }
+    )
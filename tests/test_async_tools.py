@@ -0,0 +1,131 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from light_agents.core.tool_registry import ToolRegistry
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import ToolUseMessage
+from tests.helpers import simulated_provider
+
+STATE = {"threads": [], "running": 0, "peak": 0}
+LOCK = threading.Lock()
+RUN_ID = contextvars.ContextVar("run_id", default="")
+
+
+class AsyncLookup(ToolBaseSchema):
+    name: str = "async_lookup"
+    description: str = "Look up a record with an async client."
+    read_only: bool = True
+
+    async def arun(self, **kwargs):
+        STATE["threads"].append(threading.current_thread().name)
+        await asyncio.sleep(0.05)
+        if kwargs.get("key") == "missing":
+            raise KeyError("missing")
+        return ToolResponseSchema(content=f"record {kwargs.get('key')}")
+
+
+class SyncLookup(ToolBaseSchema):
+    name: str = "sync_lookup"
+    description: str = "Look up a record with a blocking client."
+
+    def run(self, **kwargs):
+        with LOCK:
+            STATE["threads"].append(threading.current_thread().name)
+            STATE["running"] += 1
+            STATE["peak"] = max(STATE["peak"], STATE["running"])
+        time.sleep(0.05)
+        with LOCK:
+            STATE["running"] -= 1
+        return ToolResponseSchema(content=f"run {RUN_ID.get()}")
+
+
+class NoRunTool(ToolBaseSchema):
+    name: str = "nothing"
+    description: str = "Does nothing."
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    STATE.update(threads=[], running=0, peak=0)
+
+
+@pytest.fixture
+def registry():
+    registry = ToolRegistry(max_sync_workers=2)
+    registry.register_tools([AsyncLookup(), SyncLookup()])
+    return registry
+
+
+def test_async_tools_run_concurrently_on_the_loop(registry):
+    async def run_all():
+        return await asyncio.gather(
+            *(
+                registry.aexecute_tool("async_lookup", {"key": str(key)})
+                for key in range(10)
+            )
+        )
+
+    started = time.perf_counter()
+    results = asyncio.run(run_all())
+
+    assert time.perf_counter() - started < 0.3
+    assert [result.content for result in results] == [
+        f"record {key}" for key in range(10)
+    ]
+    assert set(STATE["threads"]) == {threading.current_thread().name}
+
+
+def test_sync_tools_are_offloaded_to_the_bounded_pool(registry):
+    async def run_all():
+        RUN_ID.set("run-1")
+        return await asyncio.gather(
+            *(
+                registry.aexecute_tool("sync_lookup", {"call": call})
+                for call in range(4)
+            )
+        )
+
+    results = asyncio.run(run_all())
+
+    # the context of the caller follows the call into the pool
+    assert {result.content for result in results} == {"run run-1"}
+    assert all(name.startswith("sync-tool") for name in STATE["threads"])
+    assert STATE["peak"] == 2
+
+
+def test_async_only_tool_runs_on_the_sync_path(registry):
+    result = registry.execute_tool("async_lookup", {"key": "a"})
+    assert result.content == "record a"
+
+
+def test_async_tool_errors_are_wrapped(registry):
+    with pytest.raises(ValueError, match="Error executing tool 'async_lookup'"):
+        asyncio.run(registry.aexecute_tool("async_lookup", {"key": "missing"}))
+
+
+def test_tool_without_run_is_rejected(registry):
+    with pytest.raises(ValueError, match="must implement `run` or `arun`"):
+        registry.register(NoRunTool())
+
+
+def test_agent_awaits_async_tools(make_agent, make_thread):
+    provider = simulated_provider(
+        tool_call_probability=1.0, max_parallel_tool_calls=2, max_tool_rounds=1
+    )
+    agent = make_agent(tools=[AsyncLookup()], provider=provider)
+    thread = make_thread()
+
+    asyncio.run(thread.aprocess_thread(agent))
+
+    tool_uses = [
+        message for message in thread.messages if isinstance(message, ToolUseMessage)
+    ]
+    assert tool_uses and all(
+        message.tool_outputs.startswith("record") for message in tool_uses
+    )
+    assert set(STATE["threads"]) == {threading.current_thread().name}
+    assert thread.messages[-1].role == "ai"
@@ -0,0 +1,126 @@
+import pytest
+
+from light_agents.core.budget import (
+    Budget,
+    BudgetExceededError,
+    BudgetGuard,
+    StopReason,
+)
+from light_agents.core.tool_registry import RESERVED_KWARGS
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import Message
+from light_agents.utils.tokens import estimate_request_tokens
+
+
+class VerboseTool(ToolBaseSchema):
+    name: str = "lookup"
+    description: str = "Look up a record. " * 1000
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content="found")
+
+
+def test_reservations_are_charged_once_settled():
+    budget = Budget(max_tokens=10_000)
+    guard = BudgetGuard([budget])
+
+    with guard.admit("gpt-4o", input_tokens=1000, max_tokens=4000) as call:
+        # the reservation of a running call limits the next one
+        with pytest.raises(BudgetExceededError):
+            guard.admit("gpt-4o", input_tokens=5000, max_tokens=4000)
+        call.charge(input_tokens=900, output_tokens=100)
+
+    assert budget.used_tokens == 1000
+    assert guard.stop_reason == StopReason.TOKEN_BUDGET
+
+
+def test_max_tokens_is_lowered_to_the_tightest_budget():
+    guard = BudgetGuard([Budget(max_tokens=10_000), Budget(max_tokens=3000)])
+    with guard.admit("gpt-4o", input_tokens=1000, max_tokens=4000) as call:
+        assert call.max_tokens == 2000
+
+
+def test_small_max_tokens_are_admitted():
+    budget = Budget(max_tokens=1000)
+    assert budget.reserve(input_tokens=100, max_output_tokens=16) == 16
+    with pytest.raises(BudgetExceededError):
+        budget.reserve(input_tokens=980, max_output_tokens=16)
+
+
+def test_agents_with_small_max_tokens_run(make_agent, make_thread):
+    thread = make_thread(budget=Budget(max_tokens=10_000))
+    thread.process_thread(make_agent(max_tokens=16))
+
+    assert thread.stop_reason == StopReason.COMPLETED
+    assert thread.messages[-1].role == "ai"
+
+
+def test_external_fields_cant_set_run_kwargs(make_thread):
+    for field in RESERVED_KWARGS:
+        with pytest.raises(ValueError, match=field):
+            make_thread(external_thread_fields={field: None})
+
+    thread = make_thread(external_thread_fields={"user_id": 7})
+    # fields assigned after validation are dropped too
+    thread.external_thread_fields["budget"] = None
+    run_kwargs, budget_guard = thread._run_kwargs()
+    assert run_kwargs["user_id"] == 7
+    assert "budget" not in run_kwargs and budget_guard is None
+
+
+def test_cost_budget():
+    guard = BudgetGuard([Budget(max_cost=0.001)])
+    with pytest.raises(BudgetExceededError) as error:
+        guard.admit("gpt-4o", input_tokens=1000, max_tokens=4000)
+    assert error.value.stop_reason == StopReason.COST_BUDGET
+
+
+def test_request_estimate_counts_tools():
+    request = {"messages": [{"role": "user", "content": "hi"}]}
+    with_tools = {**request, "tools": [{"name": "lookup", "description": "x" * 400}]}
+    assert estimate_request_tokens(with_tools) > estimate_request_tokens(request) + 100
+
+
+def test_thread_budget_is_exhausted(make_agent, make_thread):
+    thread = make_thread(budget=Budget(max_tokens=200))
+    agent = make_agent()
+    thread.process_thread(agent)
+    assert thread.stop_reason == StopReason.COMPLETED
+
+    for _ in range(20):
+        thread.messages.append(Message(content="again", role="user", type="text"))
+        thread.process_thread(agent)
+        if thread.stop_reason != StopReason.COMPLETED:
+            break
+
+    assert thread.stop_reason == StopReason.TOKEN_BUDGET
+    assert thread.messages[-1].content == "again"
+    assert thread.budget.used_tokens <= 200
+
+
+def test_tenant_budget_is_shared(make_agent, make_thread):
+    tenant_budget = Budget(name="tenant", max_tokens=10_000)
+    agent = make_agent()
+    for _ in range(2):
+        thread = make_thread(tenant_id="acme", tenant_budget=tenant_budget)
+        thread.process_thread(agent)
+        assert thread.stop_reason == StopReason.COMPLETED
+    assert tenant_budget.used_tokens > 0
+
+
+def test_compacted_messages_are_not_estimated(make_agent, make_thread):
+    thread = make_thread(budget=Budget(max_tokens=2000))
+    thread.messages.insert(
+        0, Message(content="old " * 10_000, role="user", type="text", compacted=True)
+    )
+    thread.process_thread(make_agent())
+
+    assert thread.stop_reason == StopReason.COMPLETED
+
+
+def test_tool_schemas_are_estimated(make_agent, make_thread):
+    thread = make_thread(budget=Budget(max_tokens=3000))
+    thread.process_thread(make_agent(tools=[VerboseTool()]))
+
+    assert thread.stop_reason == StopReason.TOKEN_BUDGET
+    assert thread.budget.used_tokens == 0
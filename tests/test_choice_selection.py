@@ -0,0 +1,152 @@
+import pytest
+
+from light_agents.ai_agents.openai_agent import OpenAIAgent
+from light_agents.core.choice_selectors import (
+    best_scored,
+    choice_length,
+    first_valid_tool_call,
+    longest_choice,
+)
+from light_agents.core.tool_registry import ToolRegistry
+from light_agents.loadtest.runner import attach_provider
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import Message, ToolUseMessage
+from tests.helpers import (
+    ScriptedCall,
+    openai_completion,
+    scripted_openai_client,
+    simulated_provider,
+)
+
+CALLS = []
+
+
+class LookupTool(ToolBaseSchema):
+    name: str = "lookup"
+    description: str = "Look up an order."
+    order_id: str = ""
+    required: list = ["order_id"]
+
+    def run(self, **kwargs):
+        CALLS.append(kwargs["order_id"])
+        return ToolResponseSchema(content=f"order {kwargs['order_id']} shipped")
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    CALLS.clear()
+
+
+@pytest.fixture
+def registry():
+    registry = ToolRegistry()
+    registry.register_tools([LookupTool()])
+    return registry
+
+
+def tool_choice(arguments, name="lookup"):
+    return {
+        "finish_reason": "tool_calls",
+        "tool_calls": [("call_1", name, arguments)],
+    }
+
+
+def test_first_valid_tool_call_skips_invalid_choices(registry):
+    completion = openai_completion(
+        tool_choice('{"order_id": "1"}', name="unknown"),
+        tool_choice('{"order_id": '),
+        tool_choice("{}"),
+        tool_choice('{"order_id": "42"}'),
+    )
+    assert first_valid_tool_call(completion.choices, registry).index == 3
+
+
+def test_first_valid_tool_call_falls_back_to_text_then_first(registry):
+    completion = openai_completion(
+        tool_choice("{}"),
+        {"content": "", "finish_reason": "stop"},
+        {"content": "It shipped.", "finish_reason": "stop"},
+    )
+    assert first_valid_tool_call(completion.choices, registry).index == 2
+
+    completion = openai_completion(tool_choice("{}"), tool_choice('{"order_id": '))
+    assert first_valid_tool_call(completion.choices, registry).index == 0
+
+
+def test_length_based_selectors():
+    completion = openai_completion(
+        {"content": "short"},
+        {"content": "the longest answer"},
+        tool_choice('{"order_id": "1"}'),
+    )
+    assert choice_length(completion.choices[2]) == len('{"order_id": "1"}')
+    assert longest_choice(completion.choices).index == 1
+    shortest = best_scored(lambda choice: -choice_length(choice))
+    assert shortest(completion.choices).index == 0
+
+
+def test_agent_requests_n_choices_and_keeps_one():
+    call = ScriptedCall(
+        openai_completion({"content": "first"}, {"content": "second, longer"}),
+    )
+    agent = OpenAIAgent(
+        n_choices=2,
+        choice_selector=longest_choice,
+        provider_client=scripted_openai_client(call),
+    )
+
+    messages = agent.agent_run([Message(role="user", type="text", content="hi")])
+
+    assert call.requests[0]["n"] == 2
+    assert [message.content for message in messages] == ["second, longer"]
+
+
+def test_agent_runs_only_the_selected_tool_calls():
+    call = ScriptedCall(
+        openai_completion(tool_choice("{}"), tool_choice('{"order_id": "42"}')),
+        openai_completion({"content": "Order 42 shipped."}),
+    )
+    agent = OpenAIAgent(
+        tools=[LookupTool()],
+        n_choices=2,
+        provider_client=scripted_openai_client(call),
+    )
+
+    messages = agent.agent_run([Message(role="user", type="text", content="42?")])
+
+    assert CALLS == ["42"]
+    tool_uses = [message for message in messages if isinstance(message, ToolUseMessage)]
+    assert len(tool_uses) == 1
+    assert tool_uses[0].tool_outputs == "order 42 shipped"
+    assert messages[-1].content == "Order 42 shipped."
+
+
+def test_agent_on_simulated_provider_gets_n_identical_choices():
+    provider = simulated_provider(tool_call_probability=0.0)
+    selected = []
+
+    def record(choices, tools_registry):
+        selected.append(len(choices))
+        return choices[-1]
+
+    agent = OpenAIAgent(n_choices=3, choice_selector=record)
+    attach_provider(agent, provider)
+    messages = agent.agent_run([Message(role="user", type="text", content="hi")])
+
+    assert selected == [3]
+    assert len(messages) == 1
+
+
+def test_single_choice_skips_the_selector():
+    def fail(choices, tools_registry):
+        raise AssertionError("selector called")
+
+    call = ScriptedCall(openai_completion({"content": "only"}))
+    agent = OpenAIAgent(
+        choice_selector=fail, provider_client=scripted_openai_client(call)
+    )
+
+    messages = agent.agent_run([Message(role="user", type="text", content="hi")])
+
+    assert "n" not in call.requests[0]
+    assert messages[-1].content == "only"
@@ -0,0 +1,181 @@
+import asyncio
+
+import pytest
+
+from light_agents.core.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitState,
+)
+from light_agents.core.tool_registry import ToolRegistry
+from light_agents.schemas import ToolBaseSchema
+from light_agents.schemas.messages_schemas import ToolUseMessage
+from tests.helpers import simulated_provider
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyTool(ToolBaseSchema):
+    name: str = "flaky"
+    description: str = "A tool whose backend is down."
+
+    def run(self, **kwargs):
+        raise RuntimeError("backend down")
+
+
+def breaker(clock, **config):
+    return CircuitBreaker("tool", CircuitBreakerConfig(**config), clock=clock)
+
+
+def test_opens_on_failure_rate():
+    clock = FakeClock()
+    circuit = breaker(clock, min_calls=4, failure_rate=0.5)
+    for failed in (False, True, False):
+        assert circuit.allow()
+        circuit.record(0.01, failed)
+    assert circuit.state == CircuitState.CLOSED
+
+    assert circuit.allow()
+    circuit.record(0.01, True)
+    assert circuit.state == CircuitState.OPEN
+    assert circuit.opened == 1
+    assert not circuit.allow()
+
+
+def test_opens_on_slow_call_rate():
+    circuit = breaker(FakeClock(), min_calls=2, slow_call_seconds=1.0)
+    for _ in range(2):
+        assert circuit.allow()
+        circuit.record(2.0, False)
+    assert circuit.state == CircuitState.OPEN
+
+
+def test_latency_is_ignored_without_threshold():
+    circuit = breaker(FakeClock(), min_calls=2)
+    for _ in range(5):
+        circuit.allow()
+        circuit.record(60.0, False)
+    assert circuit.state == CircuitState.CLOSED
+
+
+def test_half_open_probe_success_closes():
+    clock = FakeClock()
+    circuit = breaker(clock, min_calls=1, open_seconds=10, probes=1)
+    circuit.allow()
+    circuit.record(0.01, True)
+    assert circuit.state == CircuitState.OPEN
+
+    clock.now = 10
+    assert circuit.allow()
+    assert circuit.state == CircuitState.HALF_OPEN
+    # a single probe at a time
+    assert not circuit.allow()
+
+    circuit.record(0.01, False)
+    assert circuit.state == CircuitState.CLOSED
+    assert circuit.allow()
+
+
+def test_half_open_probe_failure_reopens():
+    clock = FakeClock()
+    circuit = breaker(clock, min_calls=1, open_seconds=10)
+    circuit.allow()
+    circuit.record(0.01, True)
+
+    clock.now = 10
+    assert circuit.allow()
+    circuit.record(0.01, True)
+    assert circuit.state == CircuitState.OPEN
+    assert circuit.opened == 2
+    clock.now = 15
+    assert not circuit.allow()
+
+
+def test_released_probe_is_given_back():
+    clock = FakeClock()
+    circuit = breaker(clock, min_calls=1, open_seconds=10)
+    circuit.allow()
+    circuit.record(0.01, True)
+
+    clock.now = 10
+    assert circuit.allow()
+    circuit.release()
+    assert circuit.state == CircuitState.HALF_OPEN
+    assert circuit.allow()
+
+
+def test_registry_fails_fast_and_reports_metrics():
+    registry = ToolRegistry(
+        circuit_breaker=CircuitBreakerConfig(min_calls=2, open_seconds=60)
+    )
+    registry.register(FlakyTool())
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="backend down"):
+            registry.execute_tool("flaky", {})
+
+    response = registry.execute_tool("flaky", {})
+    assert response.is_error and response.unavailable
+    assert "temporarily unavailable" in response.content
+
+    metrics = registry.metrics()["flaky"]
+    assert metrics.calls == 2
+    assert metrics.failures == 2
+    assert metrics.rejected == 1
+    assert metrics.circuit_state == CircuitState.OPEN
+    assert metrics.circuit_opened == 1
+
+
+def test_async_registry_fails_fast():
+    registry = ToolRegistry(circuit_breaker=CircuitBreakerConfig(min_calls=1))
+    registry.register(FlakyTool())
+
+    async def call_twice():
+        with pytest.raises(ValueError):
+            await registry.aexecute_tool("flaky", {})
+        return await registry.aexecute_tool("flaky", {})
+
+    assert asyncio.run(call_twice()).unavailable
+
+
+def test_tool_config_overrides_registry_default():
+    registry = ToolRegistry()
+    registry.register(FlakyTool())
+    registry.register(FlakyTool(name="guarded", circuit_breaker=CircuitBreakerConfig()))
+    assert "flaky" not in registry.circuit_breakers
+    assert "guarded" in registry.circuit_breakers
+    assert registry.metrics()["flaky"].circuit_state is None
+
+
+def test_reregistering_keeps_the_breaker_state():
+    registry = ToolRegistry(circuit_breaker=CircuitBreakerConfig(min_calls=1))
+    registry.register(FlakyTool())
+    with pytest.raises(ValueError):
+        registry.execute_tool("flaky", {})
+
+    registry.register(FlakyTool())
+    assert registry.circuit_breakers["flaky"].state == CircuitState.OPEN
+
+
+def test_open_circuit_does_not_abort_the_run(make_agent, make_thread):
+    registry = ToolRegistry(circuit_breaker=CircuitBreakerConfig(min_calls=1))
+    provider = simulated_provider(
+        tool_call_probability=1.0, max_parallel_tool_calls=1, max_tool_rounds=4
+    )
+    agent = make_agent(tools=[FlakyTool()], provider=provider, tools_registry=registry)
+    thread = make_thread()
+
+    # the default policy aborts the run on the 3rd error of a tool
+    thread.process_thread(agent)
+
+    tool_uses = [m for m in thread.messages if isinstance(m, ToolUseMessage)]
+    assert len(tool_uses) == 4
+    assert all(tool_use.is_error for tool_use in tool_uses)
+    assert "temporarily unavailable" in tool_uses[-1].tool_outputs
+    assert thread.messages[-1].role == "ai"
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from light_agents.core.run_context import RUN_CONTEXT_KWARG
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import Message, ToolUseMessage
+from light_agents.schemas.thread_schema import ThreadBase
+from tests.helpers import simulated_provider
+
+CALL_KWARGS = []
+
+
+class CustomerTool(ToolBaseSchema):
+    name: str = "customer_orders"
+    description: str = "List the orders of the customer."
+
+    def run(self, **kwargs):
+        CALL_KWARGS.append(kwargs)
+        time.sleep(0.005)
+        return ToolResponseSchema(content=f"orders of {kwargs['customer']}")
+
+
+class FailingCall:
+    """Fails the provider calls of the runs asking to fail."""
+
+    def __init__(self, call):
+        self.call = call
+
+    def create(self, **request):
+        if "please fail" in json.dumps(request["messages"]):
+            raise RuntimeError("provider down")
+        return self.call.create(**request)
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    CALL_KWARGS.clear()
+
+
+@pytest.fixture
+def agent(make_agent):
+    provider = simulated_provider(
+        latency_ms=5, tool_call_probability=1.0, max_tool_rounds=1, seed=7
+    )
+    return make_agent(tools=[CustomerTool()], provider=provider)
+
+
+def customer_thread(customer, content="my orders?"):
+    return ThreadBase(
+        type="basic",
+        messages=[Message(role="user", type="text", content=content)],
+        external_thread_fields={"customer": customer},
+    )
+
+
+def tool_outputs(messages):
+    return {
+        message.tool_outputs
+        for message in messages
+        if isinstance(message, ToolUseMessage)
+    }
+
+
+def test_async_runs_of_one_agent_stay_apart(agent):
+    threads = [customer_thread(f"c{index}") for index in range(8)]
+
+    async def run_all():
+        await asyncio.gather(*(thread.aprocess_thread(agent) for thread in threads))
+
+    asyncio.run(run_all())
+
+    for index, thread in enumerate(threads):
+        assert tool_outputs(thread.messages) == {f"orders of c{index}"}
+        assert thread.messages[-1].role == "ai"
+    assert all(RUN_CONTEXT_KWARG not in kwargs for kwargs in CALL_KWARGS)
+
+
+def test_sync_runs_from_threads_stay_apart(agent):
+    def run(customer):
+        messages = [Message(role="user", type="text", content="my orders?")]
+        return agent.agent_run(messages, customer=customer)
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(run, [f"c{index}" for index in range(8)]))
+
+    for index, messages in enumerate(results):
+        assert tool_outputs(messages) == {f"orders of c{index}"}
+        # each run returns only its own messages
+        assert sum(message.role == "ai" for message in messages) == 1
+
+
+def test_failing_run_leaves_the_others_alone(agent):
+    client = agent.async_provider_client
+    if hasattr(client, "messages"):
+        client.messages = FailingCall(client.messages)
+    else:
+        client.chat.completions = FailingCall(client.chat.completions)
+    threads = [customer_thread(f"c{index}") for index in range(4)]
+    failing = customer_thread("c9", content="please fail")
+
+    async def run_all():
+        return await asyncio.gather(
+            *(thread.aprocess_thread(agent) for thread in [*threads, failing]),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run_all())
+
+    assert isinstance(results[-1], RuntimeError)
+    assert len(failing.messages) == 1
+    for index, thread in enumerate(threads):
+        assert tool_outputs(thread.messages) == {f"orders of c{index}"}
+
+
+def test_default_fields_are_not_shared(agent_class):
+    first, second = agent_class(), agent_class()
+    first.tools.append(CustomerTool())
+    assert second.tools == []
+
+    thread, other = customer_thread("c1"), ThreadBase(type="basic")
+    thread.external_thread_fields["extra"] = 1
+    assert other.messages == [] and other.external_thread_fields == {}
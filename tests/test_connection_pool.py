@@ -0,0 +1,115 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from light_agents.ai_agents.openai_agent import OpenAIAgent
+from light_agents.core.connection_pool import (
+    ConnectionPoolConfig,
+    ConnectionPools,
+    LoopClients,
+)
+
+
+def test_sync_client_is_shared():
+    pools = ConnectionPools()
+    assert pools.client("test") is pools.client("test")
+    pools.close()
+
+
+def test_first_configuration_wins():
+    pools = ConnectionPools()
+    config = pools.configure("test", ConnectionPoolConfig(max_connections=5))
+    assert pools.configure("test", ConnectionPoolConfig()) is config
+    assert pools.configure("test").max_connections == 5
+
+
+def test_async_client_per_event_loop():
+    pools = ConnectionPools()
+
+    async def clients():
+        return pools.async_client("test"), pools.async_client("test")
+
+    first, same = asyncio.run(clients())
+    second, _ = asyncio.run(clients())
+    assert first is same
+    assert second is not first
+
+
+def test_async_client_is_rebuilt_after_aclose():
+    pools = ConnectionPools()
+
+    async def close_and_reopen():
+        closed = pools.async_client("test")
+        await pools.aclose()
+        return closed, pools.async_client("test")
+
+    closed, reopened = asyncio.run(close_and_reopen())
+    assert closed.is_closed
+    assert not reopened.is_closed
+
+
+def test_async_client_needs_a_running_loop():
+    with pytest.raises(RuntimeError):
+        ConnectionPools().async_client("test")
+
+
+def test_loop_clients_are_rebuilt_once_closed():
+    pools = ConnectionPools()
+
+    class SdkClient:
+        def __init__(self):
+            self.http_client = pools.async_client("test")
+
+        def is_closed(self):
+            return self.http_client.is_closed
+
+    clients = LoopClients(SdkClient)
+
+    async def use_twice():
+        first = clients.get()
+        assert clients.get() is first
+        await pools.aclose()
+        return first, clients.get()
+
+    first, rebuilt = asyncio.run(use_twice())
+    assert rebuilt is not first
+    assert not rebuilt.is_closed()
+
+
+def test_agent_async_client_follows_the_loop():
+    agent = OpenAIAgent()
+
+    async def agent_client():
+        return agent._async_client()
+
+    first = asyncio.run(agent_client())
+    second = asyncio.run(agent_client())
+    assert first is not second
+    assert first._client is not second._client
+
+
+def test_default_pool_configuration_takes_effect():
+    # in a fresh process: importing the agents must not configure their pools
+    code = """
+from light_agents.ai_agents.claude_agent import ClaudeAgent
+from light_agents.ai_agents.openai_agent import OpenAIAgent
+from light_agents.core.connection_pool import ConnectionPoolConfig, connection_pools
+
+config = ConnectionPoolConfig(read_timeout=42.0, max_connections=7)
+for agent_class in [OpenAIAgent, ClaudeAgent]:
+    agent = agent_class(connection_pool_config=config)
+    client = agent._client()
+    pool = connection_pools.client(agent.connection_pool)
+    print(client.timeout.read, pool._transport._pool._max_connections)
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "OPENAI_API_KEY": "test"},
+    )
+    assert result.stdout.split() == ["42.0", "7"] * 2
@@ -0,0 +1,137 @@
+import pytest
+from openai.types.completion_usage import CompletionUsage
+
+from light_agents.ai_agents.claude_agent import ClaudeAgent
+from light_agents.ai_agents.openai_agent import CONTINUATION_PROMPT, OpenAIAgent
+from light_agents.core.budget import Budget, BudgetGuard
+from light_agents.schemas.messages_schemas import Message
+from light_agents.utils.messages import stitch_text
+from tests.helpers import (
+    ScriptedCall,
+    anthropic_message,
+    openai_completion,
+    scripted_anthropic_client,
+    scripted_openai_client,
+)
+
+REPEATED = "the parcel left the warehouse"
+
+
+def user_message():
+    return Message(role="user", type="text", content="Where is my order?")
+
+
+def truncated(content):
+    return openai_completion({"content": content, "finish_reason": "length"})
+
+
+def test_stitch_drops_the_repeated_words():
+    assert stitch_text(f"Hi, {REPEATED}", f"{REPEATED} today.") == (
+        f"Hi, {REPEATED} today."
+    )
+    # overlaps shorter than min_overlap are kept, they may be a coincidence
+    assert stitch_text("one two", "two three") == "one twotwo three"
+
+
+def test_openai_truncated_answer_is_continued_and_stitched():
+    call = ScriptedCall(
+        truncated(f"Hi, {REPEATED}"),
+        openai_completion({"content": f"{REPEATED} this morning."}),
+    )
+    agent = OpenAIAgent(
+        max_continuations=2, provider_client=scripted_openai_client(call)
+    )
+
+    messages = agent.agent_run([user_message()])
+
+    assert [message.content for message in messages] == [
+        f"Hi, {REPEATED} this morning."
+    ]
+    continuation_request = call.requests[1]["messages"]
+    assert continuation_request[-2]["role"] == "assistant"
+    assert continuation_request[-2]["content"] == f"Hi, {REPEATED}"
+    assert continuation_request[-1]["content"] == CONTINUATION_PROMPT
+
+
+def test_openai_continuations_are_capped():
+    call = ScriptedCall(truncated("one"), truncated(" two"), truncated(" three"))
+    agent = OpenAIAgent(
+        max_continuations=2, provider_client=scripted_openai_client(call)
+    )
+
+    messages = agent.agent_run([user_message()])
+
+    assert len(call.requests) == 3
+    assert messages[-1].content == "one two three"
+
+
+def test_openai_keeps_the_partial_answer_without_continuations():
+    call = ScriptedCall(truncated("one"))
+    agent = OpenAIAgent(provider_client=scripted_openai_client(call))
+
+    messages = agent.agent_run([user_message()])
+
+    assert len(call.requests) == 1
+    assert messages[-1].content == "one"
+
+
+def test_openai_continuation_stops_on_exhausted_budget():
+    first = truncated("one").model_copy(
+        update={
+            "usage": CompletionUsage(
+                prompt_tokens=10, completion_tokens=990, total_tokens=1000
+            )
+        }
+    )
+    call = ScriptedCall(first, truncated(" two"))
+    agent = OpenAIAgent(
+        max_continuations=2, provider_client=scripted_openai_client(call)
+    )
+
+    messages = agent.agent_run(
+        [user_message()], budget=BudgetGuard([Budget(max_tokens=1000)])
+    )
+
+    assert len(call.requests) == 1
+    assert messages[-1].content == "one"
+
+
+def test_claude_truncated_answer_is_prefilled_and_stitched():
+    call = ScriptedCall(
+        anthropic_message(
+            {"type": "text", "text": "Hi, the parcel "}, stop_reason="max_tokens"
+        ),
+        anthropic_message({"type": "text", "text": " left today."}),
+    )
+    agent = ClaudeAgent(
+        max_continuations=1, provider_client=scripted_anthropic_client(call)
+    )
+
+    messages = agent.agent_run([user_message()])
+
+    # the prefill can't end with whitespace
+    assert call.requests[1]["messages"][-1] == {
+        "role": "assistant",
+        "content": "Hi, the parcel",
+    }
+    assert messages[-1].content == "Hi, the parcel left today."
+
+
+@pytest.mark.parametrize("max_continuations", [0, 1])
+def test_claude_tool_calls_are_not_continued(max_continuations):
+    call = ScriptedCall(
+        anthropic_message(
+            {"type": "text", "text": "Checking."},
+            {"type": "tool_use", "id": "toolu_1", "name": "lookup", "input": {}},
+            stop_reason="max_tokens",
+        ),
+    )
+    agent = ClaudeAgent(
+        max_continuations=max_continuations,
+        provider_client=scripted_anthropic_client(call),
+    )
+
+    messages = agent.agent_run([user_message()])
+
+    assert len(call.requests) == 1
+    assert messages[-1].content == "Checking."
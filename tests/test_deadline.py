@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+import pytest
+from openai import OpenAI
+
+from light_agents.core.budget import StopReason
+from light_agents.core.deadline import (
+    DEADLINE_KWARG,
+    Deadline,
+    DeadlineExceededError,
+    bounded_client,
+    check_deadline,
+)
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import ToolUseMessage
+from tests.helpers import simulated_provider
+
+
+class SlowTool(ToolBaseSchema):
+    name: str = "slow"
+    description: str = "A tool slower than the run deadline."
+
+    def run(self, **kwargs):
+        time.sleep(1.0)
+        return ToolResponseSchema(content="done")
+
+
+class AsyncSlowTool(ToolBaseSchema):
+    name: str = "aslow"
+    description: str = "An async tool slower than the run deadline."
+
+    async def arun(self, **kwargs):
+        await asyncio.sleep(1.0)
+        return ToolResponseSchema(content="done")
+
+
+class FastTool(ToolBaseSchema):
+    name: str = "fast"
+    description: str = "A fast tool."
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content="done")
+
+
+def test_deadline_expires():
+    deadline = Deadline(0.05, answer_reserve=0.04)
+    assert not deadline.expired
+    assert not deadline.wrapping_up
+    time.sleep(0.02)
+    assert deadline.wrapping_up
+    time.sleep(0.04)
+    assert deadline.expired
+    assert deadline.remaining() == 0.0
+    with pytest.raises(DeadlineExceededError):
+        deadline.check()
+    assert deadline.stop_reason == StopReason.DEADLINE
+
+
+def test_check_deadline_without_deadline():
+    check_deadline({})
+
+
+def test_bounded_client_disables_retries():
+    client = OpenAI(api_key="test", max_retries=2)
+    assert bounded_client(client, {}) is client
+
+    bounded = bounded_client(client, {DEADLINE_KWARG: Deadline(5)})
+    assert bounded.max_retries == 0
+    assert 0 < bounded.timeout <= 5
+
+
+def test_slow_provider_stops_at_deadline(make_agent, make_thread):
+    # without the deadline, each call would take 3 attempts of 2 seconds
+    provider = simulated_provider(latency_ms=2000, max_retries=2)
+    thread = make_thread()
+
+    started = time.monotonic()
+    thread.process_thread(make_agent(provider=provider), deadline=0.3)
+
+    assert time.monotonic() - started < 1.0
+    assert thread.stop_reason == StopReason.DEADLINE
+    assert len(thread.messages) == 1
+
+
+def test_async_slow_provider_stops_at_deadline(make_agent, make_thread):
+    provider = simulated_provider(latency_ms=2000, max_retries=2)
+    thread = make_thread()
+
+    started = time.monotonic()
+    asyncio.run(thread.aprocess_thread(make_agent(provider=provider), deadline=0.3))
+
+    assert time.monotonic() - started < 1.0
+    assert thread.stop_reason == StopReason.DEADLINE
+
+
+@pytest.mark.parametrize("tool", [SlowTool(), AsyncSlowTool()], ids=["sync", "async"])
+def test_slow_tool_is_abandoned(make_agent, make_thread, tool):
+    provider = simulated_provider(tool_call_probability=1.0, max_parallel_tool_calls=1)
+    agent = make_agent(tools=[tool], provider=provider)
+    thread = make_thread()
+
+    started = time.monotonic()
+    asyncio.run(thread.aprocess_thread(agent, deadline=0.3))
+
+    assert time.monotonic() - started < 0.9
+    assert thread.stop_reason == StopReason.DEADLINE
+    tool_uses = [m for m in thread.messages if isinstance(m, ToolUseMessage)]
+    assert tool_uses and tool_uses[0].is_error
+    assert "timed out" in tool_uses[0].tool_outputs
+
+
+def test_wrap_up_answers_without_tools(make_agent, make_thread):
+    provider = simulated_provider(
+        latency_ms=20, tool_call_probability=1.0, max_tool_rounds=100
+    )
+    agent = make_agent(tools=[FastTool()], provider=provider)
+    thread = make_thread()
+
+    thread.process_thread(agent, deadline=Deadline(1.0, answer_reserve=0.9))
+
+    assert thread.stop_reason == StopReason.COMPLETED
+    assert thread.messages[-1].role == "ai"
+
+
+def test_no_deadline_completes(make_agent, make_thread):
+    thread = make_thread()
+    thread.process_thread(make_agent())
+    assert thread.stop_reason == StopReason.COMPLETED
+    assert len(thread.messages) == 2
@@ -0,0 +1,169 @@
+import asyncio
+
+from light_agents.ai_agents.openai_agent import OpenAIAgent
+from light_agents.core.fan_out import FanOut, SubThread, SubThreadStatus
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import ToolUseMessage
+from tests.helpers import (
+    ScriptedCall,
+    openai_completion,
+    scripted_openai_client,
+    simulated_provider,
+)
+
+
+class FlightsTool(ToolBaseSchema):
+    name: str = "search_flights"
+    description: str = "Search flights."
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content="AF123")
+
+
+class SlowFlightsTool(ToolBaseSchema):
+    name: str = "search_flights"
+    description: str = "Search flights."
+
+    async def arun(self, **kwargs):
+        await asyncio.sleep(0.2)
+        return ToolResponseSchema(content="AF123")
+
+
+class SlowAnswerCall(ScriptedCall):
+    """Answers the calls after `delay` seconds, on the async path."""
+
+    def __init__(self, *responses, delay):
+        super().__init__(*responses)
+        self.delay = delay
+
+    async def create(self, **request):
+        if request.get("tool_choice") == "none":
+            await asyncio.sleep(self.delay)
+        return super().create(**request)
+
+
+class HotelsTool(ToolBaseSchema):
+    name: str = "search_hotels"
+    description: str = "Search hotels."
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content="Hotel du Nord")
+
+
+def test_runs_and_merges_sub_threads(make_agent, make_thread):
+    agent = make_agent()
+    fan_out = FanOut(
+        sub_threads=[
+            SubThread(name="flights", agent=agent, instructions="Find flights."),
+            SubThread(name="hotels", agent=agent, instructions="Find hotels."),
+        ]
+    )
+    thread = make_thread()
+
+    results = fan_out.run(thread)
+
+    assert [result.status for result in results] == [SubThreadStatus.COMPLETED] * 2
+    assert all(result.output for result in results)
+    merged = thread.messages[-1]
+    assert merged.role == "ai"
+    assert '<SUB_THREAD name="flights" status="completed">' in merged.content
+    assert '<SUB_THREAD name="hotels" status="completed">' in merged.content
+    # the parent only gets the merged message
+    assert len(thread.messages) == 2
+
+
+def test_runs_again_in_a_new_loop(make_agent, make_thread):
+    fan_out = FanOut(sub_threads=[SubThread(name="only", agent=make_agent())])
+    thread = make_thread()
+
+    for _ in range(2):
+        results = fan_out.run(thread)
+        assert results[0].status == SubThreadStatus.COMPLETED
+    assert len(thread.messages) == 3
+
+
+def test_sub_threads_get_their_tools(make_agent, make_thread):
+    provider = simulated_provider(
+        tool_call_probability=1.0, max_parallel_tool_calls=1, max_tool_rounds=1
+    )
+    agent = make_agent(tools=[FlightsTool(), HotelsTool()], provider=provider)
+    fan_out = FanOut(
+        sub_threads=[
+            SubThread(name="flights", agent=agent, tools=["search_flights"]),
+            SubThread(name="hotels", agent=agent, tools=["search_hotels"]),
+        ]
+    )
+
+    flights, hotels = fan_out.run(make_thread())
+
+    def tools_used(result):
+        return {
+            message.name
+            for message in result.messages
+            if isinstance(message, ToolUseMessage)
+        }
+
+    assert tools_used(flights) == {"search_flights"}
+    assert tools_used(hotels) == {"search_hotels"}
+
+
+def test_failing_sub_thread_does_not_stop_the_others(make_agent, make_thread):
+    failing = make_agent(provider=simulated_provider(error_rate=1.0))
+    fan_out = FanOut(
+        sub_threads=[
+            SubThread(name="broken", agent=failing),
+            SubThread(name="working", agent=make_agent()),
+        ]
+    )
+    thread = make_thread()
+
+    broken, working = fan_out.run(thread)
+
+    assert broken.status == SubThreadStatus.FAILED
+    assert broken.error
+    assert working.status == SubThreadStatus.COMPLETED
+    assert 'status="failed"' in thread.messages[-1].content
+
+
+def test_slow_sub_thread_times_out(make_agent, make_thread):
+    slow = make_agent(provider=simulated_provider(latency_ms=2000))
+    fan_out = FanOut(
+        sub_threads=[
+            SubThread(name="slow", agent=slow),
+            SubThread(name="fast", agent=make_agent()),
+        ],
+        timeout=0.3,
+    )
+
+    slow_result, fast_result = fan_out.run(make_thread())
+
+    assert slow_result.status == SubThreadStatus.TIMED_OUT
+    assert fast_result.status == SubThreadStatus.COMPLETED
+
+
+def test_slow_sub_thread_still_wraps_up(make_thread):
+    call = SlowAnswerCall(
+        openai_completion(
+            {
+                "tool_calls": [("call-1", "search_flights", "{}")],
+                "finish_reason": "tool_calls",
+            }
+        ),
+        openai_completion({"content": "Flight AF123, more results pending."}),
+        # the wrap-up answer lands just past the deadline
+        delay=0.3,
+    )
+    agent = OpenAIAgent(
+        tools=[SlowFlightsTool()], async_provider_client=scripted_openai_client(call)
+    )
+    fan_out = FanOut(
+        sub_threads=[SubThread(name="flights", agent=agent)],
+        timeout=0.4,
+        answer_reserve=0.3,
+    )
+
+    (result,) = fan_out.run(make_thread())
+
+    assert call.requests[-1]["tool_choice"] == "none"
+    assert result.status == SubThreadStatus.COMPLETED
+    assert result.output == "Flight AF123, more results pending."
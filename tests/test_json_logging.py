@@ -0,0 +1,136 @@
+import asyncio
+import io
+import json
+import logging
+import sys
+import threading
+
+import pytest
+
+from light_agents.core.logger_config import (
+    JsonFormatter,
+    disable_json_logging,
+    enable_json_logging,
+    log_context,
+    setup_logger,
+)
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from tests.helpers import simulated_provider
+
+logger = setup_logger("light_agents.tests.json_logging")
+
+
+class LoggingTool(ToolBaseSchema):
+    name: str = "lookup"
+    description: str = "Look up an order."
+
+    def run(self, **kwargs):
+        logger.info("tool ran")
+        return ToolResponseSchema(content="shipped")
+
+
+class BlockedStream(io.StringIO):
+    """Stream whose writes wait until it is released."""
+
+    def __init__(self):
+        super().__init__()
+        self.released = threading.Event()
+
+    def write(self, text):
+        self.released.wait(5)
+        return super().write(text)
+
+
+@pytest.fixture(autouse=True)
+def console_logs():
+    yield
+    disable_json_logging()
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_formatter_writes_one_json_line():
+    try:
+        raise KeyError("order")
+    except KeyError:
+        record = logging.LogRecord(
+            "light_agents.x", logging.ERROR, __file__, 1, "failed %s", ("a",), None
+        )
+        record.exc_info = sys.exc_info()
+
+    line = json.loads(JsonFormatter().format(record))
+
+    assert line["level"] == "ERROR"
+    assert line["logger"] == "light_agents.x"
+    assert line["message"] == "failed a"
+    assert "KeyError: 'order'" in line["exception"]
+    assert line["time"].endswith("+00:00")
+
+
+def test_package_logs_go_to_the_sink_with_their_context():
+    stream = io.StringIO()
+    enable_json_logging(stream)
+
+    with log_context(run_id="run-1", thread_id="thread-1"):
+        logger.info("inside %s", "context")
+    logger.warning("outside")
+    disable_json_logging()
+
+    inside, outside = lines(stream)
+    assert (inside["message"], inside["run_id"], inside["thread_id"]) == (
+        "inside context",
+        "run-1",
+        "thread-1",
+    )
+    assert (outside["run_id"], outside["thread_id"]) == (None, None)
+
+
+def test_disabling_restores_the_console_and_keeps_user_handlers():
+    user_handler = logging.NullHandler()
+    logger.addHandler(user_handler)
+    handler = enable_json_logging(io.StringIO())
+    assert handler in logger.handlers
+
+    disable_json_logging()
+
+    assert handler not in logger.handlers
+    assert user_handler in logger.handlers
+    assert any(isinstance(h, logging.StreamHandler) for h in logger.handlers)
+    logger.removeHandler(user_handler)
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    stream = BlockedStream()
+    handler = enable_json_logging(stream, queue_size=2)
+
+    order = {"status": "pending"}
+    for index in range(10):
+        logger.info("record %s %s", index, order)
+    order["status"] = "changed"
+
+    assert handler.dropped >= 7
+    stream.released.set()
+    disable_json_logging()
+
+    written = lines(stream)
+    assert 0 < len(written) == 10 - handler.dropped
+    # messages are rendered when logged, not when written
+    assert all("pending" in line["message"] for line in written)
+
+
+def test_tool_logs_carry_the_thread_and_run_ids(make_agent, make_thread):
+    stream = io.StringIO()
+    enable_json_logging(stream)
+    provider = simulated_provider(tool_call_probability=1.0, max_tool_rounds=1)
+    agent = make_agent(tools=[LoggingTool()], provider=provider)
+    thread = make_thread()
+
+    asyncio.run(thread.aprocess_thread(agent))
+    disable_json_logging()
+
+    tool_lines = [line for line in lines(stream) if line["message"] == "tool ran"]
+    assert tool_lines
+    assert {line["thread_id"] for line in tool_lines} == {thread.id}
+    assert all(line["run_id"] for line in tool_lines)
@@ -0,0 +1,120 @@
+import asyncio
+import json
+
+import pytest
+
+from light_agents.ai_agents.openai_agent import OpenAIAgent
+from light_agents.loadtest.runner import (
+    attach_provider,
+    load_corpus,
+    main,
+    percentile,
+    run_load_test,
+    user_turns,
+)
+from light_agents.schemas.messages_schemas import Message
+from light_agents.schemas.thread_schema import ThreadBase
+from tests.helpers import simulated_provider
+
+
+def recorded_thread():
+    return ThreadBase(
+        type="basic",
+        messages=[
+            Message(role="user", type="text", content="Where is my order?"),
+            Message(role="ai", type="text", content="It shipped."),
+            Message(role="user", type="text", content="When will it arrive?"),
+            Message(role="ai", type="text", content="Tomorrow."),
+        ],
+    )
+
+
+def build_agent():
+    return OpenAIAgent()
+
+
+def test_percentile_by_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert [percentile(values, q) for q in (50, 95, 99)] == [50.0, 95.0, 99.0]
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+def test_user_turns_replay_each_user_message():
+    turns = user_turns(recorded_thread())
+    assert [[message.content for message in turn.messages] for turn in turns] == [
+        ["Where is my order?"],
+        ["Where is my order?", "It shipped.", "When will it arrive?"],
+    ]
+
+
+def test_load_corpus_reads_json_lines(tmp_path):
+    path = tmp_path / "corpus.jsonl"
+    path.write_text(recorded_thread().model_dump_json() + "\n\n")
+    assert [len(thread.messages) for thread in load_corpus(str(path))] == [4]
+
+
+def test_levels_replay_every_turn(make_agent):
+    agent = make_agent()
+    reports = asyncio.run(
+        run_load_test(agent, [recorded_thread()], [1, 3], threads_per_worker=2)
+    )
+
+    assert [(report.concurrency, report.threads) for report in reports] == [
+        (1, 2),
+        (3, 6),
+    ]
+    assert [report.turns for report in reports] == [4, 12]
+    assert all(report.errors == 0 for report in reports)
+    assert all(report.p50_latency <= report.p99_latency for report in reports)
+    assert all(report.memory_per_thread is not None for report in reports)
+
+
+def test_failed_turns_are_counted(make_agent):
+    agent = make_agent(provider=simulated_provider(error_rate=1.0))
+    (report,) = asyncio.run(
+        run_load_test(agent, [recorded_thread()], [2], trace_memory=False)
+    )
+
+    assert report.errors == report.turns == 16
+    assert report.p50_latency == 0.0
+    assert report.peak_memory is None
+
+
+def test_empty_corpus_and_unknown_agents_are_rejected(make_agent):
+    with pytest.raises(ValueError, match="no threads"):
+        asyncio.run(run_load_test(make_agent(), [], [1]))
+    with pytest.raises(ValueError, match="provider client"):
+        attach_provider(object(), simulated_provider())
+
+
+def test_cli_writes_the_reports(tmp_path, capsys):
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text(recorded_thread().model_dump_json() + "\n")
+    output = tmp_path / "reports.json"
+
+    main(
+        [
+            "--corpus",
+            str(corpus),
+            "--agent-factory",
+            "tests.test_loadtest:build_agent",
+            "--concurrency",
+            "1,2",
+            "--threads-per-worker",
+            "1",
+            "--latency",
+            "constant",
+            "--latency-median-ms",
+            "1",
+            "--seed",
+            "1",
+            "--no-memory",
+            "--output",
+            str(output),
+        ]
+    )
+
+    reports = json.loads(output.read_text())
+    assert [report["turns"] for report in reports] == [2, 4]
+    assert "concurrency=2 turns=4 errors=0" in capsys.readouterr().out
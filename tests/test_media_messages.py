@@ -0,0 +1,202 @@
+import base64
+
+import pytest
+
+from light_agents.config import appSettings
+from light_agents.exceptions.messages_exceptions import (
+    MediaSourceNotAllowedException,
+    MessageRoleNotSupportedException,
+)
+from light_agents.schemas.messages_schemas import MediaMessage
+from light_agents.serializers.messages.claude_messages_serializers import (
+    claude_messages_list_serializer,
+)
+from light_agents.serializers.messages.openai_messages_serializer import (
+    openai_messages_list_serializer,
+)
+from light_agents.utils.media import encode_chunks, load_media, read_file_base64
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+PNG_BASE64 = base64.b64encode(PNG).decode("ascii")
+
+
+@pytest.fixture(autouse=True)
+def media_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(appSettings, "MEDIA_ROOT", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / "chart.png"
+    path.write_bytes(PNG)
+    return path
+
+
+def image_message(media_url, **kwargs):
+    kwargs.setdefault("role", "user")
+    return MediaMessage(type="image", content="", media_url=str(media_url), **kwargs)
+
+
+def test_chunked_encoding_matches_whole_encoding():
+    chunks = [PNG[:5], PNG[5:6], PNG[6:700], PNG[700:]]
+    assert encode_chunks(chunks) == PNG_BASE64
+    assert encode_chunks([]) == ""
+
+
+def test_local_files_are_read_mapped_or_in_chunks(tmp_path, image_path):
+    assert read_file_base64(str(image_path)) == PNG_BASE64
+    empty = tmp_path / "empty.pdf"
+    empty.write_bytes(b"")
+    assert read_file_base64(str(empty)) == ""
+
+
+def test_load_media_sources(image_path):
+    payload = load_media(
+        image_path.as_uri(), "image", media_root=str(image_path.parent)
+    )
+    assert (payload.media_type, payload.data, payload.filename) == (
+        "image/png",
+        PNG_BASE64,
+        "chart.png",
+    )
+
+    data_url = f"data:image/jpeg;base64,{PNG_BASE64}"
+    assert load_media(data_url, "image").data_url == data_url
+
+    remote = load_media("https://example.com/report", "file")
+    assert (remote.url, remote.data, remote.media_type) == (
+        "https://example.com/report",
+        None,
+        "application/pdf",
+    )
+
+    with pytest.raises(ValueError, match="base64"):
+        load_media("data:text/plain,hello", "file")
+
+
+def test_local_files_are_read_from_the_media_root_only(tmp_path, image_path):
+    outside = tmp_path.parent / "outside.png"
+    outside.write_bytes(PNG)
+    (tmp_path / "link.png").symlink_to(outside)
+    root = str(tmp_path)
+
+    assert load_media("chart.png", "image", media_root=root).data == PNG_BASE64
+    with pytest.raises(MediaSourceNotAllowedException, match="disabled"):
+        load_media(str(image_path), "image")
+    for media_url in [str(outside), outside.as_uri(), "../outside.png", "link.png"]:
+        with pytest.raises(MediaSourceNotAllowedException, match="outside"):
+            load_media(media_url, "image", media_root=root)
+
+
+def test_media_messages_use_the_configured_root(monkeypatch, image_path):
+    monkeypatch.setattr(appSettings, "MEDIA_ROOT", None)
+    with pytest.raises(MediaSourceNotAllowedException):
+        openai_messages_list_serializer([image_message(image_path)])
+
+
+def test_payload_is_loaded_once_per_message(image_path):
+    message = image_message(image_path)
+    first = openai_messages_list_serializer([message])
+    image_path.unlink()
+
+    assert openai_messages_list_serializer([message]) == first
+    assert (
+        claude_messages_list_serializer([message])[0]["content"][0]["source"]["data"]
+        == PNG_BASE64
+    )
+    with pytest.raises(FileNotFoundError):
+        openai_messages_list_serializer([image_message(image_path)])
+
+
+def test_openai_media_blocks(image_path):
+    serialized = openai_messages_list_serializer(
+        [
+            MediaMessage(
+                role="user",
+                type="image",
+                content="What is it?",
+                media_url=str(image_path),
+            ),
+            image_message("https://example.com/cat.jpg"),
+            MediaMessage(
+                role="user",
+                type="file",
+                content="",
+                media_url="report.pdf",
+                file_id="file-1",
+            ),
+        ]
+    )
+
+    assert serialized[0]["content"] == [
+        {"type": "text", "text": "What is it?"},
+        {
+            "type": "image_url",
+            "image_url": {"url": f"data:image/png;base64,{PNG_BASE64}"},
+        },
+    ]
+    assert serialized[1]["content"][0]["image_url"]["url"] == (
+        "https://example.com/cat.jpg"
+    )
+    assert serialized[2]["content"] == [{"type": "file", "file": {"file_id": "file-1"}}]
+
+
+def test_openai_rejects_media_from_the_assistant(image_path):
+    with pytest.raises(MessageRoleNotSupportedException):
+        openai_messages_list_serializer([image_message(image_path, role="ai")])
+
+
+def test_claude_media_blocks(tmp_path, image_path):
+    pdf = tmp_path / "invoice.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    serialized = claude_messages_list_serializer(
+        [
+            MediaMessage(
+                role="user",
+                type="image",
+                content="Describe it.",
+                media_url=str(image_path),
+            ),
+            MediaMessage(role="user", type="file", content="", media_url=str(pdf)),
+            # unsupported media are dropped, not sent
+            image_message(image_path, role="ai"),
+            MediaMessage(role="user", type="audio", content="", media_url=str(pdf)),
+        ]
+    )
+
+    assert serialized == [
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": "image/png",
+                        "data": PNG_BASE64,
+                    },
+                },
+                {"type": "text", "text": "Describe it."},
+            ],
+        },
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "document",
+                    "source": {
+                        "type": "base64",
+                        "media_type": "application/pdf",
+                        "data": base64.b64encode(b"%PDF-1.4").decode("ascii"),
+                    },
+                }
+            ],
+        },
+    ]
+
+
+def test_agents_run_on_media_messages(make_agent, image_path):
+    agent = make_agent()
+    messages = agent.agent_run([image_message(image_path)])
+    assert messages[-1].role == "ai"
@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from light_agents.core.message_index import MessageIndex, MessageList, message_index
+from light_agents.schemas.messages_schemas import Message, ToolUseMessage
+from light_agents.schemas.thread_schema import ThreadBase
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def text(role, content, minute=0):
+    return Message(
+        role=role,
+        type="text",
+        content=content,
+        timestamp=START + timedelta(minutes=minute),
+    )
+
+
+def tool_use(run_id, name="lookup"):
+    return ToolUseMessage(
+        role="tool_use", type="text", run_id=run_id, name=name, input_params_dict={}
+    )
+
+
+def conversation():
+    return [
+        text("system", "Be brief."),
+        text("user", "Order 1?", 1),
+        tool_use("call_1"),
+        text("ai", "Shipped.", 3),
+        text("user", "Order 2?", 4),
+        tool_use("call_2"),
+        tool_use("call_3", name="refund"),
+        text("ai", "Refunded.", 6),
+    ]
+
+
+def contents(view):
+    return [getattr(message, "run_id", None) or message.content for message in view]
+
+
+def test_lookups_by_role_run_id_and_tool():
+    index = MessageIndex(conversation())
+
+    assert contents(index.by_role("user")) == ["Order 1?", "Order 2?"]
+    assert index.first("ai").content == "Shipped."
+    assert index.last("ai").content == "Refunded."
+    assert index.last("missing") is None
+    assert index.tool_use("call_2").name == "lookup"
+    assert index.tool_use("call_9") is None
+    assert contents(index.tool_uses("lookup")) == ["call_1", "call_2"]
+
+
+def test_windows_by_turn_and_time():
+    index = MessageIndex(conversation())
+
+    assert contents(index.last_turns(1)) == [
+        "Order 2?",
+        "call_2",
+        "call_3",
+        "Refunded.",
+    ]
+    # the system message comes before the first turn
+    assert len(index.last_turns(5)) == 7
+    assert len(index.last_turns(0)) == 0
+    # tool uses have no timestamp, they follow the previous message
+    assert contents(index.since(START + timedelta(minutes=5))) == ["Refunded."]
+    assert contents(index.since(START + timedelta(minutes=4))) == [
+        "Order 2?",
+        "call_2",
+        "call_3",
+        "Refunded.",
+    ]
+    assert len(index.since(START + timedelta(hours=1))) == 0
+
+
+def test_out_of_order_timestamps_are_scanned():
+    messages = conversation()
+    messages.append(text("user", "Late import", minute=-10))
+    messages.append(text("ai", "Ok.", minute=7))
+    index = MessageIndex(messages)
+
+    assert contents(index.since(START + timedelta(minutes=6))) == [
+        "Refunded.",
+        "Late import",
+        "Ok.",
+    ]
+
+
+def test_appends_are_indexed_and_views_keep_their_length():
+    messages = conversation()
+    index = MessageIndex(messages)
+    users = index.by_role("user")
+
+    messages.append(text("user", "Order 3?", 7))
+
+    assert len(users) == 2
+    assert contents(index.by_role("user"))[-1] == "Order 3?"
+    assert contents(index.last_turns(1)) == ["Order 3?"]
+
+
+def test_inserts_and_removals_rebuild_the_index():
+    messages = conversation()
+    index = MessageIndex(messages)
+    index.sync()
+
+    messages.insert(1, text("user", "Hello", 0))
+    assert index.first("user").content == "Hello"
+
+    del messages[-4:]
+    assert index.tool_use("call_3") is None
+    assert index.last("ai").content == "Shipped."
+
+
+def test_view_indexing():
+    view = MessageIndex(conversation()).by_role("ai")
+
+    assert view[-1].content == "Refunded."
+    assert contents(view[:1]) == ["Shipped."]
+    assert view[:1].positions == [3]
+    with pytest.raises(IndexError):
+        view[2]
+
+
+def test_message_list_carries_its_index():
+    messages = MessageList(conversation())
+    assert message_index(messages) is message_index(messages)
+    assert message_index(conversation()) is not message_index(conversation())
+
+
+def test_thread_windows(make_agent):
+    thread = ThreadBase(type="basic", messages=conversation())
+    assert contents(thread.last_turns(1))[0] == "Order 2?"
+
+    thread.add_message(text("user", "Order 3?", 7))
+    thread.process_thread(make_agent())
+
+    assert thread.index.last("user").content == "Order 3?"
+    assert thread.index.last("ai") is thread.messages[-1]
+    assert (
+        contents(thread.messages_since(START + timedelta(minutes=7)))[0] == "Order 3?"
+    )
@@ -0,0 +1,125 @@
+from light_agents.core.blob_store import FileBlobStore, InMemoryBlobStore
+from light_agents.core.output_spill import (
+    READ_TOOL_OUTPUT,
+    OutputSpillPolicy,
+    ReadToolOutput,
+)
+from light_agents.core.tool_registry import ToolRegistry
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import ToolUseMessage
+from tests.helpers import simulated_provider
+
+OUTPUT = "".join(f"{index:04d}" for index in range(250))
+"""A tool output of 1000 characters."""
+
+
+class ReportTool(ToolBaseSchema):
+    name: str = "report"
+    description: str = "Build a long report."
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content=OUTPUT)
+
+
+def tool_message():
+    return ToolUseMessage(
+        role="tool_use",
+        type="text",
+        content="",
+        run_id="call_1",
+        name="report",
+        input_params_dict={},
+    )
+
+
+def test_short_output_is_kept_inline():
+    message = tool_message()
+    OutputSpillPolicy(max_inline_chars=1000).spill(
+        message, ToolResponseSchema(content=OUTPUT)
+    )
+    assert message.tool_outputs == OUTPUT
+    assert message.output_blob_id is None
+
+
+def test_long_output_is_spilled():
+    store = InMemoryBlobStore()
+    message = tool_message()
+    OutputSpillPolicy(max_inline_chars=999, preview_chars=100, store=store).spill(
+        message, ToolResponseSchema(content=OUTPUT)
+    )
+
+    assert message.tool_outputs.startswith(OUTPUT[:100] + "\n<TRUNCATED>")
+    assert f'blob_id="{message.output_blob_id}"' in message.tool_outputs
+    assert store.get(message.output_blob_id) == OUTPUT
+
+
+def test_pages_announce_the_rest():
+    store = InMemoryBlobStore()
+    blob_id = store.put(OUTPUT)
+    tool = ReadToolOutput(store, page_chars=300)
+
+    page = tool.run(blob_id=blob_id, offset=100).content
+    assert page.startswith(OUTPUT[100:400] + "\n<MORE>")
+    assert "offset=400" in page
+
+
+def test_last_page_filling_the_length_ends_the_output():
+    store = InMemoryBlobStore()
+    blob_id = store.put(OUTPUT)
+    tool = ReadToolOutput(store, page_chars=500)
+
+    assert tool.run(blob_id=blob_id, offset=500).content == OUTPUT[500:]
+    assert tool.run(blob_id=blob_id, offset=900).content == OUTPUT[900:]
+
+
+def test_unknown_blob():
+    response = ReadToolOutput(InMemoryBlobStore(), page_chars=100).run(
+        blob_id="missing", offset=0
+    )
+    assert response.is_error
+
+
+def test_file_store_pages(tmp_path):
+    store = FileBlobStore(str(tmp_path))
+    blob_id = store.put(OUTPUT)
+
+    assert FileBlobStore(str(tmp_path)).read(blob_id, 996, 10) == OUTPUT[996:]
+    assert store.get("../../etc/passwd") is None
+
+
+def test_agents_sharing_a_registry_read_every_store(agent_class):
+    registry = ToolRegistry()
+    first_store, second_store = InMemoryBlobStore(), InMemoryBlobStore()
+    first = agent_class(
+        tools_registry=registry, output_spill=OutputSpillPolicy(store=first_store)
+    )
+    second = agent_class(
+        tools_registry=registry, output_spill=OutputSpillPolicy(store=second_store)
+    )
+    blob_id = first_store.put(OUTPUT)
+
+    assert first._paging_tool is second._paging_tool
+    assert registry.get_tool(READ_TOOL_OUTPUT).stores == [first_store, second_store]
+    response = registry.execute_tool(READ_TOOL_OUTPUT, {"blob_id": blob_id})
+    assert response.content.startswith(OUTPUT[:100])
+
+
+def test_spilled_output_is_paged_by_the_model(make_agent, make_thread):
+    provider = simulated_provider(
+        tool_call_probability=1.0, max_parallel_tool_calls=1, max_tool_rounds=1
+    )
+    agent = make_agent(
+        tools=[ReportTool()],
+        provider=provider,
+        output_spill=OutputSpillPolicy(
+            max_inline_chars=500, preview_chars=50, store=InMemoryBlobStore()
+        ),
+    )
+    thread = make_thread()
+    thread.process_thread(agent)
+
+    tool_use = next(m for m in thread.messages if isinstance(m, ToolUseMessage))
+    assert len(tool_use.tool_outputs) < len(OUTPUT)
+    assert tool_use.output_blob_id
+    tools = agent.select_tools(thread.messages)
+    assert READ_TOOL_OUTPUT in [tool.name for tool in tools]
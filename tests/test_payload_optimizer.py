@@ -0,0 +1,132 @@
+from light_agents.ai_agents.openai_agent import OpenAIAgent
+from light_agents.core.payload_optimizer import PayloadOptimizer, trim_text, wire_size
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import Message
+from light_agents.schemas.thread_schema import ThreadBase
+from tests.helpers import ScriptedCall, openai_completion, scripted_openai_client
+
+OPENAI_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "lookup",
+        "description": (
+            "\n        Look up an order.\n\n\n        Returns its status.\n    "
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "order_id": {"type": "string", "description": "Look up an order."},
+                "verbose": {"type": "boolean", "description": None},
+                "items": {
+                    "type": "array",
+                    "items": {"type": "string", "description": "  An item.  "},
+                },
+            },
+        },
+    },
+}
+
+
+class LookupTool(ToolBaseSchema):
+    name: str = "lookup"
+    description: str = """
+        Look up an order.
+
+        Returns its status.
+    """
+    order_id: str = ""
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content="shipped")
+
+
+def test_trim_text_keeps_single_line_breaks():
+    assert trim_text("  a   b \n\n\n   c  ") == "a b\n\nc"
+    assert trim_text("   ") == ""
+
+
+def test_wire_size_counts_utf8_bytes():
+    assert wire_size({"a": "é"}) == len('{"a":"é"}'.encode("utf-8"))
+
+
+def test_single_text_blocks_become_strings():
+    messages = [
+        {"role": "user", "content": [{"type": "text", "text": "hi"}]},
+        {
+            "role": "user",
+            "content": [{"type": "text", "text": "a"}, {"type": "text", "text": "b"}],
+        },
+        {"role": "user", "content": [{"type": "image_url", "image_url": {"url": "x"}}]},
+        {"role": "tool", "content": "done", "tool_call_id": "call_1"},
+    ]
+
+    optimized = PayloadOptimizer().optimize_messages(messages)
+
+    assert optimized[0] == {"role": "user", "content": "hi"}
+    assert optimized[1:] == messages[1:]
+    assert (
+        PayloadOptimizer(compact_content=False).optimize_messages(messages) == messages
+    )
+
+
+def test_tool_descriptions_are_trimmed_and_deduplicated():
+    function = PayloadOptimizer().optimize_tool(OPENAI_TOOL)["function"]
+
+    assert function["description"] == "Look up an order.\n\nReturns its status."
+    properties = function["parameters"]["properties"]
+    assert "description" not in properties["verbose"]
+    assert properties["items"]["items"]["description"] == "An item."
+    # it repeats the tool description only with the trimmed whitespace
+    assert properties["order_id"]["description"] == "Look up an order."
+    assert wire_size(function) < wire_size(OPENAI_TOOL["function"])
+
+
+def test_claude_tools_and_disabled_rules():
+    claude_tool = {
+        "name": "lookup",
+        "description": " Look up. ",
+        "input_schema": {
+            "type": "object",
+            "properties": {"order_id": {"type": "string", "description": "Look up."}},
+        },
+    }
+
+    optimized = PayloadOptimizer().optimize_tool(claude_tool)
+    assert optimized["description"] == "Look up."
+    assert "description" not in optimized["input_schema"]["properties"]["order_id"]
+
+    untouched = PayloadOptimizer(
+        trim_descriptions=False, dedupe_descriptions=False
+    ).optimize_tool(claude_tool)
+    assert untouched == claude_tool
+
+
+def test_agent_sends_optimized_requests_and_records_their_size():
+    call = ScriptedCall(openai_completion({"content": "Shipped."}))
+    agent = OpenAIAgent(
+        tools=[LookupTool()], provider_client=scripted_openai_client(call)
+    )
+    thread = ThreadBase(
+        type="basic", messages=[Message(role="user", type="text", content="hi")]
+    )
+
+    thread.process_thread(agent)
+
+    (request,) = call.requests
+    assert request["messages"][-1] == {"role": "user", "content": "hi"}
+    assert request["tools"][0]["function"]["description"] == (
+        "Look up an order.\n\nReturns its status."
+    )
+    assert thread.request_bytes == [wire_size(request)]
+
+
+def test_request_sizes_of_each_turn(make_agent, make_thread):
+    optimized_thread, plain_thread = make_thread(), make_thread()
+
+    optimized_thread.process_thread(make_agent(tools=[LookupTool()]))
+    plain_thread.process_thread(
+        make_agent(tools=[LookupTool()], payload_optimizer=None)
+    )
+
+    assert len(optimized_thread.request_bytes) == 1
+    assert optimized_thread.request_bytes[0] < plain_thread.request_bytes[0]
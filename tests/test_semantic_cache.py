@@ -0,0 +1,210 @@
+import pytest
+
+from light_agents.ai_agents.openai_agent import OpenAIAgent
+from light_agents.core.budget import Budget
+from light_agents.core.deadline import Deadline
+from light_agents.core.semantic_cache import SemanticCache, normalize_query
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import Message
+from light_agents.schemas.thread_schema import ThreadBase
+from tests.helpers import (
+    ScriptedCall,
+    openai_completion,
+    scripted_openai_client,
+    simulated_provider,
+)
+
+
+class RecordingCall:
+    """Records the provider calls of an agent."""
+
+    def __init__(self, call):
+        self.call = call
+        self.requests = []
+
+    def create(self, **request):
+        self.requests.append(request)
+        return self.call.create(**request)
+
+
+class LookupTool(ToolBaseSchema):
+    name: str = "lookup"
+    description: str = "Look up an order."
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content="shipped")
+
+
+def record_calls(agent):
+    client = agent.provider_client
+    if hasattr(client, "messages"):
+        client.messages = recording = RecordingCall(client.messages)
+    else:
+        client.chat.completions = recording = RecordingCall(client.chat.completions)
+    return recording
+
+
+def thread(*contents):
+    roles = ["system", "user"] if len(contents) == 2 else ["user"]
+    return ThreadBase(
+        type="basic",
+        messages=[
+            Message(role=role, type="text", content=content)
+            for role, content in zip(roles, contents)
+        ],
+    )
+
+
+def test_normalization():
+    assert normalize_query("  Where’s my ORDER?! ") == "where is my order"
+    assert normalize_query("I can't find it") == "i can not find it"
+    assert normalize_query("It won't ship") == normalize_query("it will not ship")
+
+
+def test_near_duplicates_hit_within_their_context():
+    cache = SemanticCache()
+    cache.put("where is my order", "It shipped.", context="a")
+
+    assert cache.get("Where's my order?", context="a") == "It shipped."
+    assert cache.get("where is my order", context="b") is None
+    assert cache.get("how do I reset my password", context="a") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_numbers_must_match():
+    cache = SemanticCache()
+    cache.put("where is order 123", "Order 123 shipped.")
+
+    assert cache.get("Where is order #123?") == "Order 123 shipped."
+    assert cache.get("where is order 124") is None
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = SemanticCache(max_entries=2)
+    cache.put("where is my order", 1)
+    cache.put("how do i reset my password", 2)
+    cache.get("where is my order")
+    cache.put("can i change my address", 3)
+
+    assert len(cache) == 2
+    assert cache.get("how do i reset my password") is None
+    assert cache.get("where is my order") == 1
+
+
+def test_bands_must_divide_the_signature():
+    with pytest.raises(ValueError, match="bands"):
+        SemanticCache(num_perm=64, bands=10)
+
+
+def test_agent_reuses_the_answer_of_a_near_duplicate(make_agent):
+    agent = make_agent(response_cache=SemanticCache())
+    calls = record_calls(agent)
+
+    first = thread("Be brief.", "Where's my order?")
+    first.process_thread(agent)
+    second = thread("Be brief.", "where is my order")
+    second.budget = Budget(max_tokens=10_000)
+    second.process_thread(agent)
+
+    assert len(calls.requests) == 1
+    assert second.messages[-1].content == first.messages[-1].content
+    # a hit skips the budget charge
+    assert second.budget.used_tokens == 0
+
+
+def test_other_system_prompts_miss(make_agent):
+    agent = make_agent(response_cache=SemanticCache())
+    calls = record_calls(agent)
+
+    thread("Be brief.", "Where's my order?").process_thread(agent)
+    thread("Answer in French.", "Where's my order?").process_thread(agent)
+
+    assert len(calls.requests) == 2
+
+
+def test_tool_answers_are_never_cached(make_agent):
+    provider = simulated_provider(tool_call_probability=1.0, max_tool_rounds=1)
+    cache = SemanticCache()
+    agent = make_agent(tools=[LookupTool()], provider=provider, response_cache=cache)
+    calls = record_calls(agent)
+
+    thread("Where's my order?").process_thread(agent)
+    thread("Where's my order?").process_thread(agent)
+
+    assert len(cache) == 0
+    assert len(calls.requests) == 4
+
+
+def scripted_agent(call, **kwargs):
+    return OpenAIAgent(
+        response_cache=SemanticCache(),
+        provider_client=scripted_openai_client(call),
+        **kwargs,
+    )
+
+
+def test_continuations_are_never_cached():
+    call = ScriptedCall(
+        openai_completion(
+            {"content": "Paris is the capital", "finish_reason": "length"}
+        ),
+        openai_completion({"content": " of France, on the Seine."}),
+        openai_completion(
+            {"content": "Photosynthesis converts", "finish_reason": "length"}
+        ),
+        openai_completion({"content": " light into chemical energy."}),
+    )
+    agent = scripted_agent(call, max_continuations=1)
+
+    paris = thread("Tell me about Paris.")
+    paris.process_thread(agent)
+    photosynthesis = thread("Explain photosynthesis.")
+    photosynthesis.process_thread(agent)
+
+    assert len(call.requests) == 4
+    assert paris.messages[-1].content == "Paris is the capital of France, on the Seine."
+    assert photosynthesis.messages[-1].content == (
+        "Photosynthesis converts light into chemical energy."
+    )
+    assert len(agent.response_cache) == 0
+
+
+def test_follow_ups_only_hit_within_the_same_conversation():
+    call = ScriptedCall(
+        openai_completion({"content": "More about Paris."}),
+        openai_completion({"content": "More about Rome."}),
+        openai_completion({"content": "Ignored."}),
+    )
+    agent = scripted_agent(call)
+
+    def follow_up(city):
+        return ThreadBase(
+            type="basic",
+            messages=[
+                Message(role="user", type="text", content=f"Tell me about {city}."),
+                Message(role="ai", type="text", content=f"{city} is a city."),
+                Message(role="user", type="text", content="Tell me more."),
+            ],
+        )
+
+    for city in ["Paris", "Rome", "Paris"]:
+        follow_up(city).process_thread(agent)
+
+    assert len(call.requests) == 2
+
+
+def test_wrap_up_answers_are_never_cached():
+    call = ScriptedCall(
+        openai_completion({"content": "Short answer."}),
+        openai_completion({"content": "Short answer."}),
+    )
+    agent = scripted_agent(call)
+
+    for _ in range(2):
+        # already within the answer reserve, the run is wrapping up
+        thread("Where's my order?").process_thread(
+            agent, deadline=Deadline(30, answer_reserve=60)
+        )
+
+    assert len(call.requests) == 2
+    assert len(agent.response_cache) == 0
@@ -0,0 +1,140 @@
+import asyncio
+import json
+
+from light_agents.core.budget import Budget, StopReason
+from light_agents.service import ThreadService
+
+
+def request(app, method, path, body=None, **scope):
+    """Send a request to the ASGI app, returning the status and the body."""
+    payload = json.dumps(body).encode() if body is not None else b""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, **scope}
+    asyncio.run(app(scope, receive, send))
+    status = sent[0]["status"]
+    content = b"".join(message.get("body", b"") for message in sent[1:])
+    return status, content
+
+
+def thread_body(**fields):
+    return {
+        "type": "basic",
+        "messages": [{"role": "user", "type": "text", "content": "hello"}],
+        **fields,
+    }
+
+
+def test_process_thread(make_agent):
+    app = ThreadService(make_agent())
+    status, content = request(app, "POST", "/threads/process", thread_body())
+
+    thread = json.loads(content)
+    assert status == 200
+    assert thread["messages"][-1]["role"] == "ai"
+    assert thread["stop_reason"] == StopReason.COMPLETED
+
+
+def test_stream_thread(make_agent):
+    app = ThreadService(make_agent())
+    status, content = request(app, "POST", "/threads/stream", thread_body())
+
+    events = content.decode()
+    assert status == 200
+    assert "event: message" in events
+    assert "event: done" in events
+
+
+def test_client_budget_is_ignored(make_agent):
+    app = ThreadService(make_agent(), thread_budget=Budget(max_tokens=1))
+    client_budget = {"max_tokens": 10**9, "used_tokens": 0}
+    body = thread_body(budget=client_budget)
+    status, content = request(app, "POST", "/threads/process", body)
+
+    thread = json.loads(content)
+    assert status == 200
+    assert thread["budget"]["max_tokens"] == 1
+    assert thread["stop_reason"] == StopReason.TOKEN_BUDGET
+
+
+def test_thread_budget_is_not_shared(make_agent):
+    thread_budget = Budget(max_tokens=10**6)
+    app = ThreadService(make_agent(), thread_budget=thread_budget)
+    for _ in range(2):
+        _, content = request(app, "POST", "/threads/process", thread_body())
+        assert 0 < json.loads(content)["budget"]["used_tokens"] < 1000
+    assert thread_budget.used_tokens == 0
+
+
+def test_client_tenant_is_ignored(make_agent):
+    tenant_budgets = {"acme": Budget(name="acme", max_tokens=10**6)}
+    app = ThreadService(make_agent(), tenant_budgets=tenant_budgets)
+    _, content = request(app, "POST", "/threads/process", thread_body(tenant_id="acme"))
+
+    assert json.loads(content)["tenant_id"] is None
+    assert tenant_budgets["acme"].used_tokens == 0
+
+
+def test_tenant_is_resolved_from_the_request(make_agent):
+    tenant_budgets = {"acme": Budget(name="acme", max_tokens=10**6)}
+    app = ThreadService(
+        make_agent(),
+        tenant_budgets=tenant_budgets,
+        tenant_resolver=lambda scope: scope["user"],
+    )
+    _, content = request(
+        app, "POST", "/threads/process", thread_body(tenant_id="other"), user="acme"
+    )
+
+    assert json.loads(content)["tenant_id"] == "acme"
+    assert tenant_budgets["acme"].used_tokens > 0
+
+
+def test_errors(make_agent):
+    app = ThreadService(make_agent(), max_body_size=50)
+    assert request(app, "GET", "/missing")[0] == 404
+    assert request(app, "GET", "/threads/process")[0] == 405
+    assert request(app, "POST", "/threads/process", {"type": "x"})[0] == 422
+    assert request(app, "POST", "/threads/process", thread_body())[0] == 413
+
+
+def test_health(make_agent):
+    status, content = request(ThreadService(make_agent()), "GET", "/health")
+    assert status == 200
+    assert json.loads(content)["running"] == 0
+
+
+def media_body(media_url):
+    media = {"role": "user", "type": "image", "content": "", "media_url": media_url}
+    return thread_body(messages=[media])
+
+
+def test_local_media_are_refused(make_agent):
+    app = ThreadService(make_agent(), allow_remote_media=True)
+    for media_url in ["/etc/passwd", "file:///etc/passwd", "../secrets.png"]:
+        status, content = request(
+            app, "POST", "/threads/process", media_body(media_url)
+        )
+        assert status == 422
+        assert "local files" in json.loads(content)["detail"]
+        assert "cm9vd" not in content.decode()  # base64 of "root"
+
+
+def test_remote_media_need_opting_in(make_agent):
+    body = media_body("https://example.com/cat.png")
+    assert (
+        request(ThreadService(make_agent()), "POST", "/threads/process", body)[0] == 422
+    )
+
+    app = ThreadService(make_agent(), allow_remote_media=True)
+    # let through; the Claude agent then fails to download the fake URL
+    assert request(app, "POST", "/threads/process", body)[0] != 422
+    data_url = "data:image/png;base64,iVBORw0KGgo="
+    app = ThreadService(make_agent())
+    assert request(app, "POST", "/threads/process", media_body(data_url))[0] == 200
@@ -0,0 +1,163 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from openai.types.chat import ChatCompletionChunk
+
+from light_agents.ai_agents.openai_agent import OpenAIAgent
+from light_agents.core.speculative_executor import SpeculativeToolExecutor
+from light_agents.core.tool_registry import ToolRegistry
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import Message, ToolUseMessage
+
+CALLS = []
+STARTED = threading.Event()
+
+
+class SearchTool(ToolBaseSchema):
+    name: str = "search"
+    description: str = "Search the documents."
+    read_only: bool = True
+    query: str = ""
+    required: list = ["query"]
+
+    def run(self, **kwargs):
+        CALLS.append(("search", kwargs.get("query")))
+        STARTED.set()
+        if kwargs.get("query") == "fail":
+            raise RuntimeError("index down")
+        return ToolResponseSchema(content=f"results for {kwargs.get('query')}")
+
+
+class NoteTool(ToolBaseSchema):
+    name: str = "note"
+    description: str = "Write a note."
+
+    def run(self, **kwargs):
+        CALLS.append(("note", None))
+        return ToolResponseSchema(content="noted")
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    CALLS.clear()
+    STARTED.clear()
+
+
+@pytest.fixture
+def executor():
+    registry = ToolRegistry()
+    registry.register_tools([SearchTool(), NoteTool()])
+    return SpeculativeToolExecutor(registry)
+
+
+def test_read_only_tool_runs_ahead(executor):
+    assert executor.submit("call_1", "search", {"query": "cats"})
+    assert executor.pop_result("call_1").content == "results for cats"
+    assert CALLS == [("search", "cats")]
+
+
+def test_duplicate_submission_runs_once(executor):
+    executor.submit("call_1", "search", {"query": "cats"})
+    executor.submit("call_1", "search", {"query": "cats"})
+    executor.pop_result("call_1")
+    assert CALLS == [("search", "cats")]
+
+
+def test_other_calls_are_not_speculated(executor):
+    assert not executor.submit("call_1", "note", {})
+    assert not executor.submit("call_2", "search", {})
+    assert not executor.submit("call_3", "search", {"query": "x", "unknown": 1})
+    assert executor.pop_result("call_1") is None
+    assert CALLS == []
+
+
+def test_tool_error_is_raised_when_collected(executor):
+    executor.submit("call_1", "search", {"query": "fail"})
+    with pytest.raises(ValueError, match="index down"):
+        executor.pop_result("call_1")
+
+
+def test_run_executors_share_threads_but_not_calls(executor):
+    first, second = executor.for_run(), executor.for_run()
+    assert first.thread_pool() is second.thread_pool() is executor.thread_pool()
+
+    first.submit("call_1", "search", {"query": "cats"})
+    second.discard()
+    assert first.pop_result("call_1").content == "results for cats"
+    assert second.pop_result("call_1") is None
+
+
+def chunk(delta, finish_reason=None):
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+    )
+
+
+def tool_call_delta(index, call_id, name, arguments):
+    return {
+        "tool_calls": [
+            {
+                "index": index,
+                "id": call_id,
+                "type": "function",
+                "function": {"name": name, "arguments": arguments},
+            }
+        ]
+    }
+
+
+def test_streamed_tool_call_starts_before_the_stream_ends():
+    started_while_streaming = []
+
+    def tool_calls_stream():
+        yield chunk(tool_call_delta(0, "call_1", "search", '{"query": "cats"}'))
+        # completes the search call, handed to the speculative executor
+        yield chunk(tool_call_delta(1, "call_2", "note", "{}"))
+        started_while_streaming.append(STARTED.wait(2))
+        yield chunk({}, "tool_calls")
+
+    def answer_stream():
+        yield chunk({"role": "assistant", "content": "Found cats."}, "stop")
+
+    streams = iter([tool_calls_stream, answer_stream])
+    completions = SimpleNamespace(create=lambda **request: next(streams)())
+    agent = OpenAIAgent(
+        tools=[SearchTool(), NoteTool()],
+        stream=True,
+        provider_client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+    )
+
+    messages = agent.agent_run([Message(role="user", type="text", content="cats?")])
+
+    assert started_while_streaming == [True]
+    assert CALLS == [("search", "cats"), ("note", None)]
+    tool_uses = [message for message in messages if isinstance(message, ToolUseMessage)]
+    assert tool_uses[0].tool_outputs == "results for cats"
+    assert messages[-1].content == "Found cats."
+
+
+def test_stream_error_discards_the_speculated_calls():
+    def broken_stream():
+        yield chunk(tool_call_delta(0, "call_1", "search", '{"query": "cats"}'))
+        yield chunk(tool_call_delta(1, "call_2", "note", "{}"))
+        time.sleep(0.05)
+        raise ConnectionError("stream reset")
+
+    completions = SimpleNamespace(create=lambda **request: broken_stream())
+    agent = OpenAIAgent(
+        tools=[SearchTool(), NoteTool()],
+        stream=True,
+        provider_client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+    )
+
+    with pytest.raises(ConnectionError):
+        agent.agent_run([Message(role="user", type="text", content="cats?")])
+    assert ("note", None) not in CALLS
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import json
+from enum import Enum
+from typing import Dict, List, Optional
+
+import pytest
+from pydantic import BaseModel, Field
+
+from light_agents.ai_agents.openai_agent import OpenAIAgent
+from light_agents.core.tool_registry import ToolRegistry
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import Message
+from light_agents.serializers.tools.base_serializers import strict_parameters_schema
+from light_agents.serializers.tools.claude_tools_serializer import (
+    claude_tool_calling_serializer,
+)
+from light_agents.serializers.tools.openai_tools_serializer import (
+    openai_tool_calling_serializer,
+)
+from tests.helpers import ScriptedCall, openai_completion, scripted_openai_client
+
+CALLS = []
+
+
+class Priority(str, Enum):
+    low = "low"
+    high = "high"
+
+
+class Item(BaseModel):
+    sku: str
+    quantity: int = 1
+
+
+class Category(BaseModel):
+    name: str
+    parent: Optional[Category] = None
+
+
+class CreateOrderTool(ToolBaseSchema):
+    name: str = "create_order"
+    description: str = "Create an order."
+    strict: bool = True
+    required: list = ["items"]
+    items: List[Item] = Field(default_factory=list, description="Ordered items.")
+    priority: Optional[Priority] = None
+    note: str = Field(default="", description="Note for the warehouse.")
+
+    def run(self, **kwargs):
+        CALLS.append(kwargs)
+        return ToolResponseSchema(content="created")
+
+
+class CategorizeTool(ToolBaseSchema):
+    name: str = "categorize"
+    description: str = "Categorize a product."
+    strict: bool = True
+    category: Optional[Category] = None
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content="done")
+
+
+class TagTool(ToolBaseSchema):
+    name: str = "tag"
+    description: str = "Tag a product."
+    strict: bool = True
+    tags: List[Dict[str, str]] = Field(default_factory=list)
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content="done")
+
+
+class NoteTool(ToolBaseSchema):
+    name: str = "note"
+    description: str = "Write a note."
+    note: str = Field(default="", description="The note.")
+
+    def run(self, **kwargs):
+        CALLS.append(kwargs)
+        return ToolResponseSchema(content="noted")
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    CALLS.clear()
+
+
+def test_strict_schema_is_exact():
+    schema = strict_parameters_schema(CreateOrderTool())
+
+    assert schema["required"] == ["items", "priority", "note"]
+    assert schema["additionalProperties"] is False
+    assert schema["properties"]["items"] == {
+        "type": "array",
+        "description": "Ordered items.",
+        "items": {
+            "type": "object",
+            "properties": {"sku": {"type": "string"}, "quantity": {"type": "integer"}},
+            "required": ["sku", "quantity"],
+            "additionalProperties": False,
+        },
+    }
+    # optional parameters accept null
+    assert schema["properties"]["priority"] == {
+        "anyOf": [{"enum": ["low", "high"], "type": "string"}, {"type": "null"}]
+    }
+    assert schema["properties"]["note"] == {
+        "anyOf": [{"type": "string"}, {"type": "null"}],
+        "description": "Note for the warehouse.",
+    }
+    assert "title" not in json.dumps(schema) and "$ref" not in json.dumps(schema)
+
+
+def test_providers_get_the_strict_schema():
+    openai_tool = openai_tool_calling_serializer(CreateOrderTool())
+    claude_tool = claude_tool_calling_serializer(CreateOrderTool())
+
+    assert openai_tool["function"]["strict"] is True
+    assert openai_tool["function"]["parameters"] == claude_tool["input_schema"]
+    assert "strict" not in openai_tool_calling_serializer(NoteTool())["function"]
+
+
+def test_recursive_models_are_rejected():
+    with pytest.raises(ValueError, match="Recursive model 'Category'"):
+        strict_parameters_schema(CategorizeTool())
+
+
+def test_free_form_objects_are_rejected():
+    with pytest.raises(ValueError, match=r"Free-form object 'TagTool\.tags\[\]'"):
+        strict_parameters_schema(TagTool())
+
+
+def test_null_args_of_strict_tools_fall_back_to_defaults():
+    registry = ToolRegistry()
+    registry.register_tools([CreateOrderTool(), NoteTool()])
+
+    registry.execute_tool(
+        "create_order", {"items": [{"sku": "a"}], "priority": None, "note": None}
+    )
+    registry.execute_tool("note", {"note": None})
+
+    assert CALLS == [{"items": [{"sku": "a"}]}, {"note": None}]
+
+
+def test_agent_sends_strict_tools_and_runs_their_calls():
+    arguments = {
+        "items": [{"sku": "a", "quantity": 2}],
+        "priority": "high",
+        "note": None,
+    }
+    call = ScriptedCall(
+        openai_completion(
+            {
+                "finish_reason": "tool_calls",
+                "tool_calls": [("call_1", "create_order", json.dumps(arguments))],
+            }
+        ),
+        openai_completion({"content": "Order created."}),
+    )
+    agent = OpenAIAgent(
+        tools=[CreateOrderTool()], provider_client=scripted_openai_client(call)
+    )
+
+    messages = agent.agent_run([Message(role="user", type="text", content="order")])
+
+    (tool,) = call.requests[0]["tools"]
+    assert tool["function"]["strict"] is True
+    assert CALLS == [{"items": [{"sku": "a", "quantity": 2}], "priority": "high"}]
+    assert messages[-1].content == "Order created."
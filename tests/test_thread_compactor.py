@@ -0,0 +1,111 @@
+import pytest
+from pydantic import ValidationError
+
+from light_agents.core.thread_compactor import ThreadCompactor
+from light_agents.schemas.messages_schemas import (
+    Message,
+    SummaryMessage,
+    ToolUseMessage,
+)
+
+
+class CountingCompactor(ThreadCompactor):
+    summaries: int = 0
+
+    def summarize(self, messages):
+        self.summaries += 1
+        return super().summarize(messages)
+
+
+def text(role, content="word " * 40):
+    return Message(role=role, type="text", content=content)
+
+
+def tool_use(run_id):
+    return ToolUseMessage(
+        role="tool_use",
+        type="text",
+        content="",
+        run_id=run_id,
+        name="lookup",
+        input_params_dict={},
+        tool_outputs="found " * 40,
+    )
+
+
+def turns(count):
+    messages = []
+    for turn in range(count):
+        messages += [text("user"), tool_use(f"call_{turn}"), text("ai")]
+    return messages
+
+
+@pytest.fixture
+def compactor(make_agent):
+    return CountingCompactor(
+        summarizer=make_agent(), token_threshold=100, keep_last_messages=2
+    )
+
+
+def test_keep_last_messages_must_keep_a_message(make_agent):
+    with pytest.raises(ValidationError):
+        ThreadCompactor(summarizer=make_agent(), keep_last_messages=0)
+
+
+def test_keeps_the_last_message(make_agent):
+    compactor = ThreadCompactor(
+        summarizer=make_agent(), token_threshold=10, keep_last_messages=1
+    )
+    messages = [text("user"), text("ai"), text("user", "last question")]
+
+    summary = compactor.compact(messages)
+
+    assert summary is not None
+    assert summary.summarized_messages == 2
+    assert [message.compacted for message in messages] == [True, True, False, False]
+    assert messages[2] is summary
+    assert messages[3].content == "last question"
+
+
+def test_below_threshold(compactor):
+    messages = [text("user", "hi"), text("ai", "hello")]
+    assert compactor.compact(messages) is None
+    assert compactor.summaries == 0
+
+
+def test_cut_starts_at_a_user_message(compactor):
+    messages = [text("system", "Be brief."), *turns(3)]
+
+    summary = compactor.compact(messages)
+
+    # the last 2 messages would split the last turn, so it's kept whole
+    active = [message for message in messages if not message.compacted]
+    assert summary.summarized_messages == 6
+    assert active[0].role == "system"
+    assert active[1] is summary
+    assert [message.role for message in active[2:]] == ["user", "tool_use", "ai"]
+
+
+def test_single_turn_is_not_compacted(compactor):
+    messages = turns(1)
+    assert compactor.compact(messages) is None
+    assert not any(message.compacted for message in messages)
+
+
+def test_summaries_are_cached(compactor):
+    first = turns(3)
+    second = [message.model_copy() for message in first]
+
+    assert compactor.compact(first).summary_key == (
+        compactor.compact(second).summary_key
+    )
+    assert compactor.summaries == 1
+
+
+def test_compacted_messages_are_not_sent(compactor, make_thread):
+    thread = make_thread(compactor=compactor)
+    thread.messages[:0] = turns(3)
+    thread.process_thread(compactor.summarizer)
+
+    assert any(isinstance(message, SummaryMessage) for message in thread.messages)
+    assert thread.messages[-1].role == "ai"
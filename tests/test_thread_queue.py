@@ -0,0 +1,134 @@
+import multiprocessing
+import signal
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from light_agents.workers.pool import run_worker
+from light_agents.workers.thread_queue import SQLiteThreadQueue, ThreadStatus
+
+
+@pytest.fixture
+def thread_queue(tmp_path):
+    thread_queue = SQLiteThreadQueue(str(tmp_path / "threads.db"))
+    yield thread_queue
+    thread_queue.close()
+
+
+def test_claims_in_order(thread_queue, make_thread):
+    first, second = make_thread("first"), make_thread("second")
+    thread_queue.enqueue(first)
+    thread_queue.enqueue(second)
+
+    assert thread_queue.claim("worker").id == first.id
+    assert thread_queue.claim("worker").id == second.id
+    assert thread_queue.claim("worker") is None
+    assert thread_queue.counts() == {ThreadStatus.PROCESSING.value: 2}
+
+
+def test_complete_and_fail(thread_queue, make_thread):
+    done, failed = make_thread(), make_thread()
+    for thread in (done, failed):
+        thread_queue.enqueue(thread)
+        thread_queue.claim("worker")
+
+    done.messages[0].content = "processed"
+    assert thread_queue.complete(done, "worker")
+    assert thread_queue.fail(failed.id, "boom", "worker")
+
+    assert thread_queue.status(done.id) == ThreadStatus.DONE
+    assert thread_queue.get(done.id).messages[0].content == "processed"
+    assert thread_queue.status(failed.id) == ThreadStatus.FAILED
+
+
+def test_expired_lease_is_requeued(thread_queue, make_thread):
+    thread = make_thread()
+    thread_queue.enqueue(thread)
+    thread_queue.claim("dead", lease=0.05)
+    assert thread_queue.requeue_expired() == 0
+
+    time.sleep(0.1)
+    assert thread_queue.requeue_expired() == 1
+    assert thread_queue.status(thread.id) == ThreadStatus.PENDING
+
+    # the late worker can't overwrite the thread claimed by another one
+    assert thread_queue.claim("alive").id == thread.id
+    assert not thread_queue.heartbeat(thread.id, "dead", 60)
+    assert not thread_queue.complete(thread, "dead")
+    assert thread_queue.complete(thread, "alive")
+
+
+def test_threads_crashing_their_workers_fail(thread_queue, make_thread):
+    thread = make_thread()
+    thread_queue.enqueue(thread)
+    thread_queue.claim("dead", lease=0)
+    assert thread_queue.requeue_expired(max_attempts=2) == 1
+
+    thread_queue.claim("dead", lease=0)
+    assert thread_queue.requeue_expired(max_attempts=2) == 0
+    assert thread_queue.status(thread.id) == ThreadStatus.FAILED
+    assert thread_queue.claim("alive") is None
+
+    # enqueued again, the thread gets its attempts back
+    thread_queue.enqueue(thread)
+    thread_queue.claim("dead", lease=0)
+    assert thread_queue.requeue_expired(max_attempts=2) == 1
+
+
+def test_held_lease_is_not_requeued(thread_queue, make_thread):
+    thread = make_thread()
+    thread_queue.enqueue(thread)
+    thread_queue.claim("worker", lease=0.15)
+
+    with thread_queue.hold(thread.id, "worker", lease=0.15):
+        for _ in range(5):
+            time.sleep(0.1)
+            assert thread_queue.requeue_expired() == 0
+
+    assert thread_queue.status(thread.id) == ThreadStatus.PROCESSING
+
+
+def test_adds_the_lease_to_old_databases(tmp_path, make_thread):
+    path = str(tmp_path / "old.db")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE threads (id TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+        "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+        "worker TEXT, error TEXT, enqueued_at REAL NOT NULL, "
+        "updated_at REAL NOT NULL)"
+    )
+    connection.close()
+
+    thread_queue = SQLiteThreadQueue(path)
+    thread_queue.enqueue(make_thread())
+    assert thread_queue.claim("worker") is not None
+    thread_queue.close()
+
+
+def test_worker_processes_the_queue(tmp_path, make_agent, make_thread):
+    path = str(tmp_path / "threads.db")
+    thread_queue = SQLiteThreadQueue(path)
+    thread = make_thread()
+    thread_queue.enqueue(thread)
+
+    stop_event = multiprocessing.Event()
+    stats_queue = multiprocessing.Queue()
+    agent = make_agent()
+    handlers = {
+        signum: signal.getsignal(signum) for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    timer = threading.Timer(0.5, stop_event.set)
+    timer.start()
+    try:
+        run_worker("w1", path, lambda: agent, stop_event, stats_queue, 0.05, 60)
+    finally:
+        timer.cancel()
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+
+    assert thread_queue.status(thread.id) == ThreadStatus.DONE
+    assert thread_queue.get(thread.id).messages[-1].role == "ai"
+    assert stats_queue.get(timeout=5).processed == 1
+    thread_queue.close()
@@ -0,0 +1,175 @@
+from light_agents.ai_agents.openai_agent import OpenAIAgent
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import Message, ToolUseMessage
+from light_agents.serializers.messages.claude_messages_serializers import (
+    claude_messages_list_serializer,
+)
+from light_agents.serializers.messages.openai_messages_serializer import (
+    openai_messages_list_serializer,
+)
+from light_agents.utils.messages import group_tool_uses
+from tests.helpers import (
+    ScriptedCall,
+    anthropic_message,
+    openai_completion,
+    scripted_anthropic_client,
+    scripted_openai_client,
+)
+
+
+class LookupTool(ToolBaseSchema):
+    name: str = "lookup"
+    description: str = "Look up an order."
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content="shipped")
+
+
+def tool_use(name, completion_id):
+    return ToolUseMessage(
+        role="tool_use",
+        type="text",
+        content="",
+        run_id=f"call_{name}",
+        name="lookup",
+        input_params_dict={"order_id": name},
+        tool_outputs=f"order {name}",
+        completion_id=completion_id,
+    )
+
+
+def thread_messages():
+    return [
+        Message(role="user", type="text", content="Orders a, b and c?"),
+        tool_use("a", "chatcmpl-1"),
+        tool_use("b", "chatcmpl-1"),
+        tool_use("c", "chatcmpl-2"),
+        Message(role="ai", type="text", content="Shipped."),
+        # stored before completion ids, one call per turn
+        tool_use("d", None),
+        tool_use("e", None),
+    ]
+
+
+def test_tool_uses_are_grouped_by_completion():
+    groups = [
+        [message.run_id for message in group]
+        if isinstance(group, list)
+        else group.content
+        for group in group_tool_uses(thread_messages())
+    ]
+    assert groups == [
+        "Orders a, b and c?",
+        ["call_a", "call_b"],
+        ["call_c"],
+        "Shipped.",
+        ["call_d"],
+        ["call_e"],
+    ]
+
+
+def test_openai_sends_parallel_calls_in_one_assistant_turn():
+    serialized = openai_messages_list_serializer(thread_messages())
+
+    turns = [
+        (
+            message["role"],
+            [call["id"] for call in message.get("tool_calls", [])]
+            or message.get("tool_call_id"),
+        )
+        for message in serialized[1:]
+    ]
+    assert turns == [
+        ("assistant", ["call_a", "call_b"]),
+        ("tool", "call_a"),
+        ("tool", "call_b"),
+        ("assistant", ["call_c"]),
+        ("tool", "call_c"),
+        ("assistant", None),
+        ("assistant", ["call_d"]),
+        ("tool", "call_d"),
+        ("assistant", ["call_e"]),
+        ("tool", "call_e"),
+    ]
+
+
+def test_claude_sends_parallel_results_in_one_user_turn():
+    serialized = claude_messages_list_serializer(thread_messages())
+
+    assert serialized[1] == {
+        "role": "assistant",
+        "content": [
+            {
+                "type": "tool_use",
+                "id": f"call_{name}",
+                "name": "lookup",
+                "input": {"order_id": name},
+            }
+            for name in "ab"
+        ],
+    }
+    assert serialized[2] == {
+        "role": "user",
+        "content": [
+            {
+                "type": "tool_result",
+                "tool_use_id": f"call_{name}",
+                "content": f"order {name}",
+            }
+            for name in "ab"
+        ],
+    }
+    # calls without a completion id keep one turn each
+    assert [len(message["content"]) for message in serialized[6:]] == [1, 1, 1, 1]
+
+
+def tool_calls(agent_class, completion_id, count):
+    """Build a response of the agent's provider calling `lookup` `count` times."""
+    if agent_class is OpenAIAgent:
+        response = openai_completion(
+            {
+                "finish_reason": "tool_calls",
+                "tool_calls": [
+                    (f"call_{completion_id}{index}", "lookup", "{}")
+                    for index in range(count)
+                ],
+            }
+        )
+    else:
+        response = anthropic_message(
+            *[
+                {
+                    "type": "tool_use",
+                    "id": f"toolu_{completion_id}{index}",
+                    "name": "lookup",
+                    "input": {},
+                }
+                for index in range(count)
+            ],
+            stop_reason="tool_use",
+        )
+    return response.model_copy(update={"id": completion_id})
+
+
+def test_agent_marks_parallel_calls_of_a_response(agent_class):
+    if agent_class is OpenAIAgent:
+        answer = openai_completion({"content": "Shipped."})
+        scripted_client = scripted_openai_client
+    else:
+        answer = anthropic_message({"type": "text", "text": "Shipped."})
+        scripted_client = scripted_anthropic_client
+    call = ScriptedCall(
+        tool_calls(agent_class, "r1", 3),
+        tool_calls(agent_class, "r2", 2),
+        answer,
+    )
+    agent = agent_class(tools=[LookupTool()], provider_client=scripted_client(call))
+
+    messages = agent.agent_run([Message(role="user", type="text", content="hi")])
+
+    tool_uses = [message for message in messages if isinstance(message, ToolUseMessage)]
+    groups = [group for group in group_tool_uses(messages) if isinstance(group, list)]
+    completion_ids = [message.completion_id for message in tool_uses]
+    assert completion_ids == ["r1", "r1", "r1", "r2", "r2"]
+    assert [len(group) for group in groups] == [3, 2]
+    assert messages[-1].role == "ai"
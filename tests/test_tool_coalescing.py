@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from light_agents.core.tool_registry import ToolRegistry
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+
+
+class Abort(BaseException):
+    pass
+
+
+class BlockingTool(ToolBaseSchema):
+    """Read-only tool blocking until the test releases it."""
+
+    name: str = "search"
+    description: str = "Search the documents."
+    read_only: bool = True
+
+    def run(self, **kwargs):
+        state = STATE
+        state["runs"] += 1
+        state["started"].set()
+        state["release"].wait(5)
+        if state["error"] is not None:
+            raise state["error"]
+        return ToolResponseSchema(content="results")
+
+
+STATE = {}
+
+
+@pytest.fixture
+def registry():
+    STATE.update(
+        runs=0, started=threading.Event(), release=threading.Event(), error=None
+    )
+    registry = ToolRegistry()
+    registry.register(BlockingTool())
+    return registry
+
+
+def run_in_thread(function):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = function()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def owner_and_waiter(registry):
+    owner, owner_outcome = run_in_thread(lambda: registry.execute_tool("search", {}))
+    assert STATE["started"].wait(5)
+    waiter, waiter_outcome = run_in_thread(lambda: registry.execute_tool("search", {}))
+    # lets the waiter join the in-flight call
+    time.sleep(0.1)
+    STATE["release"].set()
+    owner.join(5)
+    waiter.join(5)
+    assert not owner.is_alive() and not waiter.is_alive()
+    return owner_outcome, waiter_outcome
+
+
+def test_identical_calls_run_once(registry):
+    owner, waiter = owner_and_waiter(registry)
+
+    assert STATE["runs"] == 1
+    assert owner["result"] is waiter["result"]
+    assert not registry._inflight_calls
+
+
+def test_owner_error_is_shared(registry):
+    STATE["error"] = RuntimeError("index down")
+    owner, waiter = owner_and_waiter(registry)
+
+    assert STATE["runs"] == 1
+    assert isinstance(owner["error"], ValueError)
+    assert waiter["error"] is owner["error"]
+
+
+def test_owner_interrupted(registry):
+    STATE["error"] = Abort()
+    owner, waiter = owner_and_waiter(registry)
+
+    assert isinstance(owner["error"], Abort)
+    assert isinstance(waiter["error"], Abort)
+    assert not registry._inflight_calls
+
+
+def test_different_args_are_not_coalesced(registry):
+    STATE["release"].set()
+    registry.execute_tool("search", {})
+    registry.execute_tool("search", {"extra": 1})
+    assert STATE["runs"] == 2
+
+
+def test_async_calls_are_coalesced(registry):
+    STATE["release"].set()
+
+    async def run_both():
+        return await asyncio.gather(
+            registry.aexecute_tool("search", {}), registry.aexecute_tool("search", {})
+        )
+
+    first, second = asyncio.run(run_both())
+    assert first is second
+    assert STATE["runs"] == 1
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from light_agents.core.tool_errors import ToolErrorPolicy
+from light_agents.exceptions.thread_agent_exceptions import ToolExecutionError
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import Message, ToolUseMessage
+from light_agents.serializers.messages.claude_messages_serializers import (
+    claude_messages_list_serializer,
+)
+from tests.helpers import simulated_provider
+
+STATE = {"calls": 0, "failures": 0}
+
+
+class ShakyTool(ToolBaseSchema):
+    name: str = "inventory"
+    description: str = "Check the inventory."
+
+    def run(self, **kwargs):
+        STATE["calls"] += 1
+        if STATE["calls"] <= STATE["failures"]:
+            raise ConnectionError("inventory service reset")
+        return ToolResponseSchema(content="12 in stock")
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    STATE.update(calls=0, failures=0)
+
+
+def looping_provider(rounds=3):
+    return simulated_provider(
+        tool_call_probability=1.0, max_parallel_tool_calls=1, max_tool_rounds=rounds
+    )
+
+
+def user_message():
+    return Message(role="user", type="text", content="Is it in stock?")
+
+
+def tool_uses(messages):
+    return [message for message in messages if isinstance(message, ToolUseMessage)]
+
+
+def test_policy_budgets():
+    policy = ToolErrorPolicy(max_errors_per_tool=2, max_errors_per_run=3)
+    errors = {}
+    assert policy.admit("a", errors) and policy.admit("a", errors)
+    assert not policy.admit("a", errors)
+    assert not policy.admit("b", {"a": 2, "c": 1})
+    assert not ToolErrorPolicy(max_errors_per_run=0).admit("a", {})
+
+
+def test_failed_call_is_returned_to_the_model(make_agent):
+    STATE["failures"] = 1
+    agent = make_agent(tools=[ShakyTool()], provider=looping_provider(rounds=2))
+
+    messages = agent.agent_run([user_message()])
+
+    failed, succeeded = tool_uses(messages)
+    assert failed.is_error
+    assert "inventory service reset" in failed.tool_outputs
+    assert failed.tool_outputs.startswith("<TOOL_ERROR>")
+    assert not succeeded.is_error and succeeded.tool_outputs == "12 in stock"
+    assert messages[-1].role == "ai"
+
+
+def test_errors_past_the_tool_budget_abort_the_run(make_agent):
+    STATE["failures"] = 10
+    agent = make_agent(
+        tools=[ShakyTool()],
+        provider=looping_provider(),
+        tool_error_policy=ToolErrorPolicy(max_errors_per_tool=1),
+    )
+
+    with pytest.raises(ToolExecutionError) as error:
+        agent.agent_run([user_message()])
+
+    assert error.value.tool_name == "inventory"
+    assert isinstance(error.value.error, ValueError)
+    assert STATE["calls"] == 2
+
+
+def test_async_run_aborts_on_the_first_error_without_budget(make_agent, make_thread):
+    STATE["failures"] = 10
+    agent = make_agent(
+        tools=[ShakyTool()],
+        provider=looping_provider(),
+        tool_error_policy=ToolErrorPolicy(max_errors_per_run=0),
+    )
+
+    with pytest.raises(ValueError, match="Error executing tool"):
+        asyncio.run(make_thread().aprocess_thread(agent))
+    assert STATE["calls"] == 1
+
+
+def test_custom_rendering_reaches_claude_as_error_result(make_agent):
+    STATE["failures"] = 1
+    policy = ToolErrorPolicy(render=lambda name, error: f"{name} is down")
+    agent = make_agent(
+        tools=[ShakyTool()],
+        provider=looping_provider(rounds=2),
+        tool_error_policy=policy,
+    )
+
+    messages = agent.agent_run([user_message()])
+    (result,) = [
+        block
+        for message in claude_messages_list_serializer(messages)
+        if isinstance(message["content"], list)
+        for block in message["content"]
+        if block["type"] == "tool_result" and block.get("is_error")
+    ]
+
+    assert result["content"] == "inventory is down"
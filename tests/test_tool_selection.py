@@ -0,0 +1,107 @@
+from light_agents.core.output_spill import READ_TOOL_OUTPUT
+from light_agents.core.tool_registry import ToolRegistry
+from light_agents.schemas import ToolBaseSchema, ToolResponseSchema
+from light_agents.schemas.messages_schemas import ToolUseMessage
+
+
+class WeatherTool(ToolBaseSchema):
+    name: str = "get_weather"
+    description: str = "Get the weather forecast of a city."
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content="sunny")
+
+
+class StockTool(ToolBaseSchema):
+    name: str = "get_stock_price"
+    description: str = "Get the price of a stock."
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content="42")
+
+
+class EmailTool(ToolBaseSchema):
+    name: str = "send_email"
+    description: str = "Send an email to a contact."
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content="sent")
+
+
+class ClockTool(ToolBaseSchema):
+    name: str = "get_time"
+    description: str = "Get the current time."
+    always_on: bool = True
+
+    def run(self, **kwargs):
+        return ToolResponseSchema(content="noon")
+
+
+def names(tools):
+    return [tool.name for tool in tools]
+
+
+def test_registry_ranks_and_pins():
+    registry = ToolRegistry()
+    registry.register_tools([WeatherTool(), StockTool(), ClockTool()])
+
+    selected = registry.select_tools("what is the weather forecast?", 1)
+    assert names(selected) == ["get_time", "get_weather"]
+    assert names(registry.select_tools("unrelated", 1)) == ["get_time"]
+
+
+def test_registry_selects_among_given_tools():
+    registry = ToolRegistry()
+    weather, stock = WeatherTool(), StockTool()
+    registry.register_tools([weather, stock])
+
+    assert registry.select_tools("weather price", 5, [stock]) == [stock]
+    assert sorted(names(registry.select_tools("weather price", 5))) == [
+        "get_stock_price",
+        "get_weather",
+    ]
+
+
+def test_registry_index_follows_new_tools():
+    registry = ToolRegistry()
+    registry.register(WeatherTool())
+    assert registry.select_tools("send an email", 1) == []
+
+    registry.register(EmailTool())
+    assert names(registry.select_tools("send an email", 1)) == ["send_email"]
+
+
+def test_agents_sharing_a_registry_keep_their_tools(make_agent, make_thread):
+    registry = ToolRegistry()
+    weather_agent = make_agent(
+        tools=[WeatherTool()], tools_top_k=3, tools_registry=registry
+    )
+    make_agent(tools=[StockTool()], tools_top_k=3, tools_registry=registry)
+
+    thread = make_thread("weather forecast and stock price, read the tool output")
+    assert names(weather_agent.select_tools(thread.messages)) == ["get_weather"]
+
+
+def test_called_tools_stay_selected(make_agent, make_thread):
+    agent = make_agent(tools=[WeatherTool(), EmailTool()], tools_top_k=1)
+    thread = make_thread("send an email")
+    thread.messages.append(
+        ToolUseMessage(
+            role="tool_use",
+            type="text",
+            content="",
+            run_id="call_1",
+            name="get_weather",
+            input_params_dict={},
+            tool_outputs="sunny",
+        )
+    )
+
+    selected = agent.select_tools(thread.messages)
+    assert sorted(names(selected)) == ["get_weather", "send_email"]
+
+
+def test_paging_tool_is_not_ranked(make_agent, make_thread):
+    agent = make_agent(tools=[WeatherTool()], tools_top_k=5)
+    thread = make_thread("read the tool output")
+    assert READ_TOOL_OUTPUT not in names(agent.select_tools(thread.messages))